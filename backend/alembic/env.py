@@ -38,7 +38,7 @@ try:
     from modules.conversation_engine.models import ConversationMessageModel, ConversationModel  # noqa: F401
     from modules.flow_engine.models import FlowRunModel, FlowStepRunModel  # noqa: F401
     from modules.learning_session.models import LearningSessionModel, UnitSessionModel  # noqa: F401
-    from modules.llm_services.models import LLMRequestModel  # noqa: F401
+    from modules.llm_services.models import LLMPayloadBlobModel, LLMRequestModel  # noqa: F401
     from modules.object_store.models import AudioModel, DocumentModel, ImageModel  # noqa: F401
     from modules.resource.models import ResourceModel  # noqa: F401
     from modules.shared_models import Base
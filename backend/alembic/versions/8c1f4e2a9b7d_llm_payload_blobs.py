@@ -0,0 +1,177 @@
+"""llm_payload_blobs
+
+Revision ID: 8c1f4e2a9b7d
+Revises: 3d99d3fdf93e
+Create Date: 2026-10-16 23:10:00.000000
+
+"""
+from typing import Sequence, Union
+
+import hashlib
+import importlib
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8c1f4e2a9b7d'
+down_revision: Union[str, None] = '3d99d3fdf93e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+_BATCH_SIZE = 500
+
+# Frozen copies of the blob format at this revision (modules/llm_services/blobs.py may change later)
+BLOB_REF_KEY = '$blob'
+BLOB_MIN_BYTES = 1024
+_COMPRESS_MIN_BYTES = 4096
+BLOB_COLUMNS = ('messages', 'request_payload', 'response_raw', 'response_output')
+
+try:
+    _zstd = importlib.import_module('zstandard')
+except Exception:
+    _zstd = None
+
+llm_requests = sa.table(
+    'llm_requests',
+    sa.column('id', sa.UUID()),
+    *(sa.column(name, sa.JSON()) for name in BLOB_COLUMNS),
+)
+
+llm_payload_blobs = sa.table(
+    'llm_payload_blobs',
+    sa.column('hash', sa.String()),
+    sa.column('encoding', sa.String()),
+    sa.column('data', sa.LargeBinary()),
+    sa.column('size_bytes', sa.Integer()),
+)
+
+
+def _is_ref(value) -> bool:
+    return isinstance(value, dict) and len(value) == 1 and isinstance(value.get(BLOB_REF_KEY), str)
+
+
+def dehydrate(value, blobs: dict):
+    if isinstance(value, str):
+        encoded = value.encode()
+        if len(encoded) < BLOB_MIN_BYTES:
+            return value
+        digest = hashlib.sha256(encoded).hexdigest()
+        blobs[digest] = value
+        return {BLOB_REF_KEY: digest}
+    if isinstance(value, dict):
+        return {key: dehydrate(item, blobs) for key, item in value.items()}
+    if isinstance(value, list):
+        return [dehydrate(item, blobs) for item in value]
+    return value
+
+
+def blob_refs(value) -> set:
+    if _is_ref(value):
+        return {value[BLOB_REF_KEY]}
+    if isinstance(value, dict):
+        return set().union(*(blob_refs(item) for item in value.values())) if value else set()
+    if isinstance(value, list):
+        return set().union(*(blob_refs(item) for item in value)) if value else set()
+    return set()
+
+
+def rehydrate(value, texts: dict):
+    if _is_ref(value):
+        return texts.get(value[BLOB_REF_KEY], value)
+    if isinstance(value, dict):
+        return {key: rehydrate(item, texts) for key, item in value.items()}
+    if isinstance(value, list):
+        return [rehydrate(item, texts) for item in value]
+    return value
+
+
+def _encode_blob(digest: str, text: str) -> dict:
+    data = text.encode()
+    size = len(data)
+    encoding = 'raw'
+    if _zstd is not None and size >= _COMPRESS_MIN_BYTES:
+        compressed = _zstd.ZstdCompressor(level=3).compress(data)
+        if len(compressed) < size:
+            data, encoding = compressed, 'zstd'
+    return {'hash': digest, 'encoding': encoding, 'data': data, 'size_bytes': size}
+
+
+def _decode_blob(encoding: str, data: bytes) -> str:
+    if encoding == 'zstd':
+        if _zstd is None:
+            raise RuntimeError('zstandard is required to read compressed llm_payload_blobs rows')
+        data = _zstd.ZstdDecompressor().decompress(data)
+    return data.decode()
+
+
+def store_blobs(bind, blobs: dict) -> None:
+    if not blobs:
+        return
+    existing = set(bind.execute(sa.select(llm_payload_blobs.c.hash).where(llm_payload_blobs.c.hash.in_(list(blobs)))).scalars())
+    rows = [_encode_blob(digest, text) for digest, text in blobs.items() if digest not in existing]
+    if rows:
+        bind.execute(llm_payload_blobs.insert(), rows)
+
+
+def load_blobs(bind, hashes) -> dict:
+    hashes = list(hashes)
+    if not hashes:
+        return {}
+    rows = bind.execute(sa.select(llm_payload_blobs.c.hash, llm_payload_blobs.c.encoding, llm_payload_blobs.c.data).where(llm_payload_blobs.c.hash.in_(hashes)))
+    return {digest: _decode_blob(encoding, data) for digest, encoding, data in rows}
+
+
+def _rewrite_rows(transform) -> None:
+    """Apply ``transform(row) -> changed values`` to every llm_requests row, in id-ordered batches."""
+    bind = op.get_bind()
+    last_id = None
+    while True:
+        query = sa.select(llm_requests).order_by(llm_requests.c.id).limit(_BATCH_SIZE)
+        if last_id is not None:
+            query = query.where(llm_requests.c.id > last_id)
+        rows = bind.execute(query).mappings().all()
+        if not rows:
+            break
+        for row in rows:
+            values = transform(bind, row)
+            if values:
+                bind.execute(llm_requests.update().where(llm_requests.c.id == row['id']).values(**values))
+        last_id = rows[-1]['id']
+
+
+def _dehydrate(bind, row) -> dict:
+    blobs: dict[str, str] = {}
+    values = {name: dehydrate(row[name], blobs) for name in BLOB_COLUMNS if row[name] is not None}
+    if not blobs:
+        return {}
+    store_blobs(bind, blobs)
+    return values
+
+
+def _rehydrate(bind, row) -> dict:
+    refs = set().union(*(blob_refs(row[name]) for name in BLOB_COLUMNS))
+    if not refs:
+        return {}
+    texts = load_blobs(bind, refs)
+    return {name: rehydrate(row[name], texts) for name in BLOB_COLUMNS if row[name] is not None}
+
+
+def upgrade() -> None:
+    op.create_table('llm_payload_blobs',
+    sa.Column('hash', sa.String(length=64), nullable=False),
+    sa.Column('encoding', sa.String(length=16), nullable=False),
+    sa.Column('data', sa.LargeBinary(), nullable=False),
+    sa.Column('size_bytes', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('hash')
+    )
+    # Backfill: move large strings in existing rows to blobs
+    _rewrite_rows(_dehydrate)
+
+
+def downgrade() -> None:
+    # Inline blob content back into each row before dropping the table
+    _rewrite_rows(_rehydrate)
+    op.drop_table('llm_payload_blobs')
@@ -0,0 +1,39 @@
+"""flow_payload_archive
+
+Revision ID: b5d3a7e1c402
+Revises: 8c1f4e2a9b7d
+Create Date: 2026-10-16 23:40:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5d3a7e1c402'
+down_revision: Union[str, None] = '8c1f4e2a9b7d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('flow_runs', sa.Column('payload_archived_at', sa.DateTime(timezone=True), nullable=True))
+    op.add_column('flow_step_runs', sa.Column('payload_archived_at', sa.DateTime(timezone=True), nullable=True))
+    # The archival job scans for old rows that still hold their payloads
+    op.create_index('ix_flow_runs_archive_scan', 'flow_runs', ['payload_archived_at', 'created_at'], unique=False)
+    op.create_index('ix_flow_step_runs_archive_scan', 'flow_step_runs', ['payload_archived_at', 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema.
+
+    Rows archived by the job keep only their pointer; restore payloads from the
+    archive before downgrading if they are needed in the database again.
+    """
+    op.drop_index('ix_flow_step_runs_archive_scan', table_name='flow_step_runs')
+    op.drop_index('ix_flow_runs_archive_scan', table_name='flow_runs')
+    op.drop_column('flow_step_runs', 'payload_archived_at')
+    op.drop_column('flow_runs', 'payload_archived_at')
@@ -7,7 +7,9 @@ from dataclasses import dataclass
 import logging
 import math
 import re
+from typing import Any
 
+from modules.flow_engine.public import ARTIFACT_KEY, open_artifact
 from modules.llm_services.public import AudioResponse
 
 from .flows import LessonPodcastFlow, UnitPodcastFlow
@@ -15,6 +17,13 @@ from .flows import LessonPodcastFlow, UnitPodcastFlow
 logger = logging.getLogger(__name__)
 
 
+async def _read_audio_bytes(audio_payload: dict[str, Any]) -> bytes:
+    """Open the audio artifact referenced by the flow output (inline base64 from older runs is still accepted)."""
+    if audio_payload.get(ARTIFACT_KEY):
+        return await open_artifact(audio_payload[ARTIFACT_KEY])
+    return AudioResponse.model_validate(audio_payload).audio_bytes()
+
+
 @dataclass(slots=True)
 class PodcastLesson:
     """Lightweight container for lesson data fed into podcast generation."""
@@ -105,14 +114,13 @@ class UnitPodcastGenerator:
         duration_seconds: int | None = None
 
         if audio_payload:
-            parsed_audio = AudioResponse.model_validate(audio_payload)
-            audio_bytes = parsed_audio.audio_bytes()
-            if parsed_audio.mime_type:
-                mime_type = parsed_audio.mime_type
-            if parsed_audio.voice:
-                playback_voice = parsed_audio.voice
-            if parsed_audio.duration_seconds is not None:
-                duration_seconds = math.ceil(parsed_audio.duration_seconds)
+            audio_bytes = await _read_audio_bytes(audio_payload)
+            if audio_payload.get("mime_type"):
+                mime_type = audio_payload["mime_type"]
+            if audio_payload.get("voice"):
+                playback_voice = audio_payload["voice"]
+            if audio_payload.get("duration_seconds") is not None:
+                duration_seconds = math.ceil(audio_payload["duration_seconds"])
 
         if duration_seconds is None:
             duration_seconds = self._estimate_duration_seconds(transcript_text)
@@ -197,14 +205,13 @@ class LessonPodcastGenerator:
         duration_seconds: int | None = None
 
         if audio_payload:
-            parsed_audio = AudioResponse.model_validate(audio_payload)
-            audio_bytes = parsed_audio.audio_bytes()
-            if parsed_audio.mime_type:
-                mime_type = parsed_audio.mime_type
-            if parsed_audio.voice:
-                playback_voice = parsed_audio.voice
-            if parsed_audio.duration_seconds is not None:
-                duration_seconds = math.ceil(parsed_audio.duration_seconds)
+            audio_bytes = await _read_audio_bytes(audio_payload)
+            if audio_payload.get("mime_type"):
+                mime_type = audio_payload["mime_type"]
+            if audio_payload.get("voice"):
+                playback_voice = audio_payload["voice"]
+            if audio_payload.get("duration_seconds") is not None:
+                duration_seconds = math.ceil(audio_payload["duration_seconds"])
 
         if not audio_bytes:
             raise RuntimeError("Lesson podcast audio synthesis returned no audio bytes")
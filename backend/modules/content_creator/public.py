@@ -2,6 +2,7 @@
 
 import logging
 from typing import Protocol
+import uuid
 
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -52,6 +53,9 @@ async def _handle_unit_creation(payload: dict) -> None:
     inputs = payload.get("inputs") or {}
     unit_id = str(payload.get("unit_id") or inputs.get("unit_id") or "")
     arq_task_id = str(payload.get("task_id") or inputs.get("task_id") or "") or None
+    # Set by submit_flow_task(resume_from_flow_run_id=...): steps that completed in that failed run are reused
+    resume_from = payload.get("resume_from_flow_run_id")
+    resume_from_flow_run_id = uuid.UUID(str(resume_from)) if resume_from else None
 
     # Coach-driven mode only (required fields)
     learner_desires = inputs.get("learner_desires")
@@ -73,6 +77,7 @@ async def _handle_unit_creation(payload: dict) -> None:
                 source_material=source_material,
                 target_lesson_count=target_lesson_count,
                 arq_task_id=arq_task_id,
+                resume_from_flow_run_id=resume_from_flow_run_id,
             )
     except Exception as e:
         # Mark unit as failed if creation pipeline throws an exception
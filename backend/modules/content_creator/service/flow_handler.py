@@ -20,6 +20,7 @@ from modules.content.package_models import (
 )
 from modules.content.public import ContentProvider, LessonCreate, UnitStatus, content_provider
 from modules.infrastructure.public import infrastructure_provider
+from modules.llm_services.public import current_batch_executor
 
 from ..flows import LessonCreationFlow, UnitCreationFlow
 from ..podcast import PodcastLesson
@@ -55,11 +56,13 @@ class FlowHandler:
         target_lesson_count: int | None,
         source_material: str | None = None,
         arq_task_id: str | None = None,
+        resume_from_flow_run_id: uuid.UUID | None = None,
     ) -> UnitCreationResult:
         """Execute the end-to-end unit creation pipeline.
 
         All parameters are required because the learning coach must finalize them
-        before unit creation is allowed.
+        before unit creation is allowed. ``resume_from_flow_run_id`` names a failed
+        unit planning run whose completed steps are reused.
         """
 
         logger.info("=" * 80)
@@ -101,7 +104,7 @@ class FlowHandler:
             "target_lesson_count": target_lesson_count,
         }
 
-        unit_plan = await flow.execute(flow_inputs, arq_task_id=arq_task_id)
+        unit_plan = await flow.execute(flow_inputs, arq_task_id=arq_task_id, resume_from_flow_run_id=resume_from_flow_run_id)
 
         final_title = str(unit_plan.get("unit_title") or "Unit")
         logger.info(f"   ✓ Unit title: {final_title}")
@@ -152,15 +155,17 @@ class FlowHandler:
 
         logger.info("")
         logger.info(f"📚 Phase 2: Lesson Generation ({len(lessons_plan)} lessons)")
-        logger.info(f"   Batch size: {MAX_PARALLEL_LESSONS}")
+        # In LLM batch mode requests wait in a provider batch anyway, so queue every lesson at once
+        parallel_lessons = max(1, len(lessons_plan)) if current_batch_executor() is not None else MAX_PARALLEL_LESSONS
+        logger.info(f"   Batch size: {parallel_lessons}")
         logger.info("")
 
-        for batch_start in range(0, len(lessons_plan), MAX_PARALLEL_LESSONS):
-            batch_end = min(batch_start + MAX_PARALLEL_LESSONS, len(lessons_plan))
+        for batch_start in range(0, len(lessons_plan), parallel_lessons):
+            batch_end = min(batch_start + parallel_lessons, len(lessons_plan))
             batch = lessons_plan[batch_start:batch_end]
 
-            batch_num = (batch_start // MAX_PARALLEL_LESSONS) + 1
-            total_batches = (len(lessons_plan) + MAX_PARALLEL_LESSONS - 1) // MAX_PARALLEL_LESSONS
+            batch_num = (batch_start // parallel_lessons) + 1
+            total_batches = (len(lessons_plan) + parallel_lessons - 1) // parallel_lessons
             logger.info(f"   📦 Batch {batch_num}/{total_batches}: Processing lessons {batch_start + 1}-{batch_end}")
 
             tasks = [
@@ -360,6 +365,8 @@ class FlowHandler:
         """Wrapper for _create_single_lesson with retry logic for validation errors."""
         lesson_num = lesson_index + 1
         lesson_title = lesson_plan.get("title") or f"Lesson {lesson_num}"
+        # A retry resumes the failed lesson flow run, so steps that already completed aren't paid for twice
+        flow = LessonCreationFlow()
 
         for attempt in range(1, max_retries + 1):
             try:
@@ -371,6 +378,8 @@ class FlowHandler:
                     learner_desires=learner_desires,
                     lessons_plan=lessons_plan,
                     arq_task_id=arq_task_id,
+                    flow=flow,
+                    resume_from_flow_run_id=flow.last_failed_flow_run_id if attempt > 1 else None,
                 )
             except ValidationError as exc:
                 # Extract validation error details for logging
@@ -420,6 +429,8 @@ class FlowHandler:
         learner_desires: str,
         lessons_plan: list[dict[str, Any]],
         arq_task_id: str | None,
+        flow: LessonCreationFlow | None = None,
+        resume_from_flow_run_id: uuid.UUID | None = None,
     ) -> tuple[str, PodcastLesson, str, list[str]]:
         """Create a single lesson and return (lesson_id, podcast_lesson, voice, covered_lo_ids)."""
 
@@ -453,7 +464,7 @@ class FlowHandler:
             if item is not lesson_plan
         ]
 
-        md_res = await LessonCreationFlow().execute(
+        md_res = await (flow or LessonCreationFlow()).execute(
             {
                 "learner_desires": learner_desires,
                 "learning_objectives": lesson_lo_objects,
@@ -465,6 +476,7 @@ class FlowHandler:
                 "sibling_lessons": sibling_context,
             },
             arq_task_id=arq_task_id,
+            resume_from_flow_run_id=resume_from_flow_run_id,
         )
 
         def _normalize_exercise_type(raw_type: str | None) -> str:
@@ -9,6 +9,7 @@ from typing import Any
 import httpx
 
 from modules.content.public import ContentProvider, UnitRead
+from modules.flow_engine.public import ARTIFACT_KEY, open_artifact
 
 from ..flows import UnitArtCreationFlow
 from ..podcast import (
@@ -92,12 +93,15 @@ class MediaHandler:
         alt_text = str(description_info.get("alt_text", "")).strip()
 
         image_info = art_payload.get("image") or {}
+        artifact = image_info.get(ARTIFACT_KEY)
         image_url = image_info.get("image_url")
-        if not image_url:
+        if artifact:
+            image_bytes, content_type = await open_artifact(artifact), artifact.get("mime_type")
+        elif image_url:
+            image_bytes, content_type = await self._download_image(image_url)
+        else:
             raise RuntimeError("Image generation returned no URL")
 
-        image_bytes, content_type = await self._download_image(image_url)
-
         return await self._content.save_unit_art_from_bytes(
             unit_id,
             image_bytes=image_bytes,
@@ -35,6 +35,7 @@ class StatusHandler:
         learning_objectives: list,
         source_material: str | None = None,
         target_lesson_count: int | None = None,
+        resume_from_flow_run_id: uuid.UUID | None = None,
     ) -> str:
         """Submit the ARQ flow responsible for background unit creation (coach-driven only)."""
 
@@ -50,6 +51,7 @@ class StatusHandler:
                 "source_material": source_material,
                 "target_lesson_count": target_lesson_count,
             },
+            resume_from_flow_run_id=resume_from_flow_run_id,
         )
 
         await self._content.set_unit_task(unit_id, task_result.task_id)
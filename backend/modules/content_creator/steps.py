@@ -76,6 +76,7 @@ class ExtractUnitMetadataStep(StructuredStep):
 
     step_name = "extract_unit_metadata"
     prompt_file = "extract_unit_metadata.md"
+    prefix_prompt_file = "unit_context.md"
     reasoning_effort = "low"
     model = "gemini-2.5-flash"
     verbosity = "low"
@@ -100,6 +101,7 @@ class GenerateLessonPodcastTranscriptStep(UnstructuredStep):
 
     step_name = "generate_lesson_podcast_transcript"
     prompt_file = "generate_lesson_podcast_transcript_instructional.md"
+    prefix_prompt_file = "unit_context.md"
     reasoning_effort = "medium"
     verbosity = "low"
     model = "gemini-2.5-flash"
@@ -121,6 +123,7 @@ class GenerateMCQsUnstructuredStep(UnstructuredStep):
 
     step_name = "generate_mcqs_unstructured"
     prompt_file = "generate_mcqs_unstructured.md"
+    prefix_prompt_file = "unit_context.md"
     reasoning_effort = "high"
     verbosity = "low"
     model = "gemini-2.5-flash"
@@ -14,6 +14,7 @@ from contextlib import asynccontextmanager
 from types import SimpleNamespace
 from typing import Any
 from unittest.mock import ANY, AsyncMock, Mock, patch
+import uuid
 
 import pytest
 
@@ -25,13 +26,17 @@ from modules.content_creator.flows import (
     UnitPodcastFlow,
 )
 from modules.content_creator.podcast import PodcastLesson, UnitPodcast
+from modules.content_creator.public import _handle_unit_creation
 from modules.content_creator.service import ContentCreatorService
+from modules.content_creator.service.flow_handler import FlowHandler
 from modules.content_creator.steps import (
+    ExtractUnitMetadataStep,
     MCQAnswerKey,
     MCQOption,
     MCQValidationOutputs,
     StructuredMCQExercise,
 )
+from modules.flow_engine.public import StepCheckpoint, step_input_hash
 
 # Deprecated test removed - used old step classes that no longer exist
 
@@ -484,3 +489,42 @@ class TestServiceFlows:
             content.save_lesson.assert_awaited()
             content.assign_lessons_to_unit.assert_awaited()
         svc._media_handler.save_unit_podcast.assert_awaited_once()
+
+
+@pytest.mark.asyncio
+async def test_queued_unit_creation_resumes_from_failed_flow_run() -> None:
+    """A queued task's resume_from_flow_run_id reaches the unit planning flow, so completed steps are reused."""
+    failed_run_id = uuid.uuid4()
+    coach_los = [{"id": "u_lo_1", "title": "Understand the Topic", "description": "Understand the topic"}]
+    inputs = {"learner_desires": "Beginner learning Topic", "learning_objectives": coach_los, "source_material": "Source text", "target_lesson_count": 1}
+    step_inputs = ExtractUnitMetadataStep.Inputs(learner_desires="Beginner learning Topic", coach_learning_objectives=coach_los, target_lesson_count=1, source_material="Source text")
+    checkpoint = StepCheckpoint(step_run_id=uuid.uuid4(), step_name="extract_unit_metadata", outputs={"unit_title": "Resumed Unit", "lessons": [], "lesson_count": 0})
+
+    flow_service = AsyncMock()
+    flow_service.create_flow_run_record.return_value = uuid.uuid4()
+    flow_service.load_step_checkpoints.return_value = {("unit_creation", "extract_unit_metadata", step_input_hash(step_inputs.model_dump(mode="json"))): checkpoint}
+
+    mock_infra = Mock()
+
+    @asynccontextmanager
+    async def mock_session_context():
+        yield AsyncMock()
+
+    mock_infra.get_async_session_context = mock_session_context
+    content = AsyncMock()
+    handler = FlowHandler(content, Mock(), AsyncMock())
+
+    with (
+        patch("modules.content_creator.public.infrastructure_provider", return_value=mock_infra),
+        patch("modules.content_creator.public.content_creator_provider", return_value=SimpleNamespace(_flow_handler=handler)),
+        patch("modules.flow_engine.base_flow.infrastructure_provider", return_value=mock_infra),
+        patch("modules.flow_engine.base_flow.llm_services_provider"),
+        patch("modules.flow_engine.base_flow.FlowEngineService", return_value=flow_service),
+    ):
+        await _handle_unit_creation({"task_id": "task-1", "unit_id": str(uuid.uuid4()), "inputs": inputs, "resume_from_flow_run_id": str(failed_run_id)})
+
+    flow_service.load_step_checkpoints.assert_awaited_once_with(failed_run_id, "unit_creation")
+    flow_service.record_resumed_step_run.assert_awaited_once()
+    assert flow_service.record_resumed_step_run.await_args.kwargs["checkpoint"] is checkpoint
+    flow_service.create_step_run_record.assert_not_awaited()
+    assert content.update_unit_metadata.await_args_list[0].kwargs["title"] == "Resumed Unit"
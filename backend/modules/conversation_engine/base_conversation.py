@@ -2,21 +2,22 @@
 
 from __future__ import annotations
 
-from collections.abc import Callable
+from collections.abc import AsyncIterator, Callable
+import contextlib
 import functools
 import inspect
 import json
 from pathlib import Path
-from typing import Any, ParamSpec, Protocol, TypeVar
+from typing import Any, ClassVar, ParamSpec, Protocol, TypeVar
 import uuid
 
 from pydantic import BaseModel
 
 from ..infrastructure.public import infrastructure_provider
-from ..llm_services.public import ToolDefinition, llm_services_provider
+from ..llm_services.public import INTERACTIVE, JSONFieldStreamer, ToolDefinition, get_prompt_registry, llm_priority, llm_services_provider
 from .context import ConversationContext
 from .repo import ConversationMessageRepo, ConversationRepo
-from .service import ConversationEngineService, ConversationMessageDTO, ConversationSummaryDTO
+from .service import AssistantStreamEvent, ConversationEngineService, ConversationMessageDTO, ConversationSummaryDTO, StructuredStreamEvent
 
 __all__ = ["BaseConversation", "ToolHandler", "conversation_session"]
 
@@ -24,6 +25,12 @@ P = ParamSpec("P")
 T = TypeVar("T", bound=BaseModel)
 
 
+@functools.cache
+def _conversation_dir(conversation_cls: type) -> Path:
+    """Directory of the file defining a conversation subclass (not BaseConversation)."""
+    return Path(inspect.getfile(conversation_cls)).parent.resolve()
+
+
 def _coerce_uuid(value: str | uuid.UUID | None) -> uuid.UUID | None:
     """Coerce a value to UUID for conversation_id."""
 
@@ -59,87 +66,112 @@ def _coerce_user_id(value: int | str | uuid.UUID | None) -> int | None:
     return None
 
 
-def conversation_session(func: Callable[P, Any]) -> Callable[P, Any]:
-    """Decorator that initialises infrastructure for a conversation handler."""
+@contextlib.asynccontextmanager
+async def _conversation_scope(self: BaseConversation, kwargs: dict[str, Any], *, accepts_conversation_id: bool, accepts_private_conversation_id: bool) -> AsyncIterator[None]:
+    """Open the database session and conversation context for one handler call, rewriting ``kwargs`` in place."""
 
-    signature = inspect.signature(func)
-    accepts_conversation_id = "conversation_id" in signature.parameters
-    accepts_private_conversation_id = "_conversation_id" in signature.parameters
+    infra = infrastructure_provider()
+    infra.initialize()
+    llm_services = llm_services_provider()
 
-    @functools.wraps(func)
-    async def wrapper(self: BaseConversation, *args: P.args, **kwargs: P.kwargs) -> Any:  # type: ignore[misc]
-        infra = infrastructure_provider()
-        infra.initialize()
-        llm_services = llm_services_provider()
-
-        user_arg = kwargs.get("user_id")
-        if user_arg is None and "_user_id" in kwargs:
-            user_arg = kwargs["_user_id"]
-        user_int_id = _coerce_user_id(user_arg)  # type: ignore[arg-type]
-
-        conversation_arg = kwargs.get("conversation_id")
-        if conversation_arg is None and "_conversation_id" in kwargs:
-            conversation_arg = kwargs["_conversation_id"]
-        conversation_uuid = _coerce_uuid(conversation_arg)  # type: ignore[arg-type]
-
-        metadata: dict[str, Any] | None = kwargs.get("conversation_metadata")  # type: ignore[assignment]
-        if metadata is None and "_conversation_metadata" in kwargs:
-            metadata = kwargs["_conversation_metadata"]  # type: ignore[assignment]
-
-        title: str | None = kwargs.get("conversation_title")  # type: ignore[assignment]
-        if title is None and "_conversation_title" in kwargs:
-            title = kwargs["_conversation_title"]  # type: ignore[assignment]
-
-        with infra.get_session_context() as db_session:
-            service = ConversationEngineService(
-                ConversationRepo(db_session),
-                ConversationMessageRepo(db_session),
-                llm_services,
-            )
+    user_arg = kwargs.get("user_id")
+    if user_arg is None and "_user_id" in kwargs:
+        user_arg = kwargs["_user_id"]
+    user_int_id = _coerce_user_id(user_arg)  # type: ignore[arg-type]
 
-            summary: ConversationSummaryDTO | None = None
-            if conversation_uuid is None:
-                created = await service.create_conversation(
-                    conversation_type=self.conversation_type,
-                    user_id=user_int_id,
-                    title=title,
-                    metadata=metadata,
-                )
-                conversation_uuid = uuid.UUID(created.id)
-                summary = created
-                # Always inject as _conversation_id (the magic parameter convention)
-                kwargs["_conversation_id"] = created.id  # type: ignore[index]
-            else:
-                summary = await service.get_conversation_summary(conversation_uuid)
-                if summary.conversation_type != self.conversation_type:
-                    raise ValueError(f"Conversation type mismatch for BaseConversation subclass: expected '{self.conversation_type}', got '{summary.conversation_type}'")
-
-            conversation_id_str = str(conversation_uuid) if conversation_uuid else None
-            if accepts_conversation_id:
-                kwargs["conversation_id"] = conversation_id_str  # type: ignore[index]
-            elif "conversation_id" in kwargs:
-                kwargs.pop("conversation_id")
-
-            if accepts_private_conversation_id:
-                kwargs["_conversation_id"] = conversation_id_str  # type: ignore[index]
-            elif "_conversation_id" in kwargs:
-                kwargs.pop("_conversation_id")
-
-            context_metadata = dict(summary.metadata or {}) if summary else None
-
-            ConversationContext.set(
-                service=service,
-                conversation_id=conversation_uuid,
+    conversation_arg = kwargs.get("conversation_id")
+    if conversation_arg is None and "_conversation_id" in kwargs:
+        conversation_arg = kwargs["_conversation_id"]
+    conversation_uuid = _coerce_uuid(conversation_arg)  # type: ignore[arg-type]
+
+    metadata: dict[str, Any] | None = kwargs.get("conversation_metadata")  # type: ignore[assignment]
+    if metadata is None and "_conversation_metadata" in kwargs:
+        metadata = kwargs["_conversation_metadata"]  # type: ignore[assignment]
+
+    title: str | None = kwargs.get("conversation_title")  # type: ignore[assignment]
+    if title is None and "_conversation_title" in kwargs:
+        title = kwargs["_conversation_title"]  # type: ignore[assignment]
+
+    with infra.get_session_context() as db_session:
+        service = ConversationEngineService(
+            ConversationRepo(db_session),
+            ConversationMessageRepo(db_session),
+            llm_services,
+        )
+
+        summary: ConversationSummaryDTO | None = None
+        if conversation_uuid is None:
+            created = await service.create_conversation(
+                conversation_type=self.conversation_type,
                 user_id=user_int_id,
-                metadata=context_metadata,
+                title=title,
+                metadata=metadata,
             )
+            conversation_uuid = uuid.UUID(created.id)
+            summary = created
+            # Always inject as _conversation_id (the magic parameter convention)
+            kwargs["_conversation_id"] = created.id  # type: ignore[index]
+        else:
+            summary = await service.get_conversation_summary(conversation_uuid)
+            if summary.conversation_type != self.conversation_type:
+                raise ValueError(f"Conversation type mismatch for BaseConversation subclass: expected '{self.conversation_type}', got '{summary.conversation_type}'")
+
+        conversation_id_str = str(conversation_uuid) if conversation_uuid else None
+        if accepts_conversation_id:
+            kwargs["conversation_id"] = conversation_id_str  # type: ignore[index]
+        elif "conversation_id" in kwargs:
+            kwargs.pop("conversation_id")
+
+        if accepts_private_conversation_id:
+            kwargs["_conversation_id"] = conversation_id_str  # type: ignore[index]
+        elif "_conversation_id" in kwargs:
+            kwargs.pop("_conversation_id")
+
+        context_metadata = dict(summary.metadata or {}) if summary else None
+
+        ConversationContext.set(
+            service=service,
+            conversation_id=conversation_uuid,
+            user_id=user_int_id,
+            metadata=context_metadata,
+        )
+
+        try:
+            with llm_priority(self.priority):
+                yield
+        finally:
+            ConversationContext.clear()
+
+
+def conversation_session(func: Callable[P, Any]) -> Callable[P, Any]:
+    """Decorator that initialises infrastructure for a conversation handler.
+
+    Async generator handlers (streamed replies) keep the session and context
+    open until the stream is exhausted or closed.
+    """
+
+    signature = inspect.signature(func)
+    scope_options = {
+        "accepts_conversation_id": "conversation_id" in signature.parameters,
+        "accepts_private_conversation_id": "_conversation_id" in signature.parameters,
+    }
+
+    if inspect.isasyncgenfunction(func):
+
+        @functools.wraps(func)
+        async def stream_wrapper(self: BaseConversation, *args: P.args, **kwargs: P.kwargs) -> AsyncIterator[Any]:  # type: ignore[misc]
+            async with _conversation_scope(self, kwargs, **scope_options):
+                stream = func(self, *args, **kwargs)
+                async with contextlib.aclosing(stream):
+                    async for item in stream:
+                        yield item
 
-            try:
-                result = await func(self, *args, **kwargs)
-            finally:
-                ConversationContext.clear()
+        return stream_wrapper
 
-            return result
+    @functools.wraps(func)
+    async def wrapper(self: BaseConversation, *args: P.args, **kwargs: P.kwargs) -> Any:  # type: ignore[misc]
+        async with _conversation_scope(self, kwargs, **scope_options):
+            return await func(self, *args, **kwargs)
 
     return wrapper
 
@@ -164,6 +196,10 @@ class BaseConversation:
 
     conversation_type: str
     system_prompt_file: str | None = None
+    # Structured reply models; their provider schemas are precompiled at startup
+    response_models: ClassVar[tuple[type[BaseModel], ...]] = ()
+    # A learner is waiting on every reply, so LLM calls jump ahead of background generation
+    priority: ClassVar[str] = INTERACTIVE
 
     def __init__(self) -> None:
         if not getattr(self, "conversation_type", None):
@@ -200,20 +236,11 @@ class BaseConversation:
         Raises:
             FileNotFoundError: If the prompt file cannot be found
         """
-        # Get the file path where the conversation subclass is defined
-        # Use inspect to get the actual file of the subclass, not BaseConversation
-        import inspect
-
-        conversation_file = inspect.getfile(self.__class__)
-        conversation_dir = Path(conversation_file).parent
+        prompt_file_path = _conversation_dir(self.__class__) / filename
 
-        # Build path to the prompt file relative to the conversation's directory
-        prompt_file_path = conversation_dir / filename
-
-        # Try to read the file
+        # Loaded once per process (reloaded on change when DEBUG=true)
         try:
-            with prompt_file_path.open(encoding="utf-8") as f:
-                return f.read().strip()
+            return get_prompt_registry().get(prompt_file_path).source
         except FileNotFoundError as e:
             raise FileNotFoundError(f"Conversation prompt file '{filename}' not found. Looked in: {prompt_file_path}") from e
 
@@ -366,6 +393,97 @@ class BaseConversation:
             **kwargs,
         )
 
+    async def stream_assistant_reply(
+        self,
+        *,
+        system_prompt: str | None = None,
+        metadata: dict[str, Any] | None = None,
+        model: str | None = None,
+        temperature: float | None = None,
+        max_output_tokens: int | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[AssistantStreamEvent]:
+        """Stream an assistant reply via the LLM; the final event carries the persisted message."""
+
+        ctx = ConversationContext.current()
+        prompt = system_prompt or self.get_system_prompt()
+        stream = ctx.service.stream_assistant_response(
+            ctx.conversation_id,
+            system_prompt=prompt,
+            user_id=ctx.user_id,
+            metadata=metadata,
+            model=model,
+            temperature=temperature,
+            max_output_tokens=max_output_tokens,
+            **kwargs,
+        )
+        async with contextlib.aclosing(stream):
+            async for event in stream:
+                yield event
+
+    async def stream_structured_reply(
+        self,
+        response_model: type[T],
+        *,
+        text_field: str,
+        system_prompt: str | None = None,
+        model: str | None = None,
+        temperature: float | None = None,
+        max_output_tokens: int | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[StructuredStreamEvent]:
+        """Stream a structured response, surfacing ``text_field`` as it is generated (does not record message).
+
+        Deltas are the decoded characters of the model's ``text_field`` string so the
+        learner-facing text can be shown while the remaining fields are produced. The
+        final event carries the validated ``response_model`` instance, the LLM request
+        ID and a raw dict shaped like ``generate_structured_reply``'s usage details.
+
+        Raises:
+            pydantic.ValidationError: If the completed JSON does not match ``response_model``
+        """
+        ctx = ConversationContext.current()
+        prompt = system_prompt or self.get_system_prompt()
+
+        llm_messages = await ctx.service.build_llm_messages(
+            ctx.conversation_id,
+            system_prompt=prompt,
+            include_system=False,
+        )
+
+        field_streamer = JSONFieldStreamer(text_field)
+        stream = ctx.service.llm_services.stream_response(
+            messages=llm_messages,
+            user_id=ctx.user_id,
+            model=model,
+            temperature=temperature,
+            max_output_tokens=max_output_tokens,
+            response_model=response_model,
+            **kwargs,
+        )
+        async with contextlib.aclosing(stream):
+            async for chunk in stream:
+                if chunk.response is None:
+                    delta = field_streamer.feed(chunk.delta)
+                    if delta:
+                        yield StructuredStreamEvent(delta=delta)
+                    continue
+
+                response = chunk.response
+                content = response.content.strip().removeprefix("```json").removeprefix("```").removesuffix("```")
+                result = response_model.model_validate_json(content)
+                raw = {
+                    "provider": response.provider,
+                    "model": response.model,
+                    "cost_estimate": response.cost_estimate,
+                    "usage": {
+                        "input_tokens": response.input_tokens,
+                        "output_tokens": response.output_tokens,
+                        "total_tokens": response.tokens_used,
+                    },
+                }
+                yield StructuredStreamEvent(result=result, request_id=chunk.request_id, raw=raw)
+
     async def generate_with_tools(
         self,
         *,
@@ -82,6 +82,7 @@ The `@conversation_session` decorator provides automatic infrastructure setup fo
 - Sets up database session and transaction management
 - Initializes ConversationContext for accessing conversation state
 - Cleans up resources after method completes
+- Async generator methods keep the session open until the stream finishes
 
 Special parameters (all optional):
 - `_user_id: int | None` - Associate conversation with a user
@@ -115,6 +116,8 @@ Available in your conversation subclass methods:
 **LLM Integration:**
 - `await self.generate_assistant_reply(system_prompt=None, model=None, ...)` - Generate and record unstructured response
 - `await self.generate_structured_reply(response_model, model=None, ...)` - Generate structured response (caller records message)
+- `async for event in self.stream_assistant_reply(...)` - Stream an unstructured response; the final event carries the recorded message
+- `async for event in self.stream_structured_reply(response_model, text_field="message", ...)` - Stream `text_field` as it is generated; the final event carries the parsed result (caller records message)
 
 **Metadata Management:**
 - `await self.update_conversation_metadata(metadata, merge=True)`
@@ -180,6 +183,7 @@ Low-level conversation management interface (typically accessed via Conversation
 ### LLM Integration
 - `build_llm_messages(conversation_id, system_prompt=None, limit=None, ...)` - Build message array for LLM
 - `generate_assistant_response(conversation_id, system_prompt=None, ...)` - Generate and record response
+- `stream_assistant_response(conversation_id, system_prompt=None, ...)` - Stream response, recording it when complete
 - `llm_services: LLMServicesProvider` - Direct access to LLM services for structured generation
 
 ## Result Types
@@ -200,6 +204,11 @@ Low-level conversation management interface (typically accessed via Conversation
 Extends `ConversationSummaryDTO` with:
 - `messages: list[ConversationMessageDTO]` - Full message history
 
+### AssistantStreamEvent / StructuredStreamEvent
+- `delta: str` - Newly generated text (empty on the final event)
+- `message` / `result` - Recorded message or parsed structured result (final event only)
+- `request_id: uuid.UUID | None` - LLM request ID (final event only)
+
 ### ConversationMessageDTO
 - `id: str` - Message UUID
 - `conversation_id: str` - Parent conversation
@@ -312,6 +321,7 @@ feedback = await tutor.submit_answer(
 
 from __future__ import annotations
 
+from collections.abc import AsyncIterator
 from datetime import datetime
 from typing import Any, Protocol
 import uuid
@@ -325,14 +335,18 @@ from .base_conversation import BaseConversation, ToolHandler, conversation_sessi
 from .context import ConversationContext
 from .repo import ConversationMessageRepo, ConversationRepo
 from .service import (
+    AssistantStreamEvent,
     ConversationDetailDTO,
     ConversationEngineService,
     ConversationMessageDTO,
     ConversationSummaryDTO,
     PaginatedConversationsDTO,
+    StructuredStreamEvent,
 )
 
 __all__ = [
+    # DTOs
+    "AssistantStreamEvent",
     # Framework components (for building conversation types)
     "BaseConversation",
     "ConversationContext",
@@ -343,6 +357,7 @@ __all__ = [
     "ConversationMessageDTO",
     "ConversationSummaryDTO",
     "PaginatedConversationsDTO",
+    "StructuredStreamEvent",
     "ToolHandler",
     "conversation_engine_provider",
     "conversation_session",
@@ -520,6 +535,21 @@ class ConversationEngineProvider(Protocol):
         """Generate an assistant response and record it."""
         ...
 
+    def stream_assistant_response(
+        self,
+        conversation_id: uuid.UUID,
+        *,
+        system_prompt: str | None = None,
+        user_id: int | None = None,
+        metadata: dict[str, Any] | None = None,
+        model: str | None = None,
+        temperature: float | None = None,
+        max_output_tokens: int | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[AssistantStreamEvent]:
+        """Stream an assistant response, recording it once the stream completes."""
+        ...
+
     def count_assistant_conversations_since(self, since: datetime) -> int:
         """Count learning_coach and teaching_assistant conversations created since datetime. [ADMIN ONLY]"""
         ...
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from collections.abc import AsyncIterator
 from dataclasses import asdict, dataclass
 from datetime import UTC, datetime
 from typing import Any
@@ -12,11 +13,13 @@ from .models import ConversationMessageModel, ConversationModel
 from .repo import ConversationMessageRepo, ConversationRepo
 
 __all__ = [
+    "AssistantStreamEvent",
     "ConversationDetailDTO",
     "ConversationEngineService",
     "ConversationMessageDTO",
     "ConversationSummaryDTO",
     "PaginatedConversationsDTO",
+    "StructuredStreamEvent",
 ]
 
 
@@ -70,6 +73,26 @@ class PaginatedConversationsDTO:
     has_next: bool
 
 
+@dataclass(slots=True)
+class AssistantStreamEvent:
+    """DTO for one event of a streamed assistant reply; the last event carries the stored message."""
+
+    delta: str = ""
+    message: ConversationMessageDTO | None = None
+    request_id: uuid.UUID | None = None
+    response: LLMResponse | None = None
+
+
+@dataclass(slots=True)
+class StructuredStreamEvent:
+    """DTO for one event of a streamed structured reply; the last event carries the parsed result."""
+
+    delta: str = ""
+    result: Any | None = None
+    request_id: uuid.UUID | None = None
+    raw: dict[str, Any] | None = None
+
+
 class ConversationEngineService:
     """Application service that manages conversations and LLM interactions."""
 
@@ -367,6 +390,54 @@ class ConversationEngineService:
 
         return message_dto, request_id, response
 
+    async def stream_assistant_response(
+        self,
+        conversation_id: uuid.UUID,
+        *,
+        system_prompt: str | None = None,
+        user_id: int | None = None,
+        metadata: dict[str, Any] | None = None,
+        model: str | None = None,
+        temperature: float | None = None,
+        max_output_tokens: int | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[AssistantStreamEvent]:
+        """Stream an assistant response via the LLM, persisting it once the stream completes."""
+
+        llm_messages = await self.build_llm_messages(
+            conversation_id,
+            system_prompt=system_prompt,
+            include_system=False,
+        )
+
+        stream = self.llm_services.stream_response(
+            messages=llm_messages,
+            user_id=user_id,
+            model=model,
+            temperature=temperature,
+            max_output_tokens=max_output_tokens,
+            **kwargs,
+        )
+        async for chunk in stream:
+            if chunk.response is None:
+                yield AssistantStreamEvent(delta=chunk.delta)
+                continue
+
+            response = chunk.response
+            message_metadata = dict(metadata or {})
+            message_metadata.setdefault("provider", response.provider)
+            message_metadata.setdefault("model", response.model)
+
+            message_dto = await self.record_assistant_message(
+                conversation_id,
+                response.content,
+                llm_request_id=chunk.request_id,
+                metadata=message_metadata,
+                tokens_used=response.output_tokens or response.tokens_used,
+                cost_estimate=response.cost_estimate,
+            )
+            yield AssistantStreamEvent(message=message_dto, request_id=chunk.request_id, response=response)
+
     async def update_conversation_status(self, conversation_id: uuid.UUID, status: str) -> ConversationSummaryDTO:
         """Update and persist the conversation status."""
 
@@ -0,0 +1,261 @@
+"""Cold archival of old flow run and step run payloads.
+
+``flow_runs`` and ``flow_step_runs`` keep each run's inputs and outputs: whole
+source materials, lesson packages and, in older rows, base64 audio. Nobody
+reads them after the first days unless a run is being debugged, yet they make
+up most of the database. ``archive_flow_payloads`` moves the payloads of
+finished rows older than ``FLOW_ARCHIVE_AFTER_DAYS`` (default 30) into one
+gzip-compressed JSON object per row and leaves a pointer in the row::
+
+    {"$archived": {"key", "sha256", "size_bytes", "stored_bytes", "archived_at"},
+     "$summary": {"key_count", "keys", "size_bytes"},
+     <short top-level scalars of the original, e.g. "unit_id">}
+
+Short scalars stay inline, so filters such as ``inputs["unit_id"]`` keep
+working. ``FlowRunQueryService.get_flow_run_by_id`` and ``get_flow_step_by_id``
+fetch an archived payload when a single run or step is opened; listings never
+load payloads at all.
+
+The archive is the object store bucket (``FLOW_ARCHIVE_BACKEND=object_store``,
+the default) or a local directory (``FLOW_ARCHIVE_BACKEND=local``,
+``FLOW_ARCHIVE_DIR``) for development; keys start with ``FLOW_ARCHIVE_PREFIX``
+(default ``flow-archive``). Run the job with ``scripts/archive_flow_payloads.py``.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+import gzip
+import hashlib
+import json
+import logging
+import os
+from pathlib import Path
+import tempfile
+from typing import Any, Protocol
+
+from sqlalchemy.orm import Session
+
+from ..infrastructure.public import get_metrics_registry
+from .models import FlowRunModel, FlowStepRunModel
+from .repo import FlowRunRepo, FlowStepRunRepo
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "ARCHIVED_KEY",
+    "SUMMARY_KEY",
+    "ArchiveReport",
+    "LocalPayloadArchive",
+    "ObjectStorePayloadArchive",
+    "PayloadArchive",
+    "PayloadArchiveError",
+    "archive_flow_payloads",
+    "get_payload_archive",
+    "is_archived",
+    "load_archived_payloads",
+    "set_payload_archive",
+]
+
+ARCHIVED_KEY = "$archived"
+SUMMARY_KEY = "$summary"
+DEFAULT_ARCHIVE_AFTER_DAYS = 30.0
+# Rows smaller than this are only marked as processed; a pointer would not be much smaller
+_ARCHIVE_MIN_BYTES = 2048
+# Top-level strings up to this length stay inline next to the pointer
+_INLINE_MAX_CHARS = 200
+_SUMMARY_MAX_KEYS = 50
+
+_ARCHIVED = get_metrics_registry().counter("flow_payloads_archived_total", "Flow run and step run rows whose payloads were moved to the archive", ("table",))
+_ARCHIVED_BYTES = get_metrics_registry().counter("flow_payload_archived_bytes_total", "Uncompressed payload bytes moved out of the database", ("table",))
+
+
+class PayloadArchiveError(RuntimeError):
+    """Raised when an archived payload is missing or does not match its pointer."""
+
+
+class PayloadArchive(Protocol):
+    """Blocking byte store for archived payloads (called from worker threads and the sync admin queries)."""
+
+    def put(self, key: str, data: bytes) -> None: ...
+    def get(self, key: str) -> bytes: ...
+
+
+class LocalPayloadArchive:
+    """Archive objects as files below a local directory."""
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+
+    def put(self, key: str, data: bytes) -> None:
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        partial = path.with_name(path.name + ".partial")
+        partial.write_bytes(data)
+        partial.replace(path)
+
+    def get(self, key: str) -> bytes:
+        try:
+            return self._path(key).read_bytes()
+        except FileNotFoundError:
+            raise PayloadArchiveError(f"Archived payload {key} is not in {self.root}") from None
+
+    def _path(self, key: str) -> Path:
+        parts = Path(key).parts
+        if not parts or Path(key).is_absolute() or any(part in ("", ".", "..") for part in parts):
+            raise ValueError(f"Invalid archive key: {key!r}")
+        return self.root.joinpath(*parts)
+
+
+class ObjectStorePayloadArchive:
+    """Archive objects in the object store bucket."""
+
+    def __init__(self, objects: Any) -> None:
+        self.objects = objects
+
+    def put(self, key: str, data: bytes) -> None:
+        self.objects.put_object_bytes(key, data, content_type="application/gzip")
+
+    def get(self, key: str) -> bytes:
+        return self.objects.get_object_bytes(key)
+
+
+_ARCHIVE: PayloadArchive | None = None
+
+
+def get_payload_archive() -> PayloadArchive:
+    """Return the process-wide archive, configured from ``FLOW_ARCHIVE_BACKEND`` on first use."""
+    global _ARCHIVE  # noqa: PLW0603
+    if _ARCHIVE is None:
+        backend = os.getenv("FLOW_ARCHIVE_BACKEND", "object_store").lower()
+        if backend == "local":
+            _ARCHIVE = LocalPayloadArchive(os.getenv("FLOW_ARCHIVE_DIR") or Path(tempfile.gettempdir()) / "flow_archive")
+        else:
+            # Local import: boto3 is only needed once something is archived or read back
+            from ..object_store.public import raw_object_provider
+
+            _ARCHIVE = ObjectStorePayloadArchive(raw_object_provider())
+    return _ARCHIVE
+
+
+def set_payload_archive(archive: PayloadArchive | None) -> None:
+    """Replace the process-wide archive (``None`` re-reads the environment on next use)."""
+    global _ARCHIVE  # noqa: PLW0603
+    _ARCHIVE = archive
+
+
+def archive_after() -> timedelta:
+    """Age after which finished rows are archived (``FLOW_ARCHIVE_AFTER_DAYS``)."""
+    return timedelta(days=float(os.getenv("FLOW_ARCHIVE_AFTER_DAYS") or DEFAULT_ARCHIVE_AFTER_DAYS))
+
+
+def is_archived(payload: Any) -> bool:
+    """Whether a stored inputs/outputs value is an archive pointer."""
+    return isinstance(payload, dict) and isinstance(payload.get(ARCHIVED_KEY), dict)
+
+
+def _dumps(payload: Any) -> bytes:
+    return json.dumps(payload, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def _pointer(payload: Any, ref: dict[str, Any], size_bytes: int) -> dict[str, Any]:
+    summary: dict[str, Any] = {"size_bytes": size_bytes}
+    inline: dict[str, Any] = {}
+    if isinstance(payload, dict):
+        summary["key_count"] = len(payload)
+        summary["keys"] = sorted(payload)[:_SUMMARY_MAX_KEYS]
+        inline = {key: value for key, value in payload.items() if not key.startswith("$") and (value is None or isinstance(value, bool | int | float) or (isinstance(value, str) and len(value) <= _INLINE_MAX_CHARS))}
+    return {**inline, ARCHIVED_KEY: ref, SUMMARY_KEY: summary}
+
+
+def _run_key(prefix: str, run: FlowRunModel) -> str:
+    return f"{prefix}/flow_runs/{run.created_at:%Y/%m}/{run.id}.json.gz"
+
+
+def _step_key(prefix: str, step: FlowStepRunModel) -> str:
+    return f"{prefix}/flow_step_runs/{step.created_at:%Y/%m}/{step.flow_run_id}/{step.id}.json.gz"
+
+
+def _archive_row(row: FlowRunModel | FlowStepRunModel, key: str, archive: PayloadArchive, now: datetime) -> tuple[int, int]:
+    """Move a row's payloads to ``key``; returns (uncompressed, stored) bytes, zeros when left inline."""
+    row.payload_archived_at = now
+    inputs_json, outputs_json = _dumps(row.inputs), _dumps(row.outputs)
+    if len(inputs_json) + len(outputs_json) < _ARCHIVE_MIN_BYTES:
+        return 0, 0
+    raw = b'{"inputs":' + inputs_json + b',"outputs":' + outputs_json + b"}"
+    data = gzip.compress(raw, compresslevel=6)
+    archive.put(key, data)
+    ref = {"key": key, "sha256": hashlib.sha256(raw).hexdigest(), "size_bytes": len(raw), "stored_bytes": len(data), "archived_at": now.isoformat()}
+    row.inputs = _pointer(row.inputs, ref, len(inputs_json))
+    if row.outputs is not None:
+        row.outputs = _pointer(row.outputs, ref, len(outputs_json))
+    return len(raw), len(data)
+
+
+def load_archived_payloads(pointer: dict[str, Any], archive: PayloadArchive | None = None) -> dict[str, Any]:
+    """Fetch the archived ``{"inputs", "outputs"}`` a pointer refers to, verifying its checksum."""
+    ref = pointer[ARCHIVED_KEY]
+    raw = gzip.decompress((archive or get_payload_archive()).get(ref["key"]))
+    if hashlib.sha256(raw).hexdigest() != ref["sha256"]:
+        raise PayloadArchiveError(f"Archived payload {ref['key']} does not match its checksum")
+    return json.loads(raw)
+
+
+@dataclass
+class ArchiveReport:
+    """What one archival pass moved."""
+
+    flow_runs: int = 0
+    step_runs: int = 0
+    archived_bytes: int = 0
+    stored_bytes: int = 0
+
+
+def archive_flow_payloads(
+    session: Session,
+    *,
+    older_than: timedelta | None = None,
+    batch_size: int = 100,
+    archive: PayloadArchive | None = None,
+    now: datetime | None = None,
+) -> ArchiveReport:
+    """Archive the payloads of finished rows created more than ``older_than`` ago, committing per batch.
+
+    Objects are written before their batch commits, under keys derived from the
+    row, so a failed pass leaves at most orphaned objects that the next pass
+    overwrites.
+    """
+    archive = archive or get_payload_archive()
+    now = now or datetime.now(UTC)
+    cutoff = now - (older_than if older_than is not None else archive_after())
+    prefix = os.getenv("FLOW_ARCHIVE_PREFIX", "flow-archive").strip("/")
+    report = ArchiveReport()
+    session.info["commit_scope"] = "flow_archive"
+
+    tables: tuple[tuple[str, Any, Any], ...] = (("flow_runs", FlowRunRepo(session), _run_key), ("flow_step_runs", FlowStepRunRepo(session), _step_key))
+    for table, repo, key_for in tables:
+        while True:
+            rows = repo.archivable(cutoff, batch_size)
+            moved = 0
+            for row in rows:
+                archived, stored = _archive_row(row, key_for(prefix, row), archive, now)
+                if archived:
+                    moved += 1
+                    report.archived_bytes += archived
+                    report.stored_bytes += stored
+                    _ARCHIVED_BYTES.inc(archived, table)
+            if table == "flow_runs":
+                report.flow_runs += moved
+            else:
+                report.step_runs += moved
+            if rows:
+                session.commit()
+                # Drop the committed rows so their payloads don't accumulate in the identity map
+                session.expunge_all()
+                _ARCHIVED.inc(moved, table)
+            if len(rows) < batch_size:
+                break
+
+    logger.info(f"🗄️ Archived payloads of {report.flow_runs} flow runs and {report.step_runs} step runs ({report.archived_bytes} bytes, {report.stored_bytes} stored)")
+    return report
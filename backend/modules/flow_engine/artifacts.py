@@ -0,0 +1,169 @@
+"""Binary step outputs passed by reference instead of inline base64.
+
+Audio and image steps used to return their payload base64-encoded, so every
+podcast was copied into ``flow_step_runs.outputs`` and ``flow_runs.outputs``
+and decoded again by the consumer. Steps now write the bytes once into an
+``ArtifactStore`` and return a small ``ArtifactHandle`` (uri, mime type, size,
+sha256) under the ``"artifact"`` key of their outputs; consumers read the bytes
+only when they need them with ``open_artifact``.
+
+The default store is a content-addressed local spool directory
+(``FLOW_ARTIFACT_SPOOL_DIR``, default ``<tmp>/flow_artifacts``). Files older
+than ``FLOW_ARTIFACT_TTL_HOURS`` (default 72) are swept as new artifacts are
+written; by then the consumer has long copied them into the object store.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import mimetypes
+import os
+from pathlib import Path
+import tempfile
+import time
+from typing import Any, Protocol
+import uuid
+
+from pydantic import BaseModel, Field
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "ARTIFACT_KEY",
+    "ArtifactHandle",
+    "ArtifactNotFoundError",
+    "ArtifactStore",
+    "LocalSpoolArtifactStore",
+    "get_artifact_store",
+    "open_artifact",
+    "set_artifact_store",
+]
+
+# Key under which a step's outputs carry the handle of its binary payload
+ARTIFACT_KEY = "artifact"
+SPOOL_SCHEME = "spool://"
+# Sweep the spool for expired files at most this often
+_SWEEP_INTERVAL_SECONDS = 3600
+
+
+class ArtifactNotFoundError(FileNotFoundError):
+    """Raised when a handle points at an artifact that no longer exists."""
+
+
+class ArtifactHandle(BaseModel):
+    """Lightweight, JSON-serialisable reference to a binary artifact."""
+
+    uri: str = Field(..., description="Store-specific location of the artifact")
+    mime_type: str = Field(..., description="MIME type of the payload")
+    size_bytes: int = Field(..., description="Payload size in bytes")
+    sha256: str = Field(..., description="Hex SHA-256 of the payload")
+
+
+class ArtifactStore(Protocol):
+    """Where binary step outputs live between the producing step and their consumer."""
+
+    async def put(self, data: bytes, mime_type: str) -> ArtifactHandle: ...
+    async def read(self, handle: ArtifactHandle) -> bytes: ...
+    async def exists(self, handle: ArtifactHandle) -> bool: ...
+    async def delete(self, handle: ArtifactHandle) -> None: ...
+
+
+class LocalSpoolArtifactStore:
+    """Content-addressed spool directory on local disk; identical payloads share one file."""
+
+    def __init__(self, root: str | Path, ttl_seconds: float | None = None) -> None:
+        self.root = Path(root)
+        self.ttl_seconds = ttl_seconds
+        self._last_sweep = 0.0
+
+    async def put(self, data: bytes, mime_type: str) -> ArtifactHandle:
+        digest = hashlib.sha256(data).hexdigest()
+        name = f"{digest}{mimetypes.guess_extension(mime_type.split(';', 1)[0].strip()) or '.bin'}"
+        await asyncio.to_thread(self._write, name, data)
+        return ArtifactHandle(uri=f"{SPOOL_SCHEME}{name}", mime_type=mime_type, size_bytes=len(data), sha256=digest)
+
+    async def read(self, handle: ArtifactHandle) -> bytes:
+        path = self._path(handle)
+        try:
+            return await asyncio.to_thread(path.read_bytes)
+        except FileNotFoundError:
+            raise ArtifactNotFoundError(f"Artifact {handle.uri} is no longer in the spool ({self.root})") from None
+
+    async def exists(self, handle: ArtifactHandle) -> bool:
+        return await asyncio.to_thread(self._path(handle).is_file)
+
+    async def delete(self, handle: ArtifactHandle) -> None:
+        await asyncio.to_thread(self._path(handle).unlink, missing_ok=True)
+
+    def sweep(self, max_age_seconds: float) -> int:
+        """Delete spooled files older than ``max_age_seconds``; returns how many were removed."""
+        cutoff = time.time() - max_age_seconds
+        removed = 0
+        for path in self.root.glob("*"):
+            try:
+                if path.is_file() and path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                continue
+        return removed
+
+    def _path(self, handle: ArtifactHandle) -> Path:
+        if not handle.uri.startswith(SPOOL_SCHEME):
+            raise ValueError(f"Not a spool artifact: {handle.uri}")
+        name = handle.uri.removeprefix(SPOOL_SCHEME)
+        if not name or "/" in name or "\\" in name or name.startswith("."):
+            raise ValueError(f"Invalid spool artifact name: {name!r}")
+        return self.root / name
+
+    def _write(self, name: str, data: bytes) -> None:
+        self.root.mkdir(parents=True, exist_ok=True)
+        path = self.root / name
+        if path.exists():
+            # Same content already spooled; refresh its age so the sweep keeps it
+            path.touch()
+        else:
+            tmp_path = self.root / f".{name}.{uuid.uuid4().hex}.tmp"
+            tmp_path.write_bytes(data)
+            tmp_path.replace(path)
+        now = time.time()
+        if self.ttl_seconds is not None and now - self._last_sweep >= _SWEEP_INTERVAL_SECONDS:
+            self._last_sweep = now
+            removed = self.sweep(self.ttl_seconds)
+            if removed:
+                logger.info(f"🧹 Swept {removed} expired flow artifacts from {self.root}")
+
+
+def _default_store() -> LocalSpoolArtifactStore:
+    root = os.getenv("FLOW_ARTIFACT_SPOOL_DIR") or str(Path(tempfile.gettempdir()) / "flow_artifacts")
+    ttl_hours = float(os.getenv("FLOW_ARTIFACT_TTL_HOURS", "72"))
+    return LocalSpoolArtifactStore(root, ttl_seconds=ttl_hours * 3600 if ttl_hours > 0 else None)
+
+
+_STORE: ArtifactStore | None = None
+
+
+def get_artifact_store() -> ArtifactStore:
+    """Return the process-wide artifact store, creating the local spool on first use."""
+    global _STORE  # noqa: PLW0603
+    if _STORE is None:
+        _STORE = _default_store()
+    return _STORE
+
+
+def set_artifact_store(store: ArtifactStore | None) -> None:
+    """Replace the process-wide artifact store (``None`` restores the env-configured spool)."""
+    global _STORE  # noqa: PLW0603
+    _STORE = store
+
+
+async def open_artifact(handle: ArtifactHandle | dict[str, Any]) -> bytes:
+    """Read an artifact's bytes; accepts a handle or its serialised dict from step/flow outputs."""
+    if not isinstance(handle, ArtifactHandle):
+        handle = ArtifactHandle.model_validate(handle)
+    data = await get_artifact_store().read(handle)
+    if hashlib.sha256(data).hexdigest() != handle.sha256:
+        raise ValueError(f"Artifact {handle.uri} does not match its recorded checksum")
+    return data
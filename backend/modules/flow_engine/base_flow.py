@@ -12,7 +12,7 @@ from pydantic import BaseModel
 from ..infrastructure.public import infrastructure_provider
 from ..llm_services.public import llm_services_provider
 from .context import FlowContext
-from .repo import FlowRunRepo, FlowStepRunRepo
+from .repo import AsyncFlowRunRepo, AsyncFlowStepRunRepo
 from .service import FlowEngineService
 from .types import FlowExecutionKwargs
 
@@ -21,6 +21,12 @@ logger = logging.getLogger(__name__)
 __all__ = ["BaseFlow", "FlowExecutionKwargs", "flow_execution"]
 
 
+def _as_flow_run_id(value: Any) -> uuid.UUID | None:
+    if value is None or isinstance(value, uuid.UUID):
+        return value
+    return uuid.UUID(str(value))
+
+
 def flow_execution(func: Callable[..., Any]) -> Callable[..., Any]:
     """
     Decorator that provides flow context automatically.
@@ -36,10 +42,9 @@ def flow_execution(func: Callable[..., Any]) -> Callable[..., Any]:
         infra.initialize()
         llm_services = llm_services_provider()
 
-        # Keep the entire flow execution within a managed DB session so writes commit
-        # Note: Using sync session context even in async flow - this is intentional for immediate commits
-        with infra.get_session_context() as db_session:
-            service = FlowEngineService(FlowRunRepo(db_session), FlowStepRunRepo(db_session), llm_services)
+        # Keep the entire flow execution within one async DB session; the service batches its commits
+        async with infra.get_async_session_context() as db_session:
+            service = FlowEngineService(AsyncFlowRunRepo(db_session), AsyncFlowStepRunRepo(db_session), llm_services)
 
             # Create flow run record
             inputs = args[0] if args else {}
@@ -68,8 +73,10 @@ def flow_execution(func: Callable[..., Any]) -> Callable[..., Any]:
                     )
                     raise
             user_id = cast(int | None, kwargs.get("user_id"))
+            resume_from = _as_flow_run_id(kwargs.get("resume_from_flow_run_id"))
+            self.last_failed_flow_run_id = None
 
-            logger.info(f"🚀 Starting flow: {self.flow_name}")
+            logger.info(f"🚀 Starting flow: {self.flow_name}" + (f" (resuming from {resume_from})" if resume_from else ""))
             logger.debug(f"Flow inputs: {list(inputs.keys()) if isinstance(inputs, dict) else 'N/A'}")
 
             arq_task_id = cast(str | None, kwargs.get("arq_task_id"))
@@ -79,6 +86,7 @@ def flow_execution(func: Callable[..., Any]) -> Callable[..., Any]:
                 inputs=inputs,
                 user_id=user_id,
                 arq_task_id=arq_task_id,
+                flow_metadata={"resumed_from_flow_run_id": str(resume_from)} if resume_from else None,
             )
 
             # Set up flow context
@@ -88,6 +96,10 @@ def flow_execution(func: Callable[..., Any]) -> Callable[..., Any]:
                 user_id=user_id,
                 step_counter=0,
                 arq_task_id=arq_task_id,
+                flow_name=self.flow_name,
+                max_step_concurrency=getattr(self, "max_step_concurrency", None),
+                resume_from_flow_run_id=resume_from,
+                checkpoints=await service.load_step_checkpoints(resume_from, self.flow_name) if resume_from else {},
             )
 
             try:
@@ -105,11 +117,14 @@ def flow_execution(func: Callable[..., Any]) -> Callable[..., Any]:
                 # Mark flow as failed
                 logger.error(f"❌ Flow failed: {self.flow_name} - {e!s}")
                 await service.fail_flow_run(flow_run_id, str(e))
+                # Callers can pass this as resume_from_flow_run_id to reuse the steps that completed
+                self.last_failed_flow_run_id = flow_run_id
                 raise
 
             finally:
-                # Clean up context
+                # Clean up context and commit any bookkeeping still staged
                 FlowContext.clear()
+                await service.close()
 
     return wrapper
 
@@ -128,6 +143,12 @@ class BaseFlow(ABC):
     # Required class attribute (must be set by subclasses)
     flow_name: str
 
+    # Optional cap on steps running at once when the flow uses StepGraph (None = unbounded)
+    max_step_concurrency: int | None = None
+
+    # Set when an execution of this instance fails; see resume_from_flow_run_id
+    last_failed_flow_run_id: uuid.UUID | None = None
+
     @property
     def inputs_model(self) -> type[BaseModel] | None:
         """Return the input validation model if defined."""
@@ -140,7 +161,9 @@ class BaseFlow(ABC):
 
         Args:
             inputs: Dictionary of input parameters
-            **kwargs: Additional parameters (user_id, etc.)
+            **kwargs: Additional parameters (user_id, arq_task_id, resume_from_flow_run_id).
+                With ``resume_from_flow_run_id``, steps that completed in that earlier run of
+                this flow with identical inputs reuse their recorded outputs instead of re-executing.
 
         Returns:
             Dictionary containing flow results
@@ -159,7 +182,7 @@ class BaseFlow(ABC):
 
         Args:
             inputs: Dictionary of input parameters
-            **kwargs: Additional parameters (user_id, etc.)
+            **kwargs: Additional parameters (user_id, resume_from_flow_run_id; see execute())
 
         Returns:
             Flow run ID that can be used to track progress
@@ -180,14 +203,15 @@ class BaseFlow(ABC):
             inputs = validated_inputs.model_dump()
 
         user_id = cast(int | None, kwargs.get("user_id"))
+        resume_from = _as_flow_run_id(kwargs.get("resume_from_flow_run_id"))
 
         logger.info(f"🚀 Starting ARQ flow: {self.flow_name}")
         logger.debug(f"Flow inputs: {list(inputs.keys()) if isinstance(inputs, dict) else 'N/A'}")
 
         # Create flow run record first in a separate session
         flow_run_id: uuid.UUID
-        with infra.get_session_context() as db_session:
-            service = FlowEngineService(FlowRunRepo(db_session), FlowStepRunRepo(db_session), llm_services)
+        async with infra.get_async_session_context() as db_session:
+            service = FlowEngineService(AsyncFlowRunRepo(db_session), AsyncFlowStepRunRepo(db_session), llm_services)
 
             # Create flow run record with ARQ execution mode
             flow_run_id = await service.create_flow_run_record(
@@ -203,15 +227,13 @@ class BaseFlow(ABC):
             flow_run_id=flow_run_id,
             inputs=inputs,
             user_id=user_id,
+            resume_from_flow_run_id=resume_from,
         )
 
         # Persist the task ID on the flow run record now that we have it
-        with infra.get_session_context() as db_session:
-            service = FlowEngineService(FlowRunRepo(db_session), FlowStepRunRepo(db_session), llm_services)
-            flow_run = service.flow_run_repo.by_id(flow_run_id)
-            if flow_run is not None:
-                flow_run.arq_task_id = task_result.task_id
-                service.flow_run_repo.save(flow_run)
+        async with infra.get_async_session_context() as db_session:
+            service = FlowEngineService(AsyncFlowRunRepo(db_session), AsyncFlowStepRunRepo(db_session), llm_services)
+            await service.set_arq_task_id(flow_run_id, task_result.task_id)
 
         logger.info(f"✅ Flow task submitted to ARQ: {self.flow_name} (task_id={task_result.task_id})")
 
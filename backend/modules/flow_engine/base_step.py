@@ -1,23 +1,33 @@
 """Base step classes for flow execution with consistent execute() interface."""
 
 from abc import ABC, abstractmethod
+import base64
+import contextlib
 from enum import Enum
-import json
+import functools
 import logging
 import os
 from pathlib import Path
-import re
 import time
 from typing import Any, TypeVar, cast
 import uuid
 
 from pydantic import BaseModel
 
-from ..llm_services.public import LLMMessage
+from ..infrastructure.public import COST_BUCKETS, TOKEN_BUCKETS, get_metrics_registry
+from ..llm_services.public import LLMMessage, get_prompt_registry, llm_priority, render_template
+from .artifacts import ARTIFACT_KEY, ArtifactHandle, get_artifact_store
+from .checkpoints import step_input_hash
 from .context import FlowContext
+from .routing import get_model_router
 
 logger = logging.getLogger(__name__)
 
+_metrics = get_metrics_registry()
+_STEP_DURATION = _metrics.histogram("flow_step_duration_seconds", "Step attempt duration by flow, step and outcome (completed, retried, failed)", ("flow", "step", "status"))
+_STEP_TOKENS = _metrics.histogram("flow_step_tokens", "Tokens used by a completed step", ("flow", "step"), buckets=TOKEN_BUCKETS)
+_STEP_COST = _metrics.histogram("flow_step_cost_usd", "Estimated cost of a completed step", ("flow", "step"), buckets=COST_BUCKETS)
+
 
 def _truncate_for_logging(data: Any, max_str_length: int = 200) -> Any:
     """Recursively truncate large data structures for logging.
@@ -45,6 +55,15 @@ def _truncate_for_logging(data: Any, max_str_length: int = 200) -> Any:
     return data
 
 
+@functools.cache
+def _prompts_dir(step_module: str) -> Path:
+    """Prompts directory of a step's module, e.g. "modules.content_creator.steps" -> modules/content_creator/prompts."""
+    module_parts = step_module.split(".")
+    if module_parts[-1] in ["steps", "flows"]:  # Remove the steps/flows part
+        module_parts = module_parts[:-1]
+    return (Path(*module_parts) / "prompts").resolve()
+
+
 # Type variable for input models
 InputT = TypeVar("InputT", bound=BaseModel)
 
@@ -88,9 +107,24 @@ class BaseStep(ABC):
     # Required class attributes (must be set by subclasses)
     step_name: str
     prompt_file: str | None = None  # Optional for non-LLM steps
+    # Optional stable prefix (e.g. shared unit source material) rendered ahead of prompt_file.
+    # It is sent as its own message marked for provider prompt caching, so steps and lessons
+    # that share it only pay full price for the per-call tail.
+    prefix_prompt_file: str | None = None
 
     # Optional model selection (can be overridden by subclasses)
     model: str | None = None  # "gpt-5", "gpt-5-mini", "claude-sonnet-4", etc.
+    # Optional hedging: equivalent models ("model" or "provider:model", e.g. "bedrock:claude-sonnet-4-5")
+    # raced against a slow primary call; unset defers to LLM_HEDGE_POLICIES for the model.
+    hedge_models: tuple[str, ...] = ()
+    # Optional latency-aware routing: equivalent models the router may pick instead of "model"
+    # per call (FLOW_MODEL_ROUTES can configure the same per step_name, with cost ceilings).
+    route_models: tuple[str, ...] = ()
+    # Optional LLM priority class ("interactive", "standard", "bulk"); unset inherits the caller's
+    # (flows run as "standard" unless started inside llm_priority(...), e.g. bulk scripts).
+    priority: str | None = None
+    # Model used by the current attempt, fed back to the router with its outcome
+    _attempt_model: str | None = None
 
     # Optional GPT-5 configuration (can be overridden by subclasses)
     reasoning_effort: str | None = None  # "minimal", "low", "medium", "high"
@@ -128,8 +162,17 @@ class BaseStep(ABC):
         if os.getenv("FAST_MODE", "false").lower() == "true":
             config["model"] = "gpt-5-mini"
         elif self.model:
-            # Use the model specified by the step
-            config["model"] = self.model
+            # Use the model specified by the step, or the router's pick among its equivalents
+            model = self.model
+            router = get_model_router()
+            policy = router.policy_for(self.step_name, self.model, self.route_models)
+            if policy is not None:
+                model = router.choose(self.step_name, policy).model
+            config["model"] = model
+            self._attempt_model = model
+            # Hedge alternates only apply to the step's own model
+            if self.hedge_models and model == self.model:
+                config["hedge_models"] = self.hedge_models
 
         if self.reasoning_effort:
             config["reasoning"] = {"effort": self.reasoning_effort}
@@ -143,26 +186,18 @@ class BaseStep(ABC):
         return config
 
     @staticmethod
-    def _render_handlebars(template: str, variables: dict[str, Any]) -> str:
+    def _render_handlebars(template: str, variables: dict[str, Any], fragments: dict[int, tuple[Any, str]] | None = None) -> str:
         """Render a minimal Handlebars-style template using {{var}} placeholders.
 
         - Replaces occurrences of {{ key }} with the corresponding value from variables
         - If a value is not a string, it is JSON-serialized to preserve structure
         - Leaves non-matching braces and plain JSON examples untouched
         - Raises ValueError if a placeholder is present without a provided variable
-        """
 
-        def replace(match: re.Match[str]) -> str:
-            key = match.group(1)
-            if key not in variables:
-                raise ValueError(f"Prompt template missing required input: '{key}'")
-            value = variables[key]
-            if isinstance(value, str):
-                return value
-            return json.dumps(value, ensure_ascii=False)
-
-        pattern = re.compile(r"{{\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*}}")
-        return pattern.sub(replace, template)
+        The template is compiled once per distinct text; renders sharing ``fragments``
+        serialize each non-string value only once.
+        """
+        return render_template(template, variables, fragments)
 
     async def execute(self, inputs: dict[str, Any]) -> StepResult:
         """
@@ -177,6 +212,12 @@ class BaseStep(ABC):
         # Get infrastructure from context
         context = FlowContext.current()
 
+        # Resuming a failed run: reuse this step's output if it completed there with the same inputs
+        if context.checkpoints:
+            resumed = await self._resume_from_checkpoint(validated_inputs, context)
+            if resumed is not None:
+                return resumed
+
         # Import error types for retry logic
         import httpx
 
@@ -186,9 +227,13 @@ class BaseStep(ABC):
         last_error: Exception | None = None
         first_step_run_id: uuid.UUID | None = None
 
+        if get_model_router().policy_for(self.step_name, self.model, self.route_models) is not None:
+            await get_model_router().seed_once(context.service.recent_model_outcomes)
+
         for attempt in range(self.max_retries + 1):
             start_time = time.time()
             step_run_id: uuid.UUID | None = None
+            self._attempt_model = None
 
             try:
                 logger.info(f"🔧 Starting step: {self.step_name}" + (f" (attempt {attempt + 1}/{self.max_retries + 1})" if attempt > 0 else ""))
@@ -211,13 +256,21 @@ class BaseStep(ABC):
                 # Execute step-specific logic
                 logger.debug(f"Executing step logic: {self.step_name}")
                 logger.debug(f"Step inputs: {_truncate_for_logging(validated_inputs.model_dump())}")
-                output_content, llm_request_id = await self._execute_step_logic(validated_inputs, context)
+                with llm_priority(self.priority) if self.priority else contextlib.nullcontext():
+                    output_content, llm_request_id = await self._execute_step_logic(validated_inputs, context)
                 logger.debug(f"Step output type: {type(output_content).__name__}")
                 if logger.isEnabledFor(logging.DEBUG):
                     logger.debug(f"Step output (truncated): {_truncate_for_logging(output_content)}")
 
-                # Calculate execution time
+                # Calculate execution time; read usage before the next await (graph steps share the context)
                 execution_time_ms = int((time.time() - start_time) * 1000)
+                tokens_used, cost_estimate = context.last_tokens_used, context.last_cost_estimate
+                self._observe_model(execution_time_ms, ok=True, cost=cost_estimate)
+                _STEP_DURATION.observe(execution_time_ms / 1000, context.flow_name, self.step_name, "completed")
+                if tokens_used:
+                    _STEP_TOKENS.observe(tokens_used, context.flow_name, self.step_name)
+                if cost_estimate:
+                    _STEP_COST.observe(cost_estimate, context.flow_name, self.step_name)
 
                 # Prepare outputs for database
                 if hasattr(output_content, "model_dump"):
@@ -228,14 +281,12 @@ class BaseStep(ABC):
                     outputs = {"content": str(output_content)}
 
                 # Update step run with success
-                await context.service.update_step_run_success(
-                    step_run_id=step_run_id, outputs=outputs, tokens_used=context.last_tokens_used, cost_estimate=context.last_cost_estimate, execution_time_ms=execution_time_ms, llm_request_id=llm_request_id
-                )
+                await context.service.update_step_run_success(step_run_id=step_run_id, outputs=outputs, tokens_used=tokens_used, cost_estimate=cost_estimate, execution_time_ms=execution_time_ms, llm_request_id=llm_request_id)
 
-                # Update flow progress
-                await context.service.update_flow_progress(flow_run_id=context.flow_run_id, current_step=self.step_name, step_progress=context.step_counter)
+                # Update flow progress (completed steps, so concurrent steps count once each)
+                await context.service.update_flow_progress(flow_run_id=context.flow_run_id, current_step=self.step_name, step_progress=context.mark_step_completed())
 
-                logger.info(f"✅ Step completed: {self.step_name} - Time: {execution_time_ms}ms, Tokens: {context.last_tokens_used or 0}" + (f" (succeeded on attempt {attempt + 1})" if attempt > 0 else ""))
+                logger.info(f"✅ Step completed: {self.step_name} - Time: {execution_time_ms}ms, Tokens: {tokens_used or 0}" + (f" (succeeded on attempt {attempt + 1})" if attempt > 0 else ""))
 
                 # Create result
                 return StepResult(
@@ -243,8 +294,8 @@ class BaseStep(ABC):
                     output_content=output_content,
                     metadata={
                         "step_run_id": str(step_run_id),
-                        "tokens_used": context.last_tokens_used,
-                        "cost_estimate": context.last_cost_estimate,
+                        "tokens_used": tokens_used,
+                        "cost_estimate": cost_estimate,
                         "execution_time_ms": execution_time_ms,
                         "llm_request_id": str(llm_request_id) if llm_request_id else None,
                         "step_type": self.step_type.value,
@@ -257,6 +308,8 @@ class BaseStep(ABC):
                 # Transient errors that should be retried
                 last_error = e
                 execution_time_ms = int((time.time() - start_time) * 1000)
+                self._observe_model(execution_time_ms, ok=False)
+                _STEP_DURATION.observe(execution_time_ms / 1000, context.flow_name, self.step_name, "retried" if step_run_id and attempt < self.max_retries else "failed")
 
                 if step_run_id and attempt < self.max_retries:
                     # Mark for retry
@@ -273,6 +326,8 @@ class BaseStep(ABC):
             except Exception as e:
                 # Non-retriable errors (auth, validation, programming errors)
                 execution_time_ms = int((time.time() - start_time) * 1000)
+                self._observe_model(execution_time_ms, ok=False)
+                _STEP_DURATION.observe(execution_time_ms / 1000, context.flow_name, self.step_name, "failed")
 
                 if step_run_id:
                     await context.service.update_step_run_error(step_run_id=step_run_id, error_message=str(e), execution_time_ms=execution_time_ms)
@@ -285,6 +340,51 @@ class BaseStep(ABC):
             raise last_error
         raise RuntimeError(f"Step {self.step_name} failed without raising an exception")
 
+    async def _resume_from_checkpoint(self, validated_inputs: BaseModel, context: "FlowContext") -> StepResult | None:
+        """Return the checkpointed result for these inputs, or None when the step has to run."""
+        inputs = validated_inputs.model_dump(mode="json")
+        checkpoint = context.checkpoints.get((context.flow_name or "", self.step_name, step_input_hash(inputs)))
+        if checkpoint is None:
+            return None
+        try:
+            output_content = await self._restore_output(checkpoint.outputs)
+        except Exception as e:
+            logger.warning(f"⚠️ Checkpoint for {self.step_name} is unusable ({type(e).__name__}: {e}); re-running step")
+            return None
+        if output_content is None:
+            return None
+
+        step_run_id = await context.service.record_resumed_step_run(flow_run_id=context.flow_run_id, step_name=self.step_name, step_order=context.get_next_step_order(), inputs=validated_inputs.model_dump(), checkpoint=checkpoint)
+        await context.service.update_flow_progress(flow_run_id=context.flow_run_id, current_step=self.step_name, step_progress=context.mark_step_completed())
+        logger.info(f"⏩ Step reused from checkpoint: {self.step_name} (step run {checkpoint.step_run_id})")
+
+        return StepResult(
+            step_name=self.step_name,
+            output_content=output_content,
+            metadata={
+                "step_run_id": str(step_run_id),
+                "tokens_used": 0,
+                "cost_estimate": 0.0,
+                "execution_time_ms": 0,
+                "llm_request_id": str(checkpoint.llm_request_id) if checkpoint.llm_request_id else None,
+                "step_type": self.step_type.value,
+                "prompt_file": self.prompt_file,
+                "retry_attempt": 0,
+                "resumed_from_step_run_id": str(checkpoint.step_run_id),
+            },
+        )
+
+    async def _restore_output(self, outputs: dict[str, Any]) -> Any:
+        """Rebuild ``output_content`` from recorded outputs; None means the checkpoint can't be reused."""
+        if self.outputs_model is not None:
+            return self.outputs_model.model_validate(outputs)
+        return outputs
+
+    def _observe_model(self, execution_time_ms: int, *, ok: bool, cost: float | None = None) -> None:
+        """Report the attempt's outcome on its model to the router."""
+        if self._attempt_model is not None:
+            get_model_router().observe(self.step_name, self._attempt_model, execution_time_ms / 1000, ok=ok, cost=cost)
+
     def _load_prompt_from_file(self, filename: str, context: "FlowContext") -> str:  # noqa: ARG002
         """
         Load a prompt from a markdown file.
@@ -301,27 +401,42 @@ class BaseStep(ABC):
         Raises:
             FileNotFoundError: If the prompt file cannot be found
         """
-        # Get the module path where the step class is defined
-        step_module = self.__class__.__module__
-
-        # Convert module path to file system path
-        # e.g., "modules.content_creator.steps" -> "modules/content_creator"
-        module_parts = step_module.split(".")
-        if module_parts[-1] in ["steps", "flows"]:  # Remove the steps/flows part
-            module_parts = module_parts[:-1]
-
-        # Build path to prompts directory
-        module_path = Path(*module_parts)
-        prompts_dir = module_path / "prompts"
-        prompt_file_path = prompts_dir / filename
+        prompt_file_path = _prompts_dir(self.__class__.__module__) / filename
 
-        # Try to read the file
+        # Loaded and compiled once per process (reloaded on change when DEBUG=true)
         try:
-            with prompt_file_path.open(encoding="utf-8") as f:
-                return f.read().strip()
+            return get_prompt_registry().get(prompt_file_path).source
         except FileNotFoundError:
             raise FileNotFoundError(f"Prompt file '{filename}' not found. Looked in: {prompt_file_path}") from None
 
+    def _build_prompt_messages(self, inputs: dict[str, Any], context: "FlowContext") -> list[LLMMessage]:
+        """
+        Render the step's prompt into LLM messages, prefix first.
+
+        With ``prefix_prompt_file`` the rendered prefix becomes a separate message
+        marked ``cache_breakpoint`` so providers can cache it across calls.
+        """
+        if not self.prompt_file:
+            raise ValueError(f"Step {self.step_name} must define prompt_file")
+        # Shared so inputs used by both the prefix and the main prompt are serialized once
+        fragments: dict[int, tuple[Any, str]] = {}
+        formatted_prompt = self._format_prompt(self._load_prompt(self.prompt_file, context), inputs, fragments)
+        messages: list[LLMMessage] = []
+        if self.prefix_prompt_file:
+            prefix = self._format_prompt(self._load_prompt(self.prefix_prompt_file, context), inputs, fragments)
+            messages.append(LLMMessage(role="user", content=prefix, name=None, function_call=None, tool_calls=None, cache_breakpoint=True))
+        messages.append(LLMMessage(role="user", content=formatted_prompt, name=None, function_call=None, tool_calls=None))
+        return messages
+
+    def _load_prompt(self, filename: str, context: "FlowContext") -> str:
+        """Load a prompt from a markdown file."""
+        return self._load_prompt_from_file(filename, context)
+
+    def _format_prompt(self, prompt: str, inputs: dict[str, Any], fragments: dict[int, tuple[Any, str]] | None = None) -> str:
+        """Format prompt template with input values."""
+        # Render with Handlebars-style placeholders
+        return BaseStep._render_handlebars(prompt, inputs, fragments)
+
     @abstractmethod
     async def _execute_step_logic(self, inputs: BaseModel, context: "FlowContext") -> tuple[Any, uuid.UUID | None]:
         """
@@ -349,14 +464,8 @@ class UnstructuredStep(BaseStep):
         if not self.prompt_file:
             raise ValueError(f"UnstructuredStep {self.step_name} must define prompt_file")
 
-        # Load prompt template
-        prompt_content = self._load_prompt(self.prompt_file, context)
-
-        # Format prompt using Handlebars-style rendering ({{var}})
-        formatted_prompt = self._format_prompt(prompt_content, inputs.model_dump())
-
-        # Generate response using LLM services
-        messages = [LLMMessage(role="user", content=formatted_prompt, name=None, function_call=None, tool_calls=None)]
+        # Load and format the prompt (Handlebars-style {{var}} rendering), stable prefix first
+        messages = self._build_prompt_messages(inputs.model_dump(), context)
 
         llm_services = context.service.get_llm_services()
 
@@ -370,15 +479,9 @@ class UnstructuredStep(BaseStep):
 
         return response.content, request_id
 
-    def _load_prompt(self, filename: str, context: "FlowContext") -> str:
-        """Load a prompt from a markdown file."""
-        return self._load_prompt_from_file(filename, context)
-
-    def _format_prompt(self, prompt: str, inputs: dict[str, Any]) -> str:
-        """Format prompt template with input values."""
-        # Simple string formatting - can be enhanced with Jinja2 later
-        # Render with Handlebars-style placeholders
-        return BaseStep._render_handlebars(prompt, inputs)
+    async def _restore_output(self, outputs: dict[str, Any]) -> Any:
+        """Text outputs are recorded as ``{"content": text}``."""
+        return outputs.get("content")
 
 
 class StructuredStep(BaseStep):
@@ -396,12 +499,8 @@ class StructuredStep(BaseStep):
         if not self.outputs_model:
             raise ValueError(f"StructuredStep {self.step_name} must define Outputs class")
 
-        # Load and format prompt using Handlebars-style rendering
-        prompt_content = self._load_prompt(self.prompt_file, context)
-        formatted_prompt = self._format_prompt(prompt_content, inputs.model_dump())
-
-        # Generate structured response
-        messages = [LLMMessage(role="user", content=formatted_prompt, name=None, function_call=None, tool_calls=None)]
+        # Load and format the prompt using Handlebars-style rendering, stable prefix first
+        messages = self._build_prompt_messages(inputs.model_dump(), context)
 
         llm_services = context.service.get_llm_services()
 
@@ -415,18 +514,20 @@ class StructuredStep(BaseStep):
 
         return structured_response, request_id
 
-    def _load_prompt(self, filename: str, context: "FlowContext") -> str:
-        """Load a prompt from a markdown file."""
-        return self._load_prompt_from_file(filename, context)
 
-    def _format_prompt(self, prompt: str, inputs: dict[str, Any]) -> str:
-        """Format prompt template with input values."""
-        # Render with Handlebars-style placeholders
-        return BaseStep._render_handlebars(prompt, inputs)
+async def _restore_artifact_outputs(outputs: dict[str, Any]) -> dict[str, Any] | None:
+    """Reuse recorded media outputs only while their spooled artifact still exists."""
+    if ARTIFACT_KEY in outputs and not await get_artifact_store().exists(ArtifactHandle.model_validate(outputs[ARTIFACT_KEY])):
+        return None
+    return outputs
 
 
 class ImageStep(BaseStep):
-    """Base class for steps that generate images."""
+    """Base class for steps that generate images.
+
+    Inline ``data:`` images are written to the flow artifact store and returned
+    as a handle under ``"artifact"``; remote image URLs are passed through.
+    """
 
     @property
     def step_type(self) -> StepType:
@@ -448,15 +549,35 @@ class ImageStep(BaseStep):
         llm_services = context.service.get_llm_services()
         image_response, request_id = await llm_services.generate_image(prompt=prompt, size=size, quality=quality, style=style, user_id=context.user_id)
 
-        # Update context with usage info
+        outputs = image_response.model_dump()
+        image_url = outputs.get("image_url") or ""
+        if image_url.startswith("data:") and ";base64," in image_url:
+            # Inline images (e.g. Gemini) go to the artifact store; remote URLs are already references
+            header, encoded = image_url.split(",", 1)
+            mime_type = header.removeprefix("data:").split(";", 1)[0] or "image/png"
+            handle = await get_artifact_store().put(base64.b64decode(encoded), mime_type)
+            outputs["image_url"] = None
+            outputs[ARTIFACT_KEY] = handle.model_dump()
+
+        # Update context with usage info (after the last await, see AudioStep)
         context.last_tokens_used = 0  # Images don't use tokens
         context.last_cost_estimate = image_response.cost_estimate or 0.0
 
-        return image_response.model_dump(), request_id
+        return outputs, request_id
+
+    async def _restore_output(self, outputs: dict[str, Any]) -> Any:
+        """Only spooled images are reused; remote image URLs may have expired since the original run."""
+        if ARTIFACT_KEY not in outputs:
+            return None
+        return await _restore_artifact_outputs(outputs)
 
 
 class AudioStep(BaseStep):
-    """Base class for steps that synthesize narrated audio."""
+    """Base class for steps that synthesize narrated audio.
+
+    The audio is written to the flow artifact store; outputs carry its handle
+    under ``"artifact"`` instead of the base64 payload.
+    """
 
     @property
     def step_type(self) -> StepType:
@@ -487,7 +608,15 @@ class AudioStep(BaseStep):
             user_id=context.user_id,
         )
 
+        # Spool the audio and hand back a reference so step/flow outputs stay small
+        handle = await get_artifact_store().put(audio_response.audio_bytes(), audio_response.mime_type)
+        outputs = audio_response.model_dump(exclude={"audio_base64"})
+        outputs[ARTIFACT_KEY] = handle.model_dump()
+
+        # Set usage after the last await so concurrent graph steps can't overwrite it before execute() reads it
         context.last_tokens_used = 0  # Audio synthesis does not report tokens
         context.last_cost_estimate = audio_response.cost_estimate or 0.0
+        return outputs, request_id
 
-        return audio_response.model_dump(), request_id
+    async def _restore_output(self, outputs: dict[str, Any]) -> Any:
+        return await _restore_artifact_outputs(outputs)
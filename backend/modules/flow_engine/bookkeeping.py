@@ -0,0 +1,139 @@
+"""Batched, non-blocking persistence of flow and step run bookkeeping.
+
+A flow run used to hold a synchronous session for its whole execution and
+commit every step start, step finish and progress update separately — about
+20 blocking commits on the event loop for a six-step lesson. Bookkeeping now
+goes through a ``FlowRunWriter`` wrapping the run's ``AsyncSession``:
+
+- changes are staged on the session and committed together at most once per
+  flush interval (``FLOW_BOOKKEEPING_FLUSH_MS``, default 500ms), so a step's
+  start and finish — and any number of progress updates in between — usually
+  land in a single transaction
+- progress updates only mutate the in-session flow run, so rapid updates
+  coalesce into whatever the next commit writes
+- run creation, completion and failure commit immediately, since workers and
+  the admin dashboard rely on seeing them
+- a failed commit is rolled back and its rows are staged again, so nothing
+  staged is lost; a failed deferred commit is raised by the next ``flush()``
+  or ``close()``
+
+Steps of a ``StepGraph`` share the writer; its lock serializes their use of
+the session, which does not support concurrent operations.
+"""
+
+import asyncio
+from collections.abc import AsyncIterator
+import contextlib
+import logging
+import os
+from typing import Any
+
+from sqlalchemy import inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["FlowRunWriter", "bookkeeping_flush_interval"]
+
+_DEFAULT_FLUSH_MS = 500
+
+
+def bookkeeping_flush_interval() -> float:
+    """Seconds between bookkeeping commits, from ``FLOW_BOOKKEEPING_FLUSH_MS``."""
+    return max(0, int(os.getenv("FLOW_BOOKKEEPING_FLUSH_MS") or _DEFAULT_FLUSH_MS)) / 1000
+
+
+class FlowRunWriter:
+    """Serializes a flow run's session use and coalesces its commits."""
+
+    def __init__(self, session: AsyncSession, flush_interval: float | None = None) -> None:
+        self.session = session
+        session.info["commit_scope"] = "flow_bookkeeping"
+        self.flush_interval = bookkeeping_flush_interval() if flush_interval is None else flush_interval
+        self._lock = asyncio.Lock()
+        self._dirty = False
+        # Rows staged since the last successful commit: None for new rows, else their changed column values
+        self._staged: dict[Any, dict[str, Any] | None] = {}
+        self._error: Exception | None = None
+        self._timer: asyncio.TimerHandle | None = None
+        self._flush_task: asyncio.Task[None] | None = None
+        self.commits = 0
+
+    @contextlib.asynccontextmanager
+    async def use(self) -> AsyncIterator[AsyncSession]:
+        """Exclusive access to the session, for reads and for staging changes."""
+        async with self._lock:
+            yield self.session
+
+    def mark_dirty(self) -> None:
+        """Note staged changes; they are committed with the next scheduled flush."""
+        self._remember_staged()
+        self._dirty = True
+        if self.flush_interval <= 0:
+            # Unbatched: commit right away, in the background (flushes queue on the lock in order)
+            self._flush_task = asyncio.create_task(self._background_flush(), name="flow-bookkeeping-flush")
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.flush_interval, self._spawn_flush)
+
+    def _remember_staged(self) -> None:
+        for row in self.session.new:
+            self._staged[row] = None
+        for row in self.session.dirty:
+            changes = self._staged.setdefault(row, {})
+            if changes is not None:
+                state = inspect(row)
+                changes.update({prop.key: state.attrs[prop.key].value for prop in state.mapper.column_attrs if state.attrs[prop.key].history.added})
+
+    def _restage(self) -> None:
+        # Rollback expunges rows inserted in the transaction and expires the changes made to loaded ones
+        for row, changes in self._staged.items():
+            if changes is None:
+                self.session.add(row)
+            else:
+                for key, value in changes.items():
+                    setattr(row, key, value)
+
+    def _spawn_flush(self) -> None:
+        self._timer = None
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._background_flush(), name="flow-bookkeeping-flush")
+        elif self.flush_interval > 0:
+            # A slow commit is still running; try again after another interval
+            self._timer = asyncio.get_running_loop().call_later(self.flush_interval, self._spawn_flush)
+
+    async def _background_flush(self) -> None:
+        try:
+            await self.flush()
+        except Exception as e:
+            # The rows stay staged; the next explicit flush (at the latest when the run completes or fails) raises the error
+            self._error = e
+            logger.warning(f"⚠️ Deferred flow bookkeeping commit failed: {e}")
+
+    async def flush(self) -> None:
+        """Commit staged changes now; raises a failed deferred commit's error first (its rows are retried by the next flush)."""
+        async with self._lock:
+            if self._error is not None:
+                error, self._error = self._error, None
+                raise error
+            if not self._dirty:
+                return
+            self._remember_staged()
+            try:
+                await self.session.commit()
+            except Exception:
+                await self.session.rollback()
+                self._restage()
+                raise
+            self._dirty = False
+            self._staged.clear()
+            self.commits += 1
+
+    async def close(self) -> None:
+        """Cancel the pending timer, wait for an in-flight flush and commit what is left."""
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._flush_task is not None:
+            await asyncio.gather(self._flush_task, return_exceptions=True)
+            self._flush_task = None
+        await self.flush()
@@ -0,0 +1,49 @@
+"""Step checkpoints for resuming failed flow runs.
+
+Every completed step run already persists its inputs and outputs in
+``flow_step_runs``. When a flow is executed with ``resume_from_flow_run_id``,
+the completed step runs of that earlier run become checkpoints keyed by
+``(flow_name, step_name, input hash)``; a step whose validated inputs hash to
+the same key returns the recorded output instead of calling the LLM again.
+Steps whose inputs changed (or that never completed) run normally.
+"""
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+import hashlib
+import json
+from typing import Any
+import uuid
+
+from .models import FlowStepRunModel
+
+__all__ = ["CheckpointKey", "StepCheckpoint", "index_checkpoints", "step_input_hash"]
+
+CheckpointKey = tuple[str, str, str]
+
+
+def step_input_hash(inputs: dict[str, Any]) -> str:
+    """Hex SHA-256 of the canonical JSON form of a step's inputs (sorted keys, compact separators)."""
+    canonical = json.dumps(inputs, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class StepCheckpoint:
+    """Recorded outcome of a completed step run that a resumed run may reuse."""
+
+    step_run_id: uuid.UUID
+    step_name: str
+    outputs: dict[str, Any]
+    llm_request_id: uuid.UUID | None = None
+
+
+def index_checkpoints(flow_name: str, step_runs: Iterable[FlowStepRunModel]) -> dict[CheckpointKey, StepCheckpoint]:
+    """Key a run's completed step runs by (flow_name, step_name, input hash); the first completion wins."""
+    checkpoints: dict[CheckpointKey, StepCheckpoint] = {}
+    for step_run in step_runs:
+        if step_run.status != "completed" or step_run.outputs is None:
+            continue
+        key = (flow_name, step_run.step_name, step_input_hash(step_run.inputs))
+        checkpoints.setdefault(key, StepCheckpoint(step_run_id=step_run.id, step_name=step_run.step_name, outputs=step_run.outputs, llm_request_id=step_run.llm_request_id))
+    return checkpoints
@@ -1,11 +1,13 @@
 """Flow execution context management."""
 
+import asyncio
 from contextvars import ContextVar
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import TYPE_CHECKING, Any
 import uuid
 
 if TYPE_CHECKING:
+    from .checkpoints import CheckpointKey, StepCheckpoint
     from .service import FlowEngineService
 
 # Thread-safe context variable for storing flow context
@@ -28,9 +30,18 @@ class FlowContext:
     flow_run_id: uuid.UUID
     user_id: int | None = None
     arq_task_id: str | None = None
+    flow_name: str | None = None
 
     # Execution state
     step_counter: int = 0
+    completed_steps: int = 0
+    # Cap on steps running at once within this flow run (None = unbounded); see StepGraph
+    max_step_concurrency: int | None = None
+    _step_slots: asyncio.Semaphore | None = field(default=None, init=False, repr=False)
+
+    # Completed steps of the run being resumed, reused instead of re-executing them
+    resume_from_flow_run_id: uuid.UUID | None = None
+    checkpoints: "dict[CheckpointKey, StepCheckpoint]" = field(default_factory=dict, repr=False)
 
     # Last step execution metrics (updated by steps)
     last_tokens_used: int = 0
@@ -87,13 +98,39 @@ class FlowContext:
         self.step_counter += 1
         return self.step_counter
 
+    def mark_step_completed(self) -> int:
+        """
+        Count a successfully completed step.
+
+        Returns:
+            The number of steps completed so far in this flow run
+        """
+        self.completed_steps += 1
+        return self.completed_steps
+
+    def step_slots(self) -> asyncio.Semaphore | None:
+        """
+        Get the semaphore enforcing this flow run's step concurrency limit.
+
+        Returns:
+            A semaphore shared by all step graphs of the run, or None when unbounded
+        """
+        if self.max_step_concurrency is None:
+            return None
+        if self._step_slots is None:
+            self._step_slots = asyncio.Semaphore(self.max_step_concurrency)
+        return self._step_slots
+
     def to_dict(self) -> dict[str, Any]:
         """Convert context to dictionary representation."""
         return {
             "flow_run_id": str(self.flow_run_id),
             "user_id": self.user_id,
             "arq_task_id": self.arq_task_id,
+            "flow_name": self.flow_name,
+            "resume_from_flow_run_id": str(self.resume_from_flow_run_id) if self.resume_from_flow_run_id else None,
             "step_counter": self.step_counter,
+            "completed_steps": self.completed_steps,
             "last_tokens_used": self.last_tokens_used,
             "last_cost_estimate": self.last_cost_estimate,
         }
@@ -0,0 +1,204 @@
+"""Declarative step graphs: independent steps of a flow run concurrently.
+
+Instead of awaiting steps one after another, a flow can declare them as nodes
+of a ``StepGraph``. A node's inputs may reference other nodes' outputs with
+``output_of("node")``; those references (plus any explicit ``after=``) are the
+node's dependencies. ``StepGraph.run()`` starts every node as soon as its
+dependencies have finished, so independent branches overlap::
+
+    graph = StepGraph("lesson")
+    graph.add("transcript", GenerateTranscriptStep(), {"topic": inputs["topic"]})
+    graph.add("glossary", GenerateGlossaryStep(), {"topic": inputs["topic"]})
+    graph.add("quiz", GenerateQuizStep(), {"transcript": output_of("transcript", str.strip), "glossary": output_of("glossary")})
+    results = await graph.run()  # transcript and glossary run concurrently
+
+Concurrency is capped per flow run by ``BaseFlow.max_step_concurrency`` (or
+per graph with ``StepGraph(max_concurrency=...)``). Each run records its
+per-node timings and critical path — the chain of dependencies that determined
+the graph's wall-clock time — in the flow run's ``flow_metadata``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable, Iterable, Mapping
+import contextlib
+from dataclasses import dataclass, field
+import logging
+import time
+from typing import Any
+
+from .base_step import BaseStep, StepResult
+from .context import FlowContext
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["StepGraph", "StepGraphError", "StepOutput", "output_of"]
+
+
+class StepGraphError(ValueError):
+    """Raised for an invalid graph: duplicate or unknown nodes, or a dependency cycle."""
+
+
+@dataclass(frozen=True)
+class StepOutput:
+    """Reference to another node's output, resolved when the referencing node starts."""
+
+    node: str
+    transform: Callable[[Any], Any] | None = None
+
+    def resolve(self, results: Mapping[str, StepResult]) -> Any:
+        value = results[self.node].output_content
+        return self.transform(value) if self.transform is not None else value
+
+
+def output_of(node: str, transform: Callable[[Any], Any] | None = None) -> StepOutput:
+    """Use ``node``'s ``output_content`` (optionally transformed) as an input value."""
+    return StepOutput(node, transform)
+
+
+def _references(value: Any) -> Iterable[StepOutput]:
+    if isinstance(value, StepOutput):
+        yield value
+    elif isinstance(value, Mapping):
+        for item in value.values():
+            yield from _references(item)
+    elif isinstance(value, list | tuple):
+        for item in value:
+            yield from _references(item)
+
+
+def _resolve(value: Any, results: Mapping[str, StepResult]) -> Any:
+    if isinstance(value, StepOutput):
+        return value.resolve(results)
+    if isinstance(value, Mapping):
+        return {key: _resolve(item, results) for key, item in value.items()}
+    if isinstance(value, list | tuple):
+        return type(value)(_resolve(item, results) for item in value)
+    return value
+
+
+@dataclass
+class _Node:
+    name: str
+    step: BaseStep
+    inputs: dict[str, Any]
+    depends_on: tuple[str, ...]
+
+
+@dataclass
+class _Timing:
+    ready: float
+    started: float
+    finished: float
+
+
+@dataclass
+class StepGraph:
+    """A set of flow steps with data dependencies, executed with maximal concurrency."""
+
+    name: str = "steps"
+    max_concurrency: int | None = None
+    _nodes: dict[str, _Node] = field(default_factory=dict, init=False, repr=False)
+
+    def add(self, name: str, step: BaseStep, inputs: dict[str, Any] | None = None, *, after: Iterable[str] = ()) -> StepGraph:
+        """Add a node; dependencies are the nodes referenced by ``output_of`` in ``inputs`` plus ``after``."""
+        if name in self._nodes:
+            raise StepGraphError(f"Step graph '{self.name}' already has a node named '{name}'")
+        inputs = dict(inputs or {})
+        depends_on = tuple(dict.fromkeys([*(reference.node for reference in _references(inputs)), *after]))
+        self._nodes[name] = _Node(name=name, step=step, inputs=inputs, depends_on=depends_on)
+        return self
+
+    def _topological_order(self) -> list[_Node]:
+        for node in self._nodes.values():
+            unknown = [dependency for dependency in node.depends_on if dependency not in self._nodes]
+            if unknown:
+                raise StepGraphError(f"Node '{node.name}' depends on unknown node(s): {', '.join(unknown)}")
+
+        remaining = {name: set(node.depends_on) for name, node in self._nodes.items()}
+        order: list[_Node] = []
+        while remaining:
+            ready = [name for name, dependencies in remaining.items() if not dependencies]
+            if not ready:
+                raise StepGraphError(f"Step graph '{self.name}' has a dependency cycle among: {', '.join(sorted(remaining))}")
+            for name in ready:
+                order.append(self._nodes[name])
+                del remaining[name]
+            for dependencies in remaining.values():
+                dependencies.difference_update(ready)
+        return order
+
+    async def run(self) -> dict[str, StepResult]:
+        """Execute all nodes, each once its dependencies are done; returns results by node name.
+
+        The first failing step cancels the steps still running and its exception is raised.
+        """
+        order = self._topological_order()
+        context = FlowContext.current()
+        slots = asyncio.Semaphore(self.max_concurrency) if self.max_concurrency else context.step_slots()
+        await context.service.plan_flow_steps(context.flow_run_id, context.completed_steps + len(order))
+
+        results: dict[str, StepResult] = {}
+        timings: dict[str, _Timing] = {}
+        tasks: dict[str, asyncio.Task[StepResult]] = {}
+        origin = time.perf_counter()
+
+        async def _run_node(node: _Node) -> StepResult:
+            dependencies = [tasks[name] for name in node.depends_on]
+            if dependencies:
+                # wait() rather than gather(): a cancelled dependent must not cancel shared dependencies
+                await asyncio.wait(dependencies)
+                for dependency in dependencies:
+                    dependency.result()
+            ready = time.perf_counter()
+            inputs = _resolve(node.inputs, results)
+            async with slots if slots is not None else contextlib.nullcontext():
+                started = time.perf_counter()
+                result = await node.step.execute(inputs)
+            timings[node.name] = _Timing(ready=ready - origin, started=started - origin, finished=time.perf_counter() - origin)
+            results[node.name] = result
+            return result
+
+        try:
+            async with asyncio.TaskGroup() as group:
+                for node in order:
+                    tasks[node.name] = group.create_task(_run_node(node), name=f"{self.name}:{node.name}")
+        except ExceptionGroup as group_error:
+            raise group_error.exceptions[0] from None
+
+        summary = self._summary(timings)
+        logger.info(f"🕸️ Step graph '{self.name}' finished in {summary['wall_ms']}ms (steps total {summary['step_total_ms']}ms); critical path: {' → '.join(summary['critical_path'])}")
+        await context.service.record_step_graph(context.flow_run_id, self.name, summary)
+        return {node.name: results[node.name] for node in order}
+
+    def _summary(self, timings: Mapping[str, _Timing]) -> dict[str, Any]:
+        """Per-node timings and the critical path: from the last node to finish, back through the dependency that finished last."""
+        path: list[str] = []
+        current: str | None = max(timings, key=lambda name: timings[name].finished) if timings else None
+        while current is not None:
+            path.append(current)
+            dependencies = self._nodes[current].depends_on
+            current = max(dependencies, key=lambda name: timings[name].finished) if dependencies else None
+        path.reverse()
+
+        def _ms(seconds: float) -> int:
+            return round(seconds * 1000)
+
+        return {
+            "wall_ms": _ms(max((timing.finished for timing in timings.values()), default=0.0)),
+            "step_total_ms": _ms(sum(timing.finished - timing.started for timing in timings.values())),
+            "critical_path": path,
+            "critical_path_ms": _ms(sum(timings[name].finished - timings[name].started for name in path)),
+            "nodes": {
+                name: {
+                    "step_name": self._nodes[name].step.step_name,
+                    "depends_on": list(self._nodes[name].depends_on),
+                    "ready_ms": _ms(timing.ready),
+                    "slot_wait_ms": _ms(timing.started - timing.ready),
+                    "started_ms": _ms(timing.started),
+                    "finished_ms": _ms(timing.finished),
+                }
+                for name, timing in timings.items()
+            },
+        }
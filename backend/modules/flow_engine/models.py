@@ -9,6 +9,7 @@ from sqlalchemy import (
     DateTime,
     Float,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
@@ -33,6 +34,7 @@ class FlowRunModel(Base):
     """
 
     __tablename__ = "flow_runs"
+    __table_args__ = (Index("ix_flow_runs_archive_scan", "payload_archived_at", "created_at"),)
 
     # Core identification
     id: Mapped[uuid.UUID] = mapped_column(PostgresUUID(), primary_key=True, default=uuid.uuid4)
@@ -67,6 +69,8 @@ class FlowRunModel(Base):
     inputs: Mapped[dict[str, Any]] = mapped_column(JSON, nullable=False)
     outputs: Mapped[dict[str, Any] | None] = mapped_column(JSON, nullable=True)
     flow_metadata: Mapped[dict[str, Any] | None] = mapped_column(JSON, nullable=True)
+    # Set once the archival job has processed the row; larger payloads were moved to the archive (archive.py)
+    payload_archived_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
     # Error information
     error_message: Mapped[str | None] = mapped_column(Text, nullable=True)
@@ -129,6 +133,7 @@ class FlowStepRunModel(Base):
     """
 
     __tablename__ = "flow_step_runs"
+    __table_args__ = (Index("ix_flow_step_runs_archive_scan", "payload_archived_at", "created_at"),)
 
     # Core identification
     id: Mapped[uuid.UUID] = mapped_column(PostgresUUID(), primary_key=True, default=uuid.uuid4)
@@ -149,6 +154,7 @@ class FlowStepRunModel(Base):
     # Data capture
     inputs: Mapped[dict[str, Any]] = mapped_column(JSON, nullable=False)
     outputs: Mapped[dict[str, Any] | None] = mapped_column(JSON, nullable=True)
+    payload_archived_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
     # Performance metrics
     tokens_used: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
@@ -87,6 +87,7 @@ result = await ExtractContentStep().execute({
   - `flow_name: str` - Unique identifier for the flow
 - **Optional Attributes**:
   - `Inputs: BaseModel` - Pydantic model for input validation
+  - `max_step_concurrency: int | None` - Cap on steps running at once in a `StepGraph` (default unbounded)
 - **Required Methods**:
   - `async def _execute_flow_logic(self, inputs: dict) -> dict` - Implement your flow logic
 - **Available Methods**:
@@ -119,6 +120,24 @@ result = await ExtractContentStep().execute({
 - **Optional Inputs**: `size: str`, `quality: str`, `style: str`
 - **Output**: Image URL and metadata in `result.output_content`
 
+### StepGraph
+- **Purpose**: Run independent steps of a flow concurrently
+- **Usage**: `graph.add(name, step, inputs, after=())`, where input values may be `output_of("other_node", transform)`;
+  `results = await graph.run()` returns `StepResult`s by node name
+- **Tracking**: Per-node timings and the critical path are stored in the run's `flow_metadata["step_graphs"]`
+
+### Resuming failed runs
+- **Usage**: `await flow.execute(inputs, resume_from_flow_run_id=flow.last_failed_flow_run_id)`
+- **Behavior**: Steps whose validated inputs match a completed step run of the earlier run (keyed by
+  `(flow_name, step_name, step_input_hash(inputs))`) return the recorded output as a `StepCheckpoint` instead of
+  calling the LLM again; `result.metadata["resumed_from_step_run_id"]` points at the reused step run
+
+### Payload archival
+- **Usage**: `archive_flow_payloads(session)` (or `scripts/archive_flow_payloads.py`) moves inputs/outputs of finished
+  runs older than `FLOW_ARCHIVE_AFTER_DAYS` (default 30) into gzip objects of the `PayloadArchive`
+- **Behavior**: Rows keep an `{"$archived": ..., "$summary": ...}` pointer plus short top-level scalars;
+  `get_flow_run_by_id` / `get_flow_step_by_id` fetch the archived payloads back, listings never load payloads
+
 ## Result Types
 
 ### StepResult
@@ -221,15 +240,21 @@ async def process_document():
 from typing import Any, Protocol
 import uuid
 
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from ..llm_services.public import LLMServicesProvider
 
 # For public interface
+from .archive import ArchiveReport, PayloadArchive, archive_flow_payloads, get_payload_archive, is_archived, set_payload_archive
+from .artifacts import ARTIFACT_KEY, ArtifactHandle, ArtifactNotFoundError, ArtifactStore, get_artifact_store, open_artifact, set_artifact_store
 from .base_flow import BaseFlow
 from .base_step import AudioStep, BaseStep, ImageStep, StepResult, StepType, StructuredStep, UnstructuredStep
+from .checkpoints import StepCheckpoint, step_input_hash
 from .context import FlowContext
-from .repo import FlowRunRepo, FlowStepRunRepo
+from .graph import StepGraph, StepGraphError, StepOutput, output_of
+from .repo import AsyncFlowRunRepo, AsyncFlowStepRunRepo, FlowRunRepo, FlowStepRunRepo
+from .routing import ModelRouter, RoutePolicy, get_model_router
 from .service import FlowRunDetailsDTO, FlowRunQueryService, FlowRunSummaryDTO, FlowStepDetailsDTO
 
 
@@ -309,21 +334,23 @@ class FlowEngineWorkerProvider(Protocol):
     async def update_flow_progress(self, flow_run_id: uuid.UUID, current_step: str, step_progress: int, progress_percentage: float | None = None) -> None: ...
     async def complete_flow_run(self, flow_run_id: uuid.UUID, outputs: dict[str, Any]) -> None: ...
     async def fail_flow_run(self, flow_run_id: uuid.UUID, error_message: str) -> None: ...
+    async def close(self) -> None: ...
 
 
-def flow_engine_worker_provider(session: Session, llm_services: LLMServicesProvider) -> FlowEngineWorkerProvider:
+def flow_engine_worker_provider(session: AsyncSession, llm_services: LLMServicesProvider) -> FlowEngineWorkerProvider:
     """
     Build a minimal worker-facing provider backed by the internal service.
 
     Notes:
     - Returns the concrete FlowEngineService instance which implements the protocol
+    - Step and progress writes are committed in batches; call close() before discarding the session
     - Kept internal construction here to preserve module boundaries
     """
-    if not isinstance(session, Session):
-        raise ValueError("Session must be a SQLAlchemy Session instance")
+    if not isinstance(session, AsyncSession):
+        raise ValueError("Session must be a SQLAlchemy AsyncSession instance")
 
-    flow_run_repo = FlowRunRepo(session)
-    step_run_repo = FlowStepRunRepo(session)
+    flow_run_repo = AsyncFlowRunRepo(session)
+    step_run_repo = AsyncFlowStepRunRepo(session)
 
     # Lazy import to avoid widening the public surface with internal types
     from .service import FlowEngineService  # local import
@@ -332,6 +359,11 @@ def flow_engine_worker_provider(session: Session, llm_services: LLMServicesProvi
 
 
 __all__ = [
+    "ARTIFACT_KEY",
+    "ArchiveReport",
+    "ArtifactHandle",
+    "ArtifactNotFoundError",
+    "ArtifactStore",
     "AudioStep",
     "BaseFlow",
     "BaseStep",
@@ -339,10 +371,27 @@ __all__ = [
     "FlowEngineAdminProvider",  # For admin module only
     "FlowEngineWorkerProvider",  # For task_queue worker only
     "ImageStep",
+    "ModelRouter",
+    "PayloadArchive",
+    "RoutePolicy",
+    "StepCheckpoint",
+    "StepGraph",
+    "StepGraphError",
+    "StepOutput",
     "StepResult",
     "StepType",
     "StructuredStep",
     "UnstructuredStep",
+    "archive_flow_payloads",
     "flow_engine_admin_provider",  # For admin module only
     "flow_engine_worker_provider",  # For task_queue worker only
+    "get_artifact_store",
+    "get_model_router",
+    "get_payload_archive",
+    "is_archived",
+    "open_artifact",
+    "output_of",
+    "set_artifact_store",
+    "set_payload_archive",
+    "step_input_hash",
 ]
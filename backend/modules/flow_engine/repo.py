@@ -1,13 +1,25 @@
 """Repository layer for flow execution data access."""
 
+from collections.abc import Iterable
+from datetime import datetime
 import uuid
 
-from sqlalchemy import desc, select
-from sqlalchemy.orm import Session
+from sqlalchemy import column, desc, func, select, table
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, defer
 
 from .models import FlowRunModel, FlowStepRunModel
 
-__all__ = ["FlowRunRepo", "FlowStepRunRepo"]
+__all__ = ["AsyncFlowRunRepo", "AsyncFlowStepRunRepo", "FlowRunRepo", "FlowStepRunRepo"]
+
+# Only the columns model routing needs; the table belongs to llm_services
+_llm_requests = table("llm_requests", column("id"), column("model"))
+
+# Listings never show payloads; skip loading the (possibly archived) JSON columns
+_SUMMARY_OPTIONS = (defer(FlowRunModel.inputs), defer(FlowRunModel.outputs), defer(FlowRunModel.flow_metadata))
+
+TERMINAL_RUN_STATUSES = ("completed", "failed", "cancelled")
+TERMINAL_STEP_STATUSES = ("completed", "failed", "retrying")
 
 
 class FlowRunRepo:
@@ -54,8 +66,8 @@ class FlowRunRepo:
         return len(list(result.scalars()))
 
     def get_recent(self, limit: int = 50, offset: int = 0) -> list[FlowRunModel]:
-        """Get recent flow runs with pagination."""
-        return list(self.s.execute(select(FlowRunModel).order_by(desc(FlowRunModel.created_at)).limit(limit).offset(offset)).scalars())
+        """Get recent flow runs with pagination (payload columns are not loaded)."""
+        return list(self.s.execute(select(FlowRunModel).options(*_SUMMARY_OPTIONS).order_by(desc(FlowRunModel.created_at)).limit(limit).offset(offset)).scalars())
 
     def list_by_filters(
         self,
@@ -65,9 +77,9 @@ class FlowRunRepo:
         limit: int = 100,
         offset: int = 0,
     ) -> list[FlowRunModel]:
-        """List flow runs filtered by ARQ task ID or embedded unit identifier."""
+        """List flow runs filtered by ARQ task ID or embedded unit identifier (payload columns are not loaded)."""
 
-        stmt = select(FlowRunModel)
+        stmt = select(FlowRunModel).options(*_SUMMARY_OPTIONS)
         if arq_task_id:
             stmt = stmt.where(FlowRunModel.arq_task_id == arq_task_id)
         if unit_id:
@@ -83,6 +95,11 @@ class FlowRunRepo:
         result = self.s.execute(select(FlowRunModel.id))
         return len(list(result.scalars()))
 
+    def archivable(self, created_before: datetime, limit: int = 100) -> list[FlowRunModel]:
+        """Finished flow runs created before ``created_before`` whose payloads are still inline, oldest first."""
+        stmt = select(FlowRunModel).where(FlowRunModel.payload_archived_at.is_(None), FlowRunModel.created_at < created_before, FlowRunModel.status.in_(TERMINAL_RUN_STATUSES)).order_by(FlowRunModel.created_at).limit(limit)
+        return list(self.s.execute(stmt).scalars())
+
 
 class FlowStepRunRepo:
     """Repository for FlowStepRun database operations."""
@@ -121,3 +138,66 @@ class FlowStepRunRepo:
         """Count steps in a flow run."""
         result = self.s.execute(select(FlowStepRunModel.id).where(FlowStepRunModel.flow_run_id == flow_run_id))
         return len(list(result.scalars()))
+
+    def count_by_flow_runs(self, flow_run_ids: Iterable[uuid.UUID]) -> dict[uuid.UUID, int]:
+        """Step counts of several flow runs in one grouped query (runs without steps are omitted)."""
+        ids = list(flow_run_ids)
+        if not ids:
+            return {}
+        stmt = select(FlowStepRunModel.flow_run_id, func.count(FlowStepRunModel.id)).where(FlowStepRunModel.flow_run_id.in_(ids)).group_by(FlowStepRunModel.flow_run_id)
+        return dict(self.s.execute(stmt).all())
+
+    def archivable(self, created_before: datetime, limit: int = 100) -> list[FlowStepRunModel]:
+        """Settled step runs created before ``created_before`` whose payloads are still inline, oldest first."""
+        stmt = select(FlowStepRunModel).where(FlowStepRunModel.payload_archived_at.is_(None), FlowStepRunModel.created_at < created_before, FlowStepRunModel.status.in_(TERMINAL_STEP_STATUSES)).order_by(FlowStepRunModel.created_at).limit(limit)
+        return list(self.s.execute(stmt).scalars())
+
+
+class AsyncFlowRunRepo:
+    """Async repository for the FlowRun writes made while a flow executes.
+
+    Changes are only staged on the session; ``FlowRunWriter`` decides when to commit.
+    """
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.s = session
+
+    async def by_id(self, flow_run_id: uuid.UUID) -> FlowRunModel | None:
+        """Get flow run by ID (from the session's identity map when already loaded)."""
+        return await self.s.get(FlowRunModel, flow_run_id)
+
+    def add(self, flow_run: FlowRunModel) -> FlowRunModel:
+        """Stage a new or changed flow run."""
+        self.s.add(flow_run)
+        return flow_run
+
+
+class AsyncFlowStepRunRepo:
+    """Async repository for the FlowStepRun writes made while a flow executes."""
+
+    def __init__(self, session: AsyncSession) -> None:
+        self.s = session
+
+    async def by_id(self, step_run_id: uuid.UUID) -> FlowStepRunModel | None:
+        """Get step run by ID (from the session's identity map when already loaded)."""
+        return await self.s.get(FlowStepRunModel, step_run_id)
+
+    def add(self, step_run: FlowStepRunModel) -> FlowStepRunModel:
+        """Stage a new or changed step run."""
+        self.s.add(step_run)
+        return step_run
+
+    async def by_flow_run_id(self, flow_run_id: uuid.UUID) -> list[FlowStepRunModel]:
+        """Get all step runs for a flow run."""
+        return list((await self.s.execute(select(FlowStepRunModel).where(FlowStepRunModel.flow_run_id == flow_run_id).order_by(FlowStepRunModel.step_order))).scalars())
+
+    async def recent_model_outcomes(self, limit: int = 2000) -> list[tuple[str, str, int | None, str, float | None]]:
+        """Most recent completed LLM step runs as (step_name, model, execution_time_ms, status, cost_estimate)."""
+        stmt = (
+            select(FlowStepRunModel.step_name, _llm_requests.c.model, FlowStepRunModel.execution_time_ms, FlowStepRunModel.status, FlowStepRunModel.cost_estimate)
+            .join(_llm_requests, _llm_requests.c.id == FlowStepRunModel.llm_request_id)
+            .where(FlowStepRunModel.status == "completed")
+            .order_by(desc(FlowStepRunModel.created_at))
+            .limit(limit)
+        )
+        return [tuple(row) for row in await self.s.execute(stmt)]  # type: ignore[misc]
@@ -8,7 +8,7 @@ from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 
 from ..infrastructure.public import infrastructure_provider
-from .public import FlowRunQueryService, flow_engine_admin_provider
+from .public import FlowRunQueryService, flow_engine_admin_provider, get_model_router
 
 router = APIRouter(prefix="/api/v1/flow-engine", tags=["flow-engine"])
 
@@ -114,3 +114,10 @@ def get_flow_run(
             for step in run.steps
         ],
     }
+
+
+@router.get("/routing")
+def get_routing_table() -> dict[str, Any]:
+    """Admin Observability: live per-step model routing table with the reason for each step's last pick."""
+
+    return get_model_router().table()
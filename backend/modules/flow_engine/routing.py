@@ -0,0 +1,239 @@
+"""Latency-aware model routing for flow steps.
+
+A step normally runs on its fixed ``model``. With a route — the step's
+``route_models`` or a ``FLOW_MODEL_ROUTES`` entry for its ``step_name`` — the
+router picks among the primary model and its equivalents per call, using rolling
+statistics per ``(step_name, model)``:
+
+- a model is *healthy* when its recent error rate is at most ``max_error_rate``
+- a model is *affordable* when its mean cost per call is within ``max_cost_usd``
+- among healthy, affordable models with at least ``min_samples`` observations
+  the one with the lowest latency quantile (p90 by default) wins
+- every ``explore_every``-th call goes to the least-observed model so
+  alternates keep fresh statistics; with no qualified model the primary is used
+
+Statistics are seeded once per process from recent ``flow_step_runs`` (joined to
+their ``llm_requests`` model) and then updated in-process after every step
+attempt. ``ModelRouter.table()`` returns the live routing table, including why
+the last model was chosen, for the admin endpoint.
+
+``FLOW_MODEL_ROUTES`` example::
+
+    {"extract_unit_metadata": {"models": ["gemini-2.5-flash", "gpt-5-mini"], "max_cost_usd": 0.02}}
+"""
+
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import asdict, dataclass, field, replace
+from datetime import UTC, datetime
+import json
+import logging
+import math
+import os
+import threading
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["ModelRouter", "RouteDecision", "RoutePolicy", "get_model_router"]
+
+# Observations kept per (step_name, model); older ones age out
+_STATS_WINDOW = 100
+
+
+@dataclass(frozen=True)
+class RoutePolicy:
+    """Which models a step may run on and how to choose between them."""
+
+    models: tuple[str, ...]
+    max_cost_usd: float | None = None
+    max_error_rate: float = 0.25
+    quantile: float = 0.9
+    min_samples: int = 5
+    explore_every: int = 20
+
+    @classmethod
+    def from_dict(cls, raw: dict[str, Any]) -> RoutePolicy:
+        """Build a policy from a ``FLOW_MODEL_ROUTES`` entry."""
+        defaults = cls(models=())
+        max_cost = raw.get("max_cost_usd")
+        return cls(
+            models=tuple(raw.get("models", ())),
+            max_cost_usd=float(max_cost) if max_cost is not None else None,
+            max_error_rate=float(raw.get("max_error_rate", defaults.max_error_rate)),
+            quantile=float(raw.get("quantile", defaults.quantile)),
+            min_samples=int(raw.get("min_samples", defaults.min_samples)),
+            explore_every=int(raw.get("explore_every", defaults.explore_every)),
+        )
+
+
+@dataclass(frozen=True)
+class RouteDecision:
+    """The model picked for one call and why."""
+
+    step_name: str
+    model: str
+    reason: str
+    candidates: list[dict[str, Any]] = field(default_factory=list)
+    decided_at: str = field(default_factory=lambda: datetime.now(UTC).isoformat())
+
+
+class _ModelStats:
+    """Rolling latency, outcome and cost observations for one (step_name, model)."""
+
+    def __init__(self, window: int = _STATS_WINDOW) -> None:
+        self.latencies: deque[float] = deque(maxlen=window)
+        self.outcomes: deque[bool] = deque(maxlen=window)
+        self.costs: deque[float] = deque(maxlen=window)
+
+    def observe(self, seconds: float | None, ok: bool, cost: float | None) -> None:
+        self.outcomes.append(ok)
+        if ok and seconds is not None:
+            self.latencies.append(seconds)
+        if ok and cost is not None:
+            self.costs.append(cost)
+
+    @property
+    def samples(self) -> int:
+        return len(self.outcomes)
+
+    @property
+    def error_rate(self) -> float:
+        return self.outcomes.count(False) / len(self.outcomes) if self.outcomes else 0.0
+
+    @property
+    def mean_cost(self) -> float | None:
+        return sum(self.costs) / len(self.costs) if self.costs else None
+
+    def latency_quantile(self, q: float) -> float | None:
+        if not self.latencies:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))]
+
+
+class ModelRouter:
+    """Process-wide per-step model selection from rolling latency, error and cost statistics."""
+
+    def __init__(self, routes: dict[str, RoutePolicy] | None = None) -> None:
+        self._routes = dict(routes or {})
+        self._stats: dict[tuple[str, str], _ModelStats] = {}
+        self._decisions: dict[str, RouteDecision] = {}
+        self._policies: dict[str, RoutePolicy] = {}
+        self._calls: dict[str, int] = {}
+        self._lock = threading.Lock()
+        self._seeded = False
+
+    @classmethod
+    def from_env(cls) -> ModelRouter:
+        raw = json.loads(os.getenv("FLOW_MODEL_ROUTES") or "{}")
+        return cls({step_name: RoutePolicy.from_dict(entry) for step_name, entry in raw.items()})
+
+    def policy_for(self, step_name: str, primary: str | None, route_models: Iterable[str] = ()) -> RoutePolicy | None:
+        """Configured policy for a step, else one built from the step's own ``route_models``."""
+        policy = self._routes.get(step_name)
+        if policy is None:
+            alternates = tuple(route_models)
+            if not alternates or primary is None:
+                return None
+            policy = RoutePolicy(models=(primary, *alternates))
+        elif primary is not None and primary not in policy.models:
+            policy = replace(policy, models=(primary, *policy.models))
+        return policy
+
+    def observe(self, step_name: str, model: str, seconds: float | None, *, ok: bool, cost: float | None = None) -> None:
+        """Record the outcome of one step attempt on ``model``."""
+        with self._lock:
+            stats = self._stats.get((step_name, model))
+            if stats is None:
+                stats = self._stats[(step_name, model)] = _ModelStats()
+            stats.observe(seconds, ok, cost)
+
+    async def seed_once(self, load: Callable[[], Awaitable[Iterable[tuple[str, str, int | None, str, float | None]]]]) -> None:
+        """Seed statistics from history once per process; ``load`` returns (step_name, model, execution_time_ms, status, cost) rows."""
+        if self._seeded:
+            return
+        self._seeded = True
+        try:
+            rows = list(await load())
+        except Exception as exc:  # pragma: no cover - history is optional
+            logger.warning(f"Could not seed model routing statistics: {exc}")
+            return
+        for step_name, model, execution_time_ms, status, cost in rows:
+            ok = status == "completed"
+            self.observe(step_name, model, execution_time_ms / 1000 if ok and execution_time_ms is not None else None, ok=ok, cost=cost)
+        logger.info(f"📈 Seeded model routing statistics from {len(rows)} step runs")
+
+    def choose(self, step_name: str, policy: RoutePolicy) -> RouteDecision:
+        """Pick the model for the next call of ``step_name``."""
+        primary = policy.models[0]
+        with self._lock:
+            call_number = self._calls.get(step_name, 0) + 1
+            self._calls[step_name] = call_number
+            self._policies[step_name] = policy
+            candidates = [self._describe(step_name, model, policy) for model in dict.fromkeys(policy.models)]
+
+        qualified = [candidate for candidate in candidates if candidate["eligible"]]
+        under_sampled = [candidate for candidate in candidates if candidate["samples"] < policy.min_samples]
+        if under_sampled and policy.explore_every > 0 and call_number % policy.explore_every == 0:
+            chosen = min(under_sampled, key=lambda candidate: candidate["samples"])
+            reason = f"exploring: {chosen['samples']} of {policy.min_samples} samples"
+        elif qualified:
+            chosen = min(qualified, key=lambda candidate: candidate["latency_seconds"])
+            others = ", ".join(f"{candidate['model']} {candidate['latency_seconds']:.2f}s" for candidate in qualified if candidate is not chosen)
+            reason = f"fastest healthy: p{round(policy.quantile * 100)} {chosen['latency_seconds']:.2f}s" + (f" vs {others}" if others else "")
+        else:
+            chosen = next(candidate for candidate in candidates if candidate["model"] == primary)
+            reason = "no qualified alternative; using primary"
+
+        decision = RouteDecision(step_name=step_name, model=chosen["model"], reason=reason, candidates=candidates)
+        self._decisions[step_name] = decision
+        if chosen["model"] != primary:
+            logger.info(f"🔀 Routed {step_name} to {chosen['model']} ({reason})")
+        return decision
+
+    def _describe(self, step_name: str, model: str, policy: RoutePolicy) -> dict[str, Any]:
+        stats = self._stats.get((step_name, model)) or _ModelStats()
+        latency = stats.latency_quantile(policy.quantile)
+        mean_cost = stats.mean_cost
+        healthy = stats.error_rate <= policy.max_error_rate
+        affordable = policy.max_cost_usd is None or mean_cost is None or mean_cost <= policy.max_cost_usd
+        return {
+            "model": model,
+            "samples": stats.samples,
+            "latency_seconds": latency,
+            "error_rate": round(stats.error_rate, 4),
+            "mean_cost_usd": mean_cost,
+            "healthy": healthy,
+            "affordable": affordable,
+            "eligible": healthy and affordable and latency is not None and stats.samples >= policy.min_samples,
+        }
+
+    def table(self) -> dict[str, Any]:
+        """Live routing table: per routed step, the policy, current per-model statistics and the last decision."""
+        table: dict[str, Any] = {}
+        for step_name in sorted(set(self._routes) | set(self._policies)):
+            policy = self._policies.get(step_name) or self._routes[step_name]
+            decision = self._decisions.get(step_name)
+            with self._lock:
+                models = [self._describe(step_name, model, policy) for model in dict.fromkeys(policy.models)]
+            table[step_name] = {
+                "policy": asdict(policy),
+                "calls": self._calls.get(step_name, 0),
+                "models": models,
+                "last_decision": {"model": decision.model, "reason": decision.reason, "decided_at": decision.decided_at} if decision else None,
+            }
+        return {"seeded": self._seeded, "steps": table}
+
+
+_ROUTER: ModelRouter | None = None
+
+
+def get_model_router() -> ModelRouter:
+    """Return the process-wide router, configured from ``FLOW_MODEL_ROUTES`` on first use."""
+    global _ROUTER  # noqa: PLW0603
+    if _ROUTER is None:
+        _ROUTER = ModelRouter.from_env()
+    return _ROUTER
@@ -2,12 +2,18 @@
 
 from dataclasses import dataclass
 from datetime import UTC, datetime
+import logging
 from typing import Any, cast
 import uuid
 
 from ..llm_services.public import LLMServicesProvider
+from .archive import PayloadArchive, is_archived, load_archived_payloads
+from .bookkeeping import FlowRunWriter
+from .checkpoints import CheckpointKey, StepCheckpoint, index_checkpoints
 from .models import FlowRunModel, FlowStepRunModel
-from .repo import FlowRunRepo, FlowStepRunRepo
+from .repo import AsyncFlowRunRepo, AsyncFlowStepRunRepo, FlowRunRepo, FlowStepRunRepo
+
+logger = logging.getLogger(__name__)
 
 
 # DTOs for external consumption
@@ -89,22 +95,25 @@ class FlowEngineService:
 
     Note: This is not exposed in public.py - flows and steps use the base classes directly.
     This service provides infrastructure support for the base classes.
+
+    All bookkeeping goes through one ``FlowRunWriter`` on the run's AsyncSession: step
+    and progress writes are staged and committed in batches, while run creation,
+    completion and failure are committed immediately. Call ``close()`` when the run ends.
     """
 
-    def __init__(self, flow_run_repo: FlowRunRepo, step_run_repo: FlowStepRunRepo, llm_services: LLMServicesProvider) -> None:
+    def __init__(self, flow_run_repo: AsyncFlowRunRepo, step_run_repo: AsyncFlowStepRunRepo, llm_services: LLMServicesProvider, writer: FlowRunWriter | None = None) -> None:
         self.flow_run_repo = flow_run_repo
         self.step_run_repo = step_run_repo
         self.llm_services = llm_services
+        self.writer = writer or FlowRunWriter(flow_run_repo.s)
 
-    def _commit_changes(self) -> None:
-        """
-        Commit pending changes to make them visible to other database sessions.
+    async def flush(self) -> None:
+        """Commit staged bookkeeping now (internal use)."""
+        await self.writer.flush()
 
-        This is critical for real-time visibility in the admin dashboard during
-        long-running flows executed in ARQ tasks.
-        """
-        # Access the session through the repo (sync commit for immediate visibility)
-        self.flow_run_repo.s.commit()
+    async def close(self) -> None:
+        """Commit whatever is still staged; the service must not be used afterwards (internal use)."""
+        await self.writer.close()
 
     async def create_flow_run_record(
         self,
@@ -114,29 +123,44 @@ class FlowEngineService:
         *,
         execution_mode: str = "sync",
         arq_task_id: str | None = None,
+        flow_metadata: dict[str, Any] | None = None,
     ) -> uuid.UUID:
         """Create a new flow run record (internal use)."""
         flow_run = FlowRunModel(
+            id=uuid.uuid4(),
             user_id=user_id,
             flow_name=flow_name,
             inputs=inputs,
+            flow_metadata=flow_metadata,
             status="running" if execution_mode == "sync" else "pending",
             execution_mode=execution_mode,
             started_at=datetime.now(UTC) if execution_mode == "sync" else None,
             arq_task_id=arq_task_id,
         )
 
-        created_run = self.flow_run_repo.create(flow_run)
-        assert created_run.id is not None
+        async with self.writer.use():
+            self.flow_run_repo.add(flow_run)
+        self.writer.mark_dirty()
 
-        # Commit immediately so the flow run is visible in admin dashboard
-        self._commit_changes()
+        # Commit immediately so the flow run is visible to workers and the admin dashboard
+        await self.writer.flush()
 
-        return created_run.id
+        return flow_run.id
+
+    async def set_arq_task_id(self, flow_run_id: uuid.UUID, arq_task_id: str) -> None:
+        """Persist the queue task ID on a flow run (internal use)."""
+        async with self.writer.use():
+            flow_run = await self.flow_run_repo.by_id(flow_run_id)
+            if flow_run is None:
+                return
+            flow_run.arq_task_id = arq_task_id
+        self.writer.mark_dirty()
+        await self.writer.flush()
 
     async def create_step_run_record(self, flow_run_id: uuid.UUID, step_name: str, step_order: int, inputs: dict[str, Any], retry_attempt: int = 0, retry_of_step_run_id: uuid.UUID | None = None) -> uuid.UUID:
         """Create a new step run record (internal use)."""
         step_run = FlowStepRunModel(
+            id=uuid.uuid4(),
             flow_run_id=flow_run_id,
             step_name=step_name,
             step_order=step_order,
@@ -144,32 +168,71 @@ class FlowEngineService:
             status="running",
             retry_attempt=retry_attempt,
             retry_of_step_run_id=retry_of_step_run_id,
+            # Stamped now rather than by the server, since the insert may be batched with the step's completion
+            created_at=datetime.now(UTC),
         )
 
-        created_step = self.step_run_repo.create(step_run)
-        assert created_step.id is not None
+        async with self.writer.use():
+            self.step_run_repo.add(step_run)
+        self.writer.mark_dirty()
+
+        return step_run.id
+
+    async def load_step_checkpoints(self, flow_run_id: uuid.UUID, flow_name: str) -> dict[CheckpointKey, StepCheckpoint]:
+        """Completed step outputs of an earlier run of ``flow_name``, for resuming it (internal use)."""
+        async with self.writer.use():
+            flow_run = await self.flow_run_repo.by_id(flow_run_id)
+            if flow_run is None:
+                logger.warning(f"Cannot resume from flow run {flow_run_id}: not found; running all steps")
+                return {}
+            if flow_run.flow_name != flow_name:
+                logger.warning(f"Cannot resume {flow_name} from flow run {flow_run_id} of {flow_run.flow_name}; running all steps")
+                return {}
+            return index_checkpoints(flow_name, await self.step_run_repo.by_flow_run_id(flow_run_id))
+
+    async def record_resumed_step_run(self, flow_run_id: uuid.UUID, step_name: str, step_order: int, inputs: dict[str, Any], checkpoint: StepCheckpoint) -> uuid.UUID:
+        """Record a step satisfied from a checkpoint as completed, at no token cost (internal use)."""
+        now = datetime.now(UTC)
+        step_run = FlowStepRunModel(
+            id=uuid.uuid4(),
+            flow_run_id=flow_run_id,
+            step_name=step_name,
+            step_order=step_order,
+            inputs=inputs,
+            outputs=checkpoint.outputs,
+            status="completed",
+            tokens_used=0,
+            cost_estimate=0.0,
+            execution_time_ms=0,
+            # No llm_request_id: the call belongs to the original run (and would skew model latency stats)
+            step_metadata={"resumed_from_step_run_id": str(checkpoint.step_run_id), "llm_request_id": str(checkpoint.llm_request_id) if checkpoint.llm_request_id else None},
+            created_at=now,
+            completed_at=now,
+        )
 
-        # Commit immediately so the step is visible in admin dashboard
-        self._commit_changes()
+        async with self.writer.use():
+            self.step_run_repo.add(step_run)
+        self.writer.mark_dirty()
 
-        return created_step.id
+        return step_run.id
 
     async def mark_step_run_retry(self, step_run_id: uuid.UUID, error_message: str) -> None:
         """Mark step run as retrying after a failure (internal use)."""
-        step_run = self.step_run_repo.by_id(step_run_id)
-        if step_run:
+        async with self.writer.use():
+            step_run = await self.step_run_repo.by_id(step_run_id)
+            if step_run is None:
+                return
             step_run.error_message = error_message
             step_run.status = "retrying"
             step_run.completed_at = datetime.now(UTC)
-            self.step_run_repo.save(step_run)
-
-            # Commit immediately so retry status is visible
-            self._commit_changes()
+        self.writer.mark_dirty()
 
     async def update_step_run_success(self, step_run_id: uuid.UUID, outputs: dict[str, Any], tokens_used: int, cost_estimate: float, execution_time_ms: int, llm_request_id: uuid.UUID | None = None) -> None:
         """Update step run with success data (internal use)."""
-        step_run = self.step_run_repo.by_id(step_run_id)
-        if step_run:
+        async with self.writer.use():
+            step_run = await self.step_run_repo.by_id(step_run_id)
+            if step_run is None:
+                return
             step_run.outputs = outputs
             step_run.tokens_used = tokens_used
             step_run.cost_estimate = cost_estimate
@@ -177,28 +240,26 @@ class FlowEngineService:
             step_run.llm_request_id = llm_request_id
             step_run.status = "completed"
             step_run.completed_at = datetime.now(UTC)
-            self.step_run_repo.save(step_run)
-
-            # Commit immediately so step completion is visible in admin dashboard
-            self._commit_changes()
+        self.writer.mark_dirty()
 
     async def update_step_run_error(self, step_run_id: uuid.UUID, error_message: str, execution_time_ms: int) -> None:
         """Update step run with error data (internal use)."""
-        step_run = self.step_run_repo.by_id(step_run_id)
-        if step_run:
+        async with self.writer.use():
+            step_run = await self.step_run_repo.by_id(step_run_id)
+            if step_run is None:
+                return
             step_run.error_message = error_message
             step_run.execution_time_ms = execution_time_ms
             step_run.status = "failed"
             step_run.completed_at = datetime.now(UTC)
-            self.step_run_repo.save(step_run)
-
-            # Commit immediately so step failure is visible in admin dashboard
-            self._commit_changes()
+        self.writer.mark_dirty()
 
     async def update_flow_progress(self, flow_run_id: uuid.UUID, current_step: str, step_progress: int, progress_percentage: float | None = None) -> None:
-        """Update flow run progress (internal use)."""
-        flow_run = self.flow_run_repo.by_id(flow_run_id)
-        if flow_run:
+        """Update flow run progress (internal use); rapid updates coalesce into the next batched commit."""
+        async with self.writer.use():
+            flow_run = await self.flow_run_repo.by_id(flow_run_id)
+            if flow_run is None:
+                return
             flow_run.current_step = current_step
             flow_run.step_progress = step_progress
             flow_run.last_heartbeat = datetime.now(UTC)
@@ -207,44 +268,61 @@ class FlowEngineService:
                 flow_run.progress_percentage = progress_percentage
             elif flow_run.total_steps and flow_run.total_steps > 0:
                 flow_run.progress_percentage = min(100.0, (step_progress / flow_run.total_steps) * 100)
-
-            self.flow_run_repo.save(flow_run)
-
-            # Commit immediately so progress updates are visible in admin dashboard
-            self._commit_changes()
+        self.writer.mark_dirty()
+
+    async def plan_flow_steps(self, flow_run_id: uuid.UUID, total_steps: int) -> None:
+        """Raise the flow run's expected step count so progress percentages are meaningful (internal use)."""
+        async with self.writer.use():
+            flow_run = await self.flow_run_repo.by_id(flow_run_id)
+            if flow_run is None or (flow_run.total_steps or 0) >= total_steps:
+                return
+            flow_run.total_steps = total_steps
+        self.writer.mark_dirty()
+
+    async def record_step_graph(self, flow_run_id: uuid.UUID, graph_name: str, summary: dict[str, Any]) -> None:
+        """Store a step graph's timings and critical path under flow_metadata["step_graphs"] (internal use)."""
+        async with self.writer.use():
+            flow_run = await self.flow_run_repo.by_id(flow_run_id)
+            if flow_run is None:
+                return
+            # Reassign rather than mutate so SQLAlchemy detects the JSON change
+            metadata = dict(flow_run.flow_metadata or {})
+            metadata["step_graphs"] = {**(metadata.get("step_graphs") or {}), graph_name: summary}
+            flow_run.flow_metadata = metadata
+        self.writer.mark_dirty()
 
     async def complete_flow_run(self, flow_run_id: uuid.UUID, outputs: dict[str, Any]) -> None:
         """Complete a flow run (internal use)."""
-        flow_run = self.flow_run_repo.by_id(flow_run_id)
-        if flow_run:
+        async with self.writer.use():
+            flow_run = await self.flow_run_repo.by_id(flow_run_id)
+            if flow_run is None:
+                return
             flow_run.outputs = outputs
             flow_run.status = "completed"
             flow_run.completed_at = datetime.now(UTC)
             flow_run.progress_percentage = 100.0
 
             # Calculate total metrics from steps
-            steps = self.step_run_repo.by_flow_run_id(flow_run_id)
-            total_tokens = sum(step.tokens_used or 0 for step in steps)
-            total_cost = sum(step.cost_estimate or 0.0 for step in steps)
-
-            flow_run.total_tokens = total_tokens
-            flow_run.total_cost = total_cost
+            steps = await self.step_run_repo.by_flow_run_id(flow_run_id)
+            flow_run.total_tokens = sum(step.tokens_used or 0 for step in steps)
+            flow_run.total_cost = sum(step.cost_estimate or 0.0 for step in steps)
 
             # Calculate execution time
             if flow_run.started_at is not None and flow_run.completed_at is not None:
                 started_at = cast(datetime, flow_run.started_at)
                 completed_at = cast(datetime, flow_run.completed_at)
                 flow_run.execution_time_ms = int((completed_at - started_at).total_seconds() * 1000)
+        self.writer.mark_dirty()
 
-            self.flow_run_repo.save(flow_run)
-
-            # Commit immediately so completion is visible in admin dashboard
-            self._commit_changes()
+        # Commit immediately so completion is visible in admin dashboard
+        await self.writer.flush()
 
     async def fail_flow_run(self, flow_run_id: uuid.UUID, error_message: str) -> None:
         """Mark a flow run as failed (internal use)."""
-        flow_run = self.flow_run_repo.by_id(flow_run_id)
-        if flow_run:
+        async with self.writer.use():
+            flow_run = await self.flow_run_repo.by_id(flow_run_id)
+            if flow_run is None:
+                return
             flow_run.error_message = error_message
             flow_run.status = "failed"
             flow_run.completed_at = datetime.now(UTC)
@@ -254,16 +332,20 @@ class FlowEngineService:
                 started_at = cast(datetime, flow_run.started_at)
                 completed_at = cast(datetime, flow_run.completed_at)
                 flow_run.execution_time_ms = int((completed_at - started_at).total_seconds() * 1000)
+        self.writer.mark_dirty()
 
-            self.flow_run_repo.save(flow_run)
-
-            # Commit immediately so failure is visible in admin dashboard
-            self._commit_changes()
+        # Commit immediately so failure is visible in admin dashboard
+        await self.writer.flush()
 
     def get_llm_services(self) -> LLMServicesProvider:
         """Get LLM services provider (internal use)."""
         return self.llm_services
 
+    async def recent_model_outcomes(self, limit: int = 2000) -> list[tuple[str, str, int | None, str, float | None]]:
+        """Recent per-step model outcomes used to seed model routing (internal use)."""
+        async with self.writer.use():
+            return await self.step_run_repo.recent_model_outcomes(limit)
+
 
 class FlowRunQueryService:
     """
@@ -271,11 +353,66 @@ class FlowRunQueryService:
 
     NOTE: This service is specifically designed for admin module use only.
     It provides read-only access to flow execution data for monitoring and analytics.
+
+    Payloads moved to the archive are fetched back only when a single run or
+    step is opened; step lists of a run show the archive pointer and summary.
     """
 
-    def __init__(self, flow_run_repo: FlowRunRepo, step_run_repo: FlowStepRunRepo) -> None:
+    def __init__(self, flow_run_repo: FlowRunRepo, step_run_repo: FlowStepRunRepo, archive: PayloadArchive | None = None) -> None:
         self.flow_run_repo = flow_run_repo
         self.step_run_repo = step_run_repo
+        self.archive = archive
+
+    def _payloads(self, row: FlowRunModel | FlowStepRunModel, *, fetch_archived: bool) -> tuple[dict[str, Any], dict[str, Any] | None]:
+        """A row's inputs and outputs, read back from the archive when requested (without touching the row)."""
+        if not fetch_archived or not is_archived(row.inputs):
+            return row.inputs or {}, row.outputs
+        try:
+            payloads = load_archived_payloads(row.inputs, self.archive)
+        except Exception as e:
+            # Show the pointer and summary rather than failing the whole page
+            logger.warning(f"Could not load archived payloads of {row.id}: {e}")
+            return row.inputs, row.outputs
+        return payloads.get("inputs") or {}, payloads.get("outputs")
+
+    def _step_dto(self, step: FlowStepRunModel, *, fetch_archived: bool = False) -> FlowStepDetailsDTO:
+        inputs, outputs = self._payloads(step, fetch_archived=fetch_archived)
+        return FlowStepDetailsDTO(
+            id=str(step.id),
+            flow_run_id=str(step.flow_run_id),
+            llm_request_id=str(step.llm_request_id) if step.llm_request_id else None,
+            step_name=step.step_name,
+            step_order=step.step_order,
+            status=step.status,
+            inputs=inputs,
+            outputs=outputs,
+            tokens_used=step.tokens_used or 0,
+            cost_estimate=step.cost_estimate or 0.0,
+            execution_time_ms=step.execution_time_ms,
+            error_message=step.error_message,
+            step_metadata=step.step_metadata,
+            created_at=step.created_at,
+            completed_at=step.completed_at,
+        )
+
+    @staticmethod
+    def _summary_dto(run: FlowRunModel, step_count: int) -> FlowRunSummaryDTO:
+        return FlowRunSummaryDTO(
+            id=str(run.id),
+            flow_name=run.flow_name,
+            status=run.status,
+            execution_mode=run.execution_mode,
+            arq_task_id=run.arq_task_id,
+            user_id=run.user_id,
+            created_at=run.created_at,
+            started_at=run.started_at,
+            completed_at=run.completed_at,
+            execution_time_ms=run.execution_time_ms,
+            total_tokens=run.total_tokens or 0,
+            total_cost=run.total_cost or 0.0,
+            step_count=step_count,
+            error_message=run.error_message,
+        )
 
     def get_flow_run_by_id(self, flow_run_id: uuid.UUID) -> FlowRunDetailsDTO | None:
         """Get flow run by ID. FOR ADMIN USE ONLY."""
@@ -285,29 +422,11 @@ class FlowRunQueryService:
 
         # Collect steps to compute totals and include details
         steps = self.step_run_repo.by_flow_run_id(flow_run.id)
-        step_dtos = [
-            FlowStepDetailsDTO(
-                id=str(step.id),
-                flow_run_id=str(step.flow_run_id),
-                llm_request_id=str(step.llm_request_id) if step.llm_request_id else None,
-                step_name=step.step_name,
-                step_order=step.step_order,
-                status=step.status,
-                inputs=step.inputs or {},
-                outputs=step.outputs,
-                tokens_used=step.tokens_used or 0,
-                cost_estimate=step.cost_estimate or 0.0,
-                execution_time_ms=step.execution_time_ms,
-                error_message=step.error_message,
-                step_metadata=step.step_metadata,
-                created_at=step.created_at,
-                completed_at=step.completed_at,
-            )
-            for step in steps
-        ]
+        step_dtos = [self._step_dto(step) for step in steps]
 
         total_tokens = sum(step.tokens_used or 0 for step in steps)
         total_cost = sum(step.cost_estimate or 0.0 for step in steps)
+        inputs, outputs = self._payloads(flow_run, fetch_archived=True)
 
         return FlowRunDetailsDTO(
             id=str(flow_run.id),
@@ -327,8 +446,8 @@ class FlowRunQueryService:
             execution_time_ms=flow_run.execution_time_ms,
             total_tokens=total_tokens,
             total_cost=total_cost,
-            inputs=flow_run.inputs or {},
-            outputs=flow_run.outputs,
+            inputs=inputs,
+            outputs=outputs,
             flow_metadata=flow_run.flow_metadata,
             error_message=flow_run.error_message,
             steps=step_dtos,
@@ -336,74 +455,20 @@ class FlowRunQueryService:
 
     def get_flow_steps_by_run_id(self, flow_run_id: uuid.UUID) -> list[FlowStepDetailsDTO]:
         """Get all steps for a flow run. FOR ADMIN USE ONLY."""
-        steps = self.step_run_repo.by_flow_run_id(flow_run_id)
-        return [
-            FlowStepDetailsDTO(
-                id=str(step.id),
-                flow_run_id=str(step.flow_run_id),
-                llm_request_id=str(step.llm_request_id) if step.llm_request_id else None,
-                step_name=step.step_name,
-                step_order=step.step_order,
-                status=step.status,
-                inputs=step.inputs or {},
-                outputs=step.outputs,
-                tokens_used=step.tokens_used or 0,
-                cost_estimate=step.cost_estimate or 0.0,
-                execution_time_ms=step.execution_time_ms,
-                error_message=step.error_message,
-                step_metadata=step.step_metadata,
-                created_at=step.created_at,
-                completed_at=step.completed_at,
-            )
-            for step in steps
-        ]
+        return [self._step_dto(step) for step in self.step_run_repo.by_flow_run_id(flow_run_id)]
 
     def get_flow_step_by_id(self, step_run_id: uuid.UUID) -> FlowStepDetailsDTO | None:
         """Get flow step by ID. FOR ADMIN USE ONLY."""
         step = self.step_run_repo.by_id(step_run_id)
         if not step:
             return None
-
-        return FlowStepDetailsDTO(
-            id=str(step.id),
-            flow_run_id=str(step.flow_run_id),
-            llm_request_id=str(step.llm_request_id) if step.llm_request_id else None,
-            step_name=step.step_name,
-            step_order=step.step_order,
-            status=step.status,
-            inputs=step.inputs or {},
-            outputs=step.outputs,
-            tokens_used=step.tokens_used or 0,
-            cost_estimate=step.cost_estimate or 0.0,
-            execution_time_ms=step.execution_time_ms,
-            error_message=step.error_message,
-            step_metadata=step.step_metadata,
-            created_at=step.created_at,
-            completed_at=step.completed_at,
-        )
+        return self._step_dto(step, fetch_archived=True)
 
     def get_recent_flow_runs(self, limit: int = 50, offset: int = 0) -> list[FlowRunSummaryDTO]:
         """Get recent flow runs with pagination. FOR ADMIN USE ONLY."""
         flow_runs = self.flow_run_repo.get_recent(limit, offset)
-        return [
-            FlowRunSummaryDTO(
-                id=str(run.id),
-                flow_name=run.flow_name,
-                status=run.status,
-                execution_mode=run.execution_mode,
-                arq_task_id=run.arq_task_id,
-                user_id=run.user_id,
-                created_at=run.created_at,
-                started_at=run.started_at,
-                completed_at=run.completed_at,
-                execution_time_ms=run.execution_time_ms,
-                total_tokens=run.total_tokens or 0,
-                total_cost=run.total_cost or 0.0,
-                step_count=len(self.step_run_repo.by_flow_run_id(run.id)),
-                error_message=run.error_message,
-            )
-            for run in flow_runs
-        ]
+        step_counts = self.step_run_repo.count_by_flow_runs(run.id for run in flow_runs)
+        return [self._summary_dto(run, step_counts.get(run.id, 0)) for run in flow_runs]
 
     def count_flow_runs(self) -> int:
         """Get total count of flow runs. FOR ADMIN USE ONLY."""
@@ -425,25 +490,5 @@ class FlowRunQueryService:
             limit=limit,
             offset=offset,
         )
-        result: list[FlowRunSummaryDTO] = []
-        for run in runs:
-            step_count = len(self.step_run_repo.by_flow_run_id(run.id))
-            result.append(
-                FlowRunSummaryDTO(
-                    id=str(run.id),
-                    flow_name=run.flow_name,
-                    status=run.status,
-                    execution_mode=run.execution_mode,
-                    arq_task_id=run.arq_task_id,
-                    user_id=run.user_id,
-                    created_at=run.created_at,
-                    started_at=run.started_at,
-                    completed_at=run.completed_at,
-                    execution_time_ms=run.execution_time_ms,
-                    total_tokens=run.total_tokens or 0,
-                    total_cost=run.total_cost or 0.0,
-                    step_count=step_count,
-                    error_message=run.error_message,
-                )
-            )
-        return result
+        step_counts = self.step_run_repo.count_by_flow_runs(run.id for run in runs)
+        return [self._summary_dto(run, step_counts.get(run.id, 0)) for run in runs]
@@ -1,5 +1,8 @@
 """Unit tests for flow_engine module."""
 
+import asyncio
+import base64
+from datetime import UTC, datetime, timedelta
 from typing import Any
 from unittest.mock import AsyncMock, MagicMock, patch
 import uuid
@@ -7,11 +10,20 @@ import uuid
 from pydantic import BaseModel, Field
 import pytest
 
+from modules.llm_services.public import AudioResponse
+
+from .archive import ARCHIVED_KEY, SUMMARY_KEY, LocalPayloadArchive, archive_flow_payloads
+from .artifacts import ARTIFACT_KEY, LocalSpoolArtifactStore, open_artifact, set_artifact_store
 from .base_flow import BaseFlow
-from .base_step import StepResult, StepType, StructuredStep, UnstructuredStep
+from .base_step import AudioStep, StepResult, StepType, StructuredStep, UnstructuredStep
+from .bookkeeping import FlowRunWriter
+from .checkpoints import index_checkpoints, step_input_hash
+from .context import FlowContext
+from .graph import StepGraph, StepGraphError, output_of
 from .models import FlowRunModel, FlowStepRunModel
-from .repo import FlowRunRepo, FlowStepRunRepo
-from .service import FlowEngineService
+from .repo import AsyncFlowRunRepo, AsyncFlowStepRunRepo, FlowRunRepo, FlowStepRunRepo
+from .routing import ModelRouter, RoutePolicy
+from .service import FlowEngineService, FlowRunQueryService
 
 
 class TestModels:
@@ -94,6 +106,63 @@ class TestService:
         assert service.step_run_repo == mock_step_repo
         assert service.llm_services == mock_llm_services
 
+    @pytest.mark.asyncio
+    async def test_step_and_progress_writes_are_committed_in_one_batch(self) -> None:
+        """Step start, step finish and rapid progress updates share a commit; run creation and completion commit at once."""
+        rows: dict[uuid.UUID, Any] = {}
+        session = MagicMock()
+        session.add.side_effect = lambda row: rows.setdefault(row.id, row)
+        session.get = AsyncMock(side_effect=lambda _model, row_id: rows.get(row_id))
+        session.execute = AsyncMock(side_effect=lambda _stmt: MagicMock(scalars=lambda: [row for row in rows.values() if isinstance(row, FlowStepRunModel)]))
+        session.commit = AsyncMock()
+        service = FlowEngineService(AsyncFlowRunRepo(session), AsyncFlowStepRunRepo(session), MagicMock(), writer=FlowRunWriter(session, flush_interval=60))
+
+        flow_run_id = await service.create_flow_run_record("lesson", {"topic": "t"})
+        assert session.commit.await_count == 1
+
+        for step_progress in range(1, 4):
+            step_run_id = await service.create_step_run_record(flow_run_id, f"step_{step_progress}", step_progress, {"n": step_progress})
+            await service.update_step_run_success(step_run_id, {"content": "ok"}, tokens_used=10, cost_estimate=0.01, execution_time_ms=5)
+            await service.update_flow_progress(flow_run_id, f"step_{step_progress}", step_progress)
+        assert session.commit.await_count == 1
+
+        await service.complete_flow_run(flow_run_id, {"done": True})
+        await service.close()
+
+        assert session.commit.await_count == 2
+        assert rows[flow_run_id].status == "completed"
+        assert rows[flow_run_id].step_progress == 3
+        assert rows[flow_run_id].total_tokens == 30
+
+    @pytest.mark.asyncio
+    async def test_failed_deferred_commit_restages_rows_and_is_raised_by_close(self) -> None:
+        """A failed background commit is rolled back, its rows are staged again and close() raises the error."""
+        flow_run = FlowRunModel(id=uuid.uuid4(), flow_name="lesson", inputs={}, status="running")
+        step_run = FlowStepRunModel(id=uuid.uuid4(), flow_run_id=flow_run.id, step_name="s", step_order=1, inputs={}, status="running")
+        flow_run.status = "completed"
+        session = MagicMock(new={step_run}, dirty={flow_run})
+        session.commit = AsyncMock(side_effect=[ConnectionError("db went away"), None])
+
+        async def rollback() -> None:
+            # Like AsyncSession.rollback: new rows are expunged, changes to loaded rows are lost
+            session.new, session.dirty = set(), set()
+            flow_run.status = "running"
+
+        session.rollback = AsyncMock(side_effect=rollback)
+        writer = FlowRunWriter(session, flush_interval=0)
+
+        writer.mark_dirty()
+        with pytest.raises(ConnectionError):
+            await writer.close()
+
+        session.add.assert_called_once_with(step_run)
+        assert flow_run.status == "completed"
+        assert writer.commits == 0
+
+        await writer.flush()
+        assert session.commit.await_count == 2
+        assert writer.commits == 1
+
 
 class TestSteps:
     """Test step base classes."""
@@ -150,6 +219,237 @@ class TestSteps:
         assert step.inputs_model == TestStep.Inputs
         assert step.outputs_model == TestStep.Outputs
 
+    def test_prefix_prompt_is_sent_first_and_marked_for_caching(self) -> None:
+        """A prefix_prompt_file renders into its own leading message with a cache breakpoint."""
+
+        class TestStep(UnstructuredStep):
+            step_name = "test_prefixed"
+            prompt_file = "task.md"
+            prefix_prompt_file = "context.md"
+
+            class Inputs(BaseModel):
+                material: str
+                topic: str
+
+        templates = {"context.md": "Material: {{material}}", "task.md": "Write about {{topic}}."}
+        step = TestStep()
+        with patch.object(TestStep, "_load_prompt", side_effect=lambda filename, _context: templates[filename]):
+            messages = step._build_prompt_messages({"material": "shared notes", "topic": "lesson 2"}, MagicMock())
+
+        assert [message.content for message in messages] == ["Material: shared notes", "Write about lesson 2."]
+        assert [message.cache_breakpoint for message in messages] == [True, False]
+
+    @pytest.mark.asyncio
+    async def test_audio_step_outputs_artifact_handle_instead_of_base64(self, tmp_path: Any) -> None:
+        """Synthesized audio is spooled once and referenced by a handle the consumer opens lazily."""
+
+        class TestAudioStep(AudioStep):
+            step_name = "test_audio"
+
+            class Inputs(BaseModel):
+                text: str
+                voice: str
+
+        audio = b"ID3" + bytes(range(256)) * 8
+        response = AudioResponse(audio_base64=base64.b64encode(audio).decode(), mime_type="audio/mpeg", voice="alloy", model="tts-1", cost_estimate=0.01, duration_seconds=2.5)
+        context = MagicMock()
+        context.service.get_llm_services.return_value.generate_audio = AsyncMock(return_value=(response, uuid.uuid4()))
+
+        set_artifact_store(LocalSpoolArtifactStore(tmp_path))
+        try:
+            step = TestAudioStep()
+            outputs, _request_id = await step._execute_step_logic(TestAudioStep.Inputs(text="Hello there", voice="alloy"), context)
+            again, _request_id = await step._execute_step_logic(TestAudioStep.Inputs(text="Hello there", voice="alloy"), context)
+
+            assert "audio_base64" not in outputs
+            assert outputs["voice"] == "alloy"
+            assert outputs["duration_seconds"] == 2.5
+            assert outputs[ARTIFACT_KEY]["size_bytes"] == len(audio)
+            assert again[ARTIFACT_KEY] == outputs[ARTIFACT_KEY]
+            assert len(list(tmp_path.iterdir())) == 1
+            assert await open_artifact(outputs[ARTIFACT_KEY]) == audio
+        finally:
+            set_artifact_store(None)
+
+    def test_model_router_picks_fastest_healthy_affordable_model(self) -> None:
+        """The router prefers the lowest-latency model that is healthy and within the cost ceiling."""
+        router = ModelRouter({"extract": RoutePolicy(models=("slow", "fast", "flaky", "pricey"), max_cost_usd=0.05, min_samples=3, explore_every=0)})
+        for _ in range(5):
+            router.observe("extract", "slow", 8.0, ok=True, cost=0.01)
+            router.observe("extract", "fast", 2.0, ok=True, cost=0.02)
+            router.observe("extract", "flaky", 0.5, ok=False)
+            router.observe("extract", "pricey", 0.5, ok=True, cost=0.50)
+        router.observe("extract", "flaky", 0.5, ok=True, cost=0.01)
+
+        policy = router.policy_for("extract", "slow")
+        assert policy is not None
+        decision = router.choose("extract", policy)
+
+        assert decision.model == "fast"
+        assert "fastest healthy" in decision.reason
+        candidates = {candidate["model"]: candidate for candidate in decision.candidates}
+        assert candidates["flaky"]["healthy"] is False
+        assert candidates["pricey"]["affordable"] is False
+        assert router.table()["steps"]["extract"]["last_decision"]["model"] == "fast"
+        # Steps without a route keep their fixed model
+        assert router.policy_for("other", "slow") is None
+
+    @pytest.mark.asyncio
+    async def test_routed_step_seeds_router_from_recorded_outcomes(self) -> None:
+        """The first routed step of a process awaits the recorded step outcomes and feeds them to the router."""
+
+        class RoutedStep(UnstructuredStep):
+            step_name = "routed"
+            prompt_file = "routed.md"
+            model = "primary"
+            route_models = ("alternate",)
+
+            class Inputs(BaseModel):
+                text: str
+
+            async def _execute_step_logic(self, inputs: BaseModel, context: FlowContext) -> tuple[Any, uuid.UUID | None]:  # noqa: ARG002
+                return {"content": "ok"}, None
+
+        router = ModelRouter({"routed": RoutePolicy(models=("primary", "alternate"))})
+        service = MagicMock()
+        service.recent_model_outcomes = AsyncMock(return_value=[("routed", "alternate", 900, "completed", 0.01)] * 4 + [("routed", "primary", None, "failed", None)])
+        service.create_step_run_record = AsyncMock(return_value=uuid.uuid4())
+        service.update_step_run_success = AsyncMock()
+        service.update_flow_progress = AsyncMock()
+        FlowContext.set(service=service, flow_run_id=uuid.uuid4(), flow_name="routing_flow")
+        try:
+            with patch("modules.flow_engine.base_step.get_model_router", return_value=router):
+                await RoutedStep().execute({"text": "abc"})
+                await RoutedStep().execute({"text": "abd"})
+        finally:
+            FlowContext.clear()
+
+        service.recent_model_outcomes.assert_awaited_once()
+        table = router.table()
+        assert table["seeded"] is True
+        samples = {entry["model"]: entry["samples"] for entry in table["steps"]["routed"]["models"]}
+        assert samples == {"primary": 1, "alternate": 4}
+
+    @pytest.mark.asyncio
+    async def test_step_graph_runs_independent_steps_concurrently(self) -> None:
+        """Independent nodes overlap within the flow's concurrency limit; dependents get their outputs."""
+        running = 0
+        peak = 0
+
+        class FakeStep:
+            def __init__(self, step_name: str, delay: float) -> None:
+                self.step_name = step_name
+                self.delay = delay
+                self.received: dict[str, Any] = {}
+
+            async def execute(self, inputs: dict[str, Any]) -> StepResult:
+                nonlocal running, peak
+                self.received = inputs
+                running += 1
+                peak = max(peak, running)
+                await asyncio.sleep(self.delay)
+                running -= 1
+                return StepResult(step_name=self.step_name, output_content=f"{self.step_name} out", metadata={})
+
+        service = MagicMock()
+        service.plan_flow_steps = AsyncMock()
+        service.record_step_graph = AsyncMock()
+        context = FlowContext.set(service=service, flow_run_id=uuid.uuid4(), max_step_concurrency=2)
+        try:
+            quiz = FakeStep("quiz", 0.01)
+            graph = StepGraph("lesson")
+            graph.add("transcript", FakeStep("transcript", 0.05), {"topic": "t"})
+            graph.add("glossary", FakeStep("glossary", 0.01), {"topic": "t"})
+            graph.add("extra", FakeStep("extra", 0.01), {"topic": "t"})
+            graph.add("quiz", quiz, {"transcript": output_of("transcript", str.upper), "glossary": output_of("glossary")})
+            results = await graph.run()
+        finally:
+            FlowContext.clear()
+
+        assert peak == 2
+        assert quiz.received == {"transcript": "TRANSCRIPT OUT", "glossary": "glossary out"}
+        assert list(results) == ["transcript", "glossary", "extra", "quiz"]
+        service.plan_flow_steps.assert_awaited_once_with(context.flow_run_id, 4)
+        _flow_run_id, graph_name, summary = service.record_step_graph.await_args.args
+        assert graph_name == "lesson"
+        assert summary["critical_path"] == ["transcript", "quiz"]
+        assert summary["wall_ms"] < summary["step_total_ms"]
+
+        cyclic = StepGraph().add("a", FakeStep("a", 0), {"x": output_of("b")}).add("b", FakeStep("b", 0), after=["a"])
+        with pytest.raises(StepGraphError, match="cycle"):
+            await cyclic.run()
+
+    @pytest.mark.asyncio
+    async def test_resumed_flow_reuses_checkpoint_for_unchanged_inputs(self) -> None:
+        """A step whose inputs match a completed step run of the failed flow run is not re-executed."""
+
+        class SummarizeStep(UnstructuredStep):
+            step_name = "summarize"
+            prompt_file = "summarize.md"
+
+            class Inputs(BaseModel):
+                text: str
+
+        previous_run = FlowStepRunModel(id=uuid.uuid4(), flow_run_id=uuid.uuid4(), step_name="summarize", step_order=1, inputs={"text": "abc"}, outputs={"content": "cached summary"}, status="completed")
+        service = MagicMock()
+        service.record_resumed_step_run = AsyncMock(return_value=uuid.uuid4())
+        service.update_flow_progress = AsyncMock()
+        service.llm_services.generate_response = AsyncMock()
+        FlowContext.set(service=service, flow_run_id=uuid.uuid4(), flow_name="summary_flow", checkpoints=index_checkpoints("summary_flow", [previous_run]))
+        try:
+            result = await SummarizeStep().execute({"text": "abc"})
+        finally:
+            FlowContext.clear()
+
+        assert result.output_content == "cached summary"
+        assert result.metadata["resumed_from_step_run_id"] == str(previous_run.id)
+        assert result.metadata["tokens_used"] == 0
+        service.llm_services.generate_response.assert_not_called()
+        assert service.record_resumed_step_run.await_args.kwargs["checkpoint"].step_run_id == previous_run.id
+        # Changed inputs hash to a different key, so the step runs normally
+        assert ("summary_flow", "summarize", step_input_hash({"text": "abd"})) not in index_checkpoints("summary_flow", [previous_run])
+
+    def test_old_payloads_are_archived_and_fetched_back_lazily(self, tmp_path: Any) -> None:
+        """Archived rows keep a pointer with short scalars; opening a single run or step reads the payload back."""
+        now = datetime(2026, 3, 1, tzinfo=UTC)
+        created = now - timedelta(days=45)
+        run_inputs = {"unit_id": "unit-1", "source_material": "x" * 5000}
+        run = FlowRunModel(id=uuid.uuid4(), flow_name="unit_creation", status="completed", inputs=run_inputs, outputs={"lessons": ["l" * 3000]}, created_at=created)
+        step = FlowStepRunModel(id=uuid.uuid4(), flow_run_id=run.id, step_name="outline", step_order=1, status="completed", inputs={"text": "y" * 4000}, outputs=None, created_at=created)
+        tiny = FlowStepRunModel(id=uuid.uuid4(), flow_run_id=run.id, step_name="title", step_order=2, status="completed", inputs={"text": "short"}, outputs={"content": "ok"}, created_at=created)
+        archive = LocalPayloadArchive(tmp_path)
+        session = MagicMock()
+        session.info = {}
+
+        with patch.object(FlowRunRepo, "archivable", side_effect=[[run]]) as runs, patch.object(FlowStepRunRepo, "archivable", side_effect=[[step, tiny]]):
+            report = archive_flow_payloads(session, batch_size=5, archive=archive, now=now)
+
+        assert runs.call_args.args == (now - timedelta(days=30), 5)
+        assert (report.flow_runs, report.step_runs) == (1, 1)
+        assert report.stored_bytes < report.archived_bytes
+        assert session.commit.call_count == 2
+        assert run.payload_archived_at == now and tiny.payload_archived_at == now
+        # Short scalars stay queryable next to the pointer; the large values are gone from the row
+        assert run.inputs["unit_id"] == "unit-1" and "source_material" not in run.inputs
+        assert run.inputs[SUMMARY_KEY]["keys"] == ["source_material", "unit_id"]
+        assert run.outputs[ARCHIVED_KEY]["key"] == f"flow-archive/flow_runs/2026/01/{run.id}.json.gz"
+        assert step.outputs is None and tiny.inputs == {"text": "short"}
+
+        flow_run_repo, step_run_repo = MagicMock(), MagicMock()
+        flow_run_repo.by_id.return_value = run
+        step_run_repo.by_id.return_value = step
+        step_run_repo.by_flow_run_id.return_value = [step, tiny]
+        query = FlowRunQueryService(flow_run_repo, step_run_repo, archive=archive)
+
+        details = query.get_flow_run_by_id(run.id)
+        assert details is not None
+        assert details.inputs == run_inputs and details.outputs == {"lessons": ["l" * 3000]}
+        # Step lists show the pointer; the payload is read when the step itself is opened
+        assert ARCHIVED_KEY in details.steps[0].inputs
+        step_details = query.get_flow_step_by_id(step.id)
+        assert step_details is not None and step_details.inputs == {"text": "y" * 4000}
+        assert ARCHIVED_KEY in step.inputs
+
 
 class TestFlows:
     """Test flow base classes."""
@@ -195,9 +495,9 @@ class TestFlows:
             mock_infra = MagicMock()
             mock_db_session = MagicMock()
             mock_context_manager = MagicMock()
-            mock_context_manager.__enter__ = MagicMock(return_value=mock_db_session)
-            mock_context_manager.__exit__ = MagicMock(return_value=False)
-            mock_infra.get_session_context.return_value = mock_context_manager
+            mock_context_manager.__aenter__ = AsyncMock(return_value=mock_db_session)
+            mock_context_manager.__aexit__ = AsyncMock(return_value=False)
+            mock_infra.get_async_session_context.return_value = mock_context_manager
             mock_infra_provider.return_value = mock_infra
 
             mock_llm = MagicMock()
@@ -213,10 +513,7 @@ class TestFlows:
             mock_service = MagicMock()
             mock_flow_run_id = uuid.uuid4()
             mock_service.create_flow_run_record = AsyncMock(return_value=mock_flow_run_id)
-            mock_flow_repo = MagicMock()
-            mock_flow_run = MagicMock()
-            mock_flow_repo.by_id.return_value = mock_flow_run
-            mock_service.flow_run_repo = mock_flow_repo
+            mock_service.set_arq_task_id = AsyncMock()
 
             with patch("modules.flow_engine.base_flow.FlowEngineService", return_value=mock_service):
                 # Execute ARQ flow
@@ -242,9 +539,7 @@ class TestFlows:
                 assert task_call_args[1]["inputs"] == {"data": "test input"}
 
                 # Verify arq_task_id persisted on flow run
-                mock_flow_repo.by_id.assert_called_once_with(mock_flow_run_id)
-                assert mock_flow_run.arq_task_id == mock_task_result.task_id
-                mock_flow_repo.save.assert_called_once_with(mock_flow_run)
+                mock_service.set_arq_task_id.assert_awaited_once_with(mock_flow_run_id, mock_task_result.task_id)
 
     @pytest.mark.asyncio
     async def test_execute_arq_with_input_validation(self) -> None:
@@ -271,9 +566,9 @@ class TestFlows:
             mock_infra = MagicMock()
             mock_db_session = MagicMock()
             mock_context_manager = MagicMock()
-            mock_context_manager.__enter__ = MagicMock(return_value=mock_db_session)
-            mock_context_manager.__exit__ = MagicMock(return_value=False)
-            mock_infra.get_session_context.return_value = mock_context_manager
+            mock_context_manager.__aenter__ = AsyncMock(return_value=mock_db_session)
+            mock_context_manager.__aexit__ = AsyncMock(return_value=False)
+            mock_infra.get_async_session_context.return_value = mock_context_manager
             mock_infra_provider.return_value = mock_infra
 
             mock_llm_provider.return_value = MagicMock()
@@ -286,10 +581,7 @@ class TestFlows:
 
             mock_service = MagicMock()
             mock_service.create_flow_run_record = AsyncMock(return_value=uuid.uuid4())
-            mock_flow_repo = MagicMock()
-            mock_flow_run = MagicMock()
-            mock_flow_repo.by_id.return_value = mock_flow_run
-            mock_service.flow_run_repo = mock_flow_repo
+            mock_service.set_arq_task_id = AsyncMock()
 
             with patch("modules.flow_engine.base_flow.FlowEngineService", return_value=mock_service):
                 # Execute with valid inputs
@@ -302,4 +594,4 @@ class TestFlows:
                 # Should have default value filled in
                 assert submitted_inputs["required_field"] == "test"
                 assert submitted_inputs["optional_field"] == 42
-                mock_flow_repo.save.assert_called_once_with(mock_flow_run)
+                mock_service.set_arq_task_id.assert_awaited_once()
@@ -0,0 +1,204 @@
+"""
+Named, separately sized thread pools for blocking work.
+
+Blocking SDK calls used to go through ``asyncio.to_thread`` or
+``run_in_executor(None, ...)`` and therefore shared the loop's default pool
+(``min(32, cpu + 4)`` threads) with everything else, so a burst of S3 uploads
+could starve Bedrock calls and vice versa. Each kind of blocking work now has
+its own pool:
+
+- ``llm_sdk``: synchronous LLM provider SDK calls (Bedrock ``invoke_model``)
+- ``object_store``: boto3 S3 calls
+- ``cpu``: CPU-bound parsing (PDF/DOCX/PPTX text extraction, audio stitching)
+
+Pool sizes come from ``ExecutorConfig`` (``EXECUTOR_LLM_SDK_WORKERS``,
+``EXECUTOR_OBJECT_STORE_WORKERS``, ``EXECUTOR_CPU_WORKERS``). Every pool
+reports its queue depth, in-flight count and queue wait times through
+``executor_metrics()`` (queue waits also feed ``/metrics``); pools are shut
+down by ``shutdown_executors()`` from the application and worker shutdown
+hooks.
+"""
+
+import asyncio
+from collections import deque
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+import contextvars
+import functools
+import logging
+import threading
+import time
+from typing import Any, ParamSpec, TypeVar
+
+from .metrics import get_metrics_registry
+from .models import ExecutorConfig
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "CPU_EXECUTOR",
+    "LLM_SDK_EXECUTOR",
+    "OBJECT_STORE_EXECUTOR",
+    "BoundedExecutor",
+    "configure_executors",
+    "executor_metrics",
+    "get_executor",
+    "shutdown_executors",
+]
+
+LLM_SDK_EXECUTOR = "llm_sdk"
+OBJECT_STORE_EXECUTOR = "object_store"
+CPU_EXECUTOR = "cpu"
+
+# Queue waits kept per pool for the wait-time quantiles
+_WAIT_WINDOW = 500
+
+P = ParamSpec("P")
+T = TypeVar("T")
+
+_QUEUE_WAIT = get_metrics_registry().histogram("executor_queue_wait_seconds", "Time blocking work waited for a thread, by pool", ("executor",))
+
+
+class BoundedExecutor:
+    """A named thread pool that tracks how long work waits for a free thread."""
+
+    def __init__(self, name: str, max_workers: int) -> None:
+        self.name = name
+        self.max_workers = max_workers
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-executor")
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._completed = 0
+        self._failed = 0
+        self._max_queued = 0
+        self._waits: deque[float] = deque(maxlen=_WAIT_WINDOW)
+        self._total_wait = 0.0
+
+    async def run(self, func: Callable[P, T], *args: P.args, **kwargs: P.kwargs) -> T:
+        """Run ``func(*args, **kwargs)`` on this pool and await its result, preserving context variables."""
+        submitted = time.perf_counter()
+        with self._lock:
+            self._queued += 1
+            self._max_queued = max(self._max_queued, self._queued)
+        call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+        # Whether a thread picked the call up, or the caller gave up on it first
+        state = {"started": False, "abandoned": False}
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._pool, self._tracked, call, submitted, state)
+        except BaseException:
+            with self._lock:
+                if not state["started"]:
+                    # Cancelled (or rejected by a shut-down pool) while still queued
+                    state["abandoned"] = True
+                    self._queued -= 1
+            raise
+
+    def _tracked(self, call: Callable[[], T], submitted: float, state: dict[str, bool]) -> T:
+        waited = time.perf_counter() - submitted
+        with self._lock:
+            state["started"] = True
+            if not state["abandoned"]:
+                self._queued -= 1
+            self._running += 1
+            self._waits.append(waited)
+            self._total_wait += waited
+        _QUEUE_WAIT.observe(waited, self.name)
+        ok = False
+        try:
+            result = call()
+            ok = True
+            return result
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+                if not ok:
+                    self._failed += 1
+
+    def metrics(self) -> dict[str, Any]:
+        """Queue depth, in-flight work and queue wait times of this pool."""
+        with self._lock:
+            waits = sorted(self._waits)
+            started = self._completed + self._running
+            return {
+                "max_workers": self.max_workers,
+                "queue_depth": self._queued,
+                "max_queue_depth": self._max_queued,
+                "in_flight": self._running,
+                "completed": self._completed,
+                "failed": self._failed,
+                "wait_seconds_mean": self._total_wait / started if started else 0.0,
+                "wait_seconds_p50": _quantile(waits, 0.5),
+                "wait_seconds_p95": _quantile(waits, 0.95),
+                "wait_seconds_max": waits[-1] if waits else 0.0,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting work; already submitted calls still run to completion."""
+        self._pool.shutdown(wait=wait)
+
+
+def _quantile(ordered: list[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+_CONFIG = ExecutorConfig()
+_EXECUTORS: dict[str, BoundedExecutor] = {}
+_EXECUTORS_LOCK = threading.Lock()
+
+
+def configure_executors(config: ExecutorConfig) -> None:
+    """Set pool sizes; pools already created with other sizes are replaced once their work drains."""
+    global _CONFIG  # noqa: PLW0603
+    _CONFIG = config
+    with _EXECUTORS_LOCK:
+        stale = [executor for name, executor in _EXECUTORS.items() if executor.max_workers != _workers_for(name)]
+        for executor in stale:
+            del _EXECUTORS[executor.name]
+    for executor in stale:
+        executor.shutdown(wait=False)
+
+
+def _workers_for(name: str) -> int:
+    sizes = {
+        LLM_SDK_EXECUTOR: _CONFIG.llm_sdk_workers,
+        OBJECT_STORE_EXECUTOR: _CONFIG.object_store_workers,
+        CPU_EXECUTOR: _CONFIG.cpu_workers,
+    }
+    if name not in sizes:
+        raise ValueError(f"Unknown executor: {name}")
+    return max(1, sizes[name])
+
+
+def get_executor(name: str) -> BoundedExecutor:
+    """Return the named pool, creating it on first use."""
+    executor = _EXECUTORS.get(name)
+    if executor is None:
+        with _EXECUTORS_LOCK:
+            executor = _EXECUTORS.get(name)
+            if executor is None:
+                executor = _EXECUTORS[name] = BoundedExecutor(name, _workers_for(name))
+    return executor
+
+
+def executor_metrics() -> dict[str, dict[str, Any]]:
+    """Metrics for every pool created so far."""
+    return {name: executor.metrics() for name, executor in sorted(_EXECUTORS.items())}
+
+
+get_metrics_registry().gauge_callback("executor_queue_depth", "Blocking calls waiting for a thread, by pool", ("executor",), lambda: [((name,), executor._queued) for name, executor in list(_EXECUTORS.items())])
+get_metrics_registry().gauge_callback("executor_in_flight", "Blocking calls running on a thread, by pool", ("executor",), lambda: [((name,), executor._running) for name, executor in list(_EXECUTORS.items())])
+
+
+def shutdown_executors(wait: bool = True) -> None:
+    """Shut down all pools; later calls to ``get_executor`` start fresh ones."""
+    with _EXECUTORS_LOCK:
+        executors = list(_EXECUTORS.values())
+        _EXECUTORS.clear()
+    for executor in executors:
+        executor.shutdown(wait=wait)
+    if executors:
+        logger.info(f"Shut down {len(executors)} blocking-work executors")
@@ -0,0 +1,274 @@
+"""
+In-process metrics exposed in the Prometheus text format.
+
+Step timings used to live only in ``flow_step_runs`` rows and log lines, so a
+p95 per step or model meant ad-hoc SQL over a growing table. Hot paths now
+record into process-wide counters and fixed-bucket histograms:
+
+- ``flow_step_*``: step duration, tokens and cost (``BaseStep.execute``)
+- ``llm_request_*`` / ``llm_*_total``: provider latency, tokens and cost by
+  provider and model (``LLMProvider``)
+- ``db_commit_duration_seconds``: commit time of session contexts and batched writers
+- ``task_queue_*``: ARQ queue wait and handler duration (``TaskQueueService``)
+- ``llm_priority_queue_wait_seconds``: wait for a model's concurrency window
+- ``executor_*``: blocking-work pool queue wait, depth and in-flight calls
+
+Recording is a dict lookup, a bisect over the bucket bounds and a few
+increments under an uncontended lock, a few microseconds per call against
+calls that take milliseconds to minutes. Quantiles are left to the scraper (``histogram_quantile``).
+
+The API serves ``render_metrics()`` at ``/metrics``; ARQ workers have no HTTP
+server, so they start ``start_metrics_server()`` on ``WORKER_METRICS_PORT``.
+"""
+
+import asyncio
+from bisect import bisect_left
+from collections.abc import Callable, Iterable, Sequence
+import contextlib
+import logging
+import math
+import threading
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "CONTENT_TYPE_LATEST",
+    "COST_BUCKETS",
+    "LATENCY_BUCKETS",
+    "TOKEN_BUCKETS",
+    "Counter",
+    "Histogram",
+    "MetricsRegistry",
+    "get_metrics_registry",
+    "render_metrics",
+    "start_metrics_server",
+]
+
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds, from fast DB commits to multi-minute LLM steps
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+TOKEN_BUCKETS = (100, 500, 1_000, 2_500, 5_000, 10_000, 25_000, 50_000, 100_000, 250_000)
+COST_BUCKETS = (0.0001, 0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values, strict=True)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value) and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Sequence[Any]) -> tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {len(labels)} values")
+        return tuple("" if value is None else str(value) for value in labels)
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}", *self.samples()]
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    """Monotonic total per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, *labels: Any) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, *labels: Any) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+
+
+class _HistogramSeries:
+    __slots__ = ("count", "counts", "sum")
+
+    def __init__(self, size: int) -> None:
+        self.counts = [0] * size
+        self.count = 0
+        self.sum = 0.0
+
+
+class Histogram(_Metric):
+    """Fixed-bucket histogram per label set; buckets are upper bounds, ``+Inf`` is implied."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(float(bound) for bound in buckets if not math.isinf(bound)))
+        self._series: dict[tuple[str, ...], _HistogramSeries] = {}
+
+    def observe(self, value: float, *labels: Any) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = _HistogramSeries(len(self.buckets) + 1)
+            series.counts[index] += 1
+            series.count += 1
+            series.sum += value
+
+    def snapshot(self, *labels: Any) -> dict[str, Any]:
+        """Count, sum and cumulative bucket counts for one label set (zeros when never observed)."""
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            counts = list(series.counts) if series else [0] * (len(self.buckets) + 1)
+            total, count = (series.sum, series.count) if series else (0.0, 0)
+        cumulative, running = [], 0
+        for bucket_count in counts:
+            running += bucket_count
+            cumulative.append(running)
+        return {"count": count, "sum": total, "buckets": dict(zip((*self.buckets, math.inf), cumulative, strict=True))}
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            items = sorted((key, list(series.counts), series.count, series.sum) for key, series in self._series.items())
+        for key, counts, count, total in items:
+            running = 0
+            for bound, bucket_count in zip((*self.buckets, math.inf), counts, strict=True):
+                running += bucket_count
+                le = 'le="' + _format_value(bound) + '"'
+                yield f"{self.name}_bucket{_format_labels(self.labelnames, key, le)} {running}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {count}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(total)}"
+
+
+class _CallbackGauge(_Metric):
+    """Gauge whose samples are read from a callback at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str], read: Callable[[], Iterable[tuple[Sequence[Any], float]]]) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._read = read
+
+    def samples(self) -> Iterable[str]:
+        try:
+            readings = list(self._read())
+        except Exception as e:  # pragma: no cover - a broken gauge must not break the scrape
+            logger.debug(f"Gauge {self.name} failed: {e}")
+            return
+        for labels, value in readings:
+            yield f"{self.name}{_format_labels(self.labelnames, self._key(labels))} {_format_value(value)}"
+
+
+class MetricsRegistry:
+    """Named metrics of this process; registering an existing name returns the existing metric."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> Any:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric {metric.name} is already registered with a different type or labels")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge_callback(self, name: str, documentation: str, labelnames: Sequence[str], read: Callable[[], Iterable[tuple[Sequence[Any], float]]]) -> None:
+        """Expose values computed at scrape time, e.g. current queue depths."""
+        self._register(_CallbackGauge(name, documentation, labelnames, read))
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+        with self._lock:
+            metrics = sorted(self._metrics.values(), key=lambda metric: metric.name)
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+_REGISTRY = MetricsRegistry()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Return the process-wide registry."""
+    return _REGISTRY
+
+
+def render_metrics() -> str:
+    """Prometheus text for every metric recorded in this process."""
+    return _REGISTRY.render()
+
+
+async def _handle_scrape(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        request_line = await asyncio.wait_for(reader.readline(), timeout=5)
+        # Drain headers; the request has no body
+        while (await asyncio.wait_for(reader.readline(), timeout=5)) not in (b"\r\n", b"\n", b""):
+            pass
+        parts = request_line.decode("latin-1").split()
+        if len(parts) >= 2 and parts[0] == "GET" and parts[1].split("?")[0] == "/metrics":
+            status, content_type, body = "200 OK", CONTENT_TYPE_LATEST, render_metrics().encode()
+        else:
+            status, content_type, body = "404 Not Found", "text/plain; charset=utf-8", b"not found\n"
+        writer.write(f"HTTP/1.1 {status}\r\nContent-Type: {content_type}\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode() + body)
+        await writer.drain()
+    except (TimeoutError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+        with contextlib.suppress(Exception):
+            await writer.wait_closed()
+
+
+async def start_metrics_server(port: int, host: str = "0.0.0.0") -> asyncio.Server | None:  # noqa: S104
+    """Serve ``GET /metrics`` on ``host:port`` for processes without an HTTP app; returns None when the port is taken."""
+    try:
+        server = await asyncio.start_server(_handle_scrape, host, port)
+    except OSError as e:
+        logger.warning(f"⚠️ Metrics endpoint not started on {host}:{port}: {e}")
+        return None
+    logger.info(f"📈 Metrics endpoint listening on {host}:{port}/metrics")
+    return server
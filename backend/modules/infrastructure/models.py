@@ -5,7 +5,8 @@ No ORM models needed; infrastructure provides shared utilities and session manag
 Configuration DTOs for various infrastructure services.
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+import os
 
 
 @dataclass
@@ -21,3 +22,12 @@ class RedisConfig:
     socket_timeout: float = 5.0
     connection_timeout: float = 5.0
     health_check_interval: int = 30
+
+
+@dataclass
+class ExecutorConfig:
+    """Thread pool sizes for blocking work, one pool per kind of work."""
+
+    llm_sdk_workers: int = 16
+    object_store_workers: int = 8
+    cpu_workers: int = field(default_factory=lambda: min(4, os.cpu_count() or 1))
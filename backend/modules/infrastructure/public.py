@@ -14,7 +14,9 @@ try:
 except ImportError:
     REDIS_AVAILABLE = False
 
-from .models import RedisConfig
+from .executors import CPU_EXECUTOR, LLM_SDK_EXECUTOR, OBJECT_STORE_EXECUTOR, BoundedExecutor, executor_metrics, get_executor, shutdown_executors
+from .metrics import CONTENT_TYPE_LATEST, COST_BUCKETS, LATENCY_BUCKETS, TOKEN_BUCKETS, Counter, Histogram, MetricsRegistry, get_metrics_registry, render_metrics, start_metrics_server
+from .models import ExecutorConfig, RedisConfig
 from .service import (
     APIConfig,
     AppConfig,
@@ -108,15 +110,33 @@ def infrastructure_provider() -> InfrastructureProvider:
 
 # Export the DTOs and provider for external use
 __all__ = [
+    "CONTENT_TYPE_LATEST",
+    "COST_BUCKETS",
+    "CPU_EXECUTOR",
+    "LATENCY_BUCKETS",
+    "LLM_SDK_EXECUTOR",
+    "OBJECT_STORE_EXECUTOR",
+    "TOKEN_BUCKETS",
     "APIConfig",
     "AppConfig",
     "AsyncDatabaseSessionContext",
+    "BoundedExecutor",
+    "Counter",
     "DatabaseConfig",
     "DatabaseSession",
     "DatabaseSessionContext",
     "EnvironmentStatus",
+    "ExecutorConfig",
+    "Histogram",
     "InfrastructureProvider",
     "LoggingConfig",
+    "MetricsRegistry",
     "RedisConfig",
+    "executor_metrics",
+    "get_executor",
+    "get_metrics_registry",
     "infrastructure_provider",
+    "render_metrics",
+    "shutdown_executors",
+    "start_metrics_server",
 ]
@@ -8,10 +8,11 @@ and environment validation. Returns DTOs for external consumption.
 from dataclasses import dataclass
 import os
 from pathlib import Path
+import time
 from types import TracebackType
 from typing import Any, Optional, cast
 
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, event, text
 from sqlalchemy.engine import Engine
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import (
@@ -36,7 +37,28 @@ try:
 except ImportError:
     DOTENV_AVAILABLE = False
 
-from .models import RedisConfig
+from .executors import configure_executors, shutdown_executors
+from .metrics import get_metrics_registry
+from .models import ExecutorConfig, RedisConfig
+
+_COMMIT_DURATION = get_metrics_registry().histogram(
+    "db_commit_duration_seconds",
+    "Session commit time including the final flush, by session scope (set via session.info['commit_scope'])",
+    ("scope",),
+)
+
+
+# Every commit (sync or async sessions, which run on a sync Session) is timed from these hooks
+@event.listens_for(Session, "before_commit")
+def _commit_started(session: Session) -> None:
+    session.info["_commit_started"] = time.perf_counter()
+
+
+@event.listens_for(Session, "after_commit")
+def _commit_finished(session: Session) -> None:
+    started = session.info.pop("_commit_started", None)
+    if started is not None:
+        _COMMIT_DURATION.observe(time.perf_counter() - started, session.info.get("commit_scope", "default"))
 
 
 # DTOs for external consumption
@@ -146,6 +168,7 @@ class InfrastructureService:
         self.redis_config = RedisConfig()
         self.api_config = APIConfig()
         self.logging_config = LoggingConfig()
+        self.executor_config = ExecutorConfig()
         self.values: dict[str, Any] = {}
         self._initialized = False
 
@@ -163,6 +186,7 @@ class InfrastructureService:
             return  # Already initialized, skip redundant initialization
 
         self._load_configuration(env_file)
+        configure_executors(self.executor_config)
         self._setup_database_connection()
         self._setup_redis_connection()
         self._initialized = True
@@ -239,6 +263,11 @@ class InfrastructureService:
         self.values["debug"] = os.getenv("DEBUG", "false").lower() == "true"
         self.values["feature_flag_new_ui"] = os.getenv("FEATURE_FLAG_NEW_UI", "false").lower() == "true"
 
+        # Blocking-work thread pools
+        self.values["executor_llm_sdk_workers"] = int(os.getenv("EXECUTOR_LLM_SDK_WORKERS", "16"))
+        self.values["executor_object_store_workers"] = int(os.getenv("EXECUTOR_OBJECT_STORE_WORKERS", "8"))
+        self.values["executor_cpu_workers"] = int(os.getenv("EXECUTOR_CPU_WORKERS", str(min(4, os.cpu_count() or 1))))
+
     def _populate_config_objects(self) -> None:
         """Populate typed configuration objects from loaded values."""
         # Database config
@@ -275,6 +304,13 @@ class InfrastructureService:
             file=self.values.get("log_file"),
         )
 
+        # Executor config
+        self.executor_config = ExecutorConfig(
+            llm_sdk_workers=self.values.get("executor_llm_sdk_workers", 16),
+            object_store_workers=self.values.get("executor_object_store_workers", 8),
+            cpu_workers=self.values.get("executor_cpu_workers", ExecutorConfig().cpu_workers),
+        )
+
     def _setup_database_connection(self) -> None:
         """Set up database connection and session factory."""
         database_url = self.get_database_url()
@@ -672,6 +708,8 @@ class InfrastructureService:
             await self.redis_connection.aclose()
             self.redis_connection = None
 
+        shutdown_executors()
+
         self._initialized = False
 
 
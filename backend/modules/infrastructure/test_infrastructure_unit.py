@@ -5,12 +5,17 @@ These tests focus on infrastructure services and utilities in isolation.
 They use mocks and don't require external dependencies.
 """
 
+import asyncio
 import os
+import threading
 from unittest.mock import patch
 
 import pytest
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from modules.infrastructure.executors import OBJECT_STORE_EXECUTOR, BoundedExecutor, executor_metrics, get_executor
+from modules.infrastructure.metrics import get_metrics_registry, start_metrics_server
 from modules.infrastructure.service import InfrastructureService
 
 
@@ -47,6 +52,35 @@ class TestInfrastructureService:
         with pytest.raises(RuntimeError, match="Infrastructure service not initialized"):
             self.service.get_config()
 
+    @patch.dict(os.environ, {"DATABASE_URL": "sqlite:///:memory:", "EXECUTOR_OBJECT_STORE_WORKERS": "3"})
+    @pytest.mark.asyncio
+    async def test_executors_are_sized_from_config_and_report_queue_metrics(self) -> None:
+        """Blocking work runs on named pools sized from settings, which expose queue depth and wait times."""
+        self.service.initialize()
+        assert get_executor(OBJECT_STORE_EXECUTOR).max_workers == 3
+
+        executor = BoundedExecutor("test", max_workers=1)
+        release = threading.Event()
+        try:
+            first = asyncio.ensure_future(executor.run(release.wait, 5))
+            second = asyncio.ensure_future(executor.run(lambda: "done"))
+            await asyncio.sleep(0.05)
+
+            metrics = executor.metrics()
+            assert metrics["in_flight"] == 1
+            assert metrics["queue_depth"] == 1
+
+            release.set()
+            assert await second == "done"
+            await first
+            metrics = executor.metrics()
+            assert metrics["queue_depth"] == 0
+            assert metrics["completed"] == 2
+            assert metrics["wait_seconds_max"] > 0
+        finally:
+            executor.shutdown()
+        assert OBJECT_STORE_EXECUTOR in executor_metrics()
+
     @patch.dict(os.environ, {"DATABASE_URL": "sqlite:///:memory:"})
     def test_database_session_lifecycle(self) -> None:
         """Test database session creation and cleanup."""
@@ -71,6 +105,36 @@ class TestInfrastructureService:
             assert session is not None
             # Session should be automatically cleaned up
 
+    @patch.dict(os.environ, {"DATABASE_URL": "sqlite:///:memory:"})
+    @pytest.mark.asyncio
+    async def test_commits_are_timed_and_served_as_prometheus_text(self) -> None:
+        """Session commits feed db_commit_duration_seconds, which the worker metrics endpoint serves as Prometheus text."""
+        self.service.initialize()
+        commits = get_metrics_registry().histogram("db_commit_duration_seconds", "Session commit time", ("scope",))
+        before = commits.snapshot("unit_test")["count"]
+
+        with self.service.get_session_context() as session:
+            session.info["commit_scope"] = "unit_test"
+            session.execute(text("SELECT 1"))
+        assert commits.snapshot("unit_test")["count"] == before + 1
+
+        server = await start_metrics_server(0, host="127.0.0.1")
+        assert server is not None
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.sockets[0].getsockname()[1])
+            writer.write(b"GET /metrics HTTP/1.1\r\nHost: localhost\r\n\r\n")
+            await writer.drain()
+            response = (await reader.read()).decode()
+            writer.close()
+        finally:
+            server.close()
+            await server.wait_closed()
+
+        assert response.startswith("HTTP/1.1 200 OK")
+        assert "# TYPE db_commit_duration_seconds histogram" in response
+        assert f'db_commit_duration_seconds_count{{scope="unit_test"}} {before + 1}' in response
+        assert 'db_commit_duration_seconds_bucket{scope="unit_test",le="+Inf"}' in response
+
     @patch.dict(os.environ, {"DATABASE_URL": "sqlite:///:memory:"})
     @pytest.mark.asyncio
     async def test_async_session_context_manager(self) -> None:
@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from collections.abc import Sequence
+from collections.abc import AsyncIterator, Sequence
 from datetime import UTC, datetime
 from typing import TYPE_CHECKING, Any
 import uuid
@@ -16,6 +16,7 @@ from modules.conversation_engine.public import (
     conversation_session,
 )
 from modules.infrastructure.public import infrastructure_provider
+from modules.llm_services.public import get_prompt_registry
 
 from ..dtos import (
     UNSET,
@@ -142,6 +143,7 @@ class LearningCoachConversation(BaseConversation):
     conversation_type = "learning_coach"
     system_prompt_file = "../prompts/system_prompt.md"
     finalization_prompt_file = "../prompts/finalization_extraction.md"
+    response_models = (CoachResponse, FinalizationExtraction)
 
     @conversation_session
     async def add_resource(
@@ -213,6 +215,21 @@ class LearningCoachConversation(BaseConversation):
         await self._generate_structured_reply()
         return await self._build_session_state()
 
+    @conversation_session
+    async def stream_learner_turn(
+        self,
+        *,
+        _conversation_id: str | None = None,
+        _user_id: int | None = None,
+        message: str,
+    ) -> AsyncIterator[str | LearningCoachSessionState]:
+        """Record a learner response, streaming the coach reply text before yielding the refreshed state."""
+
+        await self.record_user_message(message)
+        async for delta in self._stream_structured_reply():
+            yield delta
+        yield await self._build_session_state()
+
     @conversation_session
     async def accept_brief(
         self,
@@ -330,12 +347,7 @@ class LearningCoachConversation(BaseConversation):
     async def _generate_structured_reply(self) -> None:
         """Generate a structured coach response and persist it."""
 
-        resources = await self._load_conversation_resources()
-        from ..service import build_resource_context_prompt
-
-        base_prompt = self.get_system_prompt()
-        resource_context = build_resource_context_prompt(resources)
-        system_prompt = self._merge_system_prompt(base_prompt, resource_context)
+        system_prompt = await self._build_coach_system_prompt()
 
         # Step 1: Generate conversational response with ready_to_finalize flag
         coach_response, request_id, raw_response = await self.generate_structured_reply(
@@ -343,6 +355,43 @@ class LearningCoachConversation(BaseConversation):
             model="gemini-2.5-flash",
             system_prompt=system_prompt,
         )
+        await self._apply_coach_response(coach_response, request_id, raw_response, system_prompt=system_prompt)
+
+    async def _stream_structured_reply(self) -> AsyncIterator[str]:
+        """Stream the coach's reply text as it is generated, then persist it like ``_generate_structured_reply``."""
+
+        system_prompt = await self._build_coach_system_prompt()
+
+        async for stream_event in self.stream_structured_reply(
+            CoachResponse,
+            text_field="text",
+            model="gemini-2.5-flash",
+            system_prompt=system_prompt,
+        ):
+            if stream_event.result is None:
+                yield stream_event.delta
+                continue
+            await self._apply_coach_response(stream_event.result, stream_event.request_id, stream_event.raw or {}, system_prompt=system_prompt)
+
+    async def _build_coach_system_prompt(self) -> str | None:
+        """Combine the base coach prompt with context from attached resources."""
+
+        resources = await self._load_conversation_resources()
+        from ..service import build_resource_context_prompt
+
+        base_prompt = self.get_system_prompt()
+        resource_context = build_resource_context_prompt(resources)
+        return self._merge_system_prompt(base_prompt, resource_context)
+
+    async def _apply_coach_response(
+        self,
+        coach_response: CoachResponse,
+        request_id: uuid.UUID | None,
+        raw_response: dict[str, Any],
+        *,
+        system_prompt: str | None,
+    ) -> None:
+        """Persist a coach reply and apply any finalization it signals."""
 
         # Record the assistant message
         message_metadata: dict[str, Any] = {
@@ -437,10 +486,10 @@ Learner Context:
         current_dir = Path(__file__).parent
         prompt_path = (current_dir / relative_path).resolve()
 
-        if not prompt_path.exists():
-            raise FileNotFoundError(f"Prompt file not found: {prompt_path}")
-
-        return prompt_path.read_text(encoding="utf-8")
+        try:
+            return get_prompt_registry().text(prompt_path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"Prompt file not found: {prompt_path}") from None
 
     async def _load_conversation_resources(self) -> list[ResourceRead]:
         """Return resources referenced by the current conversation metadata."""
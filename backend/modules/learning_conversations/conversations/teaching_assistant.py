@@ -2,11 +2,12 @@
 
 from __future__ import annotations
 
-from collections.abc import Sequence
+from collections.abc import AsyncIterator, Sequence
 from dataclasses import asdict
 from datetime import UTC, datetime
 import json
 from typing import Any
+import uuid
 
 from pydantic import BaseModel, Field, ValidationError
 
@@ -40,6 +41,7 @@ class TeachingAssistantConversation(BaseConversation):
 
     conversation_type = "teaching_assistant"
     system_prompt_file = "../prompts/teaching_assistant_system_prompt.md"
+    response_models = (TeachingAssistantResponse,)
 
     _DEFAULT_QUICK_REPLIES: Sequence[str] = (
         "Can I get a hint?",
@@ -85,6 +87,24 @@ class TeachingAssistantConversation(BaseConversation):
         await self._generate_assistant_reply(context, event="follow_up")
         return await self._build_session_state(context)
 
+    @conversation_session
+    async def stream_question(
+        self,
+        *,
+        _conversation_id: str,
+        message: str,
+        context: TeachingAssistantContext,
+        _user_id: int | None = None,
+    ) -> AsyncIterator[str | TeachingAssistantSessionState]:
+        """Record a learner question, streaming the reply text before yielding the updated session state."""
+
+        metadata = self._build_metadata(context.unit_id, context.lesson_id, context.session_id)
+        await self.update_conversation_metadata(metadata, merge=True)
+        await self.record_user_message(message)
+        async for delta in self._stream_assistant_reply(context, event="follow_up"):
+            yield delta
+        yield await self._build_session_state(context)
+
     @conversation_session
     async def get_session_state(
         self,
@@ -138,16 +158,56 @@ class TeachingAssistantConversation(BaseConversation):
         system_prompt = self._build_system_prompt(context, event=event)
 
         try:
-            assistant_response, request_id, raw_response = await self.generate_structured_reply(
+            reply = await self.generate_structured_reply(
                 TeachingAssistantResponse,
                 model="gemini-2.5-flash",
                 system_prompt=system_prompt,
             )
+        except ValidationError:
+            reply = None
+        await self._record_assistant_reply(reply, event=event)
+
+    async def _stream_assistant_reply(
+        self,
+        context: TeachingAssistantContext,
+        *,
+        event: str,
+    ) -> AsyncIterator[str]:
+        """Stream the assistant message text as it is generated, then persist the reply."""
+
+        system_prompt = self._build_system_prompt(context, event=event)
+
+        reply: tuple[TeachingAssistantResponse, uuid.UUID | None, dict[str, Any]] | None = None
+        try:
+            async for stream_event in self.stream_structured_reply(
+                TeachingAssistantResponse,
+                text_field="message",
+                model="gemini-2.5-flash",
+                system_prompt=system_prompt,
+            ):
+                if stream_event.result is None:
+                    yield stream_event.delta
+                else:
+                    reply = (stream_event.result, stream_event.request_id, stream_event.raw or {})
+        except ValidationError:
+            reply = None
+        await self._record_assistant_reply(reply, event=event)
+
+    async def _record_assistant_reply(
+        self,
+        reply: tuple[TeachingAssistantResponse, uuid.UUID | None, dict[str, Any]] | None,
+        *,
+        event: str,
+    ) -> None:
+        """Persist a generated reply, or the fallback message when generation failed validation."""
+
+        if reply is not None:
+            assistant_response, request_id, raw_response = reply
             quick_replies = self._normalize_quick_replies(assistant_response.suggested_quick_replies)
             provider = raw_response.get("provider", "openai")
             usage = raw_response.get("usage", {})
             cost_estimate = raw_response.get("cost_estimate")
-        except ValidationError:
+        else:
             quick_replies = self._build_default_quick_replies()
             provider = "fallback"
             request_id = None
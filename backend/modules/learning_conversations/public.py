@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from collections.abc import AsyncIterator
 from typing import Any, Protocol
 
 from modules.infrastructure.public import InfrastructureProvider, infrastructure_provider
@@ -36,6 +37,14 @@ class LearningConversationsProvider(Protocol):
         user_id: int | None = None,
     ) -> LearningCoachSessionState: ...
 
+    def stream_learner_turn(
+        self,
+        *,
+        conversation_id: str,
+        message: str,
+        user_id: int | None = None,
+    ) -> AsyncIterator[str | LearningCoachSessionState]: ...
+
     async def accept_brief(
         self,
         *,
@@ -88,6 +97,17 @@ class LearningConversationsProvider(Protocol):
         user_id: int | None = None,
     ) -> TeachingAssistantSessionState: ...
 
+    def stream_teaching_assistant_question(
+        self,
+        *,
+        conversation_id: str,
+        message: str,
+        unit_id: str,
+        lesson_id: str | None,
+        session_id: str | None,
+        user_id: int | None = None,
+    ) -> AsyncIterator[str | TeachingAssistantSessionState]: ...
+
     async def get_teaching_assistant_session_state(
         self,
         *,
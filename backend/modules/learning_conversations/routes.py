@@ -2,11 +2,15 @@
 
 from __future__ import annotations
 
+from collections.abc import AsyncIterator
 from datetime import datetime
+import json
+import logging
 from typing import Any
 import uuid
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from pydantic_core import PydanticUndefined
 
@@ -23,6 +27,8 @@ from .dtos import (
 )
 from .service import LearningCoachService
 
+logger = logging.getLogger(__name__)
+
 router = APIRouter(prefix="/api/v1/learning_conversations", tags=["learning_conversations"])
 
 
@@ -198,6 +204,25 @@ async def submit_learner_turn(
     return _serialize_state(state)
 
 
+@router.post("/coach/session/message/stream", response_class=StreamingResponse)
+async def stream_learner_turn(
+    request: LearnerTurnRequest,
+    service: LearningCoachService = Depends(get_learning_coach_service),
+) -> StreamingResponse:
+    """Append a learner message, streaming the coach reply as server-sent events.
+
+    Emits ``delta`` events with reply text as it is generated, then one ``state``
+    event carrying the updated conversation state (or an ``error`` event).
+    """
+
+    stream = service.stream_learner_turn(
+        conversation_id=request.conversation_id,
+        message=request.message,
+        user_id=request.user_id,
+    )
+    return _event_stream_response(stream, _serialize_state)
+
+
 @router.post("/coach/session/accept", response_model=LearningCoachSessionStateModel)
 async def accept_brief(
     request: AcceptBriefRequest,
@@ -299,6 +324,28 @@ async def submit_teaching_assistant_question(
     return _serialize_teaching_assistant_state(state)
 
 
+@router.post("/teaching_assistant/ask/stream", response_class=StreamingResponse)
+async def stream_teaching_assistant_question(
+    request: TeachingAssistantQuestionRequest,
+    service: LearningCoachService = Depends(get_learning_coach_service),
+) -> StreamingResponse:
+    """Submit a learner turn to the teaching assistant, streaming the reply as server-sent events.
+
+    Emits ``delta`` events with reply text as it is generated, then one ``state``
+    event carrying the updated session state (or an ``error`` event).
+    """
+
+    stream = service.stream_teaching_assistant_question(
+        conversation_id=request.conversation_id,
+        message=request.message,
+        unit_id=request.unit_id,
+        lesson_id=request.lesson_id,
+        session_id=request.session_id,
+        user_id=request.user_id,
+    )
+    return _event_stream_response(stream, _serialize_teaching_assistant_state)
+
+
 @router.get(
     "/teaching_assistant/{conversation_id}",
     response_model=TeachingAssistantSessionStateModel,
@@ -327,6 +374,31 @@ async def get_teaching_assistant_session_state(
     return _serialize_teaching_assistant_state(state)
 
 
+def _format_sse(event: str, data: str) -> str:
+    """Format one server-sent event."""
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+def _event_stream_response(stream: AsyncIterator[Any], serialize_state: Any) -> StreamingResponse:
+    """Relay text deltas and the final session state from a conversation stream as server-sent events."""
+
+    async def _events() -> AsyncIterator[str]:
+        try:
+            async for item in stream:
+                if isinstance(item, str):
+                    yield _format_sse("delta", json.dumps({"text": item}))
+                else:
+                    yield _format_sse("state", serialize_state(item).model_dump_json())
+        except LookupError as exc:
+            yield _format_sse("error", json.dumps({"status": status.HTTP_404_NOT_FOUND, "detail": str(exc)}))
+        except Exception:
+            # Headers are already sent, so failures are reported in-band
+            logger.exception("Streaming conversation turn failed")
+            yield _format_sse("error", json.dumps({"status": status.HTTP_500_INTERNAL_SERVER_ERROR, "detail": "Failed to generate a reply"}))
+
+    return StreamingResponse(_events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
+
 def _serialize_state(state: LearningCoachSessionState) -> LearningCoachSessionStateModel:
     """Convert an internal DTO into an API response model."""
     payload: dict[str, Any] = {
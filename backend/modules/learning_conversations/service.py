@@ -2,7 +2,7 @@
 
 from __future__ import annotations
 
-from collections.abc import Callable, Sequence
+from collections.abc import AsyncIterator, Callable, Sequence
 from dataclasses import asdict
 from typing import Any
 import uuid
@@ -74,6 +74,23 @@ class LearningCoachService:
             message=message,
         )
 
+    async def stream_learner_turn(
+        self,
+        *,
+        conversation_id: str,
+        message: str,
+        user_id: int | None = None,
+    ) -> AsyncIterator[str | LearningCoachSessionState]:
+        """Append a learner turn, yielding coach reply text as it streams and then the updated state."""
+
+        conversation = self._conversation_factory()
+        async for item in conversation.stream_learner_turn(
+            _conversation_id=conversation_id,
+            _user_id=user_id,
+            message=message,
+        ):
+            yield item
+
     async def accept_brief(
         self,
         *,
@@ -265,6 +282,34 @@ class LearningCoachService:
             _user_id=user_id,
         )
 
+    async def stream_teaching_assistant_question(
+        self,
+        *,
+        conversation_id: str,
+        message: str,
+        unit_id: str,
+        lesson_id: str | None,
+        session_id: str | None,
+        user_id: int | None = None,
+    ) -> AsyncIterator[str | TeachingAssistantSessionState]:
+        """Append a learner turn, yielding reply text as it streams and then the updated state."""
+
+        context = await self._build_teaching_assistant_context(
+            unit_id=unit_id,
+            lesson_id=lesson_id,
+            session_id=session_id,
+            user_id=user_id,
+        )
+
+        conversation = self._teaching_assistant_factory()
+        async for item in conversation.stream_question(
+            _conversation_id=conversation_id,
+            message=message,
+            context=context,
+            _user_id=user_id,
+        ):
+            yield item
+
     async def get_teaching_assistant_session_state(
         self,
         *,
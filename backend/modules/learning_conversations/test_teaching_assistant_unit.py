@@ -2,8 +2,10 @@
 
 from __future__ import annotations
 
+from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 from datetime import UTC, datetime
+import json
 from unittest.mock import AsyncMock, MagicMock, patch
 import uuid
 
@@ -14,6 +16,7 @@ from modules.learning_conversations.conversations.teaching_assistant import Teac
 from modules.learning_conversations.dtos import TeachingAssistantContext, TeachingAssistantSessionState
 from modules.learning_conversations.service import LearningCoachService
 from modules.learning_session.public import AssistantSessionContext, LearningSession
+from modules.llm_services.public import LLMResponse, LLMStreamChunk
 
 
 @pytest.mark.asyncio
@@ -226,6 +229,77 @@ async def test_submit_question_appends_user_message() -> None:
     mock_llm_services.generate_structured_response.assert_awaited_once()
 
 
+@pytest.mark.asyncio
+async def test_stream_question_streams_message_text_then_records_reply() -> None:
+    """Streaming a learner turn yields the reply text incrementally and persists the parsed reply."""
+
+    conversation = TeachingAssistantConversation()
+
+    mock_infra = MagicMock()
+    sync_ctx = MagicMock()
+    sync_ctx.__enter__.return_value = MagicMock()
+    sync_ctx.__exit__.return_value = False
+    mock_infra.get_session_context.return_value = sync_ctx
+
+    conversation_id = uuid.uuid4()
+    now = datetime.now(UTC)
+    summary = ConversationSummaryDTO(
+        id=str(conversation_id),
+        user_id=456,
+        conversation_type="teaching_assistant",
+        title=None,
+        status="active",
+        metadata={"unit_id": "unit-1"},
+        message_count=2,
+        created_at=now,
+        updated_at=now,
+        last_message_at=now,
+    )
+    service_instance = AsyncMock()
+    service_instance.get_message_history.return_value = []
+    service_instance.get_conversation_summary.return_value = summary
+    service_instance.update_conversation_metadata.return_value = summary
+
+    payload = json.dumps({"message": "Try the base case.", "suggested_quick_replies": ["Show me"]})
+    request_id = uuid.uuid4()
+
+    async def fake_stream(**_: object) -> AsyncIterator[LLMStreamChunk]:
+        for start in range(0, len(payload), 5):
+            yield LLMStreamChunk(delta=payload[start : start + 5])
+        response = LLMResponse(content=payload, provider="gemini", model="gemini-2.5-flash", tokens_used=40, cost_estimate=0.02)
+        yield LLMStreamChunk(response=response, request_id=request_id)
+
+    mock_llm_services = MagicMock()
+    mock_llm_services.stream_response = fake_stream
+    service_instance.llm_services = mock_llm_services
+
+    context = TeachingAssistantContext(unit_id="unit-1", lesson_id="lesson-1", session_id="session-1", session=None)
+
+    with (
+        patch("modules.conversation_engine.base_conversation.infrastructure_provider", return_value=mock_infra),
+        patch("modules.conversation_engine.base_conversation.llm_services_provider", return_value=mock_llm_services),
+        patch("modules.conversation_engine.base_conversation.ConversationEngineService", return_value=service_instance),
+    ):
+        items = [
+            item
+            async for item in conversation.stream_question(
+                _conversation_id=str(conversation_id),
+                message="I'm stuck.",
+                context=context,
+                _user_id=456,
+            )
+        ]
+
+    assert "".join(item for item in items if isinstance(item, str)) == "Try the base case."
+    assert isinstance(items[-1], TeachingAssistantSessionState)
+    service_instance.record_user_message.assert_awaited_once()
+    recorded = service_instance.record_assistant_message.await_args
+    assert recorded.args[1] == "Try the base case."
+    assert recorded.kwargs["llm_request_id"] == request_id
+    assert recorded.kwargs["tokens_used"] == 40
+    assert recorded.kwargs["metadata"]["suggested_quick_replies"][0] == "Show me"
+
+
 @pytest.mark.asyncio
 async def test_build_teaching_assistant_context_aggregates_sources() -> None:
     """Context builder should merge learning session, content, and resources."""
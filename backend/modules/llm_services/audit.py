@@ -0,0 +1,307 @@
+"""Write-behind persistence for ``llm_requests`` audit rows.
+
+Providers build each audit row in memory while a call runs and hand the
+finished row to an ``AuditRecorder`` instead of committing it on the request's
+synchronous session. The recorder keeps a bounded queue per event loop and a
+background task that inserts queued rows in batches (one ``executemany`` per
+batch) on the async engine, so the event loop never blocks on audit writes.
+
+Request ids are assigned in Python, so callers get them immediately. A row
+stays visible through ``pending_llm_request_row`` until the insert that writes
+it has committed, and is queued again if that insert fails. Rows no insert has
+touched yet can be amended in memory (``assign_pending_user``). When a session
+is about to flush an object whose ``llm_request_id`` points at a queued row,
+that row is inserted first in the same transaction, so foreign keys from
+conversation messages and flow step runs never dangle. Inserts skip rows that
+already exist, so a row written by both a flush and the background task is
+stored once.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Iterable
+import contextlib
+import importlib
+import logging
+import threading
+from typing import Any
+import uuid
+
+from sqlalchemy import event, insert, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..infrastructure.public import infrastructure_provider
+from .blobs import dehydrate_row, store_blobs, store_blobs_async
+from .config import LLMConfig
+from .models import LLMRequestModel
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "AuditRecorder",
+    "assign_pending_user",
+    "flush_audit_records",
+    "get_audit_recorder",
+    "llm_request_row",
+    "pending_llm_request_row",
+    "persist_pending_llm_request",
+]
+
+# Rows gathered into one batch; a batch is written once full or after the linger interval
+_BATCH_SIZE = 200
+_BATCH_LINGER_SECONDS = 0.25
+
+# Dialects with INSERT ... ON CONFLICT DO NOTHING
+_UPSERT_DIALECTS = {"postgresql", "sqlite"}
+
+# Queued rows by id, shared by every loop's recorder and the session flush hook;
+# a row leaves only once the background insert that wrote it has committed
+_PENDING: dict[uuid.UUID, dict[str, Any]] = {}
+# Queued rows that an insert (background batch or session flush) may already have written
+_UNSETTLED: set[uuid.UUID] = set()
+_PENDING_LOCK = threading.Lock()
+
+RowWriter = Callable[[list[dict[str, Any]]], Awaitable[None]]
+
+
+def llm_request_row(llm_request: LLMRequestModel) -> dict[str, Any]:
+    """Snapshot an unsaved ``LLMRequestModel`` as an insertable row, applying column defaults."""
+    row: dict[str, Any] = {}
+    for column in LLMRequestModel.__table__.columns:
+        value = getattr(llm_request, column.key)
+        if value is None and column.default is not None:
+            value = column.default.arg(None) if column.default.is_callable else column.default.arg  # type: ignore[attr-defined]
+        if value is None and column.server_default is not None:
+            continue
+        row[column.key] = value
+    return row
+
+
+def pending_llm_request_row(request_id: uuid.UUID) -> dict[str, Any] | None:
+    """Return a copy of a row that is still queued for insertion."""
+    with _PENDING_LOCK:
+        row = _PENDING.get(request_id)
+        return dict(row) if row is not None else None
+
+
+def assign_pending_user(request_id: uuid.UUID, user_id: int) -> bool:
+    """Set ``user_id`` on a queued row; returns False when the row is no longer queued or is being inserted."""
+    with _PENDING_LOCK:
+        row = _PENDING.get(request_id)
+        if row is None or request_id in _UNSETTLED:
+            return False
+        row["user_id"] = user_id
+        return True
+
+
+def _dehydrate_rows(rows: list[dict[str, Any]]) -> dict[str, str]:
+    """Move large strings in the rows' JSON columns to payload blobs; returns the blobs to store first."""
+    blobs: dict[str, str] = {}
+    for row in rows:
+        blobs.update(dehydrate_row(row))
+    return blobs
+
+
+def _claim_pending(request_ids: Iterable[uuid.UUID]) -> list[dict[str, Any]]:
+    """Copies of the rows still queued, for an insert; the rows stay queued until ``_settle_pending``."""
+    with _PENDING_LOCK:
+        rows = [dict(row) for row in (_PENDING.get(request_id) for request_id in request_ids) if row is not None]
+        _UNSETTLED.update(row["id"] for row in rows)
+    return rows
+
+
+def _settle_pending(rows: Iterable[dict[str, Any]]) -> None:
+    """Drop rows whose insert has committed from the queue."""
+    with _PENDING_LOCK:
+        for row in rows:
+            _PENDING.pop(row["id"], None)
+            _UNSETTLED.discard(row["id"])
+
+
+def _insert_statement(dialect_name: str) -> Any:
+    if dialect_name in _UPSERT_DIALECTS:
+        dialect = importlib.import_module(f"sqlalchemy.dialects.{dialect_name}")
+        return dialect.insert(LLMRequestModel.__table__).on_conflict_do_nothing(index_elements=["id"])
+    return insert(LLMRequestModel.__table__)
+
+
+def _insert_rows_sync(connection: Connection, rows: list[dict[str, Any]]) -> None:
+    """Insert audit rows that are not stored yet, and their payload blobs, on the caller's transaction."""
+    store_blobs(connection, _dehydrate_rows(rows))
+    dialect_name = connection.dialect.name
+    if dialect_name not in _UPSERT_DIALECTS:
+        existing = set(connection.execute(select(LLMRequestModel.id).where(LLMRequestModel.id.in_([row["id"] for row in rows]))).scalars())
+        rows = [row for row in rows if row["id"] not in existing]
+    if rows:
+        connection.execute(_insert_statement(dialect_name), rows)
+
+
+async def _insert_rows(rows: list[dict[str, Any]]) -> None:
+    """Insert a batch of audit rows that are not stored yet, and the payload blobs they reference, on the async engine."""
+    blobs = _dehydrate_rows(rows)
+    infra = infrastructure_provider()
+    infra.initialize()
+    async with infra.get_async_session_context() as session:
+        session.info["commit_scope"] = "llm_audit"
+        await store_blobs_async(session, blobs)
+        await _execute_insert(session, rows)
+
+
+async def _execute_insert(session: AsyncSession, rows: list[dict[str, Any]]) -> None:
+    dialect_name = session.get_bind().dialect.name
+    if dialect_name not in _UPSERT_DIALECTS:
+        existing = set((await session.execute(select(LLMRequestModel.id).where(LLMRequestModel.id.in_([row["id"] for row in rows])))).scalars())
+        rows = [row for row in rows if row["id"] not in existing]
+    if rows:
+        await session.execute(_insert_statement(dialect_name), rows)
+
+
+def persist_pending_llm_request(session: Session, request_id: uuid.UUID) -> bool:
+    """Insert a still-queued row on ``session``'s transaction so it can be updated there; returns False when not queued."""
+    rows = _claim_pending([request_id])
+    if rows:
+        _insert_rows_sync(session.connection(), rows)
+    return bool(rows)
+
+
+class AuditRecorder:
+    """Bounded write-behind queue for audit rows, drained by a background task on one event loop."""
+
+    def __init__(self, *, max_queue: int = 1000, batch_size: int = _BATCH_SIZE, linger: float = _BATCH_LINGER_SECONDS, writer: RowWriter | None = None) -> None:
+        self._queue: asyncio.Queue[uuid.UUID] = asyncio.Queue(maxsize=max_queue)
+        self._batch_size = batch_size
+        self._linger = linger
+        self._writer = writer or _insert_rows
+        self._task: asyncio.Task[None] | None = None
+        # Ids taken off the queue for the batch being gathered, and the batch being written
+        self._batch: list[uuid.UUID] = []
+        self._inflight: asyncio.Future[None] | None = None
+        self.written = 0
+        self.failed = 0
+        self.fallbacks = 0
+
+    def submit(self, row: dict[str, Any]) -> bool:
+        """
+        Queue a row for background insertion without blocking.
+
+        Returns False when the queue is full or no event loop is running; the
+        caller must then write the row synchronously.
+        """
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        if self._queue.full():
+            self.fallbacks += 1
+            return False
+        with _PENDING_LOCK:
+            _PENDING[row["id"]] = row
+        self._queue.put_nowait(row["id"])
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._run(), name="llm-audit-writer")
+        return True
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            self._batch.append(await self._queue.get())
+            deadline = loop.time() + self._linger
+            while len(self._batch) < self._batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    self._batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except TimeoutError:
+                    break
+            batch, self._batch = self._batch, []
+            # Shielded so a shutdown flush cancelling this task cannot abandon a batch mid-write
+            self._inflight = asyncio.ensure_future(self._write(batch))
+            await asyncio.shield(self._inflight)
+
+    async def _write(self, request_ids: list[uuid.UUID], *, requeue: bool = True) -> None:
+        rows = _claim_pending(request_ids)
+        if not rows:
+            return
+        try:
+            await self._writer(rows)
+        except Exception:
+            self.failed += len(rows)
+            # The rows are still queued; try them again with a later batch
+            requeued = 0
+            if requeue:
+                for row in rows:
+                    if self._queue.full():
+                        break
+                    self._queue.put_nowait(row["id"])
+                    requeued += 1
+            logger.exception(f"Failed to persist {len(rows)} llm_requests audit rows ({requeued} requeued)")
+        else:
+            _settle_pending(rows)
+            self.written += len(rows)
+
+    async def flush(self) -> None:
+        """Stop the background task and write everything still queued (call before shutdown)."""
+        if self._task is not None:
+            self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+        if self._inflight is not None:
+            await self._inflight
+            self._inflight = None
+        request_ids, self._batch = self._batch, []
+        while not self._queue.empty():
+            request_ids.append(self._queue.get_nowait())
+        for start in range(0, len(request_ids), self._batch_size):
+            await self._write(request_ids[start : start + self._batch_size], requeue=False)
+
+    def stats(self) -> dict[str, int]:
+        """Return recorder counters for monitoring."""
+        return {"queued": self._queue.qsize(), "written": self.written, "failed": self.failed, "fallbacks": self.fallbacks}
+
+
+_RECORDERS: dict[int, AuditRecorder] = {}
+
+
+def get_audit_recorder(config: LLMConfig) -> AuditRecorder:
+    """Return the process-wide recorder for the running event loop."""
+    try:
+        loop_id = id(asyncio.get_running_loop())
+    except RuntimeError:
+        loop_id = 0
+    recorder = _RECORDERS.get(loop_id)
+    if recorder is None:
+        recorder = _RECORDERS[loop_id] = AuditRecorder(max_queue=config.audit_queue_size)
+    return recorder
+
+
+async def flush_audit_records() -> None:
+    """Write every queued audit row for the running event loop; call from shutdown hooks."""
+    try:
+        loop_id = id(asyncio.get_running_loop())
+    except RuntimeError:
+        loop_id = 0
+    recorder = _RECORDERS.pop(loop_id, None)
+    if recorder is not None:
+        await recorder.flush()
+
+
+@event.listens_for(Session, "before_flush")
+def _insert_referenced_audit_rows(session: Session, _flush_context: Any, _instances: Any) -> None:
+    """Insert queued audit rows referenced by objects in this flush, inside the same transaction."""
+    if not _PENDING:
+        return
+    request_ids: set[uuid.UUID] = set()
+    for obj in (*session.new, *session.dirty):
+        request_id = getattr(obj, "llm_request_id", None)
+        if request_id is not None:
+            with contextlib.suppress(ValueError):
+                request_ids.add(request_id if isinstance(request_id, uuid.UUID) else uuid.UUID(str(request_id)))
+    # The rows stay queued: this transaction may still roll back, and the background insert skips them if it commits
+    rows = _claim_pending(request_ids)
+    if rows:
+        _insert_rows_sync(session.connection(), rows)
@@ -0,0 +1,395 @@
+"""Offline batch execution of LLM requests through provider batch endpoints.
+
+Inside ``llm_batch_mode()`` providers that support a batch API hand their
+native request body to the active ``BatchExecutor`` instead of calling the
+interactive endpoint. The executor groups requests per provider and endpoint,
+submits them as one batch once the group is full or has been idle for
+``flush_interval`` seconds, polls until the batch ends, and resolves each
+caller's future with its result. The awaiting flow step stays suspended in
+the meantime and resumes with the result exactly as if the call had been
+interactive, only cheaper (batch pricing) and without occupying the
+interactive rate limits.
+
+Transports are pluggable: ``OpenAIBatchTransport`` (Files + Batch API),
+``AnthropicBatchTransport`` (Message Batches) and ``FakeBatchServer``, an
+in-process stand-in for tests and dry runs without network access.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator, Callable, Mapping
+import contextlib
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+import functools
+import json
+import logging
+from typing import Any, Protocol
+import uuid
+
+from .exceptions import LLMProviderError
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "BATCH_COST_FACTOR",
+    "AnthropicBatchTransport",
+    "BatchExecutor",
+    "BatchLine",
+    "BatchOutcome",
+    "BatchPayload",
+    "BatchTransport",
+    "FakeBatchServer",
+    "OpenAIBatchTransport",
+    "current_batch_executor",
+    "llm_batch_mode",
+]
+
+# OpenAI Batch and Anthropic Message Batches both bill at half the interactive rate
+BATCH_COST_FACTOR = 0.5
+
+OPENAI_RESPONSES_ENDPOINT = "/v1/responses"
+ANTHROPIC_MESSAGES_ENDPOINT = "/v1/messages"
+
+_current_executor: ContextVar[BatchExecutor | None] = ContextVar("llm_batch_executor", default=None)
+
+
+class BatchPayload(dict[str, Any]):
+    """Provider result body with attribute access, so SDK-style response parsing works on batch results."""
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    @classmethod
+    def wrap(cls, value: Any) -> Any:
+        """Recursively wrap JSON objects so nested fields are reachable as attributes."""
+        if isinstance(value, dict):
+            return cls({key: cls.wrap(item) for key, item in value.items()})
+        if isinstance(value, list):
+            return [cls.wrap(item) for item in value]
+        return value
+
+
+@dataclass(frozen=True)
+class BatchLine:
+    """One request in a batch, matched to its result by ``custom_id``."""
+
+    custom_id: str
+    body: dict[str, Any]
+
+
+@dataclass(frozen=True)
+class BatchOutcome:
+    """Result for one batch line: the provider response body, or an error message."""
+
+    body: dict[str, Any] | None = None
+    error: str | None = None
+
+
+class BatchTransport(Protocol):
+    """Submits batches to one provider's batch endpoint and collects their results."""
+
+    async def submit(self, endpoint: str, lines: list[BatchLine]) -> str:
+        """Submit ``lines`` for ``endpoint`` and return the provider batch id."""
+        ...
+
+    async def is_finished(self, batch_id: str) -> bool:
+        """Whether the batch has ended (completed, failed, expired or cancelled)."""
+        ...
+
+    async def results(self, batch_id: str) -> dict[str, BatchOutcome]:
+        """Outcomes of an ended batch keyed by ``custom_id``."""
+        ...
+
+
+class OpenAIBatchTransport:
+    """OpenAI Batch API: upload a JSONL input file, create the batch, read its output file."""
+
+    _ENDED = frozenset({"completed", "failed", "expired", "cancelled"})
+
+    def __init__(self, client: Any, *, completion_window: str = "24h") -> None:
+        self._client = client
+        self._completion_window = completion_window
+
+    async def submit(self, endpoint: str, lines: list[BatchLine]) -> str:
+        payload = "\n".join(json.dumps({"custom_id": line.custom_id, "method": "POST", "url": endpoint, "body": line.body}) for line in lines)
+        input_file = await self._client.files.create(file=("batch.jsonl", payload.encode("utf-8")), purpose="batch")
+        batch = await self._client.batches.create(input_file_id=input_file.id, endpoint=endpoint, completion_window=self._completion_window)
+        return str(batch.id)
+
+    async def is_finished(self, batch_id: str) -> bool:
+        batch = await self._client.batches.retrieve(batch_id)
+        return batch.status in self._ENDED
+
+    async def results(self, batch_id: str) -> dict[str, BatchOutcome]:
+        batch = await self._client.batches.retrieve(batch_id)
+        outcomes: dict[str, BatchOutcome] = {}
+        for file_id in (batch.output_file_id, batch.error_file_id):
+            if not file_id:
+                continue
+            content = await self._client.files.content(file_id)
+            for raw_line in content.text.splitlines():
+                if not raw_line.strip():
+                    continue
+                entry = json.loads(raw_line)
+                response = entry.get("response") or {}
+                if entry.get("error") or response.get("status_code") != 200:
+                    error = entry.get("error") or response.get("body", {}).get("error") or f"status {response.get('status_code')}"
+                    outcomes[entry["custom_id"]] = BatchOutcome(error=str(error))
+                else:
+                    outcomes[entry["custom_id"]] = BatchOutcome(body=response["body"])
+        if batch.status != "completed":
+            logger.warning(f"OpenAI batch {batch_id} ended with status {batch.status}")
+        return outcomes
+
+
+class AnthropicBatchTransport:
+    """Anthropic Message Batches: one request per ``custom_id`` with Messages API params."""
+
+    def __init__(self, client: Any) -> None:
+        self._client = client
+
+    async def submit(self, endpoint: str, lines: list[BatchLine]) -> str:  # noqa: ARG002 - Message Batches only serve /v1/messages
+        batch = await self._client.messages.batches.create(requests=[{"custom_id": line.custom_id, "params": line.body} for line in lines])
+        return str(batch.id)
+
+    async def is_finished(self, batch_id: str) -> bool:
+        batch = await self._client.messages.batches.retrieve(batch_id)
+        return batch.processing_status == "ended"
+
+    async def results(self, batch_id: str) -> dict[str, BatchOutcome]:
+        outcomes: dict[str, BatchOutcome] = {}
+        async for entry in await self._client.messages.batches.results(batch_id):
+            result = entry.result
+            if result.type == "succeeded":
+                outcomes[entry.custom_id] = BatchOutcome(body=result.message.model_dump())
+            else:
+                error = getattr(result, "error", None)
+                outcomes[entry.custom_id] = BatchOutcome(error=f"{result.type}: {error}" if error is not None else result.type)
+        return outcomes
+
+
+@dataclass
+class _FakeBatch:
+    endpoint: str
+    lines: list[BatchLine]
+    polls: int = 0
+
+
+class FakeBatchServer:
+    """
+    In-process batch endpoint for tests and offline dry runs.
+
+    ``responder(endpoint, body)`` returns the reply text for each request; it is
+    wrapped in the provider-native response shape for ``endpoint``. Raising from
+    the responder fails that line. Batches end after ``polls_until_done`` polls.
+    """
+
+    def __init__(self, responder: Callable[[str, dict[str, Any]], str] | None = None, *, polls_until_done: int = 1) -> None:
+        self._responder = responder or (lambda _endpoint, _body: "ok")
+        self._polls_until_done = polls_until_done
+        self._batches: dict[str, _FakeBatch] = {}
+        self.submitted: list[tuple[str, list[BatchLine]]] = []
+
+    async def submit(self, endpoint: str, lines: list[BatchLine]) -> str:
+        batch_id = f"batch_{uuid.uuid4().hex}"
+        self._batches[batch_id] = _FakeBatch(endpoint, list(lines))
+        self.submitted.append((batch_id, list(lines)))
+        return batch_id
+
+    async def is_finished(self, batch_id: str) -> bool:
+        batch = self._batches[batch_id]
+        batch.polls += 1
+        return batch.polls >= self._polls_until_done
+
+    async def results(self, batch_id: str) -> dict[str, BatchOutcome]:
+        batch = self._batches[batch_id]
+        outcomes: dict[str, BatchOutcome] = {}
+        for line in batch.lines:
+            try:
+                text = self._responder(batch.endpoint, line.body)
+            except Exception as e:
+                outcomes[line.custom_id] = BatchOutcome(error=str(e))
+                continue
+            outcomes[line.custom_id] = BatchOutcome(body=self._response_body(batch.endpoint, line.body, text))
+        return outcomes
+
+    @staticmethod
+    def _response_body(endpoint: str, body: dict[str, Any], text: str) -> dict[str, Any]:
+        """Shape ``text`` like the provider's response for ``endpoint``, with rough token usage."""
+        input_tokens = max(1, len(json.dumps(body)) // 4)
+        output_tokens = max(1, len(text) // 4)
+        response_id = uuid.uuid4().hex
+        if endpoint == ANTHROPIC_MESSAGES_ENDPOINT:
+            return {
+                "id": f"msg_{response_id}",
+                "type": "message",
+                "role": "assistant",
+                "model": body.get("model"),
+                "content": [{"type": "text", "text": text}],
+                "stop_reason": "end_turn",
+                "usage": {"input_tokens": input_tokens, "output_tokens": output_tokens},
+            }
+        return {
+            "id": f"resp_{response_id}",
+            "object": "response",
+            "status": "completed",
+            "model": body.get("model"),
+            "output": [{"type": "message", "role": "assistant", "content": [{"type": "output_text", "text": text}]}],
+            "usage": {"input_tokens": input_tokens, "output_tokens": output_tokens, "total_tokens": input_tokens + output_tokens},
+        }
+
+
+@dataclass
+class _PendingGroup:
+    transport: BatchTransport
+    items: list[tuple[BatchLine, asyncio.Future[BatchPayload]]] = field(default_factory=list)
+    timer: asyncio.TimerHandle | None = None
+
+
+class BatchExecutor:
+    """Accumulate provider requests into batches and resolve callers when results land."""
+
+    def __init__(
+        self,
+        transports: Mapping[str, BatchTransport | None] | None = None,
+        *,
+        max_batch_size: int = 1000,
+        flush_interval: float = 5.0,
+        poll_interval: float = 30.0,
+    ) -> None:
+        # Explicit transports per provider; None marks a provider as interactive-only
+        self._transports: dict[str, BatchTransport | None] = dict(transports or {})
+        self.max_batch_size = max_batch_size
+        self.flush_interval = flush_interval
+        self.poll_interval = poll_interval
+        self._pending: dict[tuple[str, str], _PendingGroup] = {}
+        self._running: set[asyncio.Task[None]] = set()
+        self.batches_submitted = 0
+        self.requests_submitted = 0
+        self.requests_failed = 0
+
+    def transport_for(self, provider: str, default: Callable[[], BatchTransport | None]) -> BatchTransport | None:
+        """Transport for ``provider``, built once from the provider's default when not given explicitly."""
+        if provider not in self._transports:
+            self._transports[provider] = default()
+        return self._transports[provider]
+
+    async def submit(self, provider: str, transport: BatchTransport, endpoint: str, body: dict[str, Any]) -> BatchPayload:
+        """Queue one request and wait for its result from the batch it lands in."""
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[BatchPayload] = loop.create_future()
+        key = (provider, endpoint)
+        group = self._pending.setdefault(key, _PendingGroup(transport))
+        group.items.append((BatchLine(uuid.uuid4().hex, body), future))
+        if len(group.items) >= self.max_batch_size:
+            self._flush(key)
+        elif group.timer is None:
+            group.timer = loop.call_later(self.flush_interval, self._flush, key)
+        return await future
+
+    def _flush(self, key: tuple[str, str]) -> None:
+        """Submit the pending group for ``key`` as one batch."""
+        group = self._pending.pop(key, None)
+        if group is None:
+            return
+        if group.timer is not None:
+            group.timer.cancel()
+        items = [(line, future) for line, future in group.items if not future.done()]
+        if not items:
+            return
+        task = asyncio.get_running_loop().create_task(self._run_batch(key, group.transport, items))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+        task.add_done_callback(functools.partial(self._abandon, items))
+
+    @staticmethod
+    def _abandon(items: list[tuple[BatchLine, asyncio.Future[BatchPayload]]], _task: asyncio.Task[None]) -> None:
+        # A batch task that ended without resolving its callers was cancelled (aclose); cancel them like queued requests
+        for _, future in items:
+            future.cancel()
+
+    async def _run_batch(self, key: tuple[str, str], transport: BatchTransport, items: list[tuple[BatchLine, asyncio.Future[BatchPayload]]]) -> None:
+        provider, endpoint = key
+        try:
+            batch_id = await transport.submit(endpoint, [line for line, _ in items])
+            self.batches_submitted += 1
+            self.requests_submitted += len(items)
+            logger.info(f"📦 Submitted {provider} batch {batch_id} with {len(items)} requests")
+            while not await transport.is_finished(batch_id):
+                await asyncio.sleep(self.poll_interval)
+            outcomes = await transport.results(batch_id)
+            logger.info(f"📦 {provider} batch {batch_id} ended with {len(outcomes)}/{len(items)} results")
+        except Exception as e:
+            logger.error(f"❌ {provider} batch failed: {type(e).__name__}: {e}")
+            self.requests_failed += len(items)
+            for _, future in items:
+                if not future.done():
+                    future.set_exception(LLMProviderError(f"{provider} batch failed: {e}"))
+            return
+
+        for line, future in items:
+            if future.done():
+                continue
+            outcome = outcomes.get(line.custom_id)
+            if outcome is None or outcome.body is None:
+                self.requests_failed += 1
+                future.set_exception(LLMProviderError(f"{provider} batch request failed: {outcome.error if outcome else 'no result returned'}"))
+            else:
+                future.set_result(BatchPayload.wrap(outcome.body))
+
+    async def drain(self) -> None:
+        """Submit everything still queued and wait for all running batches to end."""
+        for key in list(self._pending):
+            self._flush(key)
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+
+    async def aclose(self) -> None:
+        """Abandon queued requests and stop polling running batches; their callers are cancelled."""
+        for group in self._pending.values():
+            if group.timer is not None:
+                group.timer.cancel()
+            for _, future in group.items:
+                future.cancel()
+        self._pending.clear()
+        for task in list(self._running):
+            task.cancel()
+        if self._running:
+            await asyncio.gather(*self._running, return_exceptions=True)
+
+    def stats(self) -> dict[str, int]:
+        """Return counters for submitted batches and requests."""
+        return {
+            "queued": sum(len(group.items) for group in self._pending.values()),
+            "running_batches": len(self._running),
+            "batches_submitted": self.batches_submitted,
+            "requests_submitted": self.requests_submitted,
+            "requests_failed": self.requests_failed,
+        }
+
+
+def current_batch_executor() -> BatchExecutor | None:
+    """Return the executor of the enclosing ``llm_batch_mode`` block, if any."""
+    return _current_executor.get()
+
+
+@contextlib.asynccontextmanager
+async def llm_batch_mode(executor: BatchExecutor | None = None) -> AsyncIterator[BatchExecutor]:
+    """
+    Route batch-capable LLM calls made inside the block through provider batch endpoints.
+
+    Tasks started inside the block inherit batch mode, so concurrently running
+    flows share batches. Providers without a batch API keep calling interactively.
+    """
+    executor = executor or BatchExecutor()
+    token = _current_executor.set(executor)
+    try:
+        yield executor
+    finally:
+        _current_executor.reset(token)
+        await executor.aclose()
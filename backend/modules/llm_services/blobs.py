@@ -0,0 +1,235 @@
+"""Content-addressed storage for large strings in ``llm_requests`` JSON columns.
+
+The same multi-kilobyte unit source material is sent in dozens of requests per
+unit, and every copy used to be stored in full in ``messages``,
+``request_payload``, ``response_raw`` and ``response_output``. Before a row is
+written, every string of at least ``BLOB_MIN_BYTES`` in those columns is
+replaced by ``{"$blob": <sha256>}`` and the text is stored once in
+``llm_payload_blobs`` (zstd-compressed when the optional ``zstandard`` package is
+installed). ``LLMRequestRepo`` puts the text back on every read (``by_id`` and
+the listings), so callers see exactly what was recorded.
+
+Rows are dehydrated on every write path: ORM flushes (``before_flush`` hook
+below) and the write-behind audit inserts (``audit.py``). A flush only writes
+references; the flushed objects keep their full text.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Mapping, Sequence
+import hashlib
+import importlib
+import logging
+from typing import Any
+
+from sqlalchemy import event, insert, inspect, select
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from .models import LLMPayloadBlobModel, LLMRequestModel
+
+try:  # pragma: no cover - optional dependency
+    _zstd: Any = importlib.import_module("zstandard")
+    _ZSTD_AVAILABLE = True
+except Exception:  # pragma: no cover - guard when zstandard missing
+    _zstd = None
+    _ZSTD_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "BLOB_COLUMNS",
+    "BLOB_MIN_BYTES",
+    "BLOB_REF_KEY",
+    "dehydrate",
+    "dehydrate_row",
+    "load_blobs",
+    "rehydrate",
+    "rehydrate_request",
+    "rehydrate_requests",
+    "store_blobs",
+    "store_blobs_async",
+]
+
+BLOB_REF_KEY = "$blob"
+# Strings shorter than this stay inline; a reference costs ~80 bytes
+BLOB_MIN_BYTES = 1024
+# Below this, compression rarely pays for its frame overhead
+_COMPRESS_MIN_BYTES = 4096
+BLOB_COLUMNS = ("messages", "request_payload", "response_raw", "response_output")
+# session.info key for the values a flush replaced with references
+_ORIGINALS_KEY = "llm_blob_originals"
+
+# Dialects with INSERT ... ON CONFLICT DO NOTHING
+_UPSERT_DIALECTS = {"postgresql", "sqlite"}
+
+
+def _blob_hash(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _is_ref(value: Any) -> bool:
+    return isinstance(value, dict) and len(value) == 1 and isinstance(value.get(BLOB_REF_KEY), str)
+
+
+def dehydrate(value: Any, blobs: dict[str, str]) -> Any:
+    """Return ``value`` with large strings replaced by blob references, collecting their text into ``blobs``."""
+    if isinstance(value, str):
+        encoded = value.encode()
+        if len(encoded) < BLOB_MIN_BYTES:
+            return value
+        digest = _blob_hash(encoded)
+        blobs[digest] = value
+        return {BLOB_REF_KEY: digest}
+    if isinstance(value, dict):
+        return {key: dehydrate(item, blobs) for key, item in value.items()}
+    if isinstance(value, list):
+        return [dehydrate(item, blobs) for item in value]
+    return value
+
+
+def blob_refs(value: Any) -> set[str]:
+    """Return every blob hash referenced inside ``value``."""
+    if _is_ref(value):
+        return {value[BLOB_REF_KEY]}
+    if isinstance(value, dict):
+        return set().union(*(blob_refs(item) for item in value.values())) if value else set()
+    if isinstance(value, list):
+        return set().union(*(blob_refs(item) for item in value)) if value else set()
+    return set()
+
+
+def rehydrate(value: Any, texts: Mapping[str, str]) -> Any:
+    """Return ``value`` with blob references replaced by their text; unknown references are left in place."""
+    if _is_ref(value):
+        return texts.get(value[BLOB_REF_KEY], value)
+    if isinstance(value, dict):
+        return {key: rehydrate(item, texts) for key, item in value.items()}
+    if isinstance(value, list):
+        return [rehydrate(item, texts) for item in value]
+    return value
+
+
+def dehydrate_row(row: dict[str, Any]) -> dict[str, str]:
+    """Dehydrate the JSON columns of an insertable ``llm_requests`` row in place; returns the blobs to store."""
+    blobs: dict[str, str] = {}
+    for column in BLOB_COLUMNS:
+        if row.get(column) is not None:
+            row[column] = dehydrate(row[column], blobs)
+    return blobs
+
+
+def _encode_blob(digest: str, text: str) -> dict[str, Any]:
+    data = text.encode()
+    size = len(data)
+    encoding = "raw"
+    if _ZSTD_AVAILABLE and size >= _COMPRESS_MIN_BYTES:
+        compressed = _zstd.ZstdCompressor(level=3).compress(data)
+        if len(compressed) < size:
+            data, encoding = compressed, "zstd"
+    return {"hash": digest, "encoding": encoding, "data": data, "size_bytes": size}
+
+
+def _decode_blob(encoding: str, data: bytes) -> str:
+    if encoding == "zstd":
+        if not _ZSTD_AVAILABLE:
+            raise RuntimeError("zstandard is required to read compressed llm_payload_blobs rows")
+        data = _zstd.ZstdDecompressor().decompress(data)
+    return data.decode()
+
+
+def _upsert_statement(dialect_name: str) -> Any:
+    dialect = importlib.import_module(f"sqlalchemy.dialects.{dialect_name}")
+    return dialect.insert(LLMPayloadBlobModel.__table__).on_conflict_do_nothing(index_elements=["hash"])
+
+
+def store_blobs(connection: Connection, blobs: Mapping[str, str]) -> None:
+    """Insert blobs that are not stored yet, on the caller's connection and transaction."""
+    if not blobs:
+        return
+    rows = [_encode_blob(digest, text) for digest, text in blobs.items()]
+    dialect_name = connection.dialect.name
+    if dialect_name in _UPSERT_DIALECTS:
+        connection.execute(_upsert_statement(dialect_name), rows)
+        return
+    existing = set(connection.execute(select(LLMPayloadBlobModel.hash).where(LLMPayloadBlobModel.hash.in_(list(blobs)))).scalars())
+    rows = [row for row in rows if row["hash"] not in existing]
+    if rows:
+        connection.execute(insert(LLMPayloadBlobModel.__table__), rows)
+
+
+async def store_blobs_async(session: AsyncSession, blobs: Mapping[str, str]) -> None:
+    """Async counterpart of ``store_blobs`` for the write-behind audit inserts."""
+    if not blobs:
+        return
+    rows = [_encode_blob(digest, text) for digest, text in blobs.items()]
+    dialect_name = session.get_bind().dialect.name
+    if dialect_name in _UPSERT_DIALECTS:
+        await session.execute(_upsert_statement(dialect_name), rows)
+        return
+    existing = set((await session.execute(select(LLMPayloadBlobModel.hash).where(LLMPayloadBlobModel.hash.in_(list(blobs))))).scalars())
+    rows = [row for row in rows if row["hash"] not in existing]
+    if rows:
+        await session.execute(insert(LLMPayloadBlobModel.__table__), rows)
+
+
+def load_blobs(session: Session | Connection, hashes: Iterable[str]) -> dict[str, str]:
+    """Return the text of each stored blob in ``hashes``."""
+    hashes = list(hashes)
+    if not hashes:
+        return {}
+    rows = session.execute(select(LLMPayloadBlobModel.hash, LLMPayloadBlobModel.encoding, LLMPayloadBlobModel.data).where(LLMPayloadBlobModel.hash.in_(hashes)))
+    return {digest: _decode_blob(encoding, data) for digest, encoding, data in rows}
+
+
+def rehydrate_requests(session: Session, llm_requests: Sequence[LLMRequestModel]) -> list[LLMRequestModel]:
+    """Replace blob references on loaded requests with their text (one blob query), without marking rows dirty."""
+    refs = [{column: blob_refs(getattr(llm_request, column)) for column in BLOB_COLUMNS} for llm_request in llm_requests]
+    wanted = set().union(*(column_refs for request_refs in refs for column_refs in request_refs.values()))
+    if not wanted:
+        return list(llm_requests)
+    texts = load_blobs(session, wanted)
+    if len(texts) < len(wanted):
+        logger.warning(f"{len(wanted) - len(texts)} payload blobs referenced by llm_requests are missing")
+    for llm_request, request_refs in zip(llm_requests, refs, strict=True):
+        for column, column_refs in request_refs.items():
+            if column_refs:
+                set_committed_value(llm_request, column, rehydrate(getattr(llm_request, column), texts))
+    return list(llm_requests)
+
+
+def rehydrate_request(session: Session, llm_request: LLMRequestModel) -> LLMRequestModel:
+    """Replace blob references on a loaded request with their text, without marking the row dirty."""
+    return rehydrate_requests(session, [llm_request])[0]
+
+
+@event.listens_for(Session, "before_flush")
+def _dehydrate_llm_requests(session: Session, _flush_context: Any, _instances: Any) -> None:
+    """Swap large strings in new or changed ``llm_requests`` rows for blob references before they are written."""
+    blobs: dict[str, str] = {}
+    originals: list[tuple[LLMRequestModel, str, Any]] = session.info.setdefault(_ORIGINALS_KEY, [])
+    for obj in (*session.new, *session.dirty):
+        if not isinstance(obj, LLMRequestModel):
+            continue
+        state = inspect(obj)
+        for column in BLOB_COLUMNS:
+            value = getattr(obj, column)
+            if value is None or (state.persistent and not state.attrs[column].history.has_changes()):
+                continue
+            column_blobs: dict[str, str] = {}
+            dehydrated = dehydrate(value, column_blobs)
+            if column_blobs:
+                originals.append((obj, column, value))
+                setattr(obj, column, dehydrated)
+                blobs.update(column_blobs)
+    if blobs:
+        store_blobs(session.connection(), blobs)
+
+
+@event.listens_for(Session, "after_flush_postexec")
+def _restore_flushed_llm_requests(session: Session, _flush_context: Any) -> None:
+    """Give flushed objects their full text back; the database keeps the references."""
+    for obj, column, value in session.info.pop(_ORIGINALS_KEY, ()):
+        set_committed_value(obj, column, value)
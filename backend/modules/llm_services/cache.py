@@ -1,32 +1,629 @@
-"""LLM response caching system for performance optimization."""
+"""LLM response caching system for performance optimization.
+
+The cache is split into two layers:
+
+- ``ResponseStore``: a key/value engine with an in-memory LRU front tier and a
+  single-file, append-only on-disk tier. The disk tier keeps an in-memory index
+  (key -> offset/expiry/size) so lookups never scan the directory, TTL and size
+  eviction are O(1) per evicted entry, reads take no locks, and writers only
+  serialize on the key they are writing.
+- ``LLMCache``: the LLM-facing facade that derives cache keys from messages and
+  request parameters and (de)serializes ``LLMResponse`` objects.
+"""
+
+from __future__ import annotations
 
 import asyncio
-from datetime import UTC, datetime, timedelta
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Iterator
+import contextlib
+from dataclasses import dataclass
+from datetime import datetime
 import hashlib
 import json
 import logging
+import os
 from pathlib import Path
-from typing import Any
+import struct
+import time
+from typing import Any, Literal
+import zlib
+
+from pydantic import BaseModel
+
+try:  # pragma: no cover - platform guard
+    import fcntl
+
+    _FCNTL_AVAILABLE = True
+except ImportError:  # pragma: no cover - non-POSIX platforms
+    fcntl = None  # type: ignore[assignment]
+    _FCNTL_AVAILABLE = False
 
 # Import the type alias from providers
 from .providers.base import LLMProviderKwargs
+from .schema_registry import get_schema_registry
 from .types import LLMMessage as LLMMessageInternal
+from .types import LLMProviderType, ToolDefinition
 from .types import LLMResponse as LLMResponseInternal
 
 logger = logging.getLogger(__name__)
 
-__all__ = ["LLMCache"]
+__all__ = ["CachedCallKind", "LLMCache", "ResponseStore", "build_request_cache_key", "get_response_store", "response_from_dict", "schema_fingerprint"]
+
+
+# Record layout: magic, key length, value length, expires_at (epoch seconds), crc32(key + value)
+_RECORD_HEADER = struct.Struct("<4sIIdI")
+_RECORD_MAGIC = b"LLMC"
+# Tombstones share the record layout; their value is the offset of the record they retire
+_TOMBSTONE_MAGIC = b"LLMT"
+_TOMBSTONE_VALUE = struct.Struct("<Q")
+_STORE_FILENAME = "responses.store"
+# Held while appending or swapping in a compacted file; unlike the data file it is never replaced
+_LOCK_FILENAME = "responses.lock"
+# Compact the data file once dead bytes exceed live bytes and this floor
+_COMPACTION_MIN_DEAD_BYTES = 1024 * 1024
+
+# Payload layout of a cached call: "response" is a bare LLMResponse dict, "structured"
+# is {"response", "usage"} and "tools" is {"response", "tool_calls"}
+CachedCallKind = Literal["response", "structured", "tools"]
+
+
+@dataclass(slots=True)
+class _IndexEntry:
+    """Location and expiry of a live record in the data file."""
+
+    offset: int
+    size: int
+    expires_at: float
+
+
+@dataclass(slots=True)
+class _ScannedRecord:
+    """A complete record parsed from the data file; ``retires`` is set for tombstones."""
+
+    offset: int
+    size: int
+    key: str
+    expires_at: float
+    retires: int | None
+
+
+@dataclass(slots=True)
+class _KeyLock:
+    """Per-key write lock with a waiter count so idle locks can be dropped."""
+
+    lock: asyncio.Lock
+    holders: int = 0
+
+
+@contextlib.contextmanager
+def _flock(fd: int) -> Iterator[None]:
+    """Hold an exclusive advisory lock on ``fd`` (a no-op where fcntl is unavailable)."""
+    if not _FCNTL_AVAILABLE or fcntl is None:
+        yield
+        return
+    fcntl.flock(fd, fcntl.LOCK_EX)
+    try:
+        yield
+    finally:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+
+
+def _pack_record(magic: bytes, key: str, value: bytes, expires_at: float) -> bytes:
+    key_bytes = key.encode("utf-8")
+    body = key_bytes + value
+    return _RECORD_HEADER.pack(magic, len(key_bytes), len(value), expires_at, zlib.crc32(body)) + body
+
+
+def _pack_tombstone(key: str, retired_offset: int) -> bytes:
+    return _pack_record(_TOMBSTONE_MAGIC, key, _TOMBSTONE_VALUE.pack(retired_offset), 0.0)
+
+
+def _scan_records(fd: int, start: int, end: int) -> tuple[list[_ScannedRecord], int]:
+    """Parse the complete records in ``[start, end)``; also returns the offset where parsing stopped."""
+    records: list[_ScannedRecord] = []
+    offset = start
+    while offset + _RECORD_HEADER.size <= end:
+        header = os.pread(fd, _RECORD_HEADER.size, offset)
+        magic, key_len, value_len, expires_at, _crc = _RECORD_HEADER.unpack(header)
+        record_size = _RECORD_HEADER.size + key_len + value_len
+        if magic not in {_RECORD_MAGIC, _TOMBSTONE_MAGIC} or offset + record_size > end:
+            break
+        key = os.pread(fd, key_len, offset + _RECORD_HEADER.size).decode("utf-8")
+        retires = None
+        if magic == _TOMBSTONE_MAGIC:
+            (retires,) = _TOMBSTONE_VALUE.unpack(os.pread(fd, value_len, offset + _RECORD_HEADER.size + key_len))
+        records.append(_ScannedRecord(offset=offset, size=record_size, key=key, expires_at=expires_at, retires=retires))
+        offset += record_size
+    return records, offset
+
+
+def _fold_records(index: OrderedDict[str, _IndexEntry], records: list[_ScannedRecord], now: float) -> int:
+    """Apply scanned records to ``index`` (latest write wins, tombstones retire their target); returns the dead bytes found."""
+    dead_bytes = 0
+    for record in records:
+        current = index.get(record.key)
+        if record.retires is not None:
+            dead_bytes += record.size
+            # A tombstone only retires the record it names, never a newer write of the key
+            if current is not None and current.offset == record.retires:
+                del index[record.key]
+                dead_bytes += current.size
+            continue
+        if current is not None:
+            del index[record.key]
+            dead_bytes += current.size
+        if record.expires_at > now:
+            index[record.key] = _IndexEntry(offset=record.offset, size=record.size, expires_at=record.expires_at)
+        else:
+            dead_bytes += record.size
+    return dead_bytes
+
+
+@dataclass(slots=True)
+class _CompactedFile:
+    """Outcome of a compaction: the new file's inode, index and byte counts."""
+
+    inode: int
+    index: OrderedDict[str, _IndexEntry]
+    live_bytes: int
+    end: int
+
+
+def _rewrite_live_records(path: Path, lock_path: Path) -> _CompactedFile | None:
+    """
+    Copy the live records of every writer into a fresh file and swap it in.
+
+    Runs in a worker thread. The bulk copy takes no lock, so writers keep appending
+    meanwhile; the records they appended are copied under the lock just before the
+    swap. Returns None if the file was replaced or cleared underneath us.
+    """
+    tmp_path = path.with_suffix(".compact")
+    src_fd = os.open(path, os.O_RDONLY)
+    tmp_fd = os.open(tmp_path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+    lock_fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        now = time.time()
+        source_index: OrderedDict[str, _IndexEntry] = OrderedDict()
+        # Source offset -> location in the new file, for records copied so far
+        copied: dict[int, _IndexEntry] = {}
+        tmp_end = 0
+        scanned_end = 0
+
+        def _copy_through(end: int) -> None:
+            nonlocal tmp_end, scanned_end
+            records, scanned_end = _scan_records(src_fd, scanned_end, end)
+            _fold_records(source_index, records, now)
+            for entry in source_index.values():
+                if entry.offset in copied:
+                    continue
+                os.pwrite(tmp_fd, os.pread(src_fd, entry.size, entry.offset), tmp_end)
+                copied[entry.offset] = _IndexEntry(offset=tmp_end, size=entry.size, expires_at=entry.expires_at)
+                tmp_end += entry.size
+
+        _copy_through(os.fstat(src_fd).st_size)
+        with _flock(lock_fd):
+            src_size = os.fstat(src_fd).st_size
+            try:
+                current_inode = path.stat().st_ino
+            except FileNotFoundError:
+                current_inode = None
+            if current_inode != os.fstat(src_fd).st_ino or src_size < scanned_end:
+                tmp_path.unlink(missing_ok=True)
+                return None
+            _copy_through(src_size)
+            os.fsync(tmp_fd)
+            tmp_path.replace(path)
+            inode = os.fstat(tmp_fd).st_ino
+    finally:
+        os.close(lock_fd)
+        os.close(tmp_fd)
+        os.close(src_fd)
+
+    index = OrderedDict((key, copied[entry.offset]) for key, entry in source_index.items())
+    return _CompactedFile(inode=inode, index=index, live_bytes=sum(entry.size for entry in index.values()), end=tmp_end)
+
+
+class ResponseStore:
+    """
+    Tiered key/value store for cached LLM responses.
+
+    Features:
+    - In-memory LRU front tier for hot entries
+    - Single append-only data file with an in-memory index (key -> offset/expiry/size)
+    - O(1) TTL and size-based eviction (oldest-written first)
+    - Lock-free reads (``os.pread`` at indexed offsets)
+    - Per-key write locks; deletions and evictions append tombstones so they survive reopening
+    - Compaction runs in a worker thread once dead bytes dominate and keeps other writers' records
+
+    The index is rebuilt once when the store is opened. Use ``get_response_store``
+    to share one store per directory within a process.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str | Path,
+        ttl_seconds: float = 24 * 3600,
+        max_size_bytes: int = 100 * 1024 * 1024,
+        memory_max_entries: int = 1024,
+    ) -> None:
+        """
+        Open (or create) the store in ``cache_dir``.
+
+        Args:
+            cache_dir: Directory holding the single data file
+            ttl_seconds: Default time-to-live for new entries
+            max_size_bytes: Maximum live bytes kept in the data file
+            memory_max_entries: Capacity of the in-memory LRU tier
+        """
+        self.cache_dir = Path(cache_dir)
+        self.ttl_seconds = ttl_seconds
+        self.max_size_bytes = max_size_bytes
+        self.memory_max_entries = memory_max_entries
+
+        self._path = self.cache_dir / _STORE_FILENAME
+        self._lock_path = self.cache_dir / _LOCK_FILENAME
+        # Insertion-ordered: the front is always the oldest write, so TTL and size
+        # eviction pop from the front without scanning.
+        self._index: OrderedDict[str, _IndexEntry] = OrderedDict()
+        self._memory: OrderedDict[str, tuple[float, bytes]] = OrderedDict()
+        self._key_locks: dict[str, _KeyLock] = {}
+        self._live_bytes = 0
+        self._dead_bytes = 0
+        self._end = 0
+        self._fd = -1
+        self._lock_fd = -1
+        self._inode: int | None = None
+        self._compacting = False
+
+        self.hits = 0
+        self.memory_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._lock_fd = os.open(self._lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        with self._file_lock():
+            self._open()
+
+    # ------------------------------------------------------------------
+    # File handling
+    # ------------------------------------------------------------------
+    def _open(self) -> None:
+        """Open the data file and rebuild the in-memory index from it (call with the file lock held)."""
+        if self._fd >= 0:
+            os.close(self._fd)
+        self._fd = os.open(self._path, os.O_RDWR | os.O_CREAT, 0o644)
+        self._inode = os.fstat(self._fd).st_ino
+        self._rebuild_index()
+
+    def _rebuild_index(self) -> None:
+        """Scan the data file once, keeping the latest unexpired, unretired record per key."""
+        self._index.clear()
+        self._memory.clear()
+
+        file_size = os.fstat(self._fd).st_size
+        records, end = _scan_records(self._fd, 0, file_size)
+        if end < file_size:
+            # Torn write at the tail (e.g. crash mid-append): drop it
+            logger.warning(f"Truncating corrupt cache tail at offset {end} in {self._path}")
+            os.ftruncate(self._fd, end)
+
+        self._dead_bytes = _fold_records(self._index, records, time.time())
+        self._live_bytes = sum(entry.size for entry in self._index.values())
+        self._end = end
+
+    def _file_lock(self) -> contextlib.AbstractContextManager[None]:
+        """Hold an advisory lock so concurrent processes never interleave appends."""
+        return _flock(self._lock_fd)
+
+    def _sync_with_other_writers(self) -> None:
+        """Reopen if another process compacted the file, otherwise pick up its tail."""
+        try:
+            current_inode = self._path.stat().st_ino
+        except FileNotFoundError:
+            current_inode = None
+        if current_inode != self._inode:
+            self._open()
+            return
+        self._end = os.fstat(self._fd).st_size
+
+    def _append(self, data: bytes) -> int:
+        """Write ``data`` at the end of the data file (call with the file lock held); returns its offset."""
+        offset = self._end
+        os.pwrite(self._fd, data, offset)
+        self._end = offset + len(data)
+        return offset
+
+    def _read_record(self, key: str, entry: _IndexEntry) -> bytes | None:
+        """Read and verify a record; returns None if it no longer matches the index."""
+        try:
+            raw = os.pread(self._fd, entry.size, entry.offset)
+        except OSError:
+            return None
+        if len(raw) != entry.size:
+            return None
+        magic, key_len, value_len, _expires_at, crc = _RECORD_HEADER.unpack_from(raw)
+        body = raw[_RECORD_HEADER.size :]
+        if magic != _RECORD_MAGIC or zlib.crc32(body) != crc:
+            return None
+        if body[:key_len].decode("utf-8", errors="replace") != key:
+            return None
+        return body[key_len : key_len + value_len]
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def get(self, key: str) -> bytes | None:
+        """Return the cached value for ``key`` or None. Takes no locks."""
+        now = time.time()
+
+        cached = self._memory.get(key)
+        if cached is not None:
+            expires_at, value = cached
+            if expires_at > now:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                self.memory_hits += 1
+                return value
+            self._memory.pop(key, None)
+
+        entry = self._index.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+        if entry.expires_at <= now:
+            self._drop(key)
+            self.misses += 1
+            return None
+
+        stored = self._read_record(key, entry)
+        if stored is None:
+            # The file changed underneath us (another process compacted it)
+            self._drop(key)
+            self.misses += 1
+            return None
+
+        self._remember(key, entry.expires_at, stored)
+        self.hits += 1
+        return stored
+
+    async def set(self, key: str, value: bytes, ttl_seconds: float | None = None) -> None:
+        """Store ``value`` under ``key``; only writers of the same key wait on each other."""
+        async with self.key_lock(key):
+            self._write(key, value, ttl_seconds)
+        if self._dead_bytes > max(self._live_bytes, _COMPACTION_MIN_DEAD_BYTES):
+            await self.compact()
+
+    def _write(self, key: str, value: bytes, ttl_seconds: float | None) -> None:
+        """Append a record and publish it in the index (no awaits, so it is atomic on the loop)."""
+        expires_at = time.time() + (self.ttl_seconds if ttl_seconds is None else ttl_seconds)
+        record = _pack_record(_RECORD_MAGIC, key, value, expires_at)
+
+        with self._file_lock():
+            self._sync_with_other_writers()
+            offset = self._append(record)
+
+        self._drop(key)
+        self._index[key] = _IndexEntry(offset=offset, size=len(record), expires_at=expires_at)
+        self._live_bytes += len(record)
+        self._remember(key, expires_at, value)
+
+        self._evict()
+
+    @contextlib.asynccontextmanager
+    async def key_lock(self, key: str) -> AsyncIterator[None]:
+        """Serialize writers of a single key; the lock is discarded once idle."""
+        key_lock = self._key_locks.get(key)
+        if key_lock is None:
+            key_lock = self._key_locks[key] = _KeyLock(lock=asyncio.Lock())
+        key_lock.holders += 1
+        try:
+            async with key_lock.lock:
+                yield
+        finally:
+            key_lock.holders -= 1
+            if key_lock.holders == 0:
+                self._key_locks.pop(key, None)
+
+    def delete(self, key: str) -> None:
+        """Remove ``key`` from both tiers and record the deletion in the data file."""
+        self._retire([key])
+
+    def clear(self) -> None:
+        """Remove every entry and truncate the data file."""
+        with self._file_lock():
+            os.ftruncate(self._fd, 0)
+        self._index.clear()
+        self._memory.clear()
+        self._live_bytes = 0
+        self._dead_bytes = 0
+        self._end = 0
+
+    async def compact(self) -> None:
+        """Rewrite the data file with only live records (including other writers') off the event loop."""
+        if self._compacting:
+            return
+        self._compacting = True
+        try:
+            compacted = await asyncio.to_thread(_rewrite_live_records, self._path, self._lock_path)
+        finally:
+            self._compacting = False
+        if compacted is None or self._inode == compacted.inode:
+            # Another process compacted first, or a write since the swap already reopened the file
+            return
+
+        with self._file_lock():
+            if self._path.stat().st_ino != compacted.inode:
+                self._open()
+                return
+            os.close(self._fd)
+            self._fd = os.open(self._path, os.O_RDWR)
+            self._inode = compacted.inode
+            self._index = compacted.index
+            self._live_bytes = compacted.live_bytes
+            self._dead_bytes = compacted.end - compacted.live_bytes
+            self._end = compacted.end
+        for key in [key for key in self._memory if key not in self._index]:
+            del self._memory[key]
+        logger.debug(f"Compacted LLM cache store to {compacted.end} bytes ({len(compacted.index)} entries)")
+
+    def close(self) -> None:
+        """Close the data and lock file descriptors."""
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+        if self._lock_fd >= 0:
+            os.close(self._lock_fd)
+            self._lock_fd = -1
+
+    def stats(self) -> dict[str, Any]:
+        """Return a snapshot of store counters (O(1))."""
+        return {
+            "entries": len(self._index),
+            "memory_entries": len(self._memory),
+            "live_bytes": self._live_bytes,
+            "dead_bytes": self._dead_bytes,
+            "hits": self.hits,
+            "memory_hits": self.memory_hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    # ------------------------------------------------------------------
+    # Eviction helpers
+    # ------------------------------------------------------------------
+    def _remember(self, key: str, expires_at: float, value: bytes) -> None:
+        """Insert into the memory tier, evicting the least recently used entry."""
+        self._memory[key] = (expires_at, value)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_max_entries:
+            self._memory.popitem(last=False)
+
+    def _drop(self, key: str) -> None:
+        """Forget ``key``; its bytes become dead until the next compaction."""
+        self._memory.pop(key, None)
+        entry = self._index.pop(key, None)
+        if entry is not None:
+            self._live_bytes -= entry.size
+            self._dead_bytes += entry.size
+
+    def _retire(self, keys: list[str]) -> None:
+        """Forget ``keys`` and append tombstones so rebuilding the index does not resurrect them."""
+        now = time.time()
+        with self._file_lock():
+            self._sync_with_other_writers()
+            # Expired records are already skipped when the index is rebuilt
+            tombstones = b"".join(_pack_tombstone(key, entry.offset) for key in keys if (entry := self._index.get(key)) is not None and entry.expires_at > now)
+            if tombstones:
+                self._append(tombstones)
+        self._dead_bytes += len(tombstones)
+        for key in keys:
+            self._drop(key)
+
+    def _evict(self) -> None:
+        """Retire expired entries and then oldest entries until under the size budget."""
+        now = time.time()
+        victims: list[str] = []
+        live_bytes = self._live_bytes
+        for key, entry in self._index.items():
+            if entry.expires_at > now and live_bytes <= self.max_size_bytes:
+                break
+            victims.append(key)
+            live_bytes -= entry.size
+        if victims:
+            self._retire(victims)
+            self.evictions += len(victims)
+
+
+_STORES: dict[Path, ResponseStore] = {}
+
+
+def get_response_store(cache_dir: str | Path, **kwargs: Any) -> ResponseStore:
+    """Return the process-wide store for ``cache_dir``, opening it on first use."""
+    path = Path(cache_dir).resolve()
+    store = _STORES.get(path)
+    if store is None:
+        store = _STORES[path] = ResponseStore(path, **kwargs)
+    return store
+
+
+def schema_fingerprint(model: type[BaseModel]) -> str:
+    """Stable hash of a response model's JSON schema, so schema changes invalidate cached entries."""
+    return get_schema_registry().compile(model).fingerprint
+
+
+def build_request_cache_key(
+    messages: list[LLMMessageInternal],
+    *,
+    kind: CachedCallKind,
+    provider: str,
+    model: str,
+    response_model: type[BaseModel] | None = None,
+    tools: list[ToolDefinition] | None = None,
+    **params: Any,
+) -> str:
+    """
+    Build a provider-agnostic cache key for an LLM request.
+
+    The key covers the kind of call, the provider, the resolved model, the
+    response model schema (for structured calls), tool definitions and every
+    sampling parameter. ``kind`` keeps calls whose cached payloads have
+    different shapes (e.g. plain and tool calls with an empty tool list) apart.
+    """
+    request_data = {
+        "kind": kind,
+        "provider": provider,
+        "model": model,
+        "messages": [msg.to_dict() for msg in messages],
+        "response_schema": schema_fingerprint(response_model) if response_model is not None else None,
+        "tools": [tool.to_dict() for tool in tools] if tools is not None else None,
+        "params": sorted((k, v) for k, v in params.items() if v is not None),
+    }
+    request_json = json.dumps(request_data, sort_keys=True, default=str)
+    return hashlib.sha256(request_json.encode()).hexdigest()
+
+
+def response_from_dict(data: dict[str, Any]) -> LLMResponseInternal:
+    """Rebuild a cached ``LLMResponse`` (marked as cached) from its ``to_dict`` form."""
+    created_at = data.get("response_created_at")
+    provider = data["provider"]
+    with contextlib.suppress(ValueError):
+        provider = LLMProviderType(provider)
+    return LLMResponseInternal(
+        content=data["content"],
+        provider=provider,
+        model=data["model"],
+        tokens_used=data.get("tokens_used"),
+        input_tokens=data.get("input_tokens"),
+        output_tokens=data.get("output_tokens"),
+        prompt_tokens=data.get("prompt_tokens"),
+        completion_tokens=data.get("completion_tokens"),
+        cost_estimate=data.get("cost_estimate"),
+        response_time_ms=data.get("response_time_ms"),
+        cached=True,  # Mark as cached
+        provider_response_id=data.get("provider_response_id"),
+        system_fingerprint=data.get("system_fingerprint"),
+        response_output=data.get("response_output"),
+        response_created_at=datetime.fromisoformat(created_at) if created_at else None,
+        finish_reason=data.get("finish_reason"),
+        cached_input_tokens=data.get("cached_input_tokens"),
+        cache_creation_tokens=data.get("cache_creation_tokens"),
+    )
 
 
 class LLMCache:
     """
-    File-based cache for LLM responses to improve performance and reduce API costs.
+    Cache for LLM responses to improve performance and reduce API costs.
 
     Features:
     - SHA-256 hash-based cache keys
     - TTL (time-to-live) support
-    - Automatic cleanup of expired entries
-    - Thread-safe operations
+    - Tiered storage (in-memory LRU + indexed single-file disk tier)
+    - Constant-time lookups and eviction regardless of cache size
     - Configurable cache directory
     """
 
@@ -36,25 +633,31 @@ class LLMCache:
         enabled: bool = True,
         ttl_hours: int = 24,
         max_cache_size_mb: int = 100,
+        memory_max_entries: int = 1024,
     ) -> None:
         """
         Initialize the LLM cache.
 
         Args:
-            cache_dir: Directory to store cache files
+            cache_dir: Directory to store the cache data file
             enabled: Whether caching is enabled
             ttl_hours: Time-to-live for cache entries in hours
             max_cache_size_mb: Maximum cache size in MB
+            memory_max_entries: Number of entries kept in the in-memory tier
         """
         self.cache_dir = Path(cache_dir)
         self.enabled = enabled
         self.ttl_hours = ttl_hours
         self.max_cache_size_mb = max_cache_size_mb
-        self._lock = asyncio.Lock()
+        self._store: ResponseStore | None = None
 
-        # Create cache directory if it doesn't exist
         if enabled:
-            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._store = get_response_store(
+                self.cache_dir,
+                ttl_seconds=ttl_hours * 3600,
+                max_size_bytes=max_cache_size_mb * 1024 * 1024,
+                memory_max_entries=memory_max_entries,
+            )
 
     def _generate_cache_key(self, messages: list[LLMMessageInternal], **kwargs: LLMProviderKwargs) -> str:
         """
@@ -79,10 +682,6 @@ class LLMCache:
 
         return cache_key
 
-    def _get_cache_path(self, cache_key: str) -> Path:
-        """Get the file path for a cache key."""
-        return self.cache_dir / f"{cache_key}.json"
-
     async def get(self, messages: list[LLMMessageInternal], **kwargs: LLMProviderKwargs) -> LLMResponseInternal | None:
         """
         Retrieve a cached response if available.
@@ -94,50 +693,17 @@ class LLMCache:
         Returns:
             Cached LLMResponse if found and valid, None otherwise
         """
-        if not self.enabled:
+        cache_key = self._generate_cache_key(messages, **kwargs)
+        payload = await self.get_entry(cache_key)
+        if payload is None:
             return None
 
-        async with self._lock:
-            cache_key = self._generate_cache_key(messages, **kwargs)
-            cache_path = self._get_cache_path(cache_key)
-
-            if not cache_path.exists():
-                return None
-
-            try:
-                # Read cache file
-                cache_data = json.loads(cache_path.read_text())
-
-                # Check TTL
-                cached_at = datetime.fromisoformat(cache_data["cached_at"])
-                if datetime.now(UTC) - cached_at > timedelta(hours=self.ttl_hours):
-                    # Cache expired, remove file
-                    cache_path.unlink(missing_ok=True)
-                    return None
-
-                # Reconstruct LLMResponse
-                response_data = cache_data["response"]
-                response = LLMResponseInternal(
-                    content=response_data["content"],
-                    provider=response_data["provider"],
-                    model=response_data["model"],
-                    tokens_used=response_data.get("tokens_used"),
-                    prompt_tokens=response_data.get("prompt_tokens"),
-                    completion_tokens=response_data.get("completion_tokens"),
-                    cost_estimate=response_data.get("cost_estimate"),
-                    finish_reason=response_data.get("finish_reason"),
-                    response_time_ms=response_data.get("response_time_ms"),
-                    cached=True,  # Mark as cached
-                )
-
-                logger.debug(f"Cache hit for key: {cache_key[:8]}...")
-                return response
-
-            except (json.JSONDecodeError, KeyError, ValueError) as e:
-                logger.warning(f"Failed to read cache file {cache_path}: {e}")
-                # Remove corrupted cache file
-                cache_path.unlink(missing_ok=True)
-                return None
+        try:
+            return response_from_dict(payload)
+        except (KeyError, ValueError) as e:
+            logger.warning(f"Failed to decode cache entry {cache_key[:8]}...: {e}")
+            await self.delete_entry(cache_key)
+            return None
 
     async def set(self, messages: list[LLMMessageInternal], response: LLMResponseInternal, **kwargs: LLMProviderKwargs) -> None:
         """
@@ -148,148 +714,70 @@ class LLMCache:
             response: LLMResponse to cache
             **kwargs: Additional parameters
         """
-        if not self.enabled:
-            return
+        await self.set_entry(self._generate_cache_key(messages, **kwargs), response.to_dict())
 
-        async with self._lock:
-            try:
-                # Clean up expired entries first
-                await self._cleanup_expired()
+    async def get_entry(self, cache_key: str) -> dict[str, Any] | None:
+        """Return the JSON payload stored under ``cache_key``, if present and unexpired."""
+        if not self.enabled or self._store is None:
+            return None
 
-                # Check cache size
-                if await self._get_cache_size_mb() >= self.max_cache_size_mb:
-                    await self._cleanup_old_entries()
+        raw = self._store.get(cache_key)
+        if raw is None:
+            return None
 
-                cache_key = self._generate_cache_key(messages, **kwargs)
-                cache_path = self._get_cache_path(cache_key)
+        try:
+            payload = json.loads(raw)
+        except json.JSONDecodeError as e:
+            logger.warning(f"Failed to decode cache entry {cache_key[:8]}...: {e}")
+            self._store.delete(cache_key)
+            return None
 
-                # Prepare cache data
-                cache_data = {
-                    "cache_key": cache_key,
-                    "cached_at": datetime.now(UTC).isoformat(),
-                    "messages": [msg.to_dict() for msg in messages],
-                    "kwargs": kwargs,
-                    "response": response.to_dict(),
-                }
+        logger.debug(f"Cache hit for key: {cache_key[:8]}...")
+        return payload
 
-                # Write to file
-                cache_path.write_text(json.dumps(cache_data, indent=2, default=str))
+    async def set_entry(self, cache_key: str, payload: dict[str, Any]) -> None:
+        """Store a JSON-serializable payload under ``cache_key``."""
+        if not self.enabled or self._store is None:
+            return
 
-                logger.debug(f"Cached response for key: {cache_key[:8]}...")
+        try:
+            await self._store.set(cache_key, json.dumps(payload, default=str).encode("utf-8"))
+            logger.debug(f"Cached response for key: {cache_key[:8]}...")
+        except Exception as e:
+            logger.warning(f"Failed to write cache entry: {e}")
 
-            except Exception as e:
-                logger.warning(f"Failed to write cache file: {e}")
+    async def delete_entry(self, cache_key: str) -> None:
+        """Drop a single entry (e.g. one that no longer validates)."""
+        if self._store is not None:
+            self._store.delete(cache_key)
 
     async def clear(self) -> None:
         """Clear all cached responses."""
-        if not self.enabled:
+        if not self.enabled or self._store is None:
             return
 
-        async with self._lock:
-            try:
-                for cache_file in self.cache_dir.glob("*.json"):
-                    cache_file.unlink(missing_ok=True)
-                logger.info("Cache cleared")
-            except Exception as e:
-                logger.warning(f"Failed to clear cache: {e}")
-
-    async def _cleanup_expired(self) -> None:
-        """Remove expired cache entries."""
         try:
-            cutoff_time = datetime.now(UTC) - timedelta(hours=self.ttl_hours)
-
-            for cache_file in self.cache_dir.glob("*.json"):
-                try:
-                    cache_data = json.loads(cache_file.read_text())
-                    cached_at = datetime.fromisoformat(cache_data["cached_at"])
-
-                    if cached_at < cutoff_time:
-                        cache_file.unlink(missing_ok=True)
-                        logger.debug(f"Removed expired cache file: {cache_file.name}")
-
-                except (json.JSONDecodeError, KeyError, ValueError):
-                    # Remove corrupted files
-                    cache_file.unlink(missing_ok=True)
-
+            self._store.clear()
+            logger.info("Cache cleared")
         except Exception as e:
-            logger.warning(f"Failed to cleanup expired cache entries: {e}")
-
-    async def _cleanup_old_entries(self, keep_percentage: float = 0.5) -> None:
-        """
-        Remove oldest cache entries to free up space.
-
-        Args:
-            keep_percentage: Percentage of files to keep (0.0-1.0)
-        """
-        try:
-            cache_files = list(self.cache_dir.glob("*.json"))
-
-            if len(cache_files) < 10:  # Don't cleanup if we have few files
-                return
-
-            # Sort by modification time (oldest first)
-            cache_files.sort(key=lambda f: f.stat().st_mtime)
-
-            # Keep the most recent entries
-            keep_count = int(len(cache_files) * keep_percentage)
-            files_to_remove = cache_files[:-keep_count]
-
-            for cache_file in files_to_remove:
-                cache_file.unlink(missing_ok=True)
-
-            logger.info(f"Cleaned up {len(files_to_remove)} old cache files")
-
-        except Exception as e:
-            logger.warning(f"Failed to cleanup old cache entries: {e}")
-
-    async def _get_cache_size_mb(self) -> float:
-        """Get the current cache size in MB."""
-        try:
-            total_size = 0
-            for cache_file in self.cache_dir.glob("*.json"):
-                total_size += cache_file.stat().st_size
-
-            return total_size / (1024 * 1024)  # Convert to MB
-
-        except Exception:
-            return 0.0
+            logger.warning(f"Failed to clear cache: {e}")
 
     async def get_stats(self) -> dict[str, Any]:
         """Get cache statistics."""
-        if not self.enabled:
+        if not self.enabled or self._store is None:
             return {"enabled": False}
 
-        async with self._lock:
-            try:
-                cache_files = list(self.cache_dir.glob("*.json"))
-                cache_size_mb = await self._get_cache_size_mb()
-
-                # Count expired files
-                expired_count = 0
-                cutoff_time = datetime.now(UTC) - timedelta(hours=self.ttl_hours)
-
-                for cache_file in cache_files:
-                    try:
-                        cache_data = json.loads(cache_file.read_text())
-                        cached_at = datetime.fromisoformat(cache_data["cached_at"])
-                        if cached_at < cutoff_time:
-                            expired_count += 1
-                    except Exception:
-                        expired_count += 1
-
-                return {
-                    "enabled": True,
-                    "total_files": len(cache_files),
-                    "expired_files": expired_count,
-                    "cache_size_mb": round(cache_size_mb, 2),
-                    "max_cache_size_mb": self.max_cache_size_mb,
-                    "ttl_hours": self.ttl_hours,
-                    "cache_dir": str(self.cache_dir),
-                }
-
-            except Exception as e:
-                logger.warning(f"Failed to get cache stats: {e}")
-                return {
-                    "enabled": True,
-                    "error": str(e),
-                }
+        stats = self._store.stats()
+        return {
+            "enabled": True,
+            "total_entries": stats["entries"],
+            "memory_entries": stats["memory_entries"],
+            "cache_size_mb": round(stats["live_bytes"] / (1024 * 1024), 2),
+            "reclaimable_mb": round(stats["dead_bytes"] / (1024 * 1024), 2),
+            "hits": stats["hits"],
+            "misses": stats["misses"],
+            "evictions": stats["evictions"],
+            "max_cache_size_mb": self.max_cache_size_mb,
+            "ttl_hours": self.ttl_hours,
+            "cache_dir": str(self.cache_dir),
+        }
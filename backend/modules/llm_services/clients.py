@@ -0,0 +1,181 @@
+"""Process-wide registry of pooled LLM provider clients.
+
+``LLMService`` (and therefore every provider) is constructed per request or per
+step, so clients owned by provider instances never get to reuse connections.
+This registry hands out one long-lived client per provider configuration, so
+TLS sessions and keep-alive connections survive across service instances.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Callable
+from dataclasses import dataclass
+import hashlib
+import inspect
+import logging
+import threading
+from typing import Any, TypeVar
+
+try:  # pragma: no cover - optional dependency
+    import httpx
+
+    _HTTPX_AVAILABLE = True
+except Exception:  # pragma: no cover - guard when httpx is missing
+    httpx = None  # type: ignore[assignment]
+    _HTTPX_AVAILABLE = False
+
+try:  # pragma: no cover - optional dependency
+    import h2  # noqa: F401
+
+    _H2_AVAILABLE = True
+except Exception:  # pragma: no cover - HTTP/2 support not installed
+    _H2_AVAILABLE = False
+
+from .audit import flush_audit_records
+from .config import LLMConfig
+from .prompt_cache import context_cache_registry
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+__all__ = ["ProviderClientRegistry", "build_http_client", "client_registry", "config_fingerprint", "shutdown_llm_clients"]
+
+
+@dataclass
+class _RegisteredClient:
+    """A pooled client plus the event loop its connections are bound to."""
+
+    client: Any
+    loop: asyncio.AbstractEventLoop | None
+    close: Callable[[Any], Any] | None
+
+
+def config_fingerprint(*parts: Any) -> str:
+    """Hash configuration values (including secrets) into a short registry key component."""
+    return hashlib.sha256("|".join(str(part) for part in parts).encode()).hexdigest()[:16]
+
+
+def _running_loop() -> asyncio.AbstractEventLoop | None:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def build_http_client(config: LLMConfig, *, base_url: str | None = None, timeout: Any = None, headers: dict[str, str] | None = None) -> Any:
+    """Build an ``httpx.AsyncClient`` with the pool limits and keep-alive settings from ``config``."""
+    if httpx is None:  # pragma: no cover - defensive guard
+        raise RuntimeError("httpx is required for pooled provider clients")
+    limits = httpx.Limits(
+        max_connections=config.http_max_connections,
+        max_keepalive_connections=config.http_max_keepalive_connections,
+        keepalive_expiry=config.http_keepalive_expiry,
+    )
+    client_kwargs: dict[str, Any] = {
+        "limits": limits,
+        "timeout": timeout if timeout is not None else config.timeout,
+        "http2": config.http2_enabled and _H2_AVAILABLE,
+    }
+    if base_url:
+        client_kwargs["base_url"] = base_url
+    if headers:
+        client_kwargs["headers"] = headers
+    return httpx.AsyncClient(**client_kwargs)
+
+
+class ProviderClientRegistry:
+    """
+    Registry of long-lived provider clients keyed by provider configuration.
+
+    Async clients are bound to the event loop that first used them (connection
+    pools cannot be shared across loops), so the running loop is part of the
+    key. Entries whose loop has been closed are dropped and rebuilt.
+    """
+
+    def __init__(self) -> None:
+        self._clients: dict[tuple[Any, ...], _RegisteredClient] = {}
+        self._lock = threading.Lock()
+
+    def get_or_create(
+        self,
+        key: tuple[Any, ...],
+        factory: Callable[[], T],
+        *,
+        close: Callable[[T], Any] | None = None,
+        loop_bound: bool = True,
+    ) -> T:
+        """
+        Return the client registered under ``key``, creating it with ``factory`` on first use.
+
+        Args:
+            key: Hashable identity of the client configuration
+            factory: Builds a new client
+            close: Optional callable (sync or async) used to release the client on shutdown
+            loop_bound: Whether the client's connections are tied to the running event loop
+        """
+        loop = _running_loop() if loop_bound else None
+        full_key = (*key, id(loop)) if loop_bound else key
+        with self._lock:
+            entry = self._clients.get(full_key)
+            if entry is not None and (entry.loop is None or not entry.loop.is_closed()):
+                return entry.client  # type: ignore[no-any-return]
+            client = factory()
+            self._clients[full_key] = _RegisteredClient(client=client, loop=loop, close=close)
+            logger.debug(f"Created pooled client for {key[0]}")
+            return client
+
+    def http_client(self, config: LLMConfig, *, name: str, base_url: str | None = None, timeout: Any = None, headers: dict[str, str] | None = None) -> Any:
+        """
+        Return a pooled ``httpx.AsyncClient`` for a provider configuration.
+
+        The pool keeps ``http_max_keepalive_connections`` idle connections open for
+        ``http_keepalive_expiry`` seconds and negotiates HTTP/2 when ``h2`` is installed.
+        """
+        if httpx is None:  # pragma: no cover - defensive guard
+            raise RuntimeError("httpx is required for pooled provider clients")
+
+        key = (
+            name,
+            base_url,
+            config_fingerprint(sorted((headers or {}).items())),
+            repr(timeout),
+            config.http_max_connections,
+            config.http_max_keepalive_connections,
+            config.http_keepalive_expiry,
+            config.http2_enabled,
+        )
+        return self.get_or_create(key, lambda: build_http_client(config, base_url=base_url, timeout=timeout, headers=headers), close=lambda client: client.aclose())
+
+    async def aclose(self) -> None:
+        """Close every registered client that belongs to the running loop (or to no loop)."""
+        loop = _running_loop()
+        with self._lock:
+            entries = list(self._clients.items())
+            for key, entry in entries:
+                if entry.loop is None or entry.loop is loop or entry.loop.is_closed():
+                    del self._clients[key]
+
+        for key, entry in entries:
+            if entry.close is None or (entry.loop is not None and entry.loop is not loop):
+                continue
+            try:
+                result = entry.close(entry.client)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as exc:  # pragma: no cover - best effort shutdown
+                logger.warning(f"Failed to close pooled client {key[0]}: {exc}")
+
+    def __len__(self) -> int:
+        return len(self._clients)
+
+
+client_registry = ProviderClientRegistry()
+
+
+async def shutdown_llm_clients() -> None:
+    """Flush queued llm_requests audit rows, release provider context caches and close pooled LLM provider clients; call from application and worker shutdown hooks."""
+    await flush_audit_records()
+    await context_cache_registry.aclose()
+    await client_registry.aclose()
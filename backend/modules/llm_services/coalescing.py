@@ -0,0 +1,104 @@
+"""Single-flight coalescing of identical in-flight LLM requests."""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+import logging
+from typing import Any, Generic, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+__all__ = ["RequestCoalescer", "get_request_coalescer"]
+
+
+@dataclass
+class _InFlight(Generic[T]):
+    """A shared provider call and the number of callers currently awaiting it."""
+
+    task: asyncio.Task[T]
+    loop: asyncio.AbstractEventLoop
+    waiters: int = 0
+
+
+class RequestCoalescer:
+    """
+    Collapse concurrent calls that share a request key into one provider call.
+
+    The first caller for a key (the leader) starts the call as a task; callers
+    arriving while it is in flight await the same task. Each waiter awaits the
+    task through ``asyncio.shield`` so one caller being cancelled never cancels
+    the call for the others; the call itself is only cancelled once every
+    waiter has gone away.
+    """
+
+    def __init__(self) -> None:
+        self._inflight: dict[str, _InFlight[Any]] = {}
+        self.leaders = 0
+        self.coalesced = 0
+        self.abandoned = 0
+
+    async def run(self, key: str | None, call: Callable[[], Awaitable[T]]) -> tuple[T, bool]:
+        """
+        Run ``call`` or join an identical call already in flight.
+
+        Args:
+            key: Normalized request key; None disables coalescing for this call
+            call: Zero-argument coroutine factory performing the provider call
+
+        Returns:
+            Tuple of (result, shared) where ``shared`` is True when this caller
+            joined a call started by another caller
+        """
+        if key is None:
+            return await call(), False
+
+        loop = asyncio.get_running_loop()
+        entry = self._inflight.get(key)
+        shared = entry is not None and entry.loop is loop and not entry.task.done()
+        if entry is None or not shared:
+            entry = _InFlight(task=loop.create_task(call()), loop=loop)
+            self._inflight[key] = entry
+            entry.task.add_done_callback(lambda _task, key=key, entry=entry: self._forget(key, entry))
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+            logger.debug(f"Coalesced LLM request {key[:8]}... ({entry.waiters} other waiter(s))")
+
+        entry.waiters += 1
+        try:
+            return await asyncio.shield(entry.task), shared
+        finally:
+            entry.waiters -= 1
+            if entry.waiters == 0 and not entry.task.done():
+                # Every caller was cancelled; nobody is left to use the result
+                self.abandoned += 1
+                entry.task.cancel()
+
+    def _forget(self, key: str, entry: _InFlight[Any]) -> None:
+        """Drop a finished call, unless a newer call already replaced it."""
+        if self._inflight.get(key) is entry:
+            del self._inflight[key]
+        if not entry.task.cancelled():
+            # Mark the exception as retrieved; waiters re-raise it themselves
+            entry.task.exception()
+
+    def stats(self) -> dict[str, int]:
+        """Return coalescing counters."""
+        return {
+            "inflight": len(self._inflight),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "abandoned": self.abandoned,
+        }
+
+
+_COALESCER = RequestCoalescer()
+
+
+def get_request_coalescer() -> RequestCoalescer:
+    """Return the process-wide request coalescer shared by all LLMService instances."""
+    return _COALESCER
@@ -1,7 +1,8 @@
 """Configuration classes and factory functions for LLM providers."""
 
+import json
 import os
-from typing import Any
+from typing import Any, Literal
 
 from pydantic import BaseModel, Field, field_validator
 
@@ -46,6 +47,8 @@ class LLMConfig(BaseModel):
     image_model: str = Field(default="dall-e-3", description="Image generation model")
     image_quality: ImageQuality = Field(default=ImageQuality.STANDARD, description="Image quality setting")
     audio_model: str | None = Field(default=None, description="Default audio generation model")
+    tts_chunk_chars: int = Field(default=3500, gt=0, description="Longest text sent in one TTS call; longer transcripts are synthesized in chunks and stitched")
+    tts_chunk_concurrency: int = Field(default=4, gt=0, description="TTS chunks synthesized concurrently per transcript")
 
     # Web search settings
     web_search_config: WebSearchConfig = Field(default_factory=WebSearchConfig, description="Web search configuration")
@@ -54,6 +57,46 @@ class LLMConfig(BaseModel):
     cache_enabled: bool = Field(default=True, description="Enable response caching")
     cache_dir: str = Field(default=".llm_cache", description="Cache directory path")
 
+    # Connection pool settings (shared per provider config across the process)
+    http_max_connections: int = Field(default=100, gt=0, description="Maximum pooled connections per provider client")
+    http_max_keepalive_connections: int = Field(default=20, ge=0, description="Maximum idle keep-alive connections per provider client")
+    http_keepalive_expiry: float = Field(default=60.0, gt=0, description="Seconds an idle keep-alive connection is kept open")
+    http2_enabled: bool = Field(default=True, description="Negotiate HTTP/2 when the h2 package is installed")
+
+    # Rate limiting (shared across processes through Redis when available)
+    rate_limits: dict[str, dict[str, int]] = Field(
+        default_factory=dict,
+        description="Per 'provider' or 'provider:model' limits with optional rpm, tpm, max_concurrency and min_concurrency keys",
+    )
+    rate_limit_backend: Literal["auto", "local", "off"] = Field(default="auto", description="Rate limit state: auto (Redis when available, else in-process), local (in-process only) or off")
+    max_concurrency: int = Field(default=32, gt=0, description="Default ceiling for adaptive per-model concurrency")
+    priority_weights: dict[str, float] = Field(
+        default_factory=lambda: {"interactive": 8.0, "standard": 3.0, "bulk": 1.0},
+        description="Weighted fair queuing shares of the interactive, standard and bulk priority classes",
+    )
+    interactive_reserve: float = Field(default=0.25, ge=0, le=1, description="Share of each model's concurrency window reserved for interactive calls")
+
+    # Hedged requests and failover (opt-in per model)
+    hedge_policies: dict[str, dict[str, Any]] = Field(
+        default_factory=dict,
+        description="Per-model hedging with 'alternates' (model or 'provider:model') and optional quantile and delay bounds",
+    )
+
+    # Audit persistence (llm_requests rows)
+    audit_write_behind: bool = Field(default=False, description="Queue llm_requests rows for batched background inserts instead of committing per call")
+    audit_queue_size: int = Field(default=1000, gt=0, description="Pending audit rows per event loop before falling back to synchronous writes")
+
+    # Provider prompt-prefix caching
+    prompt_cache_enabled: bool = Field(default=True, description="Map cache_breakpoint messages onto provider prompt caching")
+    prompt_cache_ttl_seconds: int = Field(default=3600, gt=0, description="Lifetime of explicit provider context caches (Gemini cachedContents)")
+
+    # Record/replay provider (offline load testing)
+    replay_source: str = Field(default="db", description="Recordings to replay: 'db' or 'db:<limit>' for recent llm_requests rows, else a JSONL fixture file or directory")
+    replay_latency: str = Field(default="recorded", description="Simulated latency: none, fixed:<ms>, lognormal:<median_ms>:<sigma> or recorded[:<scale>]")
+    replay_error_rate: float = Field(default=0.0, ge=0.0, le=1.0, description="Probability that a replayed call fails with a simulated rate limit, timeout or server error")
+    replay_seed: int = Field(default=0, description="Seed for replay latency and error sampling")
+    replay_strict: bool = Field(default=False, description="Fail requests without an exact recording instead of replaying a similar one")
+
     # Logging settings
     log_level: str = Field(default="INFO", description="Logging level")
     log_requests: bool = Field(default=True, description="Log API requests and responses")
@@ -169,6 +212,28 @@ def create_llm_config_from_env(
     - WEB_SEARCH_CONTEXT_SIZE: Search context size (default: medium)
     - LLM_CACHE_ENABLED: Enable caching (default: true)
     - LLM_CACHE_DIR: Cache directory (default: .llm_cache)
+    - LLM_HTTP_MAX_CONNECTIONS: Pooled connections per provider client (default: 100)
+    - LLM_HTTP_MAX_KEEPALIVE: Idle keep-alive connections per provider client (default: 20)
+    - LLM_HTTP_KEEPALIVE_EXPIRY: Idle keep-alive expiry in seconds (default: 60)
+    - LLM_HTTP2_ENABLED: Negotiate HTTP/2 when available (default: true)
+    - LLM_RATE_LIMITS: JSON mapping of "provider" or "provider:model" to {"rpm", "tpm", "max_concurrency"}
+    - LLM_RATE_LIMIT_BACKEND: auto, local or off (default: auto)
+    - LLM_MAX_CONCURRENCY: Default adaptive concurrency ceiling per model (default: 32)
+    - LLM_PRIORITY_WEIGHTS: JSON mapping of interactive/standard/bulk to queue weights (default: 8/3/1)
+    - LLM_INTERACTIVE_RESERVE: Share of each concurrency window held for interactive calls (default: 0.25)
+    - LLM_HEDGE_POLICIES: JSON mapping of model to {"alternates", "quantile", "initial_delay_seconds", ...}
+    - LLM_AUDIT_WRITE_BEHIND: Batch llm_requests inserts in the background (default: false)
+    - LLM_AUDIT_QUEUE_SIZE: Pending audit rows before synchronous fallback (default: 1000)
+    - LLM_PROMPT_CACHE: Use provider prompt-prefix caching for marked prefixes (default: true)
+    - LLM_PROMPT_CACHE_TTL_SECONDS: Lifetime of explicit context caches (default: 3600)
+    - LLM_TTS_CHUNK_CHARS: Longest text per TTS call before chunked synthesis (default: 3500)
+    - LLM_TTS_CHUNK_CONCURRENCY: Concurrent TTS chunk calls per transcript (default: 4)
+    - LLM_PROVIDER=replay: Serve recorded responses instead of calling providers (offline load testing)
+    - LLM_REPLAY_SOURCE: 'db', 'db:<limit>' or a JSONL fixture file/directory (default: db)
+    - LLM_REPLAY_LATENCY: none, fixed:<ms>, lognormal:<median_ms>:<sigma> or recorded[:<scale>] (default: recorded)
+    - LLM_REPLAY_ERROR_RATE: Probability of a simulated provider failure per call (default: 0)
+    - LLM_REPLAY_SEED: Seed for latency and error sampling (default: 0)
+    - LLM_REPLAY_STRICT: Only replay exact request matches (default: false)
     - LOG_LEVEL: Logging level (default: INFO)
 
     Returns:
@@ -231,6 +296,41 @@ def create_llm_config_from_env(
     cache_enabled = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
     cache_dir = os.getenv("LLM_CACHE_DIR", ".llm_cache")
 
+    # Connection pool settings
+    http_max_connections = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "100"))
+    http_max_keepalive_connections = int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "20"))
+    http_keepalive_expiry = float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY", "60"))
+    http2_enabled = os.getenv("LLM_HTTP2_ENABLED", "true").lower() == "true"
+
+    # Rate limiting settings
+    rate_limits = json.loads(os.getenv("LLM_RATE_LIMITS") or "{}")
+    rate_limit_backend = os.getenv("LLM_RATE_LIMIT_BACKEND", "auto").lower()
+    max_concurrency = int(os.getenv("LLM_MAX_CONCURRENCY", "32"))
+    priority_weights = {"interactive": 8.0, "standard": 3.0, "bulk": 1.0, **json.loads(os.getenv("LLM_PRIORITY_WEIGHTS") or "{}")}
+    interactive_reserve = float(os.getenv("LLM_INTERACTIVE_RESERVE", "0.25"))
+
+    # Hedging settings
+    hedge_policies = json.loads(os.getenv("LLM_HEDGE_POLICIES") or "{}")
+
+    # Audit persistence settings
+    audit_write_behind = os.getenv("LLM_AUDIT_WRITE_BEHIND", "false").lower() == "true"
+    audit_queue_size = int(os.getenv("LLM_AUDIT_QUEUE_SIZE", "1000"))
+
+    # Prompt-prefix caching settings
+    prompt_cache_enabled = os.getenv("LLM_PROMPT_CACHE", "true").lower() == "true"
+    prompt_cache_ttl_seconds = int(os.getenv("LLM_PROMPT_CACHE_TTL_SECONDS", "3600"))
+
+    # Chunked TTS settings
+    tts_chunk_chars = int(os.getenv("LLM_TTS_CHUNK_CHARS", "3500"))
+    tts_chunk_concurrency = int(os.getenv("LLM_TTS_CHUNK_CONCURRENCY", "4"))
+
+    # Record/replay settings
+    replay_source = os.getenv("LLM_REPLAY_SOURCE", "db")
+    replay_latency = os.getenv("LLM_REPLAY_LATENCY", "recorded")
+    replay_error_rate = float(os.getenv("LLM_REPLAY_ERROR_RATE", "0"))
+    replay_seed = int(os.getenv("LLM_REPLAY_SEED", "0"))
+    replay_strict = os.getenv("LLM_REPLAY_STRICT", "false").lower() == "true"
+
     audio_model_env = os.getenv("AUDIO_MODEL")
 
     # Logging settings
@@ -264,7 +364,11 @@ def create_llm_config_from_env(
     if provider_override == LLMProviderType.OPENROUTER and not openrouter_api_key:
         raise ValueError("OPENROUTER_API_KEY must be set to use the OpenRouter provider")
 
-    if azure_openai_api_key and azure_openai_endpoint and wants(LLMProviderType.AZURE_OPENAI, "azure", "azure_openai"):
+    if wants(LLMProviderType.REPLAY, "replay"):
+        # Needs no credentials; every model is answered from recordings
+        provider = LLMProviderType.REPLAY
+        model_name = model_override or openai_model
+    elif azure_openai_api_key and azure_openai_endpoint and wants(LLMProviderType.AZURE_OPENAI, "azure", "azure_openai"):
         provider = LLMProviderType.AZURE_OPENAI
         api_key = azure_openai_api_key
         base_url = azure_openai_endpoint
@@ -383,6 +487,27 @@ def create_llm_config_from_env(
         web_search_config=web_search_config,
         cache_enabled=cache_enabled,
         cache_dir=cache_dir,
+        http_max_connections=http_max_connections,
+        http_max_keepalive_connections=http_max_keepalive_connections,
+        http_keepalive_expiry=http_keepalive_expiry,
+        http2_enabled=http2_enabled,
+        rate_limits=rate_limits,
+        rate_limit_backend=rate_limit_backend,
+        max_concurrency=max_concurrency,
+        priority_weights=priority_weights,
+        interactive_reserve=interactive_reserve,
+        hedge_policies=hedge_policies,
+        audit_write_behind=audit_write_behind,
+        audit_queue_size=audit_queue_size,
+        prompt_cache_enabled=prompt_cache_enabled,
+        prompt_cache_ttl_seconds=prompt_cache_ttl_seconds,
+        tts_chunk_chars=tts_chunk_chars,
+        tts_chunk_concurrency=tts_chunk_concurrency,
+        replay_source=replay_source,
+        replay_latency=replay_latency,
+        replay_error_rate=replay_error_rate,
+        replay_seed=replay_seed,
+        replay_strict=replay_strict,
         log_level=log_level,
         log_requests=log_requests,
     )
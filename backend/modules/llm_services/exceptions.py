@@ -30,7 +30,7 @@ class LLMAuthenticationError(LLMError):
 class LLMRateLimitError(LLMError):
     """Raised when LLM provider rate limits are exceeded"""
 
-    def __init__(self, message: str, retry_after: int | None = None, **kwargs: Any) -> None:
+    def __init__(self, message: str, retry_after: float | None = None, **kwargs: Any) -> None:
         super().__init__(message, **kwargs)
         self.retry_after = retry_after
 
@@ -0,0 +1,220 @@
+"""Hedged requests and automatic failover across equivalent models.
+
+A hedged call starts on its primary target. If no response arrives within a
+delay derived from the target's recent latency (p95 by default), a duplicate
+request is fired at the next equivalent target, e.g. the same Claude model on
+Bedrock instead of Anthropic. The first success wins and the remaining
+attempts are cancelled. An attempt that fails outright hands over to the next
+target immediately (failover) instead of waiting out the delay.
+
+Hedging is opt-in: a ``HedgePolicy`` comes from ``LLM_HEDGE_POLICIES`` for a
+model, or from the caller (flow steps set ``hedge_models``). Counters for hedge
+rate, wins, failovers and the spend of losing attempts are exposed through
+``RequestHedger.stats`` so the delays can be tuned.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import Awaitable, Callable, Sequence
+import contextlib
+from dataclasses import dataclass
+import logging
+import math
+import time
+from typing import Any, Generic, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+__all__ = [
+    "HedgeAttempt",
+    "HedgePolicy",
+    "LatencyTracker",
+    "RequestHedger",
+    "get_request_hedger",
+]
+
+# Latency samples kept per target; older samples age out
+_LATENCY_WINDOW = 200
+
+
+@dataclass(frozen=True)
+class HedgePolicy:
+    """When and where to hedge calls to one model."""
+
+    # Equivalent targets tried in order, as "model" or "provider:model" (e.g. "bedrock:claude-sonnet-4-5")
+    alternates: tuple[str, ...] = ()
+    quantile: float = 0.95
+    # Delay used until enough latency samples exist for the quantile to mean anything
+    initial_delay_seconds: float = 20.0
+    min_delay_seconds: float = 1.0
+    max_delay_seconds: float = 120.0
+    min_samples: int = 20
+
+    @classmethod
+    def from_dict(cls, raw: dict[str, Any]) -> HedgePolicy:
+        """Build a policy from an ``LLM_HEDGE_POLICIES`` entry."""
+        defaults = cls()
+        return cls(
+            alternates=tuple(raw.get("alternates", ())),
+            quantile=float(raw.get("quantile", defaults.quantile)),
+            initial_delay_seconds=float(raw.get("initial_delay_seconds", defaults.initial_delay_seconds)),
+            min_delay_seconds=float(raw.get("min_delay_seconds", defaults.min_delay_seconds)),
+            max_delay_seconds=float(raw.get("max_delay_seconds", defaults.max_delay_seconds)),
+            min_samples=int(raw.get("min_samples", defaults.min_samples)),
+        )
+
+
+class LatencyTracker:
+    """Rolling per-target latency samples used to derive hedge delays."""
+
+    def __init__(self, window: int = _LATENCY_WINDOW) -> None:
+        self._window = window
+        self._samples: dict[str, deque[float]] = {}
+
+    def observe(self, target: str, seconds: float) -> None:
+        """Record how long a call to ``target`` took."""
+        samples = self._samples.get(target)
+        if samples is None:
+            samples = self._samples[target] = deque(maxlen=self._window)
+        samples.append(seconds)
+
+    def quantile(self, target: str, q: float) -> float | None:
+        """Nearest-rank quantile of recent latencies, or None without samples."""
+        samples = self._samples.get(target)
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, max(0, math.ceil(q * len(ordered)) - 1))
+        return ordered[index]
+
+    def delay_for(self, target: str, policy: HedgePolicy) -> float:
+        """Seconds to wait on ``target`` before hedging, clamped to the policy bounds."""
+        samples = self._samples.get(target)
+        delay = policy.initial_delay_seconds if samples is None or len(samples) < policy.min_samples else self.quantile(target, policy.quantile) or policy.initial_delay_seconds
+        return min(policy.max_delay_seconds, max(policy.min_delay_seconds, delay))
+
+
+@dataclass
+class HedgeAttempt(Generic[T]):
+    """One target a hedged call may be sent to."""
+
+    target: str
+    call: Callable[[], Awaitable[T]]
+    # Spend of a result that lost the race (it was paid for but discarded)
+    cost_of: Callable[[T], float] | None = None
+    # Estimated spend of an attempt cancelled mid-flight (its prompt was already billed)
+    abandoned_cost: Callable[[], float] | None = None
+
+
+class RequestHedger:
+    """Race equivalent targets for one logical call; process-wide counters feed tuning."""
+
+    def __init__(self, latency: LatencyTracker | None = None) -> None:
+        self.latency = latency or LatencyTracker()
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.failovers = 0
+        self.cancelled = 0
+        self.wasted_cost = 0.0
+
+    async def run(self, attempts: Sequence[HedgeAttempt[T]], policy: HedgePolicy) -> tuple[T, str]:
+        """
+        Run the first attempt, hedging or failing over to later ones as needed.
+
+        Returns:
+            Tuple of (result, target) for the attempt that succeeded first
+
+        Raises:
+            The first attempt's exception when every attempt fails
+        """
+        if not attempts:
+            raise ValueError("At least one hedge attempt is required")
+        self.calls += 1
+        loop = asyncio.get_running_loop()
+        running: dict[asyncio.Task[T], tuple[HedgeAttempt[T], float]] = {}
+        errors: list[BaseException] = []
+        next_index = 0
+
+        def launch() -> None:
+            nonlocal next_index
+            attempt = attempts[next_index]
+            next_index += 1
+            running[loop.create_task(attempt.call())] = (attempt, time.perf_counter())
+
+        launch()
+        try:
+            while running:
+                timeout = None
+                if next_index < len(attempts):
+                    primary_started = min(started for _, started in running.values())
+                    delay = self.latency.delay_for(attempts[next_index - 1].target, policy)
+                    timeout = max(0.0, primary_started + delay - time.perf_counter())
+                done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    self.hedged += 1
+                    logger.info(f"Hedging slow {attempts[next_index - 1].target} call with {attempts[next_index].target}")
+                    launch()
+                    continue
+                for task in done:
+                    attempt, started = running.pop(task)
+                    exc = task.exception()
+                    if exc is None:
+                        self.latency.observe(attempt.target, time.perf_counter() - started)
+                        if attempt is not attempts[0]:
+                            self.hedge_wins += 1
+                        await self._cancel_losers(running, done, winner=task)
+                        return task.result(), attempt.target
+                    errors.append(exc)
+                    logger.warning(f"Hedged call to {attempt.target} failed: {type(exc).__name__}: {exc}")
+                if not running and next_index < len(attempts):
+                    self.failovers += 1
+                    launch()
+        finally:
+            for task in running:
+                task.cancel()
+        raise errors[0]
+
+    async def _cancel_losers(self, running: dict[asyncio.Task[T], tuple[HedgeAttempt[T], float]], done: set[asyncio.Task[T]], *, winner: asyncio.Task[T]) -> None:
+        """Cancel attempts still in flight and account for the spend they wasted."""
+        for task in done:
+            if task is winner or task.exception() is not None:
+                continue
+            attempt, _ = running.pop(task, (None, 0.0))
+            if attempt is not None and attempt.cost_of is not None:
+                self.wasted_cost += attempt.cost_of(task.result())
+        for task, (attempt, started) in list(running.items()):
+            task.cancel()
+            self.cancelled += 1
+            # The loser ran at least this long; recording it keeps a slow target's quantile honest
+            self.latency.observe(attempt.target, time.perf_counter() - started)
+            if attempt.abandoned_cost is not None:
+                with contextlib.suppress(Exception):
+                    self.wasted_cost += attempt.abandoned_cost()
+        if running:
+            await asyncio.gather(*running, return_exceptions=True)
+        running.clear()
+
+    def stats(self) -> dict[str, float]:
+        """Return hedging counters; ``hedge_rate`` is the share of calls that fired a duplicate."""
+        return {
+            "calls": self.calls,
+            "hedged": self.hedged,
+            "hedge_rate": self.hedged / self.calls if self.calls else 0.0,
+            "hedge_wins": self.hedge_wins,
+            "failovers": self.failovers,
+            "cancelled": self.cancelled,
+            "wasted_cost": round(self.wasted_cost, 6),
+        }
+
+
+_HEDGER = RequestHedger()
+
+
+def get_request_hedger() -> RequestHedger:
+    """Return the process-wide hedger shared by all LLMService instances."""
+    return _HEDGER
@@ -10,6 +10,7 @@ from sqlalchemy import (
     DateTime,
     Float,
     Integer,
+    LargeBinary,
     String,
     Text,
     func,
@@ -18,7 +19,7 @@ from sqlalchemy.orm import Mapped, mapped_column
 
 from modules.shared_models import Base, PostgresUUID
 
-__all__ = ["LLMRequestModel"]
+__all__ = ["LLMPayloadBlobModel", "LLMRequestModel"]
 
 
 class LLMRequestModel(Base):
@@ -81,6 +82,9 @@ class LLMRequestModel(Base):
     input_tokens: Mapped[int | None] = mapped_column(Integer, nullable=True)
     # Tokens generated by the model as output/completions
     output_tokens: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # Input tokens served from / written to the provider's prompt-prefix cache
+    cached_input_tokens: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    cache_creation_tokens: Mapped[int | None] = mapped_column(Integer, nullable=True)
     # Estimated USD cost computed from token usage and model pricing
     cost_estimate: Mapped[float | None] = mapped_column(Float, nullable=True)
 
@@ -143,3 +147,27 @@ class LLMRequestModel(Base):
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "response_created_at": self.response_created_at.isoformat() if self.response_created_at else None,
         }
+
+
+class LLMPayloadBlobModel(Base):
+    """
+    Content-addressed storage for large strings inside ``llm_requests`` JSON columns.
+
+    Unit source material is repeated across dozens of requests, so each large
+    message body or payload fragment is stored once here and the request row
+    keeps a ``{"$blob": <sha256>}`` reference in its place (see ``blobs.py``).
+    """
+
+    __tablename__ = "llm_payload_blobs"
+
+    # SHA-256 hex digest of the UTF-8 text
+    hash: Mapped[str] = mapped_column(String(64), primary_key=True)
+    # "raw" (UTF-8 bytes) or "zstd" (zstandard-compressed UTF-8)
+    encoding: Mapped[str] = mapped_column(String(16), nullable=False, default="raw")
+    data: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    # Uncompressed size in bytes
+    size_bytes: Mapped[int] = mapped_column(Integer, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, server_default=func.now())
+
+    def __repr__(self) -> str:
+        return f"<LLMPayloadBlobModel(hash='{self.hash[:12]}', encoding='{self.encoding}', size_bytes={self.size_bytes})>"
@@ -0,0 +1,174 @@
+"""Provider prompt-prefix caching.
+
+Callers mark the end of a stable prompt prefix by setting ``cache_breakpoint``
+on the last message of that prefix (e.g. shared unit source material sent ahead
+of a per-lesson tail). Providers map the marker onto their native mechanism:
+
+* Anthropic: a ``cache_control`` breakpoint on the last block of the prefix.
+* OpenAI: a ``prompt_cache_key`` derived from the prefix, so requests sharing it
+  are routed to the same cache.
+* Gemini: an explicit ``cachedContents`` resource holding the prefix, created
+  once per (model, prefix) and tracked in ``context_cache_registry`` until it
+  expires or the process shuts down. A request Gemini rejects because the
+  resource is gone drops the handle and is retried once uncached.
+
+Cached input tokens are reported on ``LLMResponse.cached_input_tokens`` and
+persisted on ``llm_requests``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable, Sequence
+import contextlib
+from dataclasses import dataclass
+import hashlib
+import json
+import logging
+import time
+
+from .types import LLMMessage
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "ContextCacheHandle",
+    "ContextCacheRegistry",
+    "context_cache_registry",
+    "prefix_fingerprint",
+    "split_at_cache_breakpoint",
+]
+
+# Handles this close to expiry are recreated rather than reused mid-request
+_REFRESH_MARGIN_SECONDS = 60.0
+# How long a prefix that failed to cache is sent uncached before trying again
+_FAILURE_BACKOFF_SECONDS = 300.0
+
+
+def split_at_cache_breakpoint(messages: Sequence[LLMMessage]) -> tuple[list[LLMMessage], list[LLMMessage]]:
+    """Split messages after the last ``cache_breakpoint``; the prefix is empty when none is marked."""
+    for index in range(len(messages) - 1, -1, -1):
+        if messages[index].cache_breakpoint:
+            return list(messages[: index + 1]), list(messages[index + 1 :])
+    return [], list(messages)
+
+
+def prefix_fingerprint(messages: Sequence[LLMMessage]) -> str | None:
+    """Stable hash of the cached prefix, or None when no breakpoint is marked."""
+    prefix, _ = split_at_cache_breakpoint(messages)
+    if not prefix:
+        return None
+    canonical = json.dumps([{"role": message.role.value, "content": message.content, "name": message.name} for message in prefix], sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()[:32]
+
+
+@dataclass(slots=True)
+class _KeyLock:
+    """Per-key creation lock with a waiter count so idle locks can be dropped."""
+
+    lock: asyncio.Lock
+    holders: int = 0
+
+
+@dataclass(slots=True)
+class ContextCacheHandle:
+    """A provider-side cached context and how to release it."""
+
+    name: str
+    expires_at: float  # wall-clock epoch seconds
+    delete: Callable[[], Awaitable[None]] | None = None
+
+
+class ContextCacheRegistry:
+    """
+    Process-wide handles for provider-side cached contexts, keyed by the caller.
+
+    Concurrent requests for the same key share one creation; handles are reused
+    until shortly before they expire, and a prefix whose creation failed is sent
+    uncached for a back-off period instead of retrying on every call.
+    """
+
+    def __init__(self, *, refresh_margin: float = _REFRESH_MARGIN_SECONDS, failure_backoff: float = _FAILURE_BACKOFF_SECONDS) -> None:
+        self._refresh_margin = refresh_margin
+        self._failure_backoff = failure_backoff
+        self._handles: dict[Hashable, ContextCacheHandle] = {}
+        self._suppressed_until: dict[Hashable, float] = {}
+        # Creation locks per (event loop, key); asyncio locks must not cross loops
+        self._locks: dict[tuple[int, Hashable], _KeyLock] = {}
+        self.created = 0
+        self.reused = 0
+        self.failed = 0
+
+    def _live(self, key: Hashable) -> ContextCacheHandle | None:
+        handle = self._handles.get(key)
+        if handle is not None and handle.expires_at - self._refresh_margin > time.time():
+            return handle
+        return None
+
+    async def get_or_create(self, key: Hashable, create: Callable[[], Awaitable[ContextCacheHandle]]) -> ContextCacheHandle | None:
+        """Return a live handle for ``key``, creating it once; None while the key is backing off after a failure."""
+        handle = self._live(key)
+        if handle is not None:
+            self.reused += 1
+            return handle
+        if self._suppressed_until.get(key, 0.0) > time.time():
+            return None
+
+        lock_key = (id(asyncio.get_running_loop()), key)
+        key_lock = self._locks.get(lock_key)
+        if key_lock is None:
+            key_lock = self._locks[lock_key] = _KeyLock(lock=asyncio.Lock())
+        key_lock.holders += 1
+        try:
+            async with key_lock.lock:
+                handle = self._live(key)
+                if handle is not None:
+                    self.reused += 1
+                    return handle
+                stale = self._handles.pop(key, None)
+                try:
+                    handle = await create()
+                except Exception as exc:
+                    self.failed += 1
+                    self._suppressed_until[key] = time.time() + self._failure_backoff
+                    logger.warning(f"Prompt prefix caching unavailable, sending uncached: {exc}")
+                    return None
+                self.created += 1
+                self._handles[key] = handle
+                self._suppressed_until.pop(key, None)
+        finally:
+            key_lock.holders -= 1
+            if key_lock.holders == 0:
+                self._locks.pop(lock_key, None)
+        if stale is not None:
+            await self._release(stale)
+        return handle
+
+    def invalidate(self, key: Hashable, name: str | None = None) -> None:
+        """Forget a handle the provider no longer recognises (only if it is still ``name``, when given)."""
+        handle = self._handles.get(key)
+        if handle is not None and (name is None or handle.name == name):
+            del self._handles[key]
+
+    @staticmethod
+    async def _release(handle: ContextCacheHandle) -> None:
+        if handle.delete is None:
+            return
+        with contextlib.suppress(Exception):
+            await handle.delete()
+
+    async def aclose(self) -> None:
+        """Delete every live provider-side context (best effort); call before closing HTTP clients."""
+        handles, self._handles = list(self._handles.values()), {}
+        self._suppressed_until.clear()
+        now = time.time()
+        for handle in handles:
+            if handle.expires_at > now:
+                await self._release(handle)
+
+    def stats(self) -> dict[str, int]:
+        """Return registry counters for monitoring."""
+        return {"live": len(self._handles), "created": self.created, "reused": self.reused, "failed": self.failed}
+
+
+context_cache_registry = ContextCacheRegistry()
@@ -0,0 +1,176 @@
+"""Precompiled prompt templates, loaded once per process.
+
+Steps and conversations used to open and read their markdown prompt on every
+call, and every render recompiled the placeholder regex and re-serialized
+non-string inputs with ``json.dumps``. Now:
+
+- ``PromptRegistry`` reads each prompt file once and keeps it compiled;
+  ``warm()`` loads every ``prompts/*.md`` at startup
+- a template is compiled into alternating literal chunks and placeholder names,
+  and ``render()`` assembles the output in a single pass
+- a render may share a ``fragments`` dict with other renders of the same inputs
+  (a step's prefix and main prompt) so large structured values are serialized
+  to JSON once
+- with ``DEBUG=true`` the registry checks each file's mtime on lookup and
+  recompiles edited prompts, so prompt changes apply without a restart
+
+Placeholders are Handlebars-style ``{{ name }}``. String values are inserted as
+is, other values as JSON, and a placeholder without a value raises ``ValueError``.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+import functools
+import json
+import logging
+import os
+from pathlib import Path
+import re
+import threading
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+__all__ = ["PromptRegistry", "PromptTemplate", "compile_template", "get_prompt_registry", "render_template"]
+
+_PLACEHOLDER = re.compile(r"{{\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*}}")
+
+
+@dataclass(frozen=True)
+class PromptTemplate:
+    """A template split into literal chunks around its placeholders (``len(literals) == len(names) + 1``)."""
+
+    source: str
+    literals: tuple[str, ...] = field(repr=False)
+    names: tuple[str, ...]
+
+    @classmethod
+    def parse(cls, source: str) -> PromptTemplate:
+        literals: list[str] = []
+        names: list[str] = []
+        position = 0
+        for match in _PLACEHOLDER.finditer(source):
+            literals.append(source[position : match.start()])
+            names.append(match.group(1))
+            position = match.end()
+        literals.append(source[position:])
+        return cls(source=source, literals=tuple(literals), names=tuple(names))
+
+    @property
+    def placeholders(self) -> frozenset[str]:
+        return frozenset(self.names)
+
+    def render(self, variables: dict[str, Any], fragments: dict[int, tuple[Any, str]] | None = None) -> str:
+        """Substitute ``variables``; pass the same ``fragments`` dict to renders that share input values."""
+        if not self.names:
+            return self.source
+        if fragments is None:
+            fragments = {}
+        parts = [self.literals[0]]
+        for name, literal in zip(self.names, self.literals[1:], strict=True):
+            if name not in variables:
+                raise ValueError(f"Prompt template missing required input: '{name}'")
+            value = variables[name]
+            if isinstance(value, str):
+                parts.append(value)
+            else:
+                # Keyed by identity; the value is kept alongside so its id can't be reused
+                cached = fragments.get(id(value))
+                if cached is None or cached[0] is not value:
+                    cached = fragments[id(value)] = (value, json.dumps(value, ensure_ascii=False))
+                parts.append(cached[1])
+            parts.append(literal)
+        return "".join(parts)
+
+
+@functools.lru_cache(maxsize=512)
+def compile_template(source: str) -> PromptTemplate:
+    """Compile ``source`` once; later calls with the same text return the cached template."""
+    return PromptTemplate.parse(source)
+
+
+def render_template(source: str, variables: dict[str, Any], fragments: dict[int, tuple[Any, str]] | None = None) -> str:
+    """Render a template string, compiling it on first use."""
+    return compile_template(source).render(variables, fragments)
+
+
+@dataclass(frozen=True)
+class _Entry:
+    raw: str
+    template: PromptTemplate
+    mtime_ns: int
+
+
+class PromptRegistry:
+    """Process-wide cache of prompt files, keyed by absolute path."""
+
+    def __init__(self, *, reload: bool = False) -> None:
+        self.reload = reload
+        self._entries: dict[Path, _Entry] = {}
+        self._lock = threading.Lock()
+        self._loads = 0
+        self._reloads = 0
+
+    def get(self, path: Path | str) -> PromptTemplate:
+        """The compiled template for a prompt file (stripped of surrounding whitespace).
+
+        Raises:
+            FileNotFoundError: If the file does not exist
+        """
+        return self._entry(Path(path)).template
+
+    def text(self, path: Path | str) -> str:
+        """The prompt file's contents exactly as stored."""
+        return self._entry(Path(path)).raw
+
+    def _entry(self, path: Path) -> _Entry:
+        key = path if path.is_absolute() else path.resolve()
+        entry = self._entries.get(key)
+        if entry is not None and not self.reload:
+            return entry
+        mtime_ns = key.stat().st_mtime_ns
+        if entry is not None and entry.mtime_ns == mtime_ns:
+            return entry
+        with self._lock:
+            raw = key.read_text(encoding="utf-8")
+            if entry is not None:
+                self._reloads += 1
+                logger.info(f"♻️ Reloaded prompt {key.name}")
+            else:
+                self._loads += 1
+            entry = self._entries[key] = _Entry(raw=raw, template=compile_template(raw.strip()), mtime_ns=mtime_ns)
+        return entry
+
+    def warm(self, roots: Iterable[Path]) -> int:
+        """Load every ``prompts/*.md`` below ``roots``; returns the number of prompt files loaded."""
+        loaded = 0
+        for root in roots:
+            for path in sorted(root.glob("**/prompts/*.md")):
+                try:
+                    self._entry(path)
+                    loaded += 1
+                except OSError as exc:  # pragma: no cover - defensive
+                    logger.warning("Could not preload prompt %s: %s", path, exc)
+        return loaded
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._loads = 0
+            self._reloads = 0
+
+    def stats(self) -> dict[str, Any]:
+        return {"prompts": len(self._entries), "loads": self._loads, "reloads": self._reloads, "reload_enabled": self.reload}
+
+
+_REGISTRY: PromptRegistry | None = None
+
+
+def get_prompt_registry() -> PromptRegistry:
+    """Return the process-wide registry; edited prompts are reloaded when ``DEBUG=true``."""
+    global _REGISTRY  # noqa: PLW0603
+    if _REGISTRY is None:
+        _REGISTRY = PromptRegistry(reload=os.getenv("DEBUG", "false").lower() == "true")
+    return _REGISTRY
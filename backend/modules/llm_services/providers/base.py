@@ -1,16 +1,24 @@
 """Abstract base classes and common functionality for LLM providers."""
 
 from abc import ABC, abstractmethod
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable
 import contextlib
 from datetime import UTC, datetime
+import time
 from typing import TYPE_CHECKING, Any, TypeVar
 import uuid
 
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
+from ...infrastructure.public import COST_BUCKETS, get_metrics_registry
+from ..audit import get_audit_recorder, llm_request_row
+from ..batch import BatchTransport, current_batch_executor
 from ..config import LLMConfig
+from ..exceptions import LLMError
 from ..models import LLMRequestModel
+from ..rate_limit import get_rate_limiter
 from ..types import (
     AudioGenerationRequest,
     AudioResponse,
@@ -18,6 +26,7 @@ from ..types import (
     ImageResponse,
     LLMMessage,
     LLMResponse,
+    LLMStreamChunk,
     ToolCall,
     ToolDefinition,
     WebSearchResponse,
@@ -31,9 +40,31 @@ if TYPE_CHECKING:
 
 # Type variable for Pydantic models
 T = TypeVar("T", bound=BaseModel)
+R = TypeVar("R")
 
 __all__ = ["LLMProvider"]
 
+_metrics = get_metrics_registry()
+_REQUEST_DURATION = _metrics.histogram("llm_request_duration_seconds", "Provider call latency by provider, model and outcome (completed, failed, cached)", ("provider", "model", "status"))
+_REQUEST_COST = _metrics.histogram("llm_request_cost_usd", "Estimated cost per provider call", ("provider", "model"), buckets=COST_BUCKETS)
+_TOKENS = _metrics.counter("llm_tokens_total", "Tokens billed by provider calls, by direction (input, output)", ("provider", "model", "direction"))
+_COST = _metrics.counter("llm_cost_usd_total", "Estimated provider spend", ("provider", "model"))
+
+
+def _record_call(llm_request: "LLMRequestModel", status: str, execution_time_ms: int, cost: float | None = None, input_tokens: int | None = None, output_tokens: int | None = None) -> None:
+    """Feed a finished call into the process metrics; cache hits count towards latency only."""
+    provider, model = llm_request.provider, llm_request.model
+    _REQUEST_DURATION.observe(execution_time_ms / 1000, provider, model, status)
+    if status == "cached":
+        return
+    if cost:
+        _REQUEST_COST.observe(cost, provider, model)
+        _COST.inc(cost, provider, model)
+    if input_tokens:
+        _TOKENS.inc(input_tokens, provider, model, "input")
+    if output_tokens:
+        _TOKENS.inc(output_tokens, provider, model, "output")
+
 
 class LLMProvider(ABC):
     """
@@ -48,6 +79,108 @@ class LLMProvider(ABC):
         self.config = config
         self.db_session = db_session
 
+    async def _call_with_rate_limit(
+        self,
+        model: str,
+        call: Callable[[], Awaitable[R]],
+        *,
+        estimated_tokens: int = 0,
+        max_retries: int | None = None,
+        should_retry: Callable[[BaseException], bool] | None = None,
+        usage_tokens: Callable[[R], int | None] | None = None,
+    ) -> R:
+        """
+        Run one provider request under the shared per-provider/model rate limiter.
+
+        Throttled (429) calls are retried after the provider's Retry-After hint;
+        other errors are retried only when ``should_retry`` accepts them.
+        """
+        if self.config.rate_limit_backend == "off" or self._batch_transport() is not None:
+            # Batched requests wait on the provider's batch queue, not interactive capacity
+            return await call()
+        limiter = get_rate_limiter(self.config, self.config.provider.value, model)
+        return await limiter.run(
+            call,
+            estimated_tokens=estimated_tokens,
+            max_retries=self.config.max_retries if max_retries is None else max_retries,
+            should_retry=should_retry,
+            usage_tokens=usage_tokens,
+        )
+
+    def batch_transport(self) -> BatchTransport | None:
+        """Transport for this provider's batch endpoint; None when it only serves interactive calls."""
+        return None
+
+    def _batch_transport(self) -> BatchTransport | None:
+        """Batch transport to use for this call, or None outside ``llm_batch_mode``."""
+        executor = current_batch_executor()
+        if executor is None:
+            return None
+        return executor.transport_for(self.config.provider.value, self.batch_transport)
+
+    async def _call_or_batch(self, endpoint: str, body: dict[str, Any], interactive: Callable[[], Awaitable[Any]]) -> tuple[Any, bool]:
+        """
+        Send ``body`` through the active batch executor, or make the interactive call.
+
+        Returns:
+            Tuple of (provider response, batched); batched responses are
+            attribute-accessible JSON bodies in the endpoint's response shape
+        """
+        executor = current_batch_executor()
+        transport = self._batch_transport()
+        if executor is None or transport is None:
+            return await interactive(), False
+        return await executor.submit(self.config.provider.value, transport, endpoint, body), True
+
+    def _rate_limit_slot(self, model: str, *, estimated_tokens: int = 0) -> contextlib.AbstractAsyncContextManager[Any]:
+        """Hold shared rate limit capacity around a request that is not retried (e.g. a stream)."""
+        if self.config.rate_limit_backend == "off":
+            return contextlib.nullcontext()
+        return get_rate_limiter(self.config, self.config.provider.value, model).slot(estimated_tokens)
+
+    async def _stream_with_accounting(
+        self,
+        messages: list[LLMMessage],
+        stream: AsyncIterator[LLMStreamChunk],
+        *,
+        user_id: int | None,
+        model: str,
+        temperature: float | None,
+        max_output_tokens: int | None,
+        estimated_tokens: int = 0,
+    ) -> AsyncIterator[LLMStreamChunk]:
+        """
+        Relay a provider stream while recording it in llm_requests.
+
+        ``stream`` yields text deltas followed by one chunk carrying the assembled
+        ``LLMResponse`` (content, token usage and cost). That response is persisted
+        once the stream completes and re-emitted with the request id as the final chunk.
+        """
+        llm_request = self._create_llm_request(messages=messages, user_id=user_id, model=model, temperature=temperature, max_output_tokens=max_output_tokens)
+        if llm_request.id is None:
+            raise LLMError("Failed to create LLM request record")
+
+        started = time.perf_counter()
+        final: LLMResponse | None = None
+        try:
+            async with contextlib.aclosing(stream), self._rate_limit_slot(model, estimated_tokens=estimated_tokens):
+                async for chunk in stream:
+                    if chunk.response is not None:
+                        final = chunk.response
+                    elif chunk.delta:
+                        yield chunk
+            if final is None:
+                raise LLMError("Stream ended before the provider reported completion")
+        except (Exception, asyncio.CancelledError, GeneratorExit) as exc:
+            # GeneratorExit/CancelledError: the consumer went away (e.g. the client disconnected)
+            self._update_llm_request_error(llm_request, exc if isinstance(exc, Exception) else LLMError("Stream cancelled by consumer"), int((time.perf_counter() - started) * 1000))
+            raise
+
+        final.response_time_ms = int((time.perf_counter() - started) * 1000)
+        final.response_created_at = final.response_created_at or datetime.now(UTC)
+        self._update_llm_request_success(llm_request, final, final.response_time_ms)
+        yield LLMStreamChunk(response=final, request_id=llm_request.id)
+
     def _create_llm_request(
         self,
         messages: list[LLMMessage],
@@ -100,6 +233,7 @@ class LLMProvider(ABC):
                 messages_payload.append(payload)
 
         llm_request = LLMRequestModel(
+            id=uuid.uuid4(),
             user_id=user_id,
             provider=self.config.provider.value,
             model=request_model,
@@ -109,12 +243,24 @@ class LLMProvider(ABC):
             created_at=datetime.now(UTC),
         )
 
+        # With write-behind auditing the row stays in memory until the call finishes
+        if self.config.audit_write_behind:
+            return llm_request
+
         self.db_session.add(llm_request)
         with contextlib.suppress(Exception):
             self.db_session.flush()
 
         return llm_request
 
+    def _persist_llm_request(self, llm_request: "LLMRequestModel") -> None:
+        """Persist a finished request record, queueing it for a batched insert when write-behind is enabled."""
+        if self.config.audit_write_behind and llm_request not in self.db_session and get_audit_recorder(self.config).submit(llm_request_row(llm_request)):
+            return
+        # Synchronous path, also the fallback when the write-behind queue is full
+        self.db_session.add(llm_request)
+        self.db_session.commit()
+
     def _update_llm_request_success(
         self,
         llm_request: "LLMRequestModel",
@@ -127,6 +273,8 @@ class LLMProvider(ABC):
         llm_request.tokens_used = response.tokens_used
         llm_request.input_tokens = response.input_tokens
         llm_request.output_tokens = response.output_tokens
+        llm_request.cached_input_tokens = response.cached_input_tokens
+        llm_request.cache_creation_tokens = response.cache_creation_tokens
         llm_request.cost_estimate = response.cost_estimate
         llm_request.execution_time_ms = execution_time_ms
         llm_request.status = "completed"
@@ -136,7 +284,31 @@ class LLMProvider(ABC):
         llm_request.response_output = response.response_output
         llm_request.response_created_at = response.response_created_at
 
-        self.db_session.commit()
+        _record_call(llm_request, "cached" if response.cached else "completed", execution_time_ms, response.cost_estimate, response.input_tokens, response.output_tokens)
+        self._persist_llm_request(llm_request)
+
+    def record_cached_response(
+        self,
+        messages: list[LLMMessage],
+        response: LLMResponse,
+        *,
+        user_id: int | None = None,
+        model: str | None = None,
+        temperature: float | None = None,
+        max_output_tokens: int | None = None,
+    ) -> uuid.UUID:
+        """
+        Persist an LLMRequest record for a response served from the response cache.
+
+        Returns:
+            ID of the new request record (marked ``cached=True``)
+        """
+        llm_request = self._create_llm_request(messages=messages, user_id=user_id, model=model, temperature=temperature, max_output_tokens=max_output_tokens)
+        if llm_request.id is None:
+            raise LLMError("Failed to create LLM request record")
+        response.cached = True
+        self._update_llm_request_success(llm_request, response, response.response_time_ms or 0)
+        return llm_request.id
 
     def _update_llm_request_error(
         self,
@@ -147,15 +319,17 @@ class LLMProvider(ABC):
     ) -> None:
         """Update LLMRequest record with error information."""
         # Ensure previous failed transaction is cleared
-        with contextlib.suppress(Exception):
-            self.db_session.rollback()
+        if not self.config.audit_write_behind:
+            with contextlib.suppress(Exception):
+                self.db_session.rollback()
         llm_request.status = "failed"
         llm_request.error_message = str(error)
         llm_request.error_type = type(error).__name__
         llm_request.execution_time_ms = execution_time_ms
         llm_request.retry_attempt = retry_attempt
 
-        self.db_session.commit()
+        _record_call(llm_request, "failed", execution_time_ms)
+        self._persist_llm_request(llm_request)
 
     def _update_image_request_success(
         self,
@@ -171,7 +345,8 @@ class LLMProvider(ABC):
         llm_request.execution_time_ms = execution_time_ms
         llm_request.status = "completed"
 
-        self.db_session.commit()
+        _record_call(llm_request, "completed", execution_time_ms, response.cost_estimate)
+        self._persist_llm_request(llm_request)
 
     def _update_audio_request_success(
         self,
@@ -188,7 +363,8 @@ class LLMProvider(ABC):
         llm_request.execution_time_ms = execution_time_ms
         llm_request.status = "completed"
 
-        self.db_session.commit()
+        _record_call(llm_request, "completed", execution_time_ms, response.cost_estimate)
+        self._persist_llm_request(llm_request)
 
     @abstractmethod
     async def generate_response(
@@ -234,6 +410,35 @@ class LLMProvider(ABC):
         """Default structured object generation. Provider may override."""
         raise NotImplementedError
 
+    async def stream_response(
+        self,
+        messages: list[LLMMessage],
+        user_id: int | None = None,
+        response_model: type[BaseModel] | None = None,
+        **kwargs: LLMProviderKwargs,
+    ) -> AsyncIterator[LLMStreamChunk]:
+        """Stream a completion as text deltas, ending with a chunk that carries the full response.
+
+        With ``response_model`` the streamed text is the JSON object for that model.
+
+        Note:
+            Providers with native streaming override this. The default runs a
+            regular request and yields the whole completion as a single delta.
+        """
+        if response_model is None:
+            response, request_id = await self.generate_response(messages, user_id=user_id, **kwargs)
+        else:
+            structured, request_id, usage = await self.generate_structured_object(messages, response_model, user_id=user_id, **kwargs)
+            response = LLMResponse(
+                content=structured.model_dump_json(),
+                provider=self.config.provider,
+                model=str(kwargs.get("model") or self.config.model),
+                tokens_used=usage.get("tokens_used"),
+                cost_estimate=usage.get("cost_estimate"),
+            )
+        yield LLMStreamChunk(delta=response.content)
+        yield LLMStreamChunk(response=response, request_id=request_id)
+
     @abstractmethod
     async def generate_image(
         self,
@@ -2,8 +2,7 @@
 
 from __future__ import annotations
 
-import asyncio
-from collections.abc import Iterable, Sequence
+from collections.abc import AsyncIterator, Iterable, Sequence
 from dataclasses import dataclass
 from datetime import UTC, datetime
 import importlib
@@ -15,6 +14,9 @@ import uuid
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
+from ...infrastructure.public import LLM_SDK_EXECUTOR, get_executor
+from ..batch import ANTHROPIC_MESSAGES_ENDPOINT, BATCH_COST_FACTOR, AnthropicBatchTransport, BatchTransport
+from ..clients import build_http_client, client_registry, config_fingerprint
 from ..config import LLMConfig
 from ..exceptions import (
     LLMAuthenticationError,
@@ -22,6 +24,8 @@ from ..exceptions import (
     LLMRateLimitError,
     LLMValidationError,
 )
+from ..rate_limit import estimate_tokens, retry_after_seconds
+from ..schema_registry import CLAUDE_DIALECT, get_schema_registry
 from ..types import (
     AudioGenerationRequest,
     AudioResponse,
@@ -30,6 +34,7 @@ from ..types import (
     LLMMessage,
     LLMProviderType,
     LLMResponse,
+    LLMStreamChunk,
     MessageRole,
     WebSearchResponse,
 )
@@ -92,6 +97,9 @@ class ClaudeRequestResult:
     provider_response_id: str | None
     stop_reason: str | None
     raw_response: Any
+    # Prompt-cache usage; ``input_tokens`` above counts only the uncached remainder
+    cache_read_tokens: int = 0
+    cache_creation_tokens: int = 0
 
 
 _CLAUDE_MODEL_CONFIGS: dict[str, ClaudeModelConfig] = {
@@ -124,6 +132,11 @@ _CLAUDE_MODEL_CONFIGS: dict[str, ClaudeModelConfig] = {
     ),
 }
 
+# Prompt-cache pricing relative to the base input rate
+_CACHE_READ_COST_FACTOR = 0.1
+_CACHE_WRITE_COST_FACTOR = 1.25
+_CACHE_CONTROL = {"type": "ephemeral"}
+
 
 __all__ = [
     "AnthropicProvider",
@@ -146,11 +159,12 @@ def get_claude_model_config(model: str) -> ClaudeModelConfig:
     return _CLAUDE_MODEL_CONFIGS[key]
 
 
-def estimate_claude_cost(model: str, input_tokens: int, output_tokens: int) -> float:
-    """Estimate Claude request cost based on token usage."""
+def estimate_claude_cost(model: str, input_tokens: int, output_tokens: int, cache_read_tokens: int = 0, cache_creation_tokens: int = 0) -> float:
+    """Estimate Claude request cost based on token usage (``input_tokens`` excludes prompt-cache reads and writes)."""
 
     config = get_claude_model_config(model)
-    input_cost = (input_tokens / 1_000_000) * config.input_cost_per_mtoken
+    billed_input = input_tokens + cache_read_tokens * _CACHE_READ_COST_FACTOR + cache_creation_tokens * _CACHE_WRITE_COST_FACTOR
+    input_cost = (billed_input / 1_000_000) * config.input_cost_per_mtoken
     output_cost = (output_tokens / 1_000_000) * config.output_cost_per_mtoken
     return round(input_cost + output_cost, 6)
 
@@ -187,8 +201,13 @@ def parse_claude_response(response_content: Any) -> str:
     return str(response_content)
 
 
-def convert_to_claude_messages(messages: list[LLMMessage]) -> tuple[str | None, list[dict[str, Any]]]:
-    """Convert internal LLM messages into Claude request payloads."""
+def convert_to_claude_messages(messages: list[LLMMessage], *, prompt_cache: bool = False) -> tuple[str | None, list[dict[str, Any]]]:
+    """
+    Convert internal LLM messages into Claude request payloads.
+
+    With ``prompt_cache`` a message marked ``cache_breakpoint`` gets a
+    ``cache_control`` breakpoint on its last content block.
+    """
 
     system_messages: list[str] = []
     claude_messages: list[dict[str, Any]] = []
@@ -204,6 +223,8 @@ def convert_to_claude_messages(messages: list[LLMMessage]) -> tuple[str | None,
             content_blocks.append({"type": "text", "text": message.content})
         if message.tool_calls:
             content_blocks.append({"type": "tool_result", "tool_calls": message.tool_calls})
+        if prompt_cache and message.cache_breakpoint and content_blocks:
+            content_blocks[-1] = {**content_blocks[-1], "cache_control": _CACHE_CONTROL}
         claude_messages.append({"role": role, "content": content_blocks})
 
     system_prompt = "\n\n".join(system_messages) if system_messages else None
@@ -232,6 +253,19 @@ def _to_serializable(obj: Any) -> Any:
     return str(obj)
 
 
+def _convert_anthropic_error(exc: Exception) -> LLMError:
+    """Map Anthropic SDK exceptions to module exceptions."""
+    if isinstance(exc, LLMError):
+        return exc
+    if isinstance(exc, AnthropIcAuthenticationError):
+        return LLMAuthenticationError(str(exc))
+    if isinstance(exc, AnthropIcRateLimitError):
+        return LLMRateLimitError(str(exc), retry_after=retry_after_seconds(exc))
+    if isinstance(exc, AnthropIcAPIError):
+        return LLMError(str(exc))
+    return LLMError(f"Anthropic request failed: {exc}")
+
+
 class ClaudeProviderBase(LLMProvider):
     """Shared helpers for Claude providers."""
 
@@ -246,13 +280,37 @@ class ClaudeProviderBase(LLMProvider):
         *,
         model_config: ClaudeModelConfig,
         messages: list[dict[str, Any]],
-        system_prompt: str | None,
+        system_prompt: str | list[dict[str, Any]] | None,
         max_tokens: int,
         temperature: float,
         response_format: dict[str, Any] | None = None,
     ) -> ClaudeRequestResult:
         raise NotImplementedError
 
+    def _prepare_prompt(self, messages: list[LLMMessage], response_model: type[BaseModel] | None) -> tuple[str | list[dict[str, Any]] | None, list[dict[str, Any]], dict[str, Any] | None]:
+        """Convert messages and, for structured output, add the JSON schema instructions."""
+        prompt_cache = self.config.prompt_cache_enabled
+        system_prompt, payload_messages = convert_to_claude_messages(messages, prompt_cache=prompt_cache)
+        # A prefix that ends in the system prompt is cached by marking the system block itself
+        cache_system = prompt_cache and bool(system_prompt) and any(message.cache_breakpoint for message in messages) and not any(message.cache_breakpoint for message in messages if message.role is not MessageRole.SYSTEM)
+        if response_model is None:
+            if cache_system:
+                return [{"type": "text", "text": system_prompt, "cache_control": _CACHE_CONTROL}], payload_messages, None
+            return system_prompt, payload_messages, None
+        compiled = get_schema_registry().compile(response_model, CLAUDE_DIALECT)
+        response_format = {
+            "type": "json_schema",
+            "json_schema": {
+                "name": compiled.name,
+                "schema": compiled.schema,
+            },
+        }
+        extra_system = "You must respond with a strict JSON object that matches the provided schema. Do not include any additional commentary or markdown."
+        if cache_system:
+            return [{"type": "text", "text": system_prompt, "cache_control": _CACHE_CONTROL}, {"type": "text", "text": extra_system}], payload_messages, response_format
+        system_prompt = f"{system_prompt}\n\n{extra_system}" if system_prompt else extra_system
+        return system_prompt, payload_messages, response_format
+
     async def _generate(
         self,
         messages: list[LLMMessage],
@@ -266,20 +324,8 @@ class ClaudeProviderBase(LLMProvider):
         temperature = kwargs.get("temperature", self.config.temperature)
         max_tokens = kwargs.get("max_output_tokens") or self.config.max_output_tokens or config.max_output_tokens
 
-        system_prompt, payload_messages = convert_to_claude_messages(messages)
-        if is_structured and response_model is not None:
-            schema = response_model.model_json_schema() if hasattr(response_model, "model_json_schema") else response_model.schema()
-            response_format = {
-                "type": "json_schema",
-                "json_schema": {
-                    "name": response_model.__name__,
-                    "schema": schema,
-                },
-            }
-            extra_system = "You must respond with a strict JSON object that matches the provided schema. Do not include any additional commentary or markdown."
-            system_prompt = f"{system_prompt}\n\n{extra_system}" if system_prompt else extra_system
-        else:
-            response_format = None
+        system_prompt, payload_messages, response_format = self._prepare_prompt(messages, response_model if is_structured else None)
+        batched = self._batch_transport() is not None
 
         llm_request = self._create_llm_request(
             messages=messages,
@@ -295,13 +341,18 @@ class ClaudeProviderBase(LLMProvider):
         start_time = datetime.now(UTC)
 
         try:
-            result = await self._execute_request(
-                model_config=config,
-                messages=payload_messages,
-                system_prompt=system_prompt,
-                max_tokens=max_tokens,
-                temperature=temperature,
-                response_format=response_format,
+            result = await self._call_with_rate_limit(
+                model_name,
+                lambda: self._execute_request(
+                    model_config=config,
+                    messages=payload_messages,
+                    system_prompt=system_prompt,
+                    max_tokens=max_tokens,
+                    temperature=temperature,
+                    response_format=response_format,
+                ),
+                estimated_tokens=estimate_tokens([system_prompt, payload_messages], max_tokens),
+                usage_tokens=lambda result: result.input_tokens + result.cache_read_tokens + result.cache_creation_tokens + result.output_tokens,
             )
         except Exception as exc:
             elapsed = int((datetime.now(UTC) - start_time).total_seconds() * 1000)
@@ -309,14 +360,17 @@ class ClaudeProviderBase(LLMProvider):
             raise
 
         response_time = int((datetime.now(UTC) - start_time).total_seconds() * 1000)
-        cost_estimate = estimate_claude_cost(config.name, result.input_tokens, result.output_tokens)
+        cost_estimate = estimate_claude_cost(config.name, result.input_tokens, result.output_tokens, result.cache_read_tokens, result.cache_creation_tokens)
+        if batched:
+            cost_estimate *= BATCH_COST_FACTOR
+        total_input_tokens = result.input_tokens + result.cache_read_tokens + result.cache_creation_tokens
 
         llm_response = LLMResponse(
             content=result.text,
             provider=self.provider_type,
             model=model_name,
-            tokens_used=result.input_tokens + result.output_tokens,
-            input_tokens=result.input_tokens,
+            tokens_used=total_input_tokens + result.output_tokens,
+            input_tokens=total_input_tokens,
             output_tokens=result.output_tokens,
             cost_estimate=cost_estimate,
             response_time_ms=response_time,
@@ -325,6 +379,8 @@ class ClaudeProviderBase(LLMProvider):
             response_created_at=datetime.now(UTC),
             finish_reason=result.stop_reason,
             response_output=result.raw_response if is_structured else None,
+            cached_input_tokens=result.cache_read_tokens,
+            cache_creation_tokens=result.cache_creation_tokens,
         )
 
         self._update_llm_request_success(llm_request, llm_response, response_time)
@@ -348,7 +404,7 @@ class ClaudeProviderBase(LLMProvider):
 
                 logger.info(f"Parsing structured response (length: {len(text_to_parse)}, first 200 chars): {text_to_parse[:200]}")
                 parsed_payload = json.loads(text_to_parse)
-                structured_obj = response_model(**parsed_payload)
+                structured_obj = get_schema_registry().compile(response_model, CLAUDE_DIALECT).validate(parsed_payload)
             except json.JSONDecodeError as exc:
                 logger.error(f"Failed to parse JSON. Raw text: {result.text[:500]}")
                 raise LLMValidationError(f"Claude response was not valid JSON: {exc}") from exc
@@ -439,18 +495,28 @@ class AnthropicProvider(ClaudeProviderBase):
             api_key = self.config.anthropic_api_key or self.config.api_key
             if not api_key:
                 raise LLMAuthenticationError("Anthropic API key is not configured")
+            anthropic_client = AsyncAnthropic
             try:
-                self._client = AsyncAnthropic(api_key=api_key, timeout=self.config.timeout, max_retries=self.config.max_retries)
+                self._client = client_registry.get_or_create(
+                    ("anthropic", config_fingerprint(api_key), self.config.timeout),
+                    # Retries happen in the shared rate limiter so 429s reach its cooldown and AIMD window
+                    lambda: anthropic_client(api_key=api_key, timeout=self.config.timeout, max_retries=0, http_client=build_http_client(self.config)),
+                    close=lambda client: client.close(),
+                )
             except Exception as exc:  # pragma: no cover - network failure
                 raise LLMAuthenticationError(f"Failed to initialize Anthropic client: {exc}") from exc
         return self._client
 
+    def batch_transport(self) -> BatchTransport | None:
+        """Submit Messages API calls through Anthropic Message Batches."""
+        return AnthropicBatchTransport(self._ensure_client())
+
     async def _execute_request(
         self,
         *,
         model_config: ClaudeModelConfig,
         messages: list[dict[str, Any]],
-        system_prompt: str | None,
+        system_prompt: str | list[dict[str, Any]] | None,
         max_tokens: int,
         temperature: float,
         response_format: dict[str, Any] | None = None,
@@ -469,15 +535,9 @@ class AnthropicProvider(ClaudeProviderBase):
             request_params["response_format"] = response_format
 
         try:
-            response = await client.messages.create(**request_params)
-        except AnthropIcAuthenticationError as exc:
-            raise LLMAuthenticationError(str(exc)) from exc
-        except AnthropIcRateLimitError as exc:
-            raise LLMRateLimitError(str(exc)) from exc
-        except AnthropIcAPIError as exc:
-            raise LLMError(str(exc)) from exc
-        except Exception as exc:  # pragma: no cover - defensive
-            raise LLMError(f"Anthropic request failed: {exc}") from exc
+            response, _ = await self._call_or_batch(ANTHROPIC_MESSAGES_ENDPOINT, request_params, lambda: client.messages.create(**request_params))
+        except Exception as exc:
+            raise _convert_anthropic_error(exc) from exc
 
         usage = getattr(response, "usage", None)
         input_tokens = getattr(usage, "input_tokens", None) or 0
@@ -493,8 +553,89 @@ class AnthropicProvider(ClaudeProviderBase):
             provider_response_id=getattr(response, "id", None),
             stop_reason=stop_reason,
             raw_response=_to_serializable(response),
+            cache_read_tokens=int(getattr(usage, "cache_read_input_tokens", None) or 0),
+            cache_creation_tokens=int(getattr(usage, "cache_creation_input_tokens", None) or 0),
         )
 
+    async def stream_response(
+        self,
+        messages: list[LLMMessage],
+        user_id: int | None = None,
+        response_model: type[BaseModel] | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[LLMStreamChunk]:
+        """Stream a Messages API completion, yielding text deltas as they arrive."""
+
+        model_name = (kwargs.get("model") or self.config.model).strip()
+        config = get_claude_model_config(model_name)
+        temperature = kwargs.get("temperature", self.config.temperature)
+        max_tokens = kwargs.get("max_output_tokens") or self.config.max_output_tokens or config.max_output_tokens
+        system_prompt, payload_messages, response_format = self._prepare_prompt(messages, response_model)
+
+        request_params: dict[str, Any] = {
+            "model": config.anthropic_id,
+            "max_tokens": max_tokens,
+            "messages": payload_messages,
+            "temperature": temperature,
+            "stream": True,
+        }
+        if system_prompt:
+            request_params["system"] = system_prompt
+        if response_format is not None:
+            request_params["response_format"] = response_format
+
+        async def _events() -> AsyncIterator[LLMStreamChunk]:
+            client = self._ensure_client()
+            parts: list[str] = []
+            input_tokens = output_tokens = cache_read_tokens = cache_creation_tokens = 0
+            response_id: str | None = None
+            stop_reason: str | None = None
+            try:
+                stream = await client.messages.create(**request_params)
+                async for event in stream:
+                    event_type = getattr(event, "type", "")
+                    if event_type == "message_start":
+                        response_id = getattr(event.message, "id", None)
+                        usage = getattr(event.message, "usage", None)
+                        input_tokens = int(getattr(usage, "input_tokens", 0) or 0)
+                        cache_read_tokens = int(getattr(usage, "cache_read_input_tokens", 0) or 0)
+                        cache_creation_tokens = int(getattr(usage, "cache_creation_input_tokens", 0) or 0)
+                    elif event_type == "content_block_delta" and getattr(event.delta, "type", "") == "text_delta":
+                        parts.append(event.delta.text)
+                        yield LLMStreamChunk(delta=event.delta.text)
+                    elif event_type == "message_delta":
+                        stop_reason = getattr(event.delta, "stop_reason", None) or stop_reason
+                        output_tokens = int(getattr(getattr(event, "usage", None), "output_tokens", 0) or output_tokens)
+            except Exception as exc:
+                raise _convert_anthropic_error(exc) from exc
+
+            yield LLMStreamChunk(
+                response=LLMResponse(
+                    content="".join(parts),
+                    provider=self.provider_type,
+                    model=model_name,
+                    tokens_used=input_tokens + cache_read_tokens + cache_creation_tokens + output_tokens,
+                    input_tokens=input_tokens + cache_read_tokens + cache_creation_tokens,
+                    output_tokens=output_tokens,
+                    cost_estimate=estimate_claude_cost(config.name, input_tokens, output_tokens, cache_read_tokens, cache_creation_tokens),
+                    provider_response_id=response_id,
+                    finish_reason=stop_reason,
+                    cached_input_tokens=cache_read_tokens,
+                    cache_creation_tokens=cache_creation_tokens,
+                )
+            )
+
+        async for chunk in self._stream_with_accounting(
+            messages,
+            _events(),
+            user_id=user_id,
+            model=model_name,
+            temperature=temperature,
+            max_output_tokens=max_tokens,
+            estimated_tokens=estimate_tokens([system_prompt, payload_messages], max_tokens),
+        ):
+            yield chunk
+
 
 class BedrockProvider(ClaudeProviderBase):
     """Claude provider implementation using AWS Bedrock."""
@@ -513,16 +654,17 @@ class BedrockProvider(ClaudeProviderBase):
                 "region_name": self.config.aws_region or "us-west-2",
             }
 
-            # Configure adaptive retry mode for better throttling handling
+            # Keep botocore retries short: sustained throttling must surface to the shared
+            # rate limiter so every worker backs off together
             if BotocoreConfig is not None:
                 retry_config = BotocoreConfig(
                     retries={
-                        "max_attempts": 10,  # More retry attempts for throttling
-                        "mode": "adaptive",  # Adaptive mode learns from throttling patterns
+                        "max_attempts": 2,
+                        "mode": "adaptive",  # Adaptive mode smooths brief bursts within one client
                     }
                 )
                 client_kwargs["config"] = retry_config
-                logger.info("Bedrock client configured with adaptive retry mode (max 10 attempts)")
+                logger.info("Bedrock client configured with adaptive retry mode (max 2 attempts)")
 
             if self.config.aws_access_key_id and self.config.aws_secret_access_key:
                 client_kwargs["aws_access_key_id"] = self.config.aws_access_key_id
@@ -530,7 +672,13 @@ class BedrockProvider(ClaudeProviderBase):
             if self.config.aws_session_token:
                 client_kwargs["aws_session_token"] = self.config.aws_session_token
             try:
-                self._client = _boto3.client("bedrock-runtime", **client_kwargs)
+                # boto3 clients are thread-safe and not tied to an event loop, so one is shared process-wide
+                self._client = client_registry.get_or_create(
+                    ("bedrock", config_fingerprint(*sorted((k, str(v)) for k, v in client_kwargs.items()))),
+                    lambda: _boto3.client("bedrock-runtime", **client_kwargs),
+                    close=lambda client: client.close(),
+                    loop_bound=False,
+                )
             except Exception as exc:  # pragma: no cover - network failure
                 raise LLMAuthenticationError(f"Failed to initialize Bedrock client: {exc}") from exc
         return self._client
@@ -540,7 +688,7 @@ class BedrockProvider(ClaudeProviderBase):
         *,
         model_config: ClaudeModelConfig,
         messages: list[dict[str, Any]],
-        system_prompt: str | None,
+        system_prompt: str | list[dict[str, Any]] | None,
         max_tokens: int,
         temperature: float,
         response_format: dict[str, Any] | None = None,  # noqa: ARG002
@@ -565,7 +713,7 @@ class BedrockProvider(ClaudeProviderBase):
 
         async def _invoke() -> dict[str, Any]:
             try:
-                response = await asyncio.to_thread(
+                response = await get_executor(LLM_SDK_EXECUTOR).run(
                     client.invoke_model,
                     modelId=model_id,
                     contentType="application/json",
@@ -630,4 +778,6 @@ class BedrockProvider(ClaudeProviderBase):
             provider_response_id=provider_response_id,
             stop_reason=stop_reason,
             raw_response=result_payload,
+            cache_read_tokens=int(usage.get("cache_read_input_tokens") or usage.get("cacheReadInputTokens") or 0),
+            cache_creation_tokens=int(usage.get("cache_creation_input_tokens") or usage.get("cacheWriteInputTokens") or 0),
         )
@@ -11,6 +11,7 @@ from .claude import AnthropicProvider, BedrockProvider
 from .gemini import GeminiProvider
 from .openai import OpenAIProvider
 from .openrouter import OpenRouterProvider
+from .replay import ReplayProvider
 
 __all__ = ["LLMProviderError", "create_llm_provider"]
 
@@ -48,6 +49,8 @@ def create_llm_provider(config: LLMConfig, db_session: Session) -> LLMProvider:
         return GeminiProvider(config, db_session)
     if config.provider == LLMProviderType.OPENROUTER:
         return OpenRouterProvider(config, db_session)
+    if config.provider == LLMProviderType.REPLAY:
+        return ReplayProvider(config, db_session)
     else:
         raise LLMProviderError(f"Unsupported provider: {config.provider}")
 
@@ -66,4 +69,5 @@ def get_available_providers() -> list[LLMProviderType]:
         LLMProviderType.BEDROCK,
         LLMProviderType.GEMINI,
         LLMProviderType.OPENROUTER,
+        LLMProviderType.REPLAY,
     ]
@@ -3,11 +3,13 @@
 from __future__ import annotations
 
 import asyncio
-from collections.abc import Mapping
+from collections.abc import AsyncIterator, Mapping
 import contextlib
 from datetime import UTC, datetime
 import json
 import logging
+import re
+import time
 from typing import Any
 import uuid
 
@@ -19,8 +21,10 @@ except Exception:  # pragma: no cover - guard when httpx is missing
     httpx = None  # type: ignore[assignment]
     _HTTPX_AVAILABLE = False
 
+from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
+from ..clients import client_registry, config_fingerprint
 from ..config import LLMConfig
 from ..exceptions import (
     LLMAuthenticationError,
@@ -29,6 +33,11 @@ from ..exceptions import (
     LLMTimeoutError,
     LLMValidationError,
 )
+from ..prompt_cache import ContextCacheHandle, context_cache_registry, prefix_fingerprint, split_at_cache_breakpoint
+from ..rate_limit import estimate_tokens, retry_after_seconds
+from ..schema_registry import GEMINI_DIALECT, get_schema_registry
+from ..streaming import iter_sse_data
+from ..tokenizer import count_message_tokens
 from ..types import (
     AudioGenerationRequest,
     AudioResponse,
@@ -37,6 +46,7 @@ from ..types import (
     LLMMessage,
     LLMProviderType,
     LLMResponse,
+    LLMStreamChunk,
     MessageRole,
     ToolCall,
     ToolDefinition,
@@ -71,6 +81,15 @@ _GEMINI_PRICING: Mapping[str, tuple[float, float]] = {
     "gemini-2.5-computer-use-preview": (1.25, 10.00),
 }
 
+# Cached context input is billed at a quarter of the input rate (storage is billed separately)
+_GEMINI_CACHED_INPUT_COST_FACTOR = 0.25
+# Smallest prefix (tokens) Gemini accepts for an explicit context cache, by model family
+_GEMINI_CONTEXT_CACHE_MIN_TOKENS: tuple[tuple[str, int], ...] = (("-pro", 4096),)
+_GEMINI_CONTEXT_CACHE_DEFAULT_MIN_TOKENS = 1024
+# How Gemini rejects a cachedContent that expired, was deleted or belongs to another key
+_GEMINI_CONTEXT_CACHE_ERROR_STATUSES = frozenset({400, 403, 404})
+_GEMINI_CONTEXT_CACHE_ERROR = re.compile(r"cached?\s*content", re.IGNORECASE)
+
 __all__ = ["GeminiProvider"]
 
 
@@ -96,7 +115,18 @@ class GeminiProvider(LLMProvider):
         payload: dict[str, Any],
         endpoint: str = "generateContent",
     ) -> dict[str, Any]:
-        """Send a POST request to the Gemini API and return JSON payload."""
+        """Send a POST request to the Gemini API through the shared rate limiter and return JSON payload."""
+
+        max_output_tokens = (payload.get("generationConfig") or {}).get("maxOutputTokens")
+        return await self._call_with_rate_limit(
+            model,
+            lambda: self._post_once(model, payload, endpoint),
+            estimated_tokens=estimate_tokens(payload.get("contents"), max_output_tokens),
+            usage_tokens=lambda data: (data.get("usageMetadata") or {}).get("totalTokenCount"),
+        )
+
+    async def _post_once(self, model: str, payload: dict[str, Any], endpoint: str) -> dict[str, Any]:
+        """Send a single POST request to the Gemini API."""
 
         if httpx is None:  # pragma: no cover - defensive guard
             raise LLMAuthenticationError("httpx is not available in this environment")
@@ -104,24 +134,14 @@ class GeminiProvider(LLMProvider):
         url = f"{self._base_url}/models/{model}:{endpoint}"
         params = {"key": self.config.api_key}
 
-        # Explicitly set all timeout components to prevent httpx defaults from causing silent 30s timeouts
-        timeout = (
-            httpx.Timeout(
-                connect=30.0,  # 30s to establish connection
-                read=self.config.timeout,  # Full timeout for reading response
-                write=30.0,  # 30s to send request body
-                pool=30.0,  # 30s to get connection from pool
-            )
-            if isinstance(self.config.timeout, int | float)
-            else self.config.timeout
-        )
+        timeout = self._http_timeout()
 
         self._logger.warning(f"🔍 GEMINI TIMEOUT CONFIG: config.timeout={self.config.timeout}, httpx timeout={timeout}")
 
         try:
-            async with httpx.AsyncClient(timeout=timeout) as client:
-                response = await client.post(url, params=params, json=payload)
-                response.raise_for_status()
+            client = client_registry.http_client(self.config, name="gemini", timeout=timeout)
+            response = await client.post(url, params=params, json=payload)
+            response.raise_for_status()
         except httpx.HTTPStatusError as exc:  # pragma: no cover - http failure
             raise self._convert_http_error(exc) from exc
         except httpx.TimeoutException as exc:  # pragma: no cover - timeout
@@ -135,6 +155,18 @@ class GeminiProvider(LLMProvider):
         except ValueError as exc:  # pragma: no cover - unexpected payload
             raise LLMError("Gemini returned a non-JSON response") from exc
 
+    def _http_timeout(self) -> Any:
+        """Explicitly set all timeout components to prevent httpx defaults from causing silent 30s timeouts."""
+
+        if not isinstance(self.config.timeout, int | float):
+            return self.config.timeout
+        return httpx.Timeout(
+            connect=30.0,  # 30s to establish connection
+            read=self.config.timeout,  # Full timeout for reading response
+            write=30.0,  # 30s to send request body
+            pool=30.0,  # 30s to get connection from pool
+        )
+
     def _convert_http_error(self, exc: httpx.HTTPStatusError) -> Exception:
         """Map HTTP status codes to module-specific exceptions."""
 
@@ -142,7 +174,7 @@ class GeminiProvider(LLMProvider):
         if status in {401, 403}:
             return LLMAuthenticationError("Gemini API rejected the request. Check GEMINI_API_KEY permissions.")
         if status == 429:
-            return LLMRateLimitError("Gemini rate limit exceeded")
+            return LLMRateLimitError("Gemini rate limit exceeded", retry_after=retry_after_seconds(exc))
         if status in {408, 504}:
             return LLMTimeoutError("Gemini request timed out")
         if status in {400, 422}:
@@ -312,23 +344,107 @@ class GeminiProvider(LLMProvider):
         """Extract token usage from Gemini response.
 
         Returns: (total_tokens, input_tokens, output_tokens)
-        Note: Gemini also provides cache stats in usageMetadata.cachedContentInputTokens
-              and usageMetadata.cacheCreationInputTokens if prompt caching is enabled.
+        Note: prompt-cache stats are read separately by ``_extract_cache_usage``.
         """
         usage = response.get("usageMetadata") or {}
         input_tokens = usage.get("promptTokenCount")
         output_tokens = usage.get("candidatesTokenCount")
         total_tokens = usage.get("totalTokenCount")
 
-        # Log cache stats if available (for visibility in logs)
-        cached_input_tokens = usage.get("cachedContentInputTokens")
+        if total_tokens is None and (input_tokens is not None or output_tokens is not None):
+            total_tokens = (input_tokens or 0) + (output_tokens or 0)
+        return total_tokens, input_tokens, output_tokens
+
+    def _extract_cache_usage(self, response: Mapping[str, Any]) -> tuple[int | None, int | None]:
+        """Extract (cached_input_tokens, cache_creation_tokens) from ``usageMetadata``; cached tokens are part of ``promptTokenCount``."""
+        usage = response.get("usageMetadata") or {}
+        cached_input_tokens = usage.get("cachedContentTokenCount") or usage.get("cachedContentInputTokens")
         cache_creation_tokens = usage.get("cacheCreationInputTokens")
         if cached_input_tokens or cache_creation_tokens:
             self._logger.debug(f"Gemini cache stats - cached_input: {cached_input_tokens}, cache_creation: {cache_creation_tokens}")
+        return cached_input_tokens, cache_creation_tokens
 
-        if total_tokens is None and (input_tokens is not None or output_tokens is not None):
-            total_tokens = (input_tokens or 0) + (output_tokens or 0)
-        return total_tokens, input_tokens, output_tokens
+    # ---------------------------------------------------------------------
+    # Context caching
+    # ---------------------------------------------------------------------
+    async def _apply_context_cache(self, model: str, messages: list[LLMMessage], payload: dict[str, Any]) -> dict[str, Any]:
+        """
+        Serve the marked prompt prefix from a ``cachedContents`` resource.
+
+        Returns the payload unchanged when nothing is marked, the prefix is
+        below the model's caching minimum, or the cache cannot be created.
+        """
+        if not self.config.prompt_cache_enabled:
+            return payload
+        prefix, remainder = split_at_cache_breakpoint(messages)
+        # The cached content must carry the whole system instruction, and something must follow it
+        if not prefix or not remainder or any(message.role is MessageRole.SYSTEM for message in remainder):
+            return payload
+        min_tokens = next((tokens for marker, tokens in _GEMINI_CONTEXT_CACHE_MIN_TOKENS if marker in model), _GEMINI_CONTEXT_CACHE_DEFAULT_MIN_TOKENS)
+        if count_message_tokens(prefix, model) < min_tokens:
+            return payload
+
+        handle = await context_cache_registry.get_or_create(self._context_cache_key(model, prefix), lambda: self._create_cached_content(model, prefix))
+        if handle is None:
+            return payload
+
+        _, contents = self._convert_messages(remainder)
+        cached_payload = {name: value for name, value in payload.items() if name not in {"contents", "systemInstruction"}}
+        cached_payload["contents"] = contents
+        cached_payload["cachedContent"] = handle.name
+        return cached_payload
+
+    def _context_cache_key(self, model: str, prefix: list[LLMMessage]) -> tuple[Any, ...]:
+        return ("gemini", self._base_url, config_fingerprint(self.config.api_key), model, prefix_fingerprint(prefix))
+
+    def _drop_rejected_context_cache(self, model: str, messages: list[LLMMessage], payload: dict[str, Any], response: Any) -> bool:
+        """Invalidate the context cache ``payload`` used if ``response`` rejects it; True when the call should be retried uncached."""
+        name = payload.get("cachedContent")
+        if not name or response is None or response.status_code not in _GEMINI_CONTEXT_CACHE_ERROR_STATUSES or not _GEMINI_CONTEXT_CACHE_ERROR.search(response.text):
+            return False
+        prefix, _ = split_at_cache_breakpoint(messages)
+        context_cache_registry.invalidate(self._context_cache_key(model, prefix), name)
+        self._logger.warning(f"Gemini rejected context cache {name}; retrying without it")
+        return True
+
+    async def _post_with_context_cache(self, model: str, messages: list[LLMMessage], payload: dict[str, Any]) -> tuple[dict[str, Any], dict[str, Any]]:
+        """POST ``payload`` with its marked prefix served from the context cache; returns (payload sent, response)."""
+        cached_payload = await self._apply_context_cache(model, messages, payload)
+        try:
+            return cached_payload, await self._post(model, cached_payload)
+        except LLMError as exc:
+            cause = exc.__cause__
+            # A cache that expired or was deleted server-side is re-created by the next call; this one goes uncached
+            if not (_HTTPX_AVAILABLE and isinstance(cause, httpx.HTTPStatusError) and self._drop_rejected_context_cache(model, messages, cached_payload, cause.response)):
+                raise
+        return payload, await self._post(model, payload)
+
+    async def _create_cached_content(self, model: str, prefix: list[LLMMessage]) -> ContextCacheHandle:
+        """Create a ``cachedContents`` resource holding the prompt prefix."""
+        system_instruction, contents = self._convert_messages(prefix)
+        body: dict[str, Any] = {"model": f"models/{model}", "contents": contents, "ttl": f"{self.config.prompt_cache_ttl_seconds}s"}
+        if system_instruction:
+            body["systemInstruction"] = {"role": "system", "parts": [{"text": system_instruction}]}
+
+        client = client_registry.http_client(self.config, name="gemini", timeout=self._http_timeout())
+        try:
+            response = await client.post(f"{self._base_url}/cachedContents", params={"key": self.config.api_key}, json=body)
+            response.raise_for_status()
+        except httpx.HTTPStatusError as exc:
+            raise self._convert_http_error(exc) from exc
+        data = response.json()
+        name = data["name"]
+        expires_at = self._parse_timestamp(data.get("expireTime"))
+        self._logger.info(f"Created Gemini context cache {name} for {model} ({(data.get('usageMetadata') or {}).get('totalTokenCount')} tokens)")
+
+        async def _delete() -> None:
+            await client_registry.http_client(self.config, name="gemini", timeout=self._http_timeout()).delete(f"{self._base_url}/{name}", params={"key": self.config.api_key})
+
+        return ContextCacheHandle(
+            name=name,
+            expires_at=expires_at.timestamp() if expires_at else time.time() + self.config.prompt_cache_ttl_seconds,
+            delete=_delete,
+        )
 
     def _parse_timestamp(self, value: Any) -> datetime | None:
         if not value:
@@ -343,50 +459,6 @@ class GeminiProvider(LLMProvider):
                 return None
         return None
 
-    def _flatten_json_schema(self, schema: dict[str, Any]) -> dict[str, Any]:
-        """Transform Pydantic JSON schema into Gemini-compatible format.
-
-        Gemini's responseSchema doesn't support JSON Schema $ref or $defs.
-        This method inlines all definitions and removes unsupported fields.
-        """
-        # Inline $defs into the schema
-        defs = schema.pop("$defs", {})
-
-        def resolve_refs(obj: Any) -> Any:
-            """Recursively resolve $ref references."""
-            if isinstance(obj, dict):
-                # If this object has a $ref, replace it with the definition
-                if "$ref" in obj:
-                    ref_path = obj["$ref"]
-                    # Extract definition name from #/$defs/DefinitionName
-                    if ref_path.startswith("#/$defs/"):
-                        def_name = ref_path.split("/")[-1]
-                        if def_name in defs:
-                            return resolve_refs(defs[def_name])
-                    return obj
-
-                # Otherwise, recursively process all values
-                return {k: resolve_refs(v) for k, v in obj.items()}
-            elif isinstance(obj, list):
-                return [resolve_refs(item) for item in obj]
-            else:
-                return obj
-
-        # Resolve all references
-        flattened = resolve_refs(schema)
-
-        # Remove JSON Schema meta fields that Gemini doesn't support
-        def remove_meta_fields(obj: Any) -> Any:
-            """Remove $schema, $defs, and other meta fields."""
-            if isinstance(obj, dict):
-                return {k: remove_meta_fields(v) for k, v in obj.items() if not k.startswith("$") and k not in {"examples", "default"}}
-            elif isinstance(obj, list):
-                return [remove_meta_fields(item) for item in obj]
-            else:
-                return obj
-
-        return remove_meta_fields(flattened)
-
     # ------------------------------------------------------------------
     # Text and structured generation
     # ------------------------------------------------------------------
@@ -421,19 +493,14 @@ class GeminiProvider(LLMProvider):
                 extra_generation,
                 payload_overrides,
             )
-
-            response_data = await self._post(model, payload)
+            payload, response_data = await self._post_with_context_cache(model, messages, payload)
 
             content, response_parts = self._extract_text_response(response_data)
             total_tokens, input_tokens, output_tokens = self._extract_usage(response_data)
-            cost_estimate = self.estimate_cost(input_tokens or 0, output_tokens or 0, model)
+            cached_input_tokens, cache_creation_tokens = self._extract_cache_usage(response_data)
+            cost_estimate = self.estimate_cost(input_tokens or 0, output_tokens or 0, model, cached_tokens=cached_input_tokens or 0)
             created_at = self._parse_timestamp(response_data.get("createTime"))
 
-            # Extract cache token information if available
-            usage = response_data.get("usageMetadata") or {}
-            cached_input_tokens = usage.get("cachedContentInputTokens")
-            cache_creation_tokens = usage.get("cacheCreationInputTokens")
-
             llm_response = LLMResponse(
                 content=content,
                 provider=LLMProviderType.GEMINI,
@@ -443,7 +510,7 @@ class GeminiProvider(LLMProvider):
                 output_tokens=output_tokens,
                 cost_estimate=cost_estimate,
                 response_time_ms=int((datetime.now(UTC) - start_time).total_seconds() * 1000),
-                cached=cached_input_tokens is not None and cached_input_tokens > 0,
+                cached=False,
                 provider_response_id=response_data.get("responseId"),
                 response_output=response_parts,
                 response_created_at=created_at,
@@ -474,6 +541,91 @@ class GeminiProvider(LLMProvider):
                 raise
             raise LLMError(f"Gemini text generation failed: {exc}") from exc
 
+    async def stream_response(
+        self,
+        messages: list[LLMMessage],
+        user_id: int | None = None,
+        response_model: type[BaseModel] | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[LLMStreamChunk]:
+        """Stream a completion through ``streamGenerateContent`` server-sent events."""
+
+        model = kwargs.pop("model", None) or self.config.model
+        temperature = kwargs.pop("temperature", None)
+        max_output_tokens = kwargs.pop("max_output_tokens", None)
+        extra_generation, payload_overrides = self._split_generation_kwargs(kwargs)
+        if response_model is not None:
+            extra_generation[self._map_generation_config_key("response_mime_type")] = "application/json"
+            extra_generation["responseSchema"] = get_schema_registry().compile(response_model, GEMINI_DIALECT).schema
+        uncached_payload = self._build_payload(messages, temperature, max_output_tokens, extra_generation, payload_overrides)
+        payload = await self._apply_context_cache(model, messages, uncached_payload)
+
+        async def _events() -> AsyncIterator[LLMStreamChunk]:
+            if httpx is None:  # pragma: no cover - defensive guard
+                raise LLMAuthenticationError("httpx is not available in this environment")
+
+            url = f"{self._base_url}/models/{model}:streamGenerateContent"
+            parts: list[str] = []
+            last_event: dict[str, Any] = {}
+            request_payload = payload
+            try:
+                client = client_registry.http_client(self.config, name="gemini", timeout=self._http_timeout())
+                while True:
+                    async with client.stream("POST", url, params={"key": self.config.api_key, "alt": "sse"}, json=request_payload) as response:
+                        if response.is_error:
+                            await response.aread()
+                            if request_payload is not uncached_payload and self._drop_rejected_context_cache(model, messages, request_payload, response):
+                                request_payload = uncached_payload
+                                continue
+                            response.raise_for_status()
+                        async for data in iter_sse_data(response.aiter_lines()):
+                            event = json.loads(data)
+                            last_event = event
+                            for candidate in event.get("candidates") or []:
+                                for part in (candidate.get("content") or {}).get("parts") or []:
+                                    text_value = part.get("text") if isinstance(part, dict) else None
+                                    if text_value:
+                                        parts.append(text_value)
+                                        yield LLMStreamChunk(delta=text_value)
+                    break
+            except httpx.HTTPStatusError as exc:
+                raise self._convert_http_error(exc) from exc
+            except httpx.TimeoutException as exc:
+                raise LLMTimeoutError(f"Gemini request timed out: {exc}") from exc
+            except httpx.RequestError as exc:
+                raise LLMError(f"Gemini request failed: {exc}") from exc
+            except json.JSONDecodeError as exc:
+                raise LLMError("Gemini returned a malformed stream event") from exc
+
+            total_tokens, input_tokens, output_tokens = self._extract_usage(last_event)
+            cached_input_tokens, cache_creation_tokens = self._extract_cache_usage(last_event)
+            yield LLMStreamChunk(
+                response=LLMResponse(
+                    content="".join(parts),
+                    provider=LLMProviderType.GEMINI,
+                    model=model,
+                    tokens_used=total_tokens,
+                    input_tokens=input_tokens,
+                    output_tokens=output_tokens,
+                    cached_input_tokens=cached_input_tokens,
+                    cache_creation_tokens=cache_creation_tokens,
+                    cost_estimate=self.estimate_cost(input_tokens or 0, output_tokens or 0, model, cached_tokens=cached_input_tokens or 0),
+                    provider_response_id=last_event.get("responseId"),
+                    finish_reason=next((candidate.get("finishReason") for candidate in last_event.get("candidates") or []), None),
+                )
+            )
+
+        async for chunk in self._stream_with_accounting(
+            messages,
+            _events(),
+            user_id=user_id,
+            model=model,
+            temperature=temperature,
+            max_output_tokens=max_output_tokens,
+            estimated_tokens=estimate_tokens(payload.get("contents"), max_output_tokens),
+        ):
+            yield chunk
+
     async def generate_structured_object(
         self,
         messages: list[LLMMessage],
@@ -488,13 +640,13 @@ class GeminiProvider(LLMProvider):
         extra_generation, payload_overrides = self._split_generation_kwargs(kwargs)
         extra_generation[self._map_generation_config_key("response_mime_type")] = "application/json"
 
-        # Add JSON schema to constrain structured output (Gemini 2.0+ support)
+        # Add JSON schema to constrain structured output (Gemini 2.0+ support); the
+        # Gemini-compatible form (no $ref, $defs, etc.) is compiled once per model
+        compiled = None
         try:
-            schema = response_model.model_json_schema()
-            # Transform to Gemini-compatible format (no $ref, $defs, etc.)
-            flattened_schema = self._flatten_json_schema(schema)
-            extra_generation["responseSchema"] = flattened_schema
-            self._logger.debug(f"Using JSON schema for structured output: {response_model.__name__}")
+            compiled = get_schema_registry().compile(response_model, GEMINI_DIALECT)
+            extra_generation["responseSchema"] = compiled.schema
+            self._logger.debug(f"Using JSON schema for structured output: {compiled.name}")
         except (AttributeError, TypeError) as exc:  # pragma: no cover
             self._logger.warning(f"Could not extract schema from response model: {exc}")
 
@@ -517,15 +669,14 @@ class GeminiProvider(LLMProvider):
                 extra_generation,
                 payload_overrides,
             )
-
-            response_data = await self._post(model, payload)
+            payload, response_data = await self._post_with_context_cache(model, messages, payload)
             content, response_parts = self._extract_text_response(response_data)
             if not content:
                 raise LLMValidationError("Gemini returned an empty structured response")
 
             try:
                 parsed_payload = json.loads(content)
-                structured_obj = response_model(**parsed_payload)
+                structured_obj = compiled.validate(parsed_payload) if compiled is not None else response_model(**parsed_payload)
             except json.JSONDecodeError as exc:
                 # Log the problematic content for debugging
                 self._logger.error(f"JSON parse error at char {exc.pos}: {exc.msg}")
@@ -544,7 +695,7 @@ class GeminiProvider(LLMProvider):
                         if json_end > json_start:
                             content = content[json_start:json_end].strip()
                             parsed_payload = json.loads(content)
-                            structured_obj = response_model(**parsed_payload)
+                            structured_obj = compiled.validate(parsed_payload) if compiled is not None else response_model(**parsed_payload)
                     except (json.JSONDecodeError, ValueError):
                         pass  # Fall through to main error below
                 else:
@@ -555,7 +706,7 @@ class GeminiProvider(LLMProvider):
                         if json_start >= 0 and json_end > json_start:
                             content = content[json_start : json_end + 1]
                             parsed_payload = json.loads(content)
-                            structured_obj = response_model(**parsed_payload)
+                            structured_obj = compiled.validate(parsed_payload) if compiled is not None else response_model(**parsed_payload)
                     except (json.JSONDecodeError, ValueError):
                         pass  # Fall through to main error below
 
@@ -565,14 +716,10 @@ class GeminiProvider(LLMProvider):
                 raise LLMValidationError(f"Failed to validate Gemini response model: {exc}") from exc
 
             total_tokens, input_tokens, output_tokens = self._extract_usage(response_data)
-            cost_estimate = self.estimate_cost(input_tokens or 0, output_tokens or 0, model)
+            cached_input_tokens, cache_creation_tokens = self._extract_cache_usage(response_data)
+            cost_estimate = self.estimate_cost(input_tokens or 0, output_tokens or 0, model, cached_tokens=cached_input_tokens or 0)
             created_at = self._parse_timestamp(response_data.get("createTime"))
 
-            # Extract cache token information if available
-            usage = response_data.get("usageMetadata") or {}
-            cached_input_tokens = usage.get("cachedContentInputTokens")
-            cache_creation_tokens = usage.get("cacheCreationInputTokens")
-
             llm_response = LLMResponse(
                 content=content,
                 provider=LLMProviderType.GEMINI,
@@ -582,7 +729,7 @@ class GeminiProvider(LLMProvider):
                 output_tokens=output_tokens,
                 cost_estimate=cost_estimate,
                 response_time_ms=int((datetime.now(UTC) - start_time).total_seconds() * 1000),
-                cached=cached_input_tokens is not None and cached_input_tokens > 0,
+                cached=False,
                 provider_response_id=response_data.get("responseId"),
                 response_output=response_parts,
                 response_created_at=created_at,
@@ -667,14 +814,10 @@ class GeminiProvider(LLMProvider):
 
             content, response_parts = self._extract_text_response(response_data)
             total_tokens, input_tokens, output_tokens = self._extract_usage(response_data)
-            cost_estimate = self.estimate_cost(input_tokens or 0, output_tokens or 0, model)
+            cached_input_tokens, cache_creation_tokens = self._extract_cache_usage(response_data)
+            cost_estimate = self.estimate_cost(input_tokens or 0, output_tokens or 0, model, cached_tokens=cached_input_tokens or 0)
             created_at = self._parse_timestamp(response_data.get("createTime"))
 
-            # Extract cache token information if available
-            usage = response_data.get("usageMetadata") or {}
-            cached_input_tokens = usage.get("cachedContentInputTokens")
-            cache_creation_tokens = usage.get("cacheCreationInputTokens")
-
             # Extract tool calls if present
             tool_calls: list[ToolCall] | None = None
             candidates = response_data.get("candidates") or []
@@ -703,7 +846,7 @@ class GeminiProvider(LLMProvider):
                 output_tokens=output_tokens,
                 cost_estimate=cost_estimate,
                 response_time_ms=int((datetime.now(UTC) - start_time).total_seconds() * 1000),
-                cached=cached_input_tokens is not None and cached_input_tokens > 0,
+                cached=False,
                 provider_response_id=response_data.get("responseId"),
                 response_output=response_parts,
                 response_created_at=created_at,
@@ -927,7 +1070,9 @@ class GeminiProvider(LLMProvider):
         prompt_tokens: int,
         completion_tokens: int,
         model: str | None = None,
+        cached_tokens: int = 0,
     ) -> float:
+        """Estimate token cost; ``cached_tokens`` (part of ``prompt_tokens``) are billed at the context-cache rate."""
         model_name = (model or self.config.model).lower()
         if model_name.endswith("-image"):
             # Flat fee per generated image handled elsewhere; return marginal token cost
@@ -942,6 +1087,7 @@ class GeminiProvider(LLMProvider):
             best_match = "gemini-2.5-flash"
 
         input_cost, output_cost = _GEMINI_PRICING.get(best_match, (0.30, 2.50))
-        prompt_component = (prompt_tokens / 1_000_000) * input_cost
+        cached_tokens = min(cached_tokens, prompt_tokens)
+        prompt_component = ((prompt_tokens - cached_tokens + cached_tokens * _GEMINI_CACHED_INPUT_COST_FACTOR) / 1_000_000) * input_cost
         completion_component = (completion_tokens / 1_000_000) * output_cost
         return round(prompt_component + completion_component, 6)
@@ -1,7 +1,7 @@
 """OpenAI provider implementation."""
 
-import asyncio
 import base64
+from collections.abc import AsyncIterator
 import contextlib
 from datetime import UTC, datetime
 import importlib
@@ -38,7 +38,8 @@ except Exception:
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
-from ..cache import LLMCache
+from ..batch import BATCH_COST_FACTOR, OPENAI_RESPONSES_ENDPOINT, BatchTransport, OpenAIBatchTransport
+from ..clients import build_http_client, client_registry, config_fingerprint
 from ..config import LLMConfig
 from ..exceptions import (
     LLMAuthenticationError,
@@ -47,6 +48,9 @@ from ..exceptions import (
     LLMTimeoutError,
     LLMValidationError,
 )
+from ..prompt_cache import prefix_fingerprint
+from ..rate_limit import estimate_tokens
+from ..schema_registry import OPENAI_DIALECT, get_schema_registry
 from ..types import (
     AudioGenerationRequest,
     AudioResponse,
@@ -54,6 +58,7 @@ from ..types import (
     ImageResponse,
     LLMMessage,
     LLMResponse,
+    LLMStreamChunk,
     MessageRole,
     WebSearchResponse,
 )
@@ -66,6 +71,9 @@ T = TypeVar("T", bound=BaseModel)
 
 __all__ = ["OpenAIProvider"]
 
+# GPT-5 family cached input tokens cost a tenth of the input rate
+_CACHED_INPUT_COST_FACTOR = 0.1
+
 
 class OpenAIProvider(LLMProvider):
     """
@@ -79,44 +87,51 @@ class OpenAIProvider(LLMProvider):
         """Initialize the OpenAI provider with configuration and database session."""
         super().__init__(config, db_session)
 
-        self._cache: LLMCache | None = None
-
-        # Initialize cache if enabled
-        try:
-            self._cache = LLMCache(
-                cache_dir=self.config.cache_dir,
-                enabled=self.config.cache_enabled,
-            )
-        except Exception:
-            # Cache should never block provider initialization
-            self._cache = None
-
+        self._client_override: Any | None = None
         self._setup_client()
-        # Client typing
-        self.client: Any
 
     def _setup_client(self) -> None:
-        """Setup OpenAI client based on configuration."""
+        """Validate the OpenAI SDK setup; the pooled client itself is resolved lazily per event loop."""
+        if not _OPENAI_AVAILABLE or (AsyncOpenAI is None and AsyncAzureOpenAI is None):
+            raise LLMAuthenticationError("Failed to setup OpenAI client: OpenAI SDK is not installed. Please install 'openai' package to use this provider.")
+
+    @property
+    def client(self) -> Any:
+        """OpenAI SDK client shared by every provider instance with the same configuration."""
+        if self._client_override is not None:
+            return self._client_override
         try:
-            if not _OPENAI_AVAILABLE or (AsyncOpenAI is None and AsyncAzureOpenAI is None):
-                raise LLMAuthenticationError("OpenAI SDK is not installed. Please install 'openai' package to use this provider.")
-            if self.config.provider.value == "azure_openai":
-                assert AsyncAzureOpenAI is not None
-                self.client = cast(Any, AsyncAzureOpenAI)(
-                    api_key=self.config.api_key,
-                    base_url=self.config.base_url,
-                    timeout=self.config.timeout,
-                )
-            else:
-                assert AsyncOpenAI is not None
-                self.client = cast(Any, AsyncOpenAI)(
-                    api_key=self.config.api_key,
-                    base_url=self.config.base_url,
-                    timeout=self.config.timeout,
-                )
+            return client_registry.get_or_create(
+                ("openai", self.config.provider.value, self.config.base_url, config_fingerprint(self.config.api_key), self.config.timeout),
+                self._build_client,
+                close=lambda client: client.close(),
+            )
         except Exception as e:
             raise LLMAuthenticationError(f"Failed to setup OpenAI client: {e}") from e
 
+    @client.setter
+    def client(self, value: Any) -> None:
+        self._client_override = value
+
+    def _build_client(self) -> Any:
+        """Create an SDK client backed by a pooled, keep-alive tuned HTTP client."""
+        sdk_client = AsyncAzureOpenAI if self.config.provider.value == "azure_openai" else AsyncOpenAI
+        assert sdk_client is not None
+        return cast(Any, sdk_client)(
+            api_key=self.config.api_key,
+            base_url=self.config.base_url,
+            timeout=self.config.timeout,
+            # Retries happen in the shared rate limiter so 429s reach its cooldown and AIMD window
+            max_retries=0,
+            http_client=build_http_client(self.config),
+        )
+
+    def batch_transport(self) -> BatchTransport | None:
+        """Submit Responses API calls through the OpenAI Batch API (Azure deployments excluded)."""
+        if self.config.provider.value == "azure_openai":
+            return None
+        return OpenAIBatchTransport(self.client)
+
     @staticmethod
     def _normalize_voice(voice: str) -> str:
         """Normalize friendly voice labels to OpenAI-supported voice values.
@@ -218,25 +233,18 @@ class OpenAIProvider(LLMProvider):
 
         return content, output, usage
 
-    async def _handle_cached_response(
-        self,
-        messages: list[LLMMessage],
-        llm_request: Any,
-        start_time: datetime,
-        **kwargs: Any,
-    ) -> LLMResponse | None:
-        """Check cache for existing response."""
-        cache = getattr(self, "_cache", None)
-        if self.config.cache_enabled and cache is not None:
-            cached_response = await cache.get(messages, **kwargs)
-            if cached_response:
-                self._update_llm_request_success(
-                    llm_request,
-                    cached_response,
-                    int((datetime.now(UTC) - start_time).total_seconds() * 1000),
-                )
-                return cast(LLMResponse | None, cached_response)
-        return None
+    @staticmethod
+    def _cached_input_tokens(usage: Any) -> int | None:
+        """Input tokens served from OpenAI's prompt cache (``usage.input_tokens_details.cached_tokens``)."""
+        details = getattr(usage, "input_tokens_details", None) if usage else None
+        cached_tokens = getattr(details, "cached_tokens", None)
+        return cached_tokens if isinstance(cached_tokens, int) else None
+
+    def _apply_prompt_cache_key(self, request_params: dict[str, Any], messages: list[LLMMessage]) -> None:
+        """Route requests sharing a marked prompt prefix to the same OpenAI prompt cache."""
+        fingerprint = prefix_fingerprint(messages) if self.config.prompt_cache_enabled else None
+        if fingerprint:
+            request_params["prompt_cache_key"] = fingerprint
 
     def _prepare_gpt5_request_params(
         self,
@@ -281,6 +289,7 @@ class OpenAIProvider(LLMProvider):
             if param in kwargs:
                 request_params[param] = kwargs[param]
 
+        self._apply_prompt_cache_key(request_params, messages)
         logger.debug(f"GPT-5 request params: {list(request_params.keys())}")
         return request_params
 
@@ -313,11 +322,6 @@ class OpenAIProvider(LLMProvider):
                 raise LLMError("Failed to create LLM request record")
             request_id: uuid.UUID = llm_request.id
 
-            # Check cache first (if enabled)
-            cached_response = await self._handle_cached_response(messages, llm_request, start_time, **kwargs)
-            if cached_response:
-                return cached_response, request_id
-
             # Validate model and prepare GPT-5 request
             model = kwargs.get("model", self.config.model) or self.config.model
             self._validate_gpt5_model(model)
@@ -347,13 +351,9 @@ class OpenAIProvider(LLMProvider):
                 input_messages = self._convert_messages_to_gpt5_input(messages)
                 llm_request.request_payload = {"model": model, "input": input_messages}
 
-            # Make API call with retry logic
+            # Make API call with retry logic (or queue it for the active batch)
             logger.info("⏳ Making GPT-5 API call...")
-            responses_client = getattr(self.client, "responses", None)
-            create_method = getattr(responses_client, "create", None)
-            if not callable(create_method):
-                raise LLMError("OpenAI Responses API is not available in this environment")
-            response = await self._make_api_call_with_retry(lambda: create_method(**request_params))
+            response, batched = await self._call_or_batch(OPENAI_RESPONSES_ENDPOINT, request_params, lambda: self._create_response(request_params, model))
             logger.info("✅ GPT-5 API call completed")
 
             # Parse GPT-5 response
@@ -366,7 +366,10 @@ class OpenAIProvider(LLMProvider):
 
             # Calculate cost estimate
             # Estimate cost using input/output tokens if available
-            cost_estimate = self.estimate_cost(input_tokens or 0, output_tokens or 0, model)
+            cached_input_tokens = self._cached_input_tokens(usage)
+            cost_estimate = self.estimate_cost(input_tokens or 0, output_tokens or 0, model, cached_tokens=cached_input_tokens or 0)
+            if batched:
+                cost_estimate *= BATCH_COST_FACTOR
 
             # Create response object
             # Convert provider created timestamp to datetime if available
@@ -384,6 +387,7 @@ class OpenAIProvider(LLMProvider):
                 tokens_used=tokens_used,
                 input_tokens=input_tokens,
                 output_tokens=output_tokens,
+                cached_input_tokens=cached_input_tokens,
                 cost_estimate=cost_estimate,
                 response_time_ms=int((datetime.now(UTC) - start_time).total_seconds() * 1000),
                 cached=False,
@@ -393,11 +397,6 @@ class OpenAIProvider(LLMProvider):
                 response_created_at=created_dt,
             )
 
-            # Cache response (if enabled)
-            cache = getattr(self, "_cache", None)
-            if self.config.cache_enabled and cache is not None:
-                await cache.set(messages, llm_response, **kwargs)
-
             # Update database record
             self._update_llm_request_success(
                 llm_request,
@@ -422,32 +421,74 @@ class OpenAIProvider(LLMProvider):
             # Convert to appropriate LLM exception
             raise self._convert_exception(e) from e
 
-    def _fix_schema_for_structured_outputs(self, schema: dict[str, Any]) -> dict[str, Any]:
-        """Fix JSON schema to be compatible with OpenAI structured outputs."""
-
-        def fix_object_schema(obj: dict[str, Any]) -> dict[str, Any]:
-            """Recursively fix object schemas to include additionalProperties: false."""
-            if isinstance(obj, dict):
-                # Fix current object
-                if obj.get("type") == "object":
-                    obj["additionalProperties"] = False
-
-                # Recursively fix nested objects
-                for key, value in obj.items():
-                    if isinstance(value, dict):
-                        obj[key] = fix_object_schema(value)
-                    elif isinstance(value, list):
-                        obj[key] = [fix_object_schema(item) if isinstance(item, dict) else item for item in value]
-
-            return obj
-
-        fixed_schema = fix_object_schema(schema.copy())
+    async def stream_response(
+        self,
+        messages: list[LLMMessage],
+        user_id: int | None = None,
+        response_model: type[BaseModel] | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[LLMStreamChunk]:
+        """
+        Stream a Responses API completion, yielding output text deltas as they arrive.
 
-        # Also ensure the root object has additionalProperties: false
-        if fixed_schema.get("type") == "object":
-            fixed_schema["additionalProperties"] = False
+        With ``response_model`` the request uses native Structured Outputs and the
+        deltas are the JSON text of the object.
+        """
+        kwargs_clean = kwargs.copy()
+        model = kwargs_clean.pop("model", None) or self.config.model
+        self._validate_gpt5_model(model)
+        request_params = self._prepare_gpt5_request_params(messages, model, **kwargs_clean) if response_model is None else self._prepare_structured_request_params(messages, response_model, model, **kwargs_clean)
 
-        return fixed_schema
+        async def _events() -> AsyncIterator[LLMStreamChunk]:
+            try:
+                stream = await self.client.responses.create(**request_params, stream=True)
+                async for event in stream:
+                    event_type = getattr(event, "type", "")
+                    if event_type == "response.output_text.delta":
+                        yield LLMStreamChunk(delta=event.delta)
+                    elif event_type in {"response.completed", "response.incomplete"}:
+                        yield LLMStreamChunk(response=self._response_from_stream(event.response, model))
+                    elif event_type == "response.failed":
+                        error = getattr(event.response, "error", None)
+                        raise LLMError(f"OpenAI stream failed: {getattr(error, 'message', None) or 'unknown error'}")
+                    elif event_type == "error":
+                        raise LLMError(f"OpenAI stream error: {getattr(event, 'message', None) or 'unknown error'}")
+            except LLMError:
+                raise
+            except Exception as e:
+                raise self._convert_exception(e) from e
+
+        logger.info(f"🤖 Starting streamed {model} request - Messages: {len(messages)}")
+        async for chunk in self._stream_with_accounting(
+            messages,
+            _events(),
+            user_id=user_id,
+            model=model,
+            temperature=kwargs.get("temperature"),
+            max_output_tokens=kwargs.get("max_output_tokens"),
+            estimated_tokens=estimate_tokens(request_params.get("input"), request_params.get("max_output_tokens")),
+        ):
+            yield chunk
+
+    def _response_from_stream(self, response: Any, model: str) -> LLMResponse:
+        """Build an LLMResponse from the final Response object of a stream."""
+        content, output, usage = self._parse_gpt5_response(response)
+        input_tokens = getattr(usage, "input_tokens", None) if usage else None
+        output_tokens = getattr(usage, "output_tokens", None) if usage else None
+        cached_input_tokens = self._cached_input_tokens(usage)
+        return LLMResponse(
+            content=content,
+            provider=self.config.provider,
+            model=model,
+            tokens_used=getattr(usage, "total_tokens", None) if usage else None,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            cached_input_tokens=cached_input_tokens,
+            cost_estimate=self.estimate_cost(input_tokens or 0, output_tokens or 0, model, cached_tokens=cached_input_tokens or 0),
+            provider_response_id=getattr(response, "id", None),
+            response_output=self._to_jsonable(output) if output is not None else None,
+            finish_reason=getattr(response, "status", None),
+        )
 
     def _prepare_structured_request_params(
         self,
@@ -457,12 +498,11 @@ class OpenAIProvider(LLMProvider):
         **kwargs: Any,
     ) -> dict[str, Any]:
         """Prepare request parameters for structured outputs."""
-        schema = response_model.model_json_schema()
-        # Fix schema for OpenAI structured outputs compatibility
-        schema = self._fix_schema_for_structured_outputs(schema)
+        # Strict-mode schema is compiled once per response model
+        compiled = get_schema_registry().compile(response_model, OPENAI_DIALECT)
         input_messages = self._convert_messages_to_gpt5_input(messages)
 
-        request_params = {"model": model, "input": input_messages, "text": {"format": {"type": "json_schema", "name": response_model.__name__.lower(), "schema": schema, "strict": True}}}
+        request_params = {"model": model, "input": input_messages, "text": {"format": {"type": "json_schema", "name": compiled.name.lower(), "schema": compiled.schema, "strict": True}}}
 
         # Add GPT-5 specific parameters for structured outputs
         if "reasoning" in kwargs:
@@ -487,6 +527,7 @@ class OpenAIProvider(LLMProvider):
             if param in kwargs:
                 request_params[param] = kwargs[param]
 
+        self._apply_prompt_cache_key(request_params, messages)
         return request_params
 
     def _validate_structured_response(self, response: Any) -> None:
@@ -536,18 +577,6 @@ class OpenAIProvider(LLMProvider):
                 raise LLMError("Failed to create LLM request record")
             request_id: uuid.UUID = llm_request.id
 
-            # Check cache first (if enabled)
-            cached_response = await self._handle_cached_response(messages, llm_request, start_time, **kwargs)
-            if cached_response:
-                # Parse cached response into structured object
-                try:
-                    json_data = json.loads(cached_response.content)
-                    structured_obj = response_model(**json_data)
-                    usage_info = {"tokens_used": cached_response.tokens_used or 0, "cost_estimate": cached_response.cost_estimate or 0.0}
-                    return structured_obj, request_id, usage_info
-                except (json.JSONDecodeError, ValueError) as e:
-                    logger.warning(f"Cached response not valid JSON, proceeding with new request: {e}")
-
             # Use OpenAI's native structured outputs
             # Remove model from kwargs to avoid duplicate parameter
             kwargs_clean = kwargs.copy()
@@ -555,15 +584,20 @@ class OpenAIProvider(LLMProvider):
             request_params = self._prepare_structured_request_params(messages, response_model, model, **kwargs_clean)
             logger.info(f"🤖 Starting structured {model} request using native Structured Outputs")
 
-            # Try using responses.parse if available (newer SDK versions)
-            responses_client = getattr(self.client, "responses", None)
+            # Try using responses.parse if available (newer SDK versions); batches carry the raw text.format body
+            batching = self._batch_transport() is not None
+            responses_client = None if batching else getattr(self.client, "responses", None)
             parse_method = getattr(responses_client, "parse", None)
             if callable(parse_method):
                 # Use the native SDK parsing method
                 # For responses.parse(), we use text_format instead of text.format
                 parse_params = request_params.copy()
                 parse_params.pop("text", None)  # Remove text.format for responses.parse()
-                response = await cast(Any, parse_method)(**parse_params, text_format=response_model)
+                response = await self._make_api_call_with_retry(
+                    lambda: cast(Any, parse_method)(**parse_params, text_format=response_model),
+                    model=model,
+                    estimated_tokens=estimate_tokens(parse_params.get("input"), parse_params.get("max_output_tokens")),
+                )
 
                 # Extract the parsed object directly
                 if hasattr(response, "output_parsed") and response.output_parsed is not None:
@@ -574,7 +608,8 @@ class OpenAIProvider(LLMProvider):
                     tokens_used = getattr(usage, "total_tokens", None) if usage else None
                     input_tokens = getattr(usage, "input_tokens", None) if usage else None
                     output_tokens = getattr(usage, "output_tokens", None) if usage else None
-                    cost_estimate = self.estimate_cost(input_tokens or 0, output_tokens or 0, model)
+                    cached_input_tokens = self._cached_input_tokens(usage)
+                    cost_estimate = self.estimate_cost(input_tokens or 0, output_tokens or 0, model, cached_tokens=cached_input_tokens or 0)
 
                     llm_response = LLMResponse(
                         content=json.dumps(structured_obj.model_dump() if hasattr(structured_obj, "model_dump") else structured_obj),
@@ -583,6 +618,7 @@ class OpenAIProvider(LLMProvider):
                         tokens_used=tokens_used,
                         input_tokens=input_tokens,
                         output_tokens=output_tokens,
+                        cached_input_tokens=cached_input_tokens,
                         cost_estimate=cost_estimate,
                         response_time_ms=int((datetime.now(UTC) - start_time).total_seconds() * 1000),
                         cached=False,
@@ -590,19 +626,15 @@ class OpenAIProvider(LLMProvider):
                         system_fingerprint=getattr(response, "system_fingerprint", None),
                     )
 
-                    # Update database and cache
+                    # Update database record
                     self._update_llm_request_success(llm_request, llm_response, llm_response.response_time_ms or 0)
 
-                    cache = getattr(self, "_cache", None)
-                    if self.config.cache_enabled and cache is not None:
-                        await cache.set(messages, llm_response, **kwargs)
-
                     logger.info(f"🎉 Structured response completed using native parsing - Tokens: {tokens_used or 0}")
                     usage_info = {"tokens_used": tokens_used or 0, "cost_estimate": cost_estimate}
                     return structured_obj, request_id, usage_info
 
             # Fallback to manual API call with structured outputs
-            response = await self._make_api_call_with_retry(lambda: self.client.responses.create(**request_params))
+            response, batched = await self._call_or_batch(OPENAI_RESPONSES_ENDPOINT, request_params, lambda: self._create_response(request_params, model))
 
             # Handle potential refusals and errors
             self._validate_structured_response(response)
@@ -617,13 +649,16 @@ class OpenAIProvider(LLMProvider):
                 raise LLMValidationError("LLM returned empty response for structured output")
 
             json_data = json.loads(content_to_parse)
-            structured_obj = response_model(**json_data)
+            structured_obj = get_schema_registry().compile(response_model, OPENAI_DIALECT).validate(json_data)
 
             # Create LLMResponse for tracking
             tokens_used = getattr(usage, "total_tokens", None) if usage else None
             input_tokens = getattr(usage, "input_tokens", None) if usage else None
             output_tokens = getattr(usage, "output_tokens", None) if usage else None
-            cost_estimate = self.estimate_cost(input_tokens or 0, output_tokens or 0, model)
+            cached_input_tokens = self._cached_input_tokens(usage)
+            cost_estimate = self.estimate_cost(input_tokens or 0, output_tokens or 0, model, cached_tokens=cached_input_tokens or 0)
+            if batched:
+                cost_estimate *= BATCH_COST_FACTOR
 
             llm_response = LLMResponse(
                 content=content_to_parse,
@@ -632,6 +667,7 @@ class OpenAIProvider(LLMProvider):
                 tokens_used=tokens_used,
                 input_tokens=input_tokens,
                 output_tokens=output_tokens,
+                cached_input_tokens=cached_input_tokens,
                 cost_estimate=cost_estimate,
                 response_time_ms=int((datetime.now(UTC) - start_time).total_seconds() * 1000),
                 cached=False,
@@ -644,11 +680,6 @@ class OpenAIProvider(LLMProvider):
             # Update database record
             self._update_llm_request_success(llm_request, llm_response, llm_response.response_time_ms or 0)
 
-            # Cache response
-            cache = getattr(self, "_cache", None)
-            if self.config.cache_enabled and cache is not None:
-                await cache.set(messages, llm_response, **kwargs)
-
             logger.info(f"🎉 Structured object parsed successfully: {type(structured_obj).__name__}")
             usage_info = {"tokens_used": tokens_used or 0, "cost_estimate": cost_estimate}
             return structured_obj, request_id, usage_info
@@ -707,7 +738,7 @@ class OpenAIProvider(LLMProvider):
                 request_params["style"] = request.style
 
             # Make API call with retry logic
-            response = await self._make_api_call_with_retry(lambda: self.client.images.generate(**request_params))
+            response = await self._make_api_call_with_retry(lambda: self.client.images.generate(**request_params), model=self.config.image_model)
 
             # Extract response data
             image_data = response.data[0]
@@ -793,7 +824,7 @@ class OpenAIProvider(LLMProvider):
             if not callable(create_method):
                 raise LLMError("OpenAI audio synthesis API does not expose a create() method")
 
-            response = await cast(Any, create_method)(**request_kwargs)
+            response = await self._make_api_call_with_retry(lambda: cast(Any, create_method)(**request_kwargs), model=resolved_model)
 
             audio_payload = getattr(response, "content", None)
             if isinstance(audio_payload, bytes | bytearray):
@@ -873,6 +904,7 @@ class OpenAIProvider(LLMProvider):
         prompt_tokens: int,
         completion_tokens: int,
         model: str | None = None,
+        cached_tokens: int = 0,
     ) -> float:
         """Estimate cost from hardcoded GPT-5 family pricing (as of Sep 2025).
 
@@ -880,6 +912,8 @@ class OpenAIProvider(LLMProvider):
         - gpt-5: input $1.25, output $10.00
         - gpt-5-mini: input $0.25, output $2.00
         - gpt-5-nano: input $0.05, output $0.40
+
+        ``cached_tokens`` (part of ``prompt_tokens``) are billed at the cached-input rate.
         """
         model_name = (model or self.config.model).lower()
 
@@ -900,7 +934,8 @@ class OpenAIProvider(LLMProvider):
             best_key = "gpt-5-mini"
 
         input_rate, output_rate = pricing_map[best_key]
-        input_cost = (prompt_tokens / 1000000.0) * input_rate
+        cached_tokens = min(cached_tokens, prompt_tokens)
+        input_cost = ((prompt_tokens - cached_tokens + cached_tokens * _CACHED_INPUT_COST_FACTOR) / 1000000.0) * input_rate
         output_cost = (completion_tokens / 1000000.0) * output_rate
         return input_cost + output_cost
 
@@ -960,31 +995,36 @@ class OpenAIProvider(LLMProvider):
         estimated_minutes = len(words) / 165  # Approximate spoken words per minute
         return max(1, math.ceil(estimated_minutes * 60))
 
-    async def _make_api_call_with_retry(self, api_call_func: Any) -> Any:
-        """Make API call with retry logic for rate limits and transient errors."""
-        last_exception = None
+    async def _create_response(self, request_params: dict[str, Any], model: str) -> Any:
+        """Call the interactive Responses API under the shared rate limiter."""
+        responses_client = getattr(self.client, "responses", None)
+        create_method = getattr(responses_client, "create", None)
+        if not callable(create_method):
+            raise LLMError("OpenAI Responses API is not available in this environment")
+        return await self._make_api_call_with_retry(lambda: create_method(**request_params), model=model, estimated_tokens=estimate_tokens(request_params.get("input"), request_params.get("max_output_tokens")))
 
-        for attempt in range(self.config.max_retries + 1):
-            try:
-                return await api_call_func()
-            except Exception as e:
-                last_exception = e
-
-                # Check if we should retry
-                if attempt < self.config.max_retries and self._should_retry(e):
-                    wait_time = self._calculate_backoff(attempt)
-                    logger.warning(f"API call failed (attempt {attempt + 1}), retrying in {wait_time}s: {e}")
-                    await asyncio.sleep(wait_time)
-                    continue
-
-                # Don't retry or max retries reached
-                break
-
-        # All retries failed
-        if last_exception is not None:
+    async def _make_api_call_with_retry(self, api_call_func: Any, *, model: str | None = None, estimated_tokens: int = 0) -> Any:
+        """Make API call through the shared rate limiter, retrying rate limits and transient errors."""
+        try:
+            return await self._call_with_rate_limit(
+                model or self.config.model,
+                api_call_func,
+                estimated_tokens=estimated_tokens,
+                should_retry=self._should_retry,
+                usage_tokens=self._usage_tokens,
+            )
+        except LLMError:
+            raise
+        except Exception as e:
             # Convert to LLMError subtype for consistency
-            raise self._convert_exception(last_exception)
-        raise LLMError("Unknown error during OpenAI API call")
+            raise self._convert_exception(e) from e
+
+    @staticmethod
+    def _usage_tokens(response: Any) -> int | None:
+        """Total tokens reported by a Responses API result, used to settle TPM reservations."""
+        usage = getattr(response, "usage", None)
+        total = getattr(usage, "total_tokens", None) if usage is not None else None
+        return total if isinstance(total, int) else None
 
     def _should_retry(self, exception: Any) -> bool:
         """Determine if an exception should trigger a retry."""
@@ -1004,13 +1044,6 @@ class OpenAIProvider(LLMProvider):
 
         return False
 
-    def _calculate_backoff(self, attempt: int) -> float:
-        """Calculate exponential backoff time."""
-        base_delay = 1.0
-        max_delay = 60.0
-        delay = base_delay * (2**attempt)
-        return cast(float, min(delay, max_delay))
-
     def _convert_exception(self, exception: Any) -> LLMError:
         """Convert OpenAI exceptions to LLM exceptions."""
         # Use imported symbols or fallbacks
@@ -2,6 +2,7 @@
 
 from __future__ import annotations
 
+from collections.abc import AsyncIterator
 from datetime import UTC, datetime
 import json
 import logging
@@ -19,6 +20,7 @@ except Exception:  # pragma: no cover - dependency missing
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
+from ..clients import client_registry
 from ..config import LLMConfig
 from ..exceptions import (
     LLMAuthenticationError,
@@ -28,6 +30,9 @@ from ..exceptions import (
     LLMValidationError,
 )
 from ..models import LLMRequestModel
+from ..rate_limit import estimate_tokens
+from ..schema_registry import OPENROUTER_DIALECT, get_schema_registry
+from ..streaming import iter_sse_data
 from ..types import (
     AudioGenerationRequest,
     AudioResponse,
@@ -36,6 +41,7 @@ from ..types import (
     LLMMessage,
     LLMProviderType,
     LLMResponse,
+    LLMStreamChunk,
     WebSearchResponse,
 )
 from .base import LLMProvider
@@ -113,6 +119,72 @@ class OpenRouterProvider(LLMProvider):
                 raise
             raise LLMError(f"OpenRouter request failed: {exc}") from exc
 
+    async def stream_response(
+        self,
+        messages: list[LLMMessage],
+        user_id: int | None = None,
+        response_model: type[BaseModel] | None = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[LLMStreamChunk]:
+        """Stream a chat completion from OpenRouter as server-sent events."""
+
+        request_kwargs = dict(kwargs)
+        model = request_kwargs.get("model", self.config.model)
+        request_kwargs["model"] = model
+        payload = self._build_payload(messages, model, request_kwargs, response_model=response_model)
+        payload["stream"] = True
+        payload["usage"] = {"include": True}
+
+        async def _events() -> AsyncIterator[LLMStreamChunk]:
+            if httpx is None:  # pragma: no cover - defensive guard
+                raise LLMAuthenticationError("httpx is required to use the OpenRouter provider")
+
+            parts: list[str] = []
+            final: dict[str, Any] = {}
+            finish_reason: str | None = None
+            try:
+                client = client_registry.http_client(self.config, name="openrouter", timeout=self._timeout)
+                async with client.stream("POST", f"{self._base_url}{_OPENROUTER_CHAT_COMPLETIONS_PATH}", json=payload, headers=self._headers()) as response:
+                    if response.status_code >= 400:
+                        await response.aread()
+                        self._raise_for_status(response)
+                    async for data in iter_sse_data(response.aiter_lines()):
+                        if data == "[DONE]":
+                            break
+                        event = json.loads(data)
+                        if event.get("error"):
+                            raise LLMError(str((event["error"] or {}).get("message") or event["error"]))
+                        final.update({key: event[key] for key in ("id", "created", "usage", "cost", "system_fingerprint") if event.get(key) is not None})
+                        for choice in event.get("choices") or []:
+                            finish_reason = choice.get("finish_reason") or finish_reason
+                            delta = (choice.get("delta") or {}).get("content")
+                            if delta:
+                                parts.append(delta)
+                                yield LLMStreamChunk(delta=delta)
+            except httpx.TimeoutException as exc:
+                raise LLMTimeoutError(f"OpenRouter request timed out: {exc}") from exc
+            except httpx.RequestError as exc:
+                raise LLMError(f"OpenRouter request failed: {exc}") from exc
+            except json.JSONDecodeError as exc:
+                raise LLMError("OpenRouter returned a malformed stream event") from exc
+
+            # Reassemble a completion body so accounting matches non-streamed responses
+            final.setdefault("cost", (final.get("usage") or {}).get("cost"))
+            final["choices"] = [{"message": {"content": "".join(parts)}, "finish_reason": finish_reason}]
+            llm_response, _usage_info = self._parse_completion_response(final, model)
+            yield LLMStreamChunk(response=llm_response)
+
+        async for chunk in self._stream_with_accounting(
+            messages,
+            _events(),
+            user_id=user_id,
+            model=model,
+            temperature=request_kwargs.get("temperature"),
+            max_output_tokens=request_kwargs.get("max_output_tokens"),
+            estimated_tokens=estimate_tokens(payload.get("messages"), payload.get("max_tokens")),
+        ):
+            yield chunk
+
     async def generate_structured_object(
         self,
         messages: list[LLMMessage],
@@ -220,7 +292,7 @@ class OpenRouterProvider(LLMProvider):
     ) -> dict[str, Any]:
         """Construct the JSON payload for the OpenRouter chat completions endpoint."""
 
-        message_payload = [self._message_to_dict(message) for message in messages]
+        message_payload = [self._message_to_dict(message, prompt_cache=self.config.prompt_cache_enabled) for message in messages]
 
         temperature = request_kwargs.get("temperature", self.config.temperature)
         max_output_tokens = request_kwargs.get("max_output_tokens", self.config.max_output_tokens)
@@ -235,8 +307,7 @@ class OpenRouterProvider(LLMProvider):
             payload["max_tokens"] = max_output_tokens
 
         if response_model is not None:
-            schema = response_model.model_json_schema()
-            schema_prompt = f"You must respond with a JSON object that strictly conforms to this schema: {json.dumps(schema)}"
+            schema_prompt = get_schema_registry().compile(response_model, OPENROUTER_DIALECT).prompt
             payload["messages"] = [
                 {"role": "system", "content": schema_prompt},
                 *message_payload,
@@ -246,25 +317,48 @@ class OpenRouterProvider(LLMProvider):
         return payload
 
     async def _post_json(self, path: str, payload: dict[str, Any]) -> dict[str, Any]:
-        """Send a POST request to OpenRouter and return the JSON response."""
+        """Send a POST request to OpenRouter through the shared rate limiter and return the JSON response."""
+
+        return await self._call_with_rate_limit(
+            payload.get("model") or self.config.model,
+            lambda: self._post_json_once(path, payload),
+            estimated_tokens=estimate_tokens(payload.get("messages"), payload.get("max_tokens")),
+            usage_tokens=lambda data: (data.get("usage") or {}).get("total_tokens"),
+        )
+
+    async def _post_json_once(self, path: str, payload: dict[str, Any]) -> dict[str, Any]:
+        """Send a single POST request to OpenRouter."""
 
         if httpx is None:  # pragma: no cover - defensive guard
             raise LLMAuthenticationError("httpx is required to use the OpenRouter provider")
 
         url = f"{self._base_url}{path}"
-        headers = {
-            "Authorization": f"Bearer {self._api_key}",
-            "Content-Type": "application/json",
-        }
+        headers = self._headers()
 
         try:
-            async with httpx.AsyncClient(timeout=self._timeout) as client:
-                response = await client.post(url, json=payload, headers=headers)
+            client = client_registry.http_client(self.config, name="openrouter", timeout=self._timeout)
+            response = await client.post(url, json=payload, headers=headers)
         except httpx.TimeoutException as exc:
             raise LLMTimeoutError(f"OpenRouter request timed out: {exc}") from exc
         except httpx.RequestError as exc:
             raise LLMError(f"OpenRouter request failed: {exc}") from exc
 
+        self._raise_for_status(response)
+
+        try:
+            return response.json()
+        except ValueError as exc:
+            raise LLMError("OpenRouter returned a non-JSON response") from exc
+
+    def _headers(self) -> dict[str, str]:
+        return {
+            "Authorization": f"Bearer {self._api_key}",
+            "Content-Type": "application/json",
+        }
+
+    def _raise_for_status(self, response: Any) -> None:
+        """Map OpenRouter error statuses to module exceptions."""
+
         if response.status_code in {401, 403}:
             message = self._extract_error_message(response)
             raise LLMAuthenticationError(
@@ -286,11 +380,6 @@ class OpenRouterProvider(LLMProvider):
             message = self._extract_error_message(response)
             raise LLMError(message or f"OpenRouter returned error {response.status_code}")
 
-        try:
-            return response.json()
-        except ValueError as exc:
-            raise LLMError("OpenRouter returned a non-JSON response") from exc
-
     def _parse_completion_response(
         self,
         data: dict[str, Any],
@@ -322,7 +411,7 @@ class OpenRouterProvider(LLMProvider):
 
         cached_flag = usage.get("cached")
         # The cache metrics differ per upstream provider; normalise the key surface area we store.
-        cached_input_tokens = usage.get("cached_input_tokens") or usage.get("cache_read_input_tokens") or usage.get("cache_read_tokens")
+        cached_input_tokens = (usage.get("prompt_tokens_details") or {}).get("cached_tokens") or usage.get("cached_input_tokens") or usage.get("cache_read_input_tokens") or usage.get("cache_read_tokens")
         cache_creation_tokens = usage.get("cache_creation_input_tokens") or usage.get("cache_creation_tokens")
 
         cost_raw = data.get("cost")
@@ -343,7 +432,8 @@ class OpenRouterProvider(LLMProvider):
             output_tokens=completion_tokens,
             cost_estimate=cost_estimate,
             response_time_ms=None,
-            cached=bool(cached_flag) if cached_flag is not None else bool(cached_input_tokens),
+            # Prompt-cache reads are reported in cached_input_tokens; ``cached`` means a response-cache hit
+            cached=bool(cached_flag),
             provider_response_id=data.get("id"),
             system_fingerprint=data.get("system_fingerprint"),
             response_output=None,
@@ -413,12 +503,22 @@ class OpenRouterProvider(LLMProvider):
         return model
 
     @staticmethod
-    def _message_to_dict(message: LLMMessage) -> dict[str, Any]:
-        """Convert internal message representation into OpenRouter payload format."""
+    def _message_to_dict(message: LLMMessage, *, prompt_cache: bool = False) -> dict[str, Any]:
+        """Convert internal message representation into OpenRouter payload format.
 
-        if hasattr(message, "to_dict"):
-            return message.to_dict()
-        return {"role": message.role.value, "content": message.content}
+        With ``prompt_cache`` a ``cache_breakpoint`` message carries a ``cache_control``
+        marker on its last text part, which OpenRouter forwards to upstreams that
+        need explicit breakpoints (Anthropic, Gemini) and ignores elsewhere.
+        """
+
+        payload = message.to_dict() if hasattr(message, "to_dict") else {"role": message.role.value, "content": message.content}
+        if prompt_cache and message.cache_breakpoint:
+            content = payload.get("content")
+            parts = [{"type": "text", "text": content}] if isinstance(content, str) else [dict(part) for part in content or []]
+            if parts:
+                parts[-1]["cache_control"] = {"type": "ephemeral"}
+                payload["content"] = parts
+        return payload
 
     @staticmethod
     def _store_request_payload(llm_request: LLMRequestModel, payload: dict[str, Any]) -> None:
@@ -444,8 +544,4 @@ class OpenRouterProvider(LLMProvider):
     def _validate_structured_payload(model: type[T], payload: dict[str, Any]) -> T:
         """Validate parsed JSON payload against the provided Pydantic model."""
 
-        if hasattr(model, "model_validate"):
-            return model.model_validate(payload)  # type: ignore[return-value]
-        if hasattr(model, "parse_obj"):
-            return model.parse_obj(payload)  # type: ignore[return-value]
-        return model(**payload)  # type: ignore[call-arg]
+        return get_schema_registry().compile(model, OPENROUTER_DIALECT).validate(payload)  # type: ignore[no-any-return]
@@ -0,0 +1,407 @@
+"""Record/replay provider for offline load testing.
+
+``LLM_PROVIDER=replay`` routes every model to ``ReplayProvider``, which answers
+from previously recorded ``llm_requests`` rows instead of calling a vendor, so
+``UnitCreationFlow``/``LessonCreationFlow`` can be run end to end at scale for
+free. Recordings come from ``LLM_REPLAY_SOURCE``: ``db`` (or ``db:<limit>``)
+reads the most recent completed rows, any other value is a JSONL fixture file
+(or a directory of them) whose lines use the ``llm_requests`` column names.
+
+Requests are matched by a normalized key (message roles plus whitespace-collapsed
+content). Without an exact match a recording of the same kind is chosen
+deterministically from the key — for structured calls only among recordings that
+validate against the requested response model — unless ``LLM_REPLAY_STRICT``
+is set. Audio and images fall back to generated silence / a 1x1 PNG, so text-only
+fixtures still drive the media steps.
+
+Each call is delayed per ``LLM_REPLAY_LATENCY`` (``none``, ``fixed:<ms>``,
+``lognormal:<median_ms>:<sigma>`` or ``recorded[:<scale>]`` for the recorded
+``execution_time_ms``) and fails with probability ``LLM_REPLAY_ERROR_RATE``
+(rate limit, timeout or server error). Randomness is derived from
+``LLM_REPLAY_SEED``, the request key and how often that key was seen, so runs
+are reproducible however calls interleave. Calls still go through the shared
+rate limiter and are written to ``llm_requests``, keeping the pipeline's real
+overheads in the benchmark. Disable the response cache (``LLM_CACHE_ENABLED``)
+when measuring throughput.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+from collections import defaultdict
+from collections.abc import Iterable, Mapping
+from dataclasses import dataclass
+import hashlib
+import io
+import json
+import logging
+import math
+from pathlib import Path
+import random
+import re
+import threading
+from typing import Any, TypeVar
+import uuid
+import wave
+
+from pydantic import BaseModel
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from ..blobs import BLOB_COLUMNS, blob_refs, load_blobs, rehydrate
+from ..config import LLMConfig
+from ..exceptions import LLMError, LLMProviderError, LLMRateLimitError, LLMTimeoutError
+from ..models import LLMRequestModel
+from ..schema_registry import get_schema_registry
+from ..types import (
+    AudioGenerationRequest,
+    AudioResponse,
+    ImageGenerationRequest,
+    ImageResponse,
+    LLMMessage,
+    LLMProviderType,
+    LLMResponse,
+    MessageRole,
+    ToolCall,
+    ToolDefinition,
+    WebSearchResponse,
+)
+from .base import LLMProvider, LLMProviderKwargs
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T", bound=BaseModel)
+
+__all__ = ["LatencyModel", "ReplayLibrary", "ReplayProvider", "ReplayRecord", "replay_request_key"]
+
+TEXT_KIND = "text"
+AUDIO_KIND = "audio"
+IMAGE_KIND = "image"
+
+_DEFAULT_DB_LIMIT = 5000
+_ERROR_KINDS = ("rate_limit", "timeout", "server")
+# 1x1 transparent PNG served when no image was recorded
+_PLACEHOLDER_PNG = "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=="
+_SILENCE_SAMPLE_RATE = 8000
+_WORDS_PER_SECOND = 165 / 60
+
+
+def _normalize_content(content: Any) -> str:
+    if isinstance(content, str):
+        return " ".join(content.split())
+    return json.dumps(content, sort_keys=True, default=str)
+
+
+def replay_request_key(messages: Iterable[Mapping[str, Any]]) -> str:
+    """Key a request by its message roles and whitespace-normalized content."""
+    normalized = [[str(message.get("role", "")).lower().removeprefix("messagerole."), _normalize_content(message.get("content"))] for message in messages]
+    return hashlib.sha256(json.dumps(normalized).encode()).hexdigest()
+
+
+@dataclass(slots=True)
+class ReplayRecord:
+    """One recorded response, reduced to what replay needs."""
+
+    kind: str
+    key: str
+    model: str | None
+    content: str | None
+    response_raw: dict[str, Any]
+    execution_time_ms: int | None = None
+    input_tokens: int | None = None
+    output_tokens: int | None = None
+    tokens_used: int | None = None
+    cost_estimate: float | None = None
+
+    @classmethod
+    def from_row(cls, row: Mapping[str, Any]) -> ReplayRecord:
+        raw = row.get("response_raw") or {}
+        if not isinstance(raw, dict):
+            raw = {}
+        kind = AUDIO_KIND if raw.get("audio_base64") else IMAGE_KIND if raw.get("image_url") else TEXT_KIND
+        return cls(
+            kind=kind,
+            key=replay_request_key(row.get("messages") or []),
+            model=row.get("model"),
+            content=row.get("response_content"),
+            response_raw=raw,
+            execution_time_ms=row.get("execution_time_ms"),
+            input_tokens=row.get("input_tokens"),
+            output_tokens=row.get("output_tokens"),
+            tokens_used=row.get("tokens_used"),
+            cost_estimate=row.get("cost_estimate"),
+        )
+
+
+class ReplayLibrary:
+    """Recorded responses indexed by kind and request key."""
+
+    def __init__(self, records: Iterable[ReplayRecord]) -> None:
+        self._by_key: dict[tuple[str, str], list[ReplayRecord]] = defaultdict(list)
+        self._by_kind: dict[str, list[ReplayRecord]] = defaultdict(list)
+        self._structured: dict[Any, list[tuple[ReplayRecord, Any]]] = {}
+        self._lock = threading.Lock()
+        for record in records:
+            self._by_key[(record.kind, record.key)].append(record)
+            self._by_kind[record.kind].append(record)
+
+    def __len__(self) -> int:
+        return sum(len(records) for records in self._by_kind.values())
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Mapping[str, Any]]) -> ReplayLibrary:
+        return cls(ReplayRecord.from_row(row) for row in rows if row.get("status", "completed") == "completed" and row.get("provider") != LLMProviderType.REPLAY.value)
+
+    @classmethod
+    def from_fixtures(cls, path: str | Path) -> ReplayLibrary:
+        """Load JSONL fixtures (one ``llm_requests``-shaped object per line) from a file or directory."""
+        path = Path(path)
+        files = sorted(path.glob("*.jsonl")) if path.is_dir() else [path]
+        rows: list[dict[str, Any]] = []
+        for file in files:
+            with file.open(encoding="utf-8") as handle:
+                rows.extend(json.loads(line) for line in handle if line.strip())
+        return cls.from_rows(rows)
+
+    @classmethod
+    def from_database(cls, session: Session, limit: int = _DEFAULT_DB_LIMIT) -> ReplayLibrary:
+        """Load the most recent completed ``llm_requests`` rows, with payload blobs restored."""
+        columns = [column.name for column in LLMRequestModel.__table__.columns]
+        stmt = select(LLMRequestModel.__table__).where(LLMRequestModel.status == "completed", LLMRequestModel.provider != LLMProviderType.REPLAY.value).order_by(LLMRequestModel.created_at.desc()).limit(limit)
+        rows = [dict(zip(columns, row, strict=True)) for row in session.execute(stmt)]
+        texts = load_blobs(session, set().union(*(blob_refs(row[column]) for row in rows for column in BLOB_COLUMNS)) if rows else set())
+        if texts:
+            for row in rows:
+                for column in BLOB_COLUMNS:
+                    row[column] = rehydrate(row[column], texts)
+        return cls.from_rows(rows)
+
+    def match(self, kind: str, key: str, response_model: Any = None, *, strict: bool = False) -> tuple[ReplayRecord, Any] | None:
+        """Return the recording for ``key`` (plus the validated object for structured calls), or None."""
+        if response_model is None:
+            exact = self._by_key.get((kind, key))
+            if exact:
+                return _pick(exact, key), None
+            pool = [] if strict else self._by_kind.get(kind, [])
+            return (_pick(pool, key), None) if pool else None
+
+        candidates = self._structured_candidates(response_model)
+        exact_matches = [candidate for candidate in candidates if candidate[0].key == key]
+        if exact_matches:
+            return _pick(exact_matches, key)
+        if strict or not candidates:
+            return None
+        return _pick(candidates, key)
+
+    def _structured_candidates(self, response_model: Any) -> list[tuple[ReplayRecord, Any]]:
+        """Text recordings whose JSON content validates against ``response_model``, computed once per model."""
+        candidates = self._structured.get(response_model)
+        if candidates is not None:
+            return candidates
+        with self._lock:
+            candidates = self._structured.get(response_model)
+            if candidates is None:
+                compiled = get_schema_registry().compile(response_model)
+                candidates = []
+                for record in self._by_kind.get(TEXT_KIND, []):
+                    if not record.content or not record.content.lstrip().startswith("{"):
+                        continue
+                    try:
+                        candidates.append((record, compiled.validate(json.loads(record.content))))
+                    except Exception:  # noqa: S112 - recordings for other models are expected
+                        continue
+                self._structured[response_model] = candidates
+        return candidates
+
+
+def _pick(items: list[Any], key: str) -> Any:
+    """Choose deterministically from ``items`` for ``key``."""
+    return items[int(key[:8], 16) % len(items)]
+
+
+class LatencyModel:
+    """Simulated provider latency parsed from a spec such as ``lognormal:1200:0.6``."""
+
+    def __init__(self, spec: str) -> None:
+        self.spec = spec.strip().lower() or "none"
+        kind, _, args = self.spec.partition(":")
+        params = [float(value) for value in args.split(":") if value]
+        if kind not in {"none", "fixed", "lognormal", "recorded"}:
+            raise ValueError(f"Unknown replay latency model: {spec!r}")
+        if kind == "fixed" and len(params) != 1:
+            raise ValueError("fixed latency needs one value: fixed:<ms>")
+        if kind == "lognormal" and len(params) != 2:
+            raise ValueError("lognormal latency needs two values: lognormal:<median_ms>:<sigma>")
+        self.kind = kind
+        self.params = params
+
+    def sample_seconds(self, record: ReplayRecord | None, rng: random.Random) -> float:
+        if self.kind == "fixed":
+            return self.params[0] / 1000
+        if self.kind == "lognormal":
+            median_ms, sigma = self.params
+            return rng.lognormvariate(math.log(max(median_ms, 1e-3)), sigma) / 1000
+        if self.kind == "recorded":
+            scale = self.params[0] if self.params else 1.0
+            return (record.execution_time_ms or 0) * scale / 1000 if record else 0.0
+        return 0.0
+
+
+_LIBRARIES: dict[str, ReplayLibrary] = {}
+_LIBRARIES_LOCK = threading.Lock()
+
+
+def _load_library(source: str, session: Session) -> ReplayLibrary:
+    """Load (once per process) the recordings named by ``source``."""
+    library = _LIBRARIES.get(source)
+    if library is not None:
+        return library
+    with _LIBRARIES_LOCK:
+        library = _LIBRARIES.get(source)
+        if library is None:
+            kind, _, limit = source.partition(":")
+            library = ReplayLibrary.from_database(session, int(limit) if limit else _DEFAULT_DB_LIMIT) if kind == "db" else ReplayLibrary.from_fixtures(source)
+            logger.info(f"🎞️ Loaded {len(library)} recorded LLM responses for replay from {source}")
+            _LIBRARIES[source] = library
+    return library
+
+
+def _silent_wav(seconds: float) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(_SILENCE_SAMPLE_RATE)
+        wav.writeframes(b"\x00\x00" * int(seconds * _SILENCE_SAMPLE_RATE))
+    return buffer.getvalue()
+
+
+class ReplayProvider(LLMProvider):
+    """Serves recorded responses with simulated latency and failures."""
+
+    def __init__(self, config: LLMConfig, db_session: Session) -> None:
+        super().__init__(config, db_session)
+        self.latency = LatencyModel(config.replay_latency)
+        self._seen: dict[str, int] = defaultdict(int)
+
+    @property
+    def library(self) -> ReplayLibrary:
+        return _load_library(self.config.replay_source, self.db_session)
+
+    def _rng(self, key: str) -> random.Random:
+        count = self._seen[key]
+        self._seen[key] = count + 1
+        return random.Random(f"{self.config.replay_seed}:{key}:{count}")  # noqa: S311 - seeded, reproducible latency and failure simulation, not cryptography
+
+    async def _replay(self, kind: str, messages: list[LLMMessage], model: str, response_model: Any = None) -> tuple[ReplayRecord | None, Any]:
+        """Find the recording, wait out the simulated latency and maybe fail, under the shared rate limiter."""
+        key = replay_request_key(message.to_dict() for message in messages)
+        found = self.library.match(kind, key, response_model, strict=self.config.replay_strict)
+        if found is None and (kind == TEXT_KIND or self.config.replay_strict):
+            raise LLMProviderError(f"No recorded {'structured ' if response_model else ''}{kind} response to replay for request {key[:12]}", provider=self.config.provider.value, model=model)
+        record, parsed = found if found is not None else (None, None)
+        rng = self._rng(key)
+
+        async def call() -> None:
+            await asyncio.sleep(self.latency.sample_seconds(record, rng))
+            if rng.random() < self.config.replay_error_rate:
+                error_kind = rng.choice(_ERROR_KINDS)
+                if error_kind == "rate_limit":
+                    raise LLMRateLimitError("Simulated rate limit (replay)", retry_after=1.0, provider=self.config.provider.value, model=model)
+                if error_kind == "timeout":
+                    raise LLMTimeoutError("Simulated timeout (replay)", provider=self.config.provider.value, model=model)
+                raise LLMProviderError("Simulated server error (replay)", error_code="500", provider=self.config.provider.value, model=model)
+
+        await self._call_with_rate_limit(model, call)
+        return record, parsed
+
+    def _response(self, record: ReplayRecord, model: str, elapsed_ms: int) -> LLMResponse:
+        return LLMResponse(
+            content=record.content or "",
+            provider=self.config.provider,
+            model=model,
+            tokens_used=record.tokens_used,
+            input_tokens=record.input_tokens,
+            output_tokens=record.output_tokens,
+            cost_estimate=record.cost_estimate,
+            response_time_ms=elapsed_ms,
+        )
+
+    async def _run(self, kind: str, messages: list[LLMMessage], model: str, user_id: int | None, response_model: Any = None, **kwargs: Any) -> tuple[ReplayRecord | None, Any, LLMRequestModel, int]:
+        llm_request = self._create_llm_request(messages=messages, user_id=user_id, model=model, **kwargs)
+        if llm_request.id is None:
+            raise LLMError("Failed to create LLM request record")
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        try:
+            record, parsed = await self._replay(kind, messages, model, response_model)
+        except Exception as exc:
+            self._update_llm_request_error(llm_request, exc, int((loop.time() - started) * 1000))
+            raise
+        return record, parsed, llm_request, int((loop.time() - started) * 1000)
+
+    async def generate_response(self, messages: list[LLMMessage], user_id: int | None = None, **kwargs: LLMProviderKwargs) -> tuple[LLMResponse, uuid.UUID]:
+        model = str(kwargs.pop("model", None) or self.config.model)
+        record, _parsed, llm_request, elapsed_ms = await self._run(TEXT_KIND, messages, model, user_id, **kwargs)
+        assert record is not None  # text misses raise in _replay
+        response = self._response(record, model, elapsed_ms)
+        self._update_llm_request_success(llm_request, response, elapsed_ms)
+        return response, llm_request.id
+
+    async def generate_response_with_tools(
+        self,
+        messages: list[LLMMessage],
+        tools: list[ToolDefinition],  # noqa: ARG002
+        user_id: int | None = None,
+        **kwargs: LLMProviderKwargs,
+    ) -> tuple[LLMResponse, list[ToolCall] | None, uuid.UUID]:
+        """Replay the recorded text; tool calls are not recorded, so none are returned."""
+        response, request_id = await self.generate_response(messages, user_id=user_id, **kwargs)
+        return response, None, request_id
+
+    async def generate_structured_object(self, messages: list[LLMMessage], response_model: type[T], user_id: int | None = None, **kwargs: LLMProviderKwargs) -> tuple[T, uuid.UUID, dict[str, Any]]:
+        model = str(kwargs.pop("model", None) or self.config.model)
+        record, parsed, llm_request, elapsed_ms = await self._run(TEXT_KIND, messages, model, user_id, response_model, **kwargs)
+        assert record is not None  # text misses raise in _replay
+        response = self._response(record, model, elapsed_ms)
+        self._update_llm_request_success(llm_request, response, elapsed_ms)
+        return parsed, llm_request.id, {"tokens_used": record.tokens_used or 0, "cost_estimate": record.cost_estimate or 0.0}
+
+    async def generate_image(self, request: ImageGenerationRequest, user_id: int | None = None, **_kwargs: LLMProviderKwargs) -> tuple[ImageResponse, uuid.UUID]:
+        messages = [LLMMessage(role=MessageRole.USER, content=request.prompt)]
+        record, _parsed, llm_request, elapsed_ms = await self._run(IMAGE_KIND, messages, self.config.image_model, user_id)
+        image_url = str(record.response_raw.get("image_url")) if record else ""
+        if not image_url.startswith("data:"):
+            # Recorded vendor URLs expire and would need the network; stay offline
+            image_url = f"data:image/png;base64,{_PLACEHOLDER_PNG}"
+        response = ImageResponse(
+            image_url=image_url,
+            revised_prompt=record.response_raw.get("revised_prompt") if record else None,
+            size=request.size.value if hasattr(request.size, "value") else str(request.size),
+            cost_estimate=record.cost_estimate if record else 0.0,
+        )
+        self._update_image_request_success(llm_request, response, elapsed_ms)
+        return response, llm_request.id
+
+    async def generate_audio(self, request: AudioGenerationRequest, user_id: int | None = None, **_kwargs: LLMProviderKwargs) -> tuple[AudioResponse, uuid.UUID]:
+        messages = [LLMMessage(role=MessageRole.USER, content=request.text)]
+        record, _parsed, llm_request, elapsed_ms = await self._run(AUDIO_KIND, messages, request.model, user_id)
+        if record is not None:
+            raw = record.response_raw
+            response = AudioResponse(
+                audio_base64=raw["audio_base64"],
+                mime_type=raw.get("mime_type") or "audio/mpeg",
+                voice=request.voice,
+                model=request.model,
+                cost_estimate=record.cost_estimate,
+                duration_seconds=raw.get("duration_seconds"),
+            )
+        else:
+            seconds = max(1.0, len(re.findall(r"[\w']+", request.text)) / _WORDS_PER_SECOND)
+            response = AudioResponse(audio_base64=base64.b64encode(_silent_wav(seconds)).decode(), mime_type="audio/wav", voice=request.voice, model=request.model, cost_estimate=0.0, duration_seconds=seconds)
+        self._update_audio_request_success(llm_request, response, elapsed_ms, response_raw={"mime_type": response.mime_type, "duration_seconds": response.duration_seconds, "replayed": record is not None})
+        return response, llm_request.id
+
+    async def search_recent_news(self, search_queries: list[str], user_id: int | None = None, **kwargs: LLMProviderKwargs) -> tuple[WebSearchResponse, uuid.UUID]:
+        raise NotImplementedError("Web search is not recorded, so it cannot be replayed")
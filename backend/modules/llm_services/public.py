@@ -2,7 +2,9 @@
 
 from __future__ import annotations
 
+from collections.abc import AsyncIterator, Iterable, Sequence
 from datetime import datetime
+from pathlib import Path
 from typing import Any, Protocol, TypeVar
 import uuid
 
@@ -10,27 +12,53 @@ from pydantic import BaseModel
 from sqlalchemy.orm import Session
 
 from ..infrastructure.public import infrastructure_provider
+from .batch import BatchExecutor, FakeBatchServer, current_batch_executor, llm_batch_mode
+from .clients import shutdown_llm_clients
+from .prompt_templates import PromptRegistry, PromptTemplate, get_prompt_registry, render_template
 from .providers.base import LLMProviderKwargs
 from .repo import LLMRequestRepo
-from .service import AudioResponse, ImageResponse, LLMMessage, LLMRequest, LLMResponse, LLMService, WebSearchResponse
+from .scheduler import BULK, INTERACTIVE, PRIORITY_CLASSES, STANDARD, current_priority, llm_priority, priority_wait_stats
+from .schema_registry import get_schema_registry
+from .service import AudioResponse, ImageResponse, LLMMessage, LLMRequest, LLMResponse, LLMService, LLMStreamChunk, WebSearchResponse
+from .streaming import JSONFieldStreamer
 from .types import ToolCall, ToolDefinition
 
 # Type variable for structured responses
 T = TypeVar("T", bound=BaseModel)
 
 __all__ = [
+    "BULK",
+    "INTERACTIVE",
+    "PRIORITY_CLASSES",
+    "STANDARD",
     "AudioResponse",
+    "BatchExecutor",
+    "FakeBatchServer",
     "ImageResponse",
+    "JSONFieldStreamer",
     "LLMMessage",
     "LLMRequest",
     "LLMResponse",
     "LLMServicesAdminProvider",
     "LLMServicesProvider",
+    "LLMStreamChunk",
+    "PromptRegistry",
+    "PromptTemplate",
     "ToolCall",
     "ToolDefinition",
     "WebSearchResponse",
+    "current_batch_executor",
+    "current_priority",
+    "get_prompt_registry",
+    "llm_batch_mode",
+    "llm_priority",
     "llm_services_admin_provider",
     "llm_services_provider",
+    "priority_wait_stats",
+    "render_template",
+    "shutdown_llm_clients",
+    "warm_prompt_templates",
+    "warm_response_schemas",
 ]
 
 
@@ -40,6 +68,7 @@ class LLMServicesProvider(Protocol):
 
     This interface provides access to LLM functionality including:
     - Text generation with conversation context
+    - Streaming text generation for interactive replies
     - Structured output generation using Pydantic models
     - Image generation from text prompts
     - Web search capabilities
@@ -47,7 +76,14 @@ class LLMServicesProvider(Protocol):
     """
 
     async def generate_response(
-        self, messages: list[LLMMessage], user_id: int | None = None, model: str | None = None, temperature: float | None = None, max_output_tokens: int | None = None, **kwargs: LLMProviderKwargs
+        self,
+        messages: list[LLMMessage],
+        user_id: int | None = None,
+        model: str | None = None,
+        temperature: float | None = None,
+        max_output_tokens: int | None = None,
+        hedge_models: Sequence[str] | None = None,
+        **kwargs: LLMProviderKwargs,
     ) -> tuple[LLMResponse, uuid.UUID]:
         """
         Generate a text response from the LLM.
@@ -58,6 +94,7 @@ class LLMServicesProvider(Protocol):
             model: Override default model (e.g., "gpt-4", "gpt-3.5-turbo")
             temperature: Override default temperature (0.0-2.0)
             max_output_tokens: Override maximum output tokens
+            hedge_models: Equivalent models ("model" or "provider:model") to hedge slow calls with
             **kwargs: Additional provider-specific parameters
 
         Returns:
@@ -68,8 +105,47 @@ class LLMServicesProvider(Protocol):
         """
         ...
 
+    def stream_response(
+        self,
+        messages: list[LLMMessage],
+        user_id: int | None = None,
+        model: str | None = None,
+        temperature: float | None = None,
+        max_output_tokens: int | None = None,
+        response_model: type[BaseModel] | None = None,
+        **kwargs: LLMProviderKwargs,
+    ) -> AsyncIterator[LLMStreamChunk]:
+        """
+        Stream a response from the LLM as it is generated.
+
+        Args:
+            messages: List of conversation messages
+            user_id: Optional user identifier for tracking
+            model: Override default model
+            temperature: Override default temperature
+            max_output_tokens: Override maximum output tokens
+            response_model: Optional Pydantic model; the streamed text is then its JSON
+            **kwargs: Additional provider-specific parameters
+
+        Yields:
+            Chunks with text deltas, then a final chunk carrying the complete
+            response and its request ID (recorded once the stream completes)
+
+        Raises:
+            LLMError: If the request fails
+        """
+        ...
+
     async def generate_structured_response(
-        self, messages: list[LLMMessage], response_model: type[T], user_id: int | None = None, model: str | None = None, temperature: float | None = None, max_output_tokens: int | None = None, **kwargs: LLMProviderKwargs
+        self,
+        messages: list[LLMMessage],
+        response_model: type[T],
+        user_id: int | None = None,
+        model: str | None = None,
+        temperature: float | None = None,
+        max_output_tokens: int | None = None,
+        hedge_models: Sequence[str] | None = None,
+        **kwargs: LLMProviderKwargs,
     ) -> tuple[T, uuid.UUID, dict[str, Any]]:
         """
         Generate a structured response using a Pydantic model.
@@ -81,6 +157,7 @@ class LLMServicesProvider(Protocol):
             model: Override default model
             temperature: Override default temperature
             max_output_tokens: Override maximum output tokens
+            hedge_models: Equivalent models ("model" or "provider:model") to hedge slow calls with
             **kwargs: Additional provider-specific parameters
 
         Returns:
@@ -93,7 +170,15 @@ class LLMServicesProvider(Protocol):
         ...
 
     async def generate_response_with_tools(
-        self, messages: list[LLMMessage], tools: list[ToolDefinition], user_id: int | None = None, model: str | None = None, temperature: float | None = None, max_output_tokens: int | None = None, **kwargs: LLMProviderKwargs
+        self,
+        messages: list[LLMMessage],
+        tools: list[ToolDefinition],
+        user_id: int | None = None,
+        model: str | None = None,
+        temperature: float | None = None,
+        max_output_tokens: int | None = None,
+        hedge_models: Sequence[str] | None = None,
+        **kwargs: LLMProviderKwargs,
     ) -> tuple[LLMResponse, list[ToolCall] | None, uuid.UUID]:
         """
         Generate response with tool calling capability.
@@ -105,6 +190,7 @@ class LLMServicesProvider(Protocol):
             model: Override default model
             temperature: Override default temperature
             max_output_tokens: Override maximum output tokens
+            hedge_models: Equivalent models ("model" or "provider:model") to hedge slow calls with
             **kwargs: Additional provider-specific parameters
 
         Returns:
@@ -144,9 +230,10 @@ class LLMServicesProvider(Protocol):
         model: str | None = None,
         audio_format: str = "mp3",
         speed: float | None = None,
+        chunked: bool | None = None,
         **kwargs: LLMProviderKwargs,
     ) -> tuple[AudioResponse, uuid.UUID]:
-        """Synthesize narrated audio from text content."""
+        """Synthesize narrated audio from text content; long text is synthesized in parallel chunks and stitched."""
         ...
 
     async def search_web(self, queries: list[str], user_id: int | None = None, max_results: int = 10, **kwargs: LLMProviderKwargs) -> tuple[WebSearchResponse, uuid.UUID]:
@@ -193,13 +280,27 @@ class LLMServicesProvider(Protocol):
         """
         ...
 
-    def estimate_cost(self, messages: list[LLMMessage], model: str | None = None) -> float:
+    def count_tokens(self, messages: list[LLMMessage], model: str | None = None) -> int:
+        """
+        Count prompt tokens without calling the provider.
+
+        Args:
+            messages: List of conversation messages
+            model: Model whose tokenizer to use (defaults to the configured model)
+
+        Returns:
+            Prompt tokens, including per-message framing overhead
+        """
+        ...
+
+    def estimate_cost(self, messages: list[LLMMessage], model: str | None = None, expected_output_tokens: int | None = None) -> float:
         """
         Estimate the cost of a request before making it.
 
         Args:
             messages: List of conversation messages
             model: Model to use for estimation
+            expected_output_tokens: Expected completion size (defaults to a quarter of the prompt)
 
         Returns:
             Estimated cost in USD
@@ -296,3 +397,13 @@ def llm_services_admin_provider(session: Session) -> LLMServicesAdminProvider:
 
     # Return the service directly - it already implements the protocol method
     return LLMService(LLMRequestRepo(session))
+
+
+def warm_response_schemas(models: Iterable[type[BaseModel]]) -> int:
+    """Precompile provider schemas and validators for ``models``; returns the number compiled."""
+    return get_schema_registry().warm(models)
+
+
+def warm_prompt_templates(roots: Iterable[Path] | None = None) -> int:
+    """Load and compile every ``prompts/*.md`` below ``roots`` (default: all modules); returns the number loaded."""
+    return get_prompt_registry().warm(roots if roots is not None else [Path(__file__).resolve().parents[1]])
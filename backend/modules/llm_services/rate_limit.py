@@ -0,0 +1,444 @@
+"""Shared rate limiting and adaptive concurrency for LLM provider calls.
+
+Every provider funnels its network calls through ``ProviderRateLimiter.run``,
+keyed by provider and model. A call:
+
+1. waits out any shared cooldown set by a recent 429 (``Retry-After``),
+2. reserves one request from the RPM bucket and an estimate of its tokens
+   from the TPM bucket,
+3. takes a slot from an AIMD concurrency window that grows additively while
+   calls succeed at normal latency and shrinks multiplicatively on 429s or
+   latency spikes. Waiters queue per priority class (see ``scheduler``) and
+   part of the window is held back for interactive calls.
+
+Buckets and cooldowns live in Redis when it is available, so every API
+process and ARQ worker draws from the same quota; otherwise they fall back to
+in-process buckets.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections.abc import AsyncIterator, Awaitable, Callable, Mapping
+import contextlib
+from dataclasses import dataclass
+import json
+import logging
+import random
+import time
+from typing import Any, TypeVar
+
+from .config import LLMConfig
+from .exceptions import LLMRateLimitError
+from .scheduler import WeightedFairScheduler, current_priority
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+__all__ = [
+    "AdaptiveConcurrencyLimiter",
+    "LocalTokenBucket",
+    "ProviderRateLimiter",
+    "RateLimitPolicy",
+    "estimate_tokens",
+    "get_rate_limiter",
+    "retry_after_seconds",
+]
+
+_REDIS_KEY_PREFIX = "llm:ratelimit"
+_MAX_BACKOFF_SECONDS = 60.0
+# After a Redis failure, use local buckets for this long before trying Redis again
+_REDIS_RETRY_INTERVAL_SECONDS = 30.0
+
+# Atomically refill a bucket from Redis server time, debit ``amount`` and return
+# the seconds the caller must wait (0 when tokens were available). A pending
+# cooldown (set after a 429) is returned instead, without debiting.
+_RESERVE_SCRIPT = """
+local cooldown_ms = redis.call('PTTL', KEYS[2])
+if cooldown_ms > 0 then
+    return tostring(cooldown_ms / 1000)
+end
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local amount = tonumber(ARGV[3])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1]) or capacity
+local ts = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate) - amount
+tokens = math.min(capacity, tokens)
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000) + 60000)
+if tokens >= 0 then
+    return '0'
+end
+return tostring(-tokens / rate)
+"""
+
+
+@dataclass(frozen=True)
+class RateLimitPolicy:
+    """Quota and concurrency bounds for one provider+model."""
+
+    requests_per_minute: int | None = None
+    tokens_per_minute: int | None = None
+    max_concurrency: int = 32
+    min_concurrency: int = 1
+    priority_weights: Mapping[str, float] | None = None
+    interactive_reserve: float = 0.25
+
+    @classmethod
+    def from_config(cls, config: LLMConfig, provider: str, model: str) -> RateLimitPolicy:
+        """Resolve the policy for ``provider:model``, falling back to the provider-wide entry."""
+        raw = config.rate_limits.get(f"{provider}:{model}") or config.rate_limits.get(provider) or {}
+        return cls(
+            requests_per_minute=raw.get("rpm"),
+            tokens_per_minute=raw.get("tpm"),
+            max_concurrency=int(raw.get("max_concurrency", config.max_concurrency)),
+            min_concurrency=int(raw.get("min_concurrency", 1)),
+            priority_weights=config.priority_weights,
+            interactive_reserve=float(raw.get("interactive_reserve", config.interactive_reserve)),
+        )
+
+
+def estimate_tokens(payload: Any, max_output_tokens: int | None = None) -> int:
+    """Cheap token estimate (~4 characters per token) used to reserve TPM quota before a call."""
+    text = payload if isinstance(payload, str) else json.dumps(payload, default=str)
+    return len(text) // 4 + (max_output_tokens or 0)
+
+
+def retry_after_seconds(exc: BaseException) -> float | None:
+    """Extract a Retry-After hint from module exceptions or SDK/HTTP errors carrying a response."""
+    retry_after = getattr(exc, "retry_after", None)
+    if isinstance(retry_after, int | float) and retry_after > 0:
+        return float(retry_after)
+
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None)
+    if headers is None:
+        return None
+    for header, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        value = headers.get(header)
+        if value is None:
+            continue
+        try:
+            return max(0.0, float(value) * scale)
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
+def _is_throttle(exc: BaseException) -> bool:
+    if isinstance(exc, LLMRateLimitError):
+        return True
+    return getattr(exc, "status_code", None) == 429 or getattr(getattr(exc, "response", None), "status_code", None) == 429
+
+
+class LocalTokenBucket:
+    """
+    In-process token bucket using reservations.
+
+    ``reserve`` always debits and returns how long the caller must wait for its
+    reservation to become valid, so concurrent callers queue in arrival order
+    without polling.
+    """
+
+    def __init__(self, capacity: float, refill_per_second: float) -> None:
+        self.capacity = capacity
+        self.refill_per_second = refill_per_second
+        self._tokens = capacity
+        self._updated = time.monotonic()
+
+    def reserve(self, amount: float) -> float:
+        """Debit ``amount`` (capped at capacity) and return the wait in seconds."""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.refill_per_second)
+        self._updated = now
+        self._tokens = min(self.capacity, self._tokens - min(amount, self.capacity))
+        if self._tokens >= 0:
+            return 0.0
+        return -self._tokens / self.refill_per_second
+
+
+class AdaptiveConcurrencyLimiter:
+    """
+    AIMD concurrency window.
+
+    The window grows by roughly one slot per window of successful calls and is
+    halved on a 429; a call whose latency exceeds ``latency_tolerance`` times
+    the smoothed baseline shrinks it by 10%. Queued callers are admitted by
+    priority class through a ``WeightedFairScheduler``.
+    """
+
+    def __init__(
+        self,
+        initial: int,
+        minimum: int,
+        maximum: int,
+        latency_tolerance: float = 2.0,
+        priority_weights: Mapping[str, float] | None = None,
+        interactive_reserve: float = 0.25,
+    ) -> None:
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = float(min(max(initial, self.minimum), self.maximum))
+        self.latency_tolerance = latency_tolerance
+        self.in_flight = 0
+        self._baseline_latency: float | None = None
+        self.scheduler = WeightedFairScheduler(priority_weights, interactive_reserve)
+
+    async def acquire(self, priority: str | None = None) -> None:
+        """Wait for a free slot in the current window; ``priority`` defaults to the context's class."""
+        priority = priority or current_priority()
+        # Always queue so an uncontended call is admitted (and timed) by the same rules
+        waiter = self.scheduler.enqueue(priority)
+        self._wake()
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed to us just as we were cancelled; pass it on
+                self.in_flight -= 1
+                self._wake()
+            else:
+                self.scheduler.discard(priority, waiter)
+            raise
+
+    def release(self, *, latency: float | None = None, throttled: bool = False) -> None:
+        """Return a slot and adapt the window from the call's outcome."""
+        self.in_flight -= 1
+        if throttled:
+            self.limit = max(float(self.minimum), self.limit / 2)
+        elif latency is not None:
+            baseline = self._baseline_latency
+            if baseline is not None and latency > baseline * self.latency_tolerance:
+                self.limit = max(float(self.minimum), self.limit * 0.9)
+            else:
+                self.limit = min(float(self.maximum), self.limit + 1 / self.limit)
+            self._baseline_latency = latency if baseline is None else baseline * 0.9 + latency * 0.1
+        self._wake()
+
+    def _wake(self) -> None:
+        while self.scheduler.admit_next(self.in_flight, int(self.limit)):
+            self.in_flight += 1
+
+
+class ProviderRateLimiter:
+    """Request/token buckets, shared cooldown and adaptive concurrency for one provider+model."""
+
+    def __init__(self, provider: str, model: str, policy: RateLimitPolicy, backend: str = "auto") -> None:
+        """Create a limiter; ``backend`` is ``auto`` (Redis when available) or ``local``."""
+        self.provider = provider
+        self.model = model
+        self.policy = policy
+        self.backend = backend
+        self.concurrency = AdaptiveConcurrencyLimiter(
+            initial=max(policy.min_concurrency, policy.max_concurrency // 2),
+            minimum=policy.min_concurrency,
+            maximum=policy.max_concurrency,
+            priority_weights=policy.priority_weights,
+            interactive_reserve=policy.interactive_reserve,
+        )
+        self._buckets: dict[str, LocalTokenBucket] = {}
+        if policy.requests_per_minute:
+            self._buckets["rpm"] = LocalTokenBucket(policy.requests_per_minute, policy.requests_per_minute / 60)
+        if policy.tokens_per_minute:
+            self._buckets["tpm"] = LocalTokenBucket(policy.tokens_per_minute, policy.tokens_per_minute / 60)
+        self._cooldown_until = 0.0
+        self._redis_disabled_until = 0.0
+
+        self.throttled = 0
+        self.waited_seconds = 0.0
+
+    # ------------------------------------------------------------------
+    # Redis-backed shared state
+    # ------------------------------------------------------------------
+    def _redis(self) -> Any | None:
+        if self.backend in {"local", "off"} or time.monotonic() < self._redis_disabled_until:
+            return None
+        try:
+            from ..infrastructure.public import infrastructure_provider
+
+            return infrastructure_provider().get_redis_connection()
+        except Exception:
+            return None
+
+    def _redis_key(self, suffix: str) -> str:
+        return f"{_REDIS_KEY_PREFIX}:{self.provider}:{self.model}:{suffix}"
+
+    def _disable_redis(self, exc: Exception) -> None:
+        logger.warning(f"Rate limiter falling back to local buckets for {_REDIS_RETRY_INTERVAL_SECONDS:.0f}s: {exc}")
+        self._redis_disabled_until = time.monotonic() + _REDIS_RETRY_INTERVAL_SECONDS
+
+    async def _reserve(self, name: str, amount: float) -> float:
+        bucket = self._buckets.get(name)
+        if bucket is None or amount == 0:
+            return 0.0
+        redis = self._redis()
+        if redis is not None:
+            try:
+                wait = await redis.eval(_RESERVE_SCRIPT, 2, self._redis_key(name), self._redis_key("cooldown"), bucket.capacity, bucket.refill_per_second, amount)
+                return float(wait.decode() if isinstance(wait, bytes) else wait)
+            except Exception as exc:
+                self._disable_redis(exc)
+        return bucket.reserve(amount)
+
+    async def _cooldown_remaining(self) -> float:
+        remaining = self._cooldown_until - time.monotonic()
+        if not self._buckets:
+            # Without buckets the reserve script never runs, so check the shared cooldown directly
+            redis = self._redis()
+            if redis is not None:
+                try:
+                    ttl_ms = await redis.pttl(self._redis_key("cooldown"))
+                    remaining = max(remaining, (ttl_ms or 0) / 1000)
+                except Exception as exc:
+                    self._disable_redis(exc)
+        return max(0.0, remaining)
+
+    async def _start_cooldown(self, seconds: float) -> None:
+        self._cooldown_until = max(self._cooldown_until, time.monotonic() + seconds)
+        redis = self._redis()
+        if redis is not None:
+            try:
+                await redis.set(self._redis_key("cooldown"), "1", px=max(1, int(seconds * 1000)))
+            except Exception as exc:
+                self._disable_redis(exc)
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    async def wait_for_capacity(self, estimated_tokens: int) -> None:
+        """Block until the cooldown has passed and RPM/TPM reservations are valid."""
+        wait = await self._cooldown_remaining()
+        wait = max(wait, await self._reserve("rpm", 1), await self._reserve("tpm", estimated_tokens))
+        if wait > 0:
+            self.waited_seconds += wait
+            logger.debug(f"Rate limiter delaying {self.provider}:{self.model} call by {wait:.2f}s")
+            await asyncio.sleep(wait)
+
+    async def settle_tokens(self, estimated_tokens: int, actual_tokens: int | None) -> None:
+        """Correct the TPM bucket once the real token usage is known."""
+        if actual_tokens is None or "tpm" not in self._buckets:
+            return
+        delta = actual_tokens - estimated_tokens
+        if delta:
+            await self._reserve("tpm", delta)
+
+    async def run(
+        self,
+        call: Callable[[], Awaitable[T]],
+        *,
+        estimated_tokens: int = 0,
+        max_retries: int = 3,
+        should_retry: Callable[[BaseException], bool] | None = None,
+        usage_tokens: Callable[[T], int | None] | None = None,
+    ) -> T:
+        """
+        Run a provider call under the limits, retrying throttled and transient failures.
+
+        Args:
+            call: Zero-argument coroutine factory performing one provider request
+            estimated_tokens: Tokens to reserve from the TPM bucket before calling
+            max_retries: Retries after the first attempt
+            should_retry: Predicate for retryable non-throttle errors (e.g. 5xx, connection errors)
+            usage_tokens: Extracts actual token usage from a result to correct the TPM bucket
+
+        Raises:
+            The last exception once retries are exhausted or the error is not retryable
+        """
+        for attempt in range(max_retries + 1):
+            await self.wait_for_capacity(estimated_tokens)
+            await self.concurrency.acquire()
+            started = time.perf_counter()
+            try:
+                result = await call()
+            except Exception as exc:
+                throttled = _is_throttle(exc)
+                self.concurrency.release(throttled=throttled)
+                if throttled:
+                    self.throttled += 1
+                    delay = retry_after_seconds(exc) or self._backoff(attempt)
+                    await self._start_cooldown(delay)
+                    logger.warning(f"{self.provider}:{self.model} throttled (attempt {attempt + 1}); cooling down {delay:.1f}s, window now {self.concurrency.limit:.1f}")
+                elif should_retry is not None and should_retry(exc) and attempt < max_retries:
+                    delay = self._backoff(attempt)
+                    logger.warning(f"{self.provider}:{self.model} call failed (attempt {attempt + 1}), retrying in {delay:.1f}s: {exc}")
+                    await asyncio.sleep(delay)
+                else:
+                    raise
+                if attempt >= max_retries:
+                    raise
+                continue
+            except BaseException:
+                # Cancelled (hedge loser, abandoned coalesced call, cancelled task group): free the slot without adapting the window
+                self.concurrency.release()
+                raise
+
+            self.concurrency.release(latency=time.perf_counter() - started)
+            if usage_tokens is not None:
+                try:
+                    await self.settle_tokens(estimated_tokens, usage_tokens(result))
+                except Exception as exc:  # pragma: no cover - accounting must never fail a call
+                    logger.debug(f"Failed to settle token usage: {exc}")
+            return result
+
+        raise AssertionError("unreachable")  # pragma: no cover
+
+    @contextlib.asynccontextmanager
+    async def slot(self, estimated_tokens: int = 0) -> AsyncIterator[None]:
+        """
+        Hold rate limit capacity around a request that cannot be retried transparently.
+
+        Streams are not retried once output has reached the caller, but a 429 still
+        starts the shared cooldown and shrinks the concurrency window.
+        """
+        await self.wait_for_capacity(estimated_tokens)
+        await self.concurrency.acquire()
+        throttled = False
+        try:
+            yield
+        except Exception as exc:
+            throttled = _is_throttle(exc)
+            if throttled:
+                self.throttled += 1
+                await self._start_cooldown(retry_after_seconds(exc) or self._backoff(0))
+            raise
+        finally:
+            # Stream duration depends on output length, so it does not feed the latency baseline
+            self.concurrency.release(throttled=throttled)
+
+    @staticmethod
+    def _backoff(attempt: int) -> float:
+        """Exponential backoff with jitter, used when no Retry-After hint is available."""
+        return min(_MAX_BACKOFF_SECONDS, 2**attempt) * (0.5 + random.random() / 2)  # noqa: S311
+
+    def stats(self) -> dict[str, Any]:
+        """Return limiter counters for monitoring."""
+        return {
+            "provider": self.provider,
+            "model": self.model,
+            "concurrency_limit": round(self.concurrency.limit, 2),
+            "in_flight": self.concurrency.in_flight,
+            "queued": self.concurrency.scheduler.queued(),
+            "throttled": self.throttled,
+            "waited_seconds": round(self.waited_seconds, 3),
+        }
+
+
+_LIMITERS: dict[tuple[str, str, int], ProviderRateLimiter] = {}
+
+
+def get_rate_limiter(config: LLMConfig, provider: str, model: str) -> ProviderRateLimiter:
+    """Return the process-wide limiter for ``provider:model`` on the running event loop."""
+    try:
+        loop_id = id(asyncio.get_running_loop())
+    except RuntimeError:
+        loop_id = 0
+    key = (provider, model, loop_id)
+    limiter = _LIMITERS.get(key)
+    if limiter is None:
+        limiter = _LIMITERS[key] = ProviderRateLimiter(provider, model, RateLimitPolicy.from_config(config, provider, model), backend=config.rate_limit_backend)
+    return limiter
@@ -8,6 +8,7 @@ import uuid
 from sqlalchemy import desc
 from sqlalchemy.orm import Session
 
+from .blobs import rehydrate_request, rehydrate_requests
 from .models import LLMRequestModel
 
 __all__ = ["LLMRequestRepo"]
@@ -20,8 +21,9 @@ class LLMRequestRepo:
         self.s = session
 
     def by_id(self, request_id: uuid.UUID) -> LLMRequestModel | None:
-        """Get LLM request by ID."""
-        return self.s.get(LLMRequestModel, request_id)
+        """Get LLM request by ID, with payload blob references replaced by their content."""
+        request = self.s.get(LLMRequestModel, request_id)
+        return rehydrate_request(self.s, request) if request is not None else None
 
     def create(self, llm_request: LLMRequestModel) -> LLMRequestModel:
         """Create a new LLM request record."""
@@ -35,15 +37,15 @@ class LLMRequestRepo:
 
     def by_user_id(self, user_id: int, limit: int = 50, offset: int = 0) -> list[LLMRequestModel]:
         """Get LLM requests for a specific user."""
-        return self.s.query(LLMRequestModel).filter(LLMRequestModel.user_id == user_id).order_by(desc(LLMRequestModel.created_at)).limit(limit).offset(offset).all()
+        return rehydrate_requests(self.s, self.s.query(LLMRequestModel).filter(LLMRequestModel.user_id == user_id).order_by(desc(LLMRequestModel.created_at)).limit(limit).offset(offset).all())
 
     def by_status(self, status: str, limit: int = 100) -> list[LLMRequestModel]:
         """Get LLM requests by status."""
-        return self.s.query(LLMRequestModel).filter(LLMRequestModel.status == status).order_by(desc(LLMRequestModel.created_at)).limit(limit).all()
+        return rehydrate_requests(self.s, self.s.query(LLMRequestModel).filter(LLMRequestModel.status == status).order_by(desc(LLMRequestModel.created_at)).limit(limit).all())
 
     def by_provider(self, provider: str, limit: int = 100, offset: int = 0) -> list[LLMRequestModel]:
         """Get LLM requests by provider."""
-        return self.s.query(LLMRequestModel).filter(LLMRequestModel.provider == provider).order_by(desc(LLMRequestModel.created_at)).limit(limit).offset(offset).all()
+        return rehydrate_requests(self.s, self.s.query(LLMRequestModel).filter(LLMRequestModel.provider == provider).order_by(desc(LLMRequestModel.created_at)).limit(limit).offset(offset).all())
 
     def update_success(
         self,
@@ -62,7 +64,7 @@ class LLMRequestRepo:
         response_created_at: datetime | None = None,
     ) -> None:
         """Update LLM request with successful response data."""
-        request = self.by_id(request_id)
+        request = self.s.get(LLMRequestModel, request_id)
         if request:
             request.response_content = response_content
             request.response_raw = response_raw
@@ -81,7 +83,7 @@ class LLMRequestRepo:
 
     def update_error(self, request_id: uuid.UUID, error_message: str, error_type: str, execution_time_ms: int | None = None, retry_attempt: int = 1) -> None:
         """Update LLM request with error information."""
-        request = self.by_id(request_id)
+        request = self.s.get(LLMRequestModel, request_id)
         if request:
             request.status = "failed"
             request.error_message = error_message
@@ -100,7 +102,7 @@ class LLMRequestRepo:
 
     def get_recent(self, limit: int = 50, offset: int = 0) -> list[LLMRequestModel]:
         """Get recent LLM requests with pagination. FOR ADMIN USE ONLY."""
-        return self.s.query(LLMRequestModel).order_by(desc(LLMRequestModel.created_at)).limit(limit).offset(offset).all()
+        return rehydrate_requests(self.s, self.s.query(LLMRequestModel).order_by(desc(LLMRequestModel.created_at)).limit(limit).offset(offset).all())
 
     def count_all(self) -> int:
         """Get total count of LLM requests. FOR ADMIN USE ONLY."""
@@ -109,7 +111,7 @@ class LLMRequestRepo:
     def assign_user(self, request_id: uuid.UUID, user_id: int) -> None:
         """Ensure an LLM request is associated with the provided user."""
 
-        request = self.by_id(request_id)
+        request = self.s.get(LLMRequestModel, request_id)
         if request is None:
             return
 
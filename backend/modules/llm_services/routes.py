@@ -103,6 +103,20 @@ async def generate_response(
     return GenerateResponseResponse(request_id=request_id, response=response)
 
 
+@router.get("/hedging/stats", response_model=dict[str, float])
+def get_hedging_stats(service: LLMService = Depends(get_llm_service)) -> dict[str, float]:
+    """Return process-wide hedge rate, failover and wasted-spend counters for tuning hedge delays."""
+
+    return service.get_hedging_stats()
+
+
+@router.get("/scheduler/stats", response_model=dict[str, dict[str, Any]])
+def get_scheduler_stats(service: LLMService = Depends(get_llm_service)) -> dict[str, dict[str, Any]]:
+    """Return queue wait per priority class (interactive, standard, bulk) for tuning weights and the interactive reserve."""
+
+    return service.get_scheduler_stats()
+
+
 @router.get("/requests", response_model=list[LLMRequest])
 def list_user_requests(
     user_id: int = Query(..., description="User to filter requests for"),
@@ -0,0 +1,194 @@
+"""Priority classes and weighted fair queuing for LLM provider calls.
+
+Interactive turns (teaching assistant, learning coach) share provider quotas and
+the per-model concurrency window with unit generation. A few concurrent unit
+flows used to fill the window, so an interactive call queued behind them.
+Every call now carries a priority class:
+
+- ``interactive``: a learner is waiting on the reply (conversations)
+- ``standard``: the default, used by flow steps
+- ``bulk``: background or batch generation (scripts, backfills)
+
+The class is read from a context variable, so callers tag a whole scope with
+``llm_priority(...)``. The limiter queues waiters per class. It serves the
+classes by stride scheduling in proportion to ``LLM_PRIORITY_WEIGHTS``, and
+holds ``LLM_INTERACTIVE_RESERVE`` of each model's window back for
+interactive calls, so background work can never take all of it.
+``priority_wait_stats()`` reports queue wait per class, which is also
+exported as ``llm_priority_queue_wait_seconds`` on ``/metrics``.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import Iterator, Mapping
+import contextlib
+from contextvars import ContextVar
+import threading
+import time
+from typing import Any
+
+from ..infrastructure.public import get_metrics_registry
+
+__all__ = [
+    "BULK",
+    "INTERACTIVE",
+    "PRIORITY_CLASSES",
+    "STANDARD",
+    "WeightedFairScheduler",
+    "current_priority",
+    "llm_priority",
+    "priority_wait_stats",
+]
+
+INTERACTIVE = "interactive"
+STANDARD = "standard"
+BULK = "bulk"
+PRIORITY_CLASSES = (INTERACTIVE, STANDARD, BULK)
+
+DEFAULT_WEIGHTS: Mapping[str, float] = {INTERACTIVE: 8.0, STANDARD: 3.0, BULK: 1.0}
+
+# Queue waits kept per class for the wait-time quantiles
+_WAIT_WINDOW = 1000
+
+_current_priority: ContextVar[str] = ContextVar("llm_priority", default=STANDARD)
+
+_QUEUE_WAIT = get_metrics_registry().histogram("llm_priority_queue_wait_seconds", "Wait for a slot in a model's concurrency window, by priority class", ("priority",))
+
+
+def current_priority() -> str:
+    """Priority class of LLM calls made from the current context."""
+    return _current_priority.get()
+
+
+@contextlib.contextmanager
+def llm_priority(priority: str) -> Iterator[None]:
+    """Run LLM calls made inside the block (and tasks started from it) in ``priority``."""
+    if priority not in PRIORITY_CLASSES:
+        raise ValueError(f"Unknown LLM priority class: {priority!r} (expected one of {', '.join(PRIORITY_CLASSES)})")
+    previous = _current_priority.get()
+    # Restore by value rather than token: streamed handlers may resume in another context
+    _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.set(previous)
+
+
+class _ClassWaits:
+    """Process-wide queue wait observations for one priority class."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.admitted = 0
+        self.queued = 0
+        self.total_wait = 0.0
+        self.waits: deque[float] = deque(maxlen=_WAIT_WINDOW)
+
+    def observe(self, priority: str, seconds: float) -> None:
+        _QUEUE_WAIT.observe(seconds, priority)
+        with self.lock:
+            self.admitted += 1
+            self.total_wait += seconds
+            self.waits.append(seconds)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self.lock:
+            waits = sorted(self.waits)
+            return {
+                "admitted": self.admitted,
+                "queued": self.queued,
+                "wait_seconds_mean": self.total_wait / self.admitted if self.admitted else 0.0,
+                "wait_seconds_p50": _quantile(waits, 0.5),
+                "wait_seconds_p95": _quantile(waits, 0.95),
+                "wait_seconds_max": waits[-1] if waits else 0.0,
+            }
+
+
+def _quantile(ordered: list[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+_CLASS_WAITS = {priority: _ClassWaits() for priority in PRIORITY_CLASSES}
+
+
+def priority_wait_stats() -> dict[str, dict[str, Any]]:
+    """Queue wait per priority class across every model's concurrency window in this process."""
+    return {priority: waits.snapshot() for priority, waits in _CLASS_WAITS.items()}
+
+
+class WeightedFairScheduler:
+    """Per-class waiter queues for one concurrency window, served by stride scheduling.
+
+    Each class advances a virtual "pass" by ``1 / weight`` per admitted call. The
+    non-empty class with the lowest pass goes next, so over time class ``c``
+    gets ``weight[c] / sum(weights of busy classes)`` of the slots. A class that
+    was idle restarts at the current virtual time instead of spending credit
+    from its idle period. Non-interactive classes only start while more than
+    the reserved share of the window is free.
+    """
+
+    def __init__(self, weights: Mapping[str, float] | None = None, interactive_reserve: float = 0.25) -> None:
+        merged = {**DEFAULT_WEIGHTS, **(weights or {})}
+        self.weights = {priority: max(float(merged[priority]), 0.001) for priority in PRIORITY_CLASSES}
+        self.interactive_reserve = min(max(interactive_reserve, 0.0), 1.0)
+        self._queues: dict[str, deque[tuple[asyncio.Future[None], float]]] = {priority: deque() for priority in PRIORITY_CLASSES}
+        self._pass = dict.fromkeys(PRIORITY_CLASSES, 0.0)
+        self._virtual_time = 0.0
+
+    def reserved_slots(self, limit: int) -> int:
+        """Slots of a ``limit``-sized window that only interactive calls may take (always leaves one for the rest)."""
+        return max(0, min(int(limit * self.interactive_reserve), limit - 1))
+
+    def _admissible(self, priority: str, in_flight: int, limit: int) -> bool:
+        if priority == INTERACTIVE:
+            return in_flight < limit
+        return in_flight < limit - self.reserved_slots(limit)
+
+    def enqueue(self, priority: str) -> asyncio.Future[None]:
+        """Queue a waiter for ``priority``; it resolves once ``admit_next`` admits it."""
+        queue = self._queues[priority]
+        if not queue:
+            self._pass[priority] = max(self._pass[priority], self._virtual_time)
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        queue.append((waiter, time.perf_counter()))
+        waits = _CLASS_WAITS[priority]
+        with waits.lock:
+            waits.queued += 1
+        return waiter
+
+    def discard(self, priority: str, waiter: asyncio.Future[None]) -> None:
+        """Remove a cancelled waiter that was never admitted."""
+        queue = self._queues[priority]
+        for index, (queued, _enqueued) in enumerate(queue):
+            if queued is waiter:
+                del queue[index]
+                waits = _CLASS_WAITS[priority]
+                with waits.lock:
+                    waits.queued -= 1
+                return
+
+    def admit_next(self, in_flight: int, limit: int) -> bool:
+        """Resolve the next waiter allowed to start; returns False when none can."""
+        while True:
+            candidates = [priority for priority in PRIORITY_CLASSES if self._queues[priority] and self._admissible(priority, in_flight, limit)]
+            if not candidates:
+                return False
+            priority = min(candidates, key=lambda candidate: self._pass[candidate])
+            waiter, enqueued = self._queues[priority].popleft()
+            waits = _CLASS_WAITS[priority]
+            with waits.lock:
+                waits.queued -= 1
+            if waiter.done():
+                continue
+            self._virtual_time = self._pass[priority]
+            self._pass[priority] += 1 / self.weights[priority]
+            waits.observe(priority, time.perf_counter() - enqueued)
+            waiter.set_result(None)
+            return True
+
+    def queued(self) -> dict[str, int]:
+        return {priority: len(queue) for priority, queue in self._queues.items()}
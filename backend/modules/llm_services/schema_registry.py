@@ -0,0 +1,241 @@
+"""Precompiled structured-output schemas, one per response model and provider dialect.
+
+Every structured call used to regenerate the Pydantic JSON schema and rewrite it
+for the provider (strict ``additionalProperties`` for OpenAI, ``$ref`` inlining
+for Gemini, a schema prompt for OpenRouter). The registry does that work once
+per ``(response_model, dialect)`` and keeps a ``TypeAdapter`` next to the
+transformed schema so responses are validated by the same compiled core
+validator. ``warm()`` is called at startup with every step ``Outputs`` class and
+conversation response model, so the first request of a unit pays nothing either.
+
+Compiled schemas are shared between requests and must be treated as read-only.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+import copy
+from dataclasses import dataclass, field
+import hashlib
+import json
+import logging
+import threading
+from typing import Any
+
+from pydantic import TypeAdapter
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "CLAUDE_DIALECT",
+    "DIALECTS",
+    "GEMINI_DIALECT",
+    "OPENAI_DIALECT",
+    "OPENROUTER_DIALECT",
+    "RAW_DIALECT",
+    "CompiledSchema",
+    "SchemaRegistry",
+    "gemini_inline_schema",
+    "get_schema_registry",
+    "openai_strict_schema",
+]
+
+RAW_DIALECT = "raw"
+OPENAI_DIALECT = "openai"
+GEMINI_DIALECT = "gemini"
+CLAUDE_DIALECT = "claude"
+OPENROUTER_DIALECT = "openrouter"
+DIALECTS = (RAW_DIALECT, OPENAI_DIALECT, GEMINI_DIALECT, CLAUDE_DIALECT, OPENROUTER_DIALECT)
+
+OPENROUTER_SCHEMA_PROMPT = "You must respond with a JSON object that strictly conforms to this schema: {schema}"
+
+
+def openai_strict_schema(schema: dict[str, Any]) -> dict[str, Any]:
+    """Return ``schema`` with ``additionalProperties: false`` on every object, as OpenAI structured outputs require."""
+
+    def fix_object_schema(obj: dict[str, Any]) -> dict[str, Any]:
+        """Recursively fix object schemas to include additionalProperties: false."""
+        if isinstance(obj, dict):
+            # Fix current object
+            if obj.get("type") == "object":
+                obj["additionalProperties"] = False
+
+            # Recursively fix nested objects
+            for key, value in obj.items():
+                if isinstance(value, dict):
+                    obj[key] = fix_object_schema(value)
+                elif isinstance(value, list):
+                    obj[key] = [fix_object_schema(item) if isinstance(item, dict) else item for item in value]
+
+        return obj
+
+    fixed_schema = fix_object_schema(copy.deepcopy(schema))
+
+    # Also ensure the root object has additionalProperties: false
+    if fixed_schema.get("type") == "object":
+        fixed_schema["additionalProperties"] = False
+
+    return fixed_schema
+
+
+def gemini_inline_schema(schema: dict[str, Any]) -> dict[str, Any]:
+    """Transform a Pydantic JSON schema into Gemini's ``responseSchema`` format.
+
+    Gemini's responseSchema doesn't support JSON Schema $ref or $defs, so all
+    definitions are inlined and unsupported meta fields are removed.
+    """
+    schema = dict(schema)
+    defs = schema.pop("$defs", {})
+
+    def resolve_refs(obj: Any) -> Any:
+        """Recursively resolve $ref references."""
+        if isinstance(obj, dict):
+            # If this object has a $ref, replace it with the definition
+            if "$ref" in obj:
+                ref_path = obj["$ref"]
+                # Extract definition name from #/$defs/DefinitionName
+                if ref_path.startswith("#/$defs/"):
+                    def_name = ref_path.split("/")[-1]
+                    if def_name in defs:
+                        return resolve_refs(defs[def_name])
+                return obj
+
+            # Otherwise, recursively process all values
+            return {k: resolve_refs(v) for k, v in obj.items()}
+        elif isinstance(obj, list):
+            return [resolve_refs(item) for item in obj]
+        else:
+            return obj
+
+    def remove_meta_fields(obj: Any) -> Any:
+        """Remove $schema, $defs, and other meta fields."""
+        if isinstance(obj, dict):
+            return {k: remove_meta_fields(v) for k, v in obj.items() if not k.startswith("$") and k not in {"examples", "default"}}
+        elif isinstance(obj, list):
+            return [remove_meta_fields(item) for item in obj]
+        else:
+            return obj
+
+    return remove_meta_fields(resolve_refs(schema))
+
+
+@dataclass(frozen=True)
+class CompiledSchema:
+    """A response model's schema rewritten for one provider dialect, plus its validator."""
+
+    model: Any
+    dialect: str
+    name: str
+    schema: dict[str, Any]
+    schema_json: str
+    fingerprint: str
+    adapter: TypeAdapter[Any] = field(repr=False)
+    # OpenRouter only: the system prompt that carries the schema
+    prompt: str | None = None
+
+    def validate(self, payload: Any) -> Any:
+        """Validate a parsed JSON payload into an instance of ``model``."""
+        return self.adapter.validate_python(payload)
+
+
+class SchemaRegistry:
+    """Process-wide cache of ``CompiledSchema`` keyed by ``(response_model, dialect)``."""
+
+    def __init__(self) -> None:
+        self._compiled: dict[tuple[Any, str], CompiledSchema] = {}
+        self._adapters: dict[Any, tuple[TypeAdapter[Any], dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def compile(self, model: Any, dialect: str = RAW_DIALECT) -> CompiledSchema:
+        """Return the compiled schema for ``model`` in ``dialect``, building it on first use."""
+        key = (model, dialect)
+        compiled = self._compiled.get(key)
+        if compiled is not None:
+            self._hits += 1
+            return compiled
+        with self._lock:
+            compiled = self._compiled.get(key)
+            if compiled is None:
+                self._misses += 1
+                compiled = self._compiled[key] = self._build(model, dialect)
+        return compiled
+
+    def validator(self, model: Any) -> TypeAdapter[Any]:
+        """Return the cached ``TypeAdapter`` for ``model``."""
+        return self.compile(model).adapter
+
+    def warm(self, models: Iterable[Any], dialects: Iterable[str] = DIALECTS) -> int:
+        """Compile every model for every dialect ahead of the first request; returns the number compiled.
+
+        A model whose schema cannot be generated is logged and skipped so a single
+        bad class never blocks startup; it fails again, loudly, on first use.
+        """
+        dialects = tuple(dialects)
+        compiled = 0
+        for model in dict.fromkeys(models):
+            for dialect in dialects:
+                try:
+                    self.compile(model, dialect)
+                    compiled += 1
+                except Exception as exc:  # pragma: no cover - defensive, depends on user models
+                    logger.warning("Could not precompile schema for %s (%s): %s", getattr(model, "__name__", model), dialect, exc)
+                    break
+        return compiled
+
+    def clear(self) -> None:
+        with self._lock:
+            self._compiled.clear()
+            self._adapters.clear()
+            self._hits = 0
+            self._misses = 0
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self._hits + self._misses
+        return {
+            "models": len(self._adapters),
+            "compiled": len(self._compiled),
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": self._hits / lookups if lookups else 0.0,
+        }
+
+    def _build(self, model: Any, dialect: str) -> CompiledSchema:
+        if dialect not in DIALECTS:
+            raise ValueError(f"Unknown schema dialect: {dialect}")
+        cached = self._adapters.get(model)
+        if cached is None:
+            adapter: TypeAdapter[Any] = TypeAdapter(model)
+            cached = self._adapters[model] = (adapter, adapter.json_schema())
+        adapter, raw_schema = cached
+
+        prompt: str | None = None
+        if dialect == OPENAI_DIALECT:
+            schema = openai_strict_schema(raw_schema)
+        elif dialect == GEMINI_DIALECT:
+            schema = gemini_inline_schema(raw_schema)
+        else:
+            schema = raw_schema
+        if dialect == OPENROUTER_DIALECT:
+            prompt = OPENROUTER_SCHEMA_PROMPT.format(schema=json.dumps(schema))
+
+        schema_json = json.dumps(schema, sort_keys=True, default=str)
+        return CompiledSchema(
+            model=model,
+            dialect=dialect,
+            name=getattr(model, "__name__", str(model)),
+            schema=schema,
+            schema_json=schema_json,
+            fingerprint=hashlib.sha256(schema_json.encode()).hexdigest()[:16],
+            adapter=adapter,
+            prompt=prompt,
+        )
+
+
+_REGISTRY = SchemaRegistry()
+
+
+def get_schema_registry() -> SchemaRegistry:
+    """Return the process-wide registry shared by all providers."""
+    return _REGISTRY
@@ -1,19 +1,33 @@
 """Service layer for LLM operations with DTOs."""
 
+import asyncio
 import base64
+from collections.abc import AsyncIterator, Awaitable, Callable, Sequence
 import contextlib
-from datetime import datetime
+import dataclasses
+from datetime import UTC, datetime
+import functools
 import logging
+import time
 from typing import Any, TypeVar
 import uuid
 
 from pydantic import BaseModel, ConfigDict, Field
 
+from ..infrastructure.public import CPU_EXECUTOR, get_executor
+from .audit import assign_pending_user, pending_llm_request_row, persist_pending_llm_request
+from .batch import current_batch_executor
+from .cache import CachedCallKind, LLMCache, build_request_cache_key, response_from_dict
+from .coalescing import get_request_coalescer
 from .config import LLMConfig, create_llm_config_from_env
 from .exceptions import LLMAuthenticationError, LLMError
+from .hedging import HedgeAttempt, HedgePolicy, get_request_hedger
 from .providers.base import LLMProvider, LLMProviderKwargs
 from .providers.factory import create_llm_provider
 from .repo import LLMRequestRepo
+from .scheduler import priority_wait_stats
+from .tokenizer import count_message_tokens
+from .tts import STITCHABLE_FORMATS, audio_duration_seconds, split_transcript, stitch_audio
 from .types import (
     AudioGenerationRequest,
     ImageGenerationRequest,
@@ -36,6 +50,9 @@ from .types import (
 from .types import (
     LLMResponse as LLMResponseInternal,
 )
+from .types import (
+    LLMStreamChunk as LLMStreamChunkInternal,
+)
 from .types import (
     SearchResult as SearchResultInternal,
 )
@@ -45,6 +62,8 @@ from .types import (
 
 # Type variable for structured responses
 T = TypeVar("T", bound=BaseModel)
+# Type variable for hedged provider call results
+R = TypeVar("R")
 
 __all__ = [
     "AudioResponse",
@@ -54,6 +73,7 @@ __all__ = [
     "LLMRequest",
     "LLMResponse",
     "LLMService",
+    "LLMStreamChunk",
     "SearchResult",
     "WebSearchResponse",
 ]
@@ -121,10 +141,11 @@ class LLMMessage(BaseModel):
     name: str | None = Field(None, description="Optional name for the message")
     function_call: dict[str, Any] | None = Field(None, description="Function call data")
     tool_calls: list[dict[str, Any]] | None = Field(None, description="Tool calls data")
+    cache_breakpoint: bool = Field(False, description="Cache the prompt prefix up to and including this message")
 
     def to_llm_message(self) -> LLMMessageInternal:
         """Convert to internal LLMMessage type."""
-        return LLMMessageInternal(role=MessageRole(self.role), content=self.content, name=self.name, function_call=self.function_call, tool_calls=self.tool_calls)
+        return LLMMessageInternal(role=MessageRole(self.role), content=self.content, name=self.name, function_call=self.function_call, tool_calls=self.tool_calls, cache_breakpoint=self.cache_breakpoint)
 
 
 class LLMResponse(BaseModel):
@@ -143,6 +164,8 @@ class LLMResponse(BaseModel):
     system_fingerprint: str | None = Field(None, description="System fingerprint")
     response_output: dict[str, Any] | list[dict[str, Any]] | None = Field(None, description="Responses API output structure")
     response_created_at: datetime | None = Field(None, description="Provider response created timestamp")
+    cached_input_tokens: int | None = Field(None, description="Input tokens served from the provider's prompt cache")
+    cache_creation_tokens: int | None = Field(None, description="Input tokens written to the provider's prompt cache")
 
     @classmethod
     def from_llm_response(cls, response: LLMResponseInternal) -> "LLMResponse":
@@ -161,9 +184,24 @@ class LLMResponse(BaseModel):
             system_fingerprint=response.system_fingerprint,
             response_output=response.response_output,
             response_created_at=response.response_created_at,
+            cached_input_tokens=response.cached_input_tokens,
+            cache_creation_tokens=response.cache_creation_tokens,
         )
 
 
+class LLMStreamChunk(BaseModel):
+    """DTO for one piece of a streamed LLM response."""
+
+    delta: str = Field("", description="Newly generated text")
+    response: LLMResponse | None = Field(None, description="Complete response, set only on the final chunk")
+    request_id: uuid.UUID | None = Field(None, description="LLM request id, set only on the final chunk")
+
+    @property
+    def is_final(self) -> bool:
+        """Whether this chunk closes the stream."""
+        return self.response is not None
+
+
 class LLMRequest(BaseModel):
     """DTO for LLM request records."""
 
@@ -184,6 +222,8 @@ class LLMRequest(BaseModel):
     tokens_used: int | None = Field(None, description="Tokens used")
     input_tokens: int | None = Field(None, description="Input tokens")
     output_tokens: int | None = Field(None, description="Output tokens")
+    cached_input_tokens: int | None = Field(None, description="Input tokens read from the provider's prompt cache")
+    cache_creation_tokens: int | None = Field(None, description="Input tokens written to the provider's prompt cache")
     cost_estimate: float | None = Field(None, description="Cost estimate")
     status: str = Field(..., description="Request status")
     execution_time_ms: int | None = Field(None, description="Execution time")
@@ -288,12 +328,16 @@ class LLMService:
         self._provider_cache: dict[LLMProviderType, LLMProvider] = {}
         self._provider_configs: dict[LLMProviderType, LLMConfig] = {}
         self._default_provider_type: LLMProviderType | None = None
+        self._cache: LLMCache | None = None
+        self._coalescer = get_request_coalescer()
+        self._hedger = get_request_hedger()
         self._logger = logging.getLogger(__name__)
         # Initialize default LLM provider
         try:
             default_config = create_llm_config_from_env()
             self._default_provider_type = default_config.provider
             self._provider_configs[default_config.provider] = default_config
+            self._cache = self._create_cache(default_config)
             self._logger.info(f"Initializing default LLM provider: {default_config.provider.value} (model: {default_config.model})")
             provider_instance = create_llm_provider(default_config, repo.s)
             self._provider_cache[default_config.provider] = provider_instance
@@ -304,6 +348,168 @@ class LLMService:
             self.provider = None
             self._default_provider_type = None
 
+    def _create_cache(self, config: LLMConfig) -> LLMCache | None:
+        """Create the shared response cache; caching must never block service initialization."""
+        if not config.cache_enabled:
+            return None
+        try:
+            return LLMCache(cache_dir=config.cache_dir, enabled=True)
+        except Exception as e:
+            self._logger.warning(f"Failed to initialize LLM response cache: {e}")
+            return None
+
+    def _request_key(
+        self,
+        provider: LLMProvider,
+        messages: list[LLMMessageInternal],
+        *,
+        kind: CachedCallKind,
+        model: str | None,
+        temperature: float | None,
+        max_output_tokens: int | None,
+        kwargs: dict[str, Any],
+        response_model: type[BaseModel] | None = None,
+        tools: list[ToolDefinition] | None = None,
+    ) -> str:
+        """Build the provider-agnostic key used for response caching and request coalescing."""
+        return build_request_cache_key(
+            messages,
+            kind=kind,
+            provider=provider.config.provider.value,
+            model=model or provider.config.model,
+            response_model=response_model,
+            tools=tools,
+            temperature=temperature if temperature is not None else provider.config.temperature,
+            max_output_tokens=max_output_tokens if max_output_tokens is not None else provider.config.max_output_tokens,
+            **kwargs,
+        )
+
+    async def _get_cached_payload(self, cache_key: str) -> dict[str, Any] | None:
+        """Look up a cached payload; returns None on miss or when caching is disabled."""
+        if self._cache is None:
+            return None
+        return await self._cache.get_entry(cache_key)
+
+    async def _set_cached_payload(self, cache_key: str, build_payload: Callable[[], dict[str, Any]]) -> None:
+        """Store a payload for later cache hits; a response that cannot be serialized is simply not cached."""
+        if self._cache is None:
+            return
+        try:
+            payload = build_payload()
+        except Exception as e:
+            self._logger.warning(f"Skipping response cache write: {e}")
+            return
+        await self._cache.set_entry(cache_key, payload)
+
+    def _record_cache_hit(
+        self,
+        provider: LLMProvider,
+        messages: list[LLMMessageInternal],
+        response: LLMResponseInternal,
+        *,
+        started: float,
+        user_id: int | None,
+        model: str | None,
+        temperature: float | None,
+        max_output_tokens: int | None,
+    ) -> uuid.UUID:
+        """Record a cache hit or coalesced call in llm_requests; neither incurs provider spend."""
+        response.cost_estimate = 0.0
+        response.response_time_ms = int((time.perf_counter() - started) * 1000)
+        response.response_created_at = response.response_created_at or datetime.now(UTC)
+        return provider.record_cached_response(messages, response, user_id=user_id, model=model, temperature=temperature, max_output_tokens=max_output_tokens)
+
+    @staticmethod
+    def _structured_payload(provider: LLMProvider, model: str | None, structured_obj: BaseModel, usage_info: dict[str, Any]) -> dict[str, Any]:
+        """Serialize a structured result into the payload shared by the cache and coalesced callers."""
+        response = LLMResponseInternal(
+            content=structured_obj.model_dump_json(),
+            provider=provider.config.provider,
+            model=model or provider.config.model,
+            tokens_used=usage_info.get("tokens_used"),
+            cost_estimate=usage_info.get("cost_estimate"),
+        )
+        return {"response": response.to_dict(), "usage": usage_info}
+
+    @staticmethod
+    def _stream_payload(response: LLMResponseInternal, *, structured: bool) -> dict[str, Any]:
+        """Serialize a completed stream in the cache layout of the matching non-streamed call."""
+        if not structured:
+            return response.to_dict()
+        return {"response": response.to_dict(), "usage": {"tokens_used": response.tokens_used, "cost_estimate": response.cost_estimate}}
+
+    def get_coalescing_stats(self) -> dict[str, int]:
+        """Return process-wide counters for coalesced (deduplicated) in-flight requests."""
+        return self._coalescer.stats()
+
+    def get_hedging_stats(self) -> dict[str, float]:
+        """Return process-wide counters for hedged calls, failovers and wasted spend."""
+        return self._hedger.stats()
+
+    def get_scheduler_stats(self) -> dict[str, dict[str, Any]]:
+        """Return per-priority-class queue wait for the LLM concurrency windows in this process."""
+        return priority_wait_stats()
+
+    def _hedge_policy(self, provider: LLMProvider, model: str | None, hedge_models: Sequence[str] | None) -> HedgePolicy | None:
+        """Resolve the hedging policy for a call; None when the call is not hedged."""
+        raw_policy = provider.config.hedge_policies.get(model or provider.config.model)
+        if raw_policy is None and not hedge_models:
+            return None
+        policy = HedgePolicy.from_dict(raw_policy or {})
+        if hedge_models:
+            policy = dataclasses.replace(policy, alternates=tuple(hedge_models))
+        return policy if policy.alternates else None
+
+    def _resolve_hedge_target(self, target: str) -> tuple[LLMProvider, str]:
+        """Resolve a "model" or "provider:model" hedge target to its provider and model."""
+        prefix, separator, target_model = target.partition(":")
+        if separator and prefix in {provider_type.value for provider_type in LLMProviderType}:
+            return self._ensure_provider(LLMProviderType(prefix)), target_model
+        return self._select_provider(target), target
+
+    async def _call_hedged(
+        self,
+        provider: LLMProvider,
+        model: str | None,
+        hedge_models: Sequence[str] | None,
+        messages: list[LLMMessageInternal],
+        call: Callable[[LLMProvider, str | None], Awaitable[R]],
+        cost_of: Callable[[R], float],
+    ) -> R:
+        """
+        Run a provider call, hedging it across equivalent targets when a policy applies.
+
+        ``call`` receives the provider and model of one attempt. Alternates that
+        are not configured in this environment are skipped rather than failing the call.
+        """
+        # Batched calls wait in the provider's batch queue by design; racing them would only double spend
+        policy = None if current_batch_executor() is not None else self._hedge_policy(provider, model, hedge_models)
+        if policy is None:
+            return await call(provider, model)
+
+        def attempt(target_provider: LLMProvider, target_model: str | None) -> HedgeAttempt[R]:
+            resolved_model = target_model or target_provider.config.model
+            return HedgeAttempt(
+                target=f"{target_provider.config.provider.value}:{resolved_model}",
+                call=lambda: call(target_provider, target_model),
+                cost_of=cost_of,
+                abandoned_cost=lambda: target_provider.estimate_cost(prompt_tokens=count_message_tokens(messages, resolved_model), completion_tokens=0, model=resolved_model),
+            )
+
+        attempts = [attempt(provider, model)]
+        for target in policy.alternates:
+            try:
+                attempts.append(attempt(*self._resolve_hedge_target(target)))
+            except (RuntimeError, ValueError) as e:
+                self._logger.warning(f"Skipping unavailable hedge target {target}: {e}")
+        if len(attempts) == 1:
+            return await call(provider, model)
+
+        result, target = await self._hedger.run(attempts, policy)
+        if target != attempts[0].target:
+            self._logger.info(f"Hedged call served by {target} instead of {attempts[0].target}")
+        return result
+
     def _ensure_provider(self, provider_type: LLMProviderType) -> LLMProvider:
         if provider_type in self._provider_cache:
             self._logger.debug(f"Using cached {provider_type.value} provider")
@@ -340,6 +546,10 @@ class LLMService:
             self._logger.debug(f"No model specified, using default provider: {self._default_provider_type.value}")
             return self._ensure_provider(self._default_provider_type)
 
+        if self._default_provider_type == LLMProviderType.REPLAY:
+            # Replay mode answers every model from recordings
+            return self._ensure_provider(LLMProviderType.REPLAY)
+
         if model.startswith("openrouter/"):
             try:
                 provider = self._ensure_provider(LLMProviderType.OPENROUTER)
@@ -405,37 +615,138 @@ class LLMService:
     def _ensure_request_user(self, request_id: uuid.UUID, user_id: int | None) -> None:
         """Persist the user association for the given LLM request when provided."""
 
-        if user_id is None:
+        if user_id is None or assign_pending_user(request_id, user_id):
             return
 
         with contextlib.suppress(Exception):
+            # A row the background writer is inserting right now is written here first, so the update has a target
+            persist_pending_llm_request(self.repo.s, request_id)
             self.repo.assign_user(request_id, user_id)
 
     async def generate_response(
-        self, messages: list[LLMMessage], user_id: int | None = None, model: str | None = None, temperature: float | None = None, max_output_tokens: int | None = None, **kwargs: LLMProviderKwargs
+        self,
+        messages: list[LLMMessage],
+        user_id: int | None = None,
+        model: str | None = None,
+        temperature: float | None = None,
+        max_output_tokens: int | None = None,
+        hedge_models: Sequence[str] | None = None,
+        **kwargs: LLMProviderKwargs,
     ) -> tuple[LLMResponse, uuid.UUID]:
         """
         Generate a text response from the LLM.
+
+        ``hedge_models`` opts the call into hedging/failover across equivalent
+        models, overriding any ``LLM_HEDGE_POLICIES`` alternates for the model.
         """
         provider = self._select_provider(model)
 
         # Convert DTOs to internal types
         internal_messages = [msg.to_llm_message() for msg in messages]
 
-        # Call provider
+        # Serve identical requests from the response cache
+        started = time.perf_counter()
+        request_key = self._request_key(provider, internal_messages, kind="response", model=model, temperature=temperature, max_output_tokens=max_output_tokens, kwargs=kwargs)
+        cached = await self._get_cached_payload(request_key)
+        if cached is not None:
+            internal_response = response_from_dict(cached)
+            request_id = self._record_cache_hit(provider, internal_messages, internal_response, started=started, user_id=user_id, model=model, temperature=temperature, max_output_tokens=max_output_tokens)
+            return LLMResponse.from_llm_response(internal_response), request_id
+
+        async def _call_target(target: LLMProvider, target_model: str | None) -> tuple[LLMResponseInternal, uuid.UUID]:
+            return await target.generate_response(messages=internal_messages, user_id=user_id, model=target_model, temperature=temperature, max_output_tokens=max_output_tokens, **kwargs)  # type: ignore[arg-type]
+
+        async def _call_provider() -> tuple[LLMResponseInternal, uuid.UUID]:
+            result = await self._call_hedged(provider, model, hedge_models, internal_messages, _call_target, lambda r: r[0].cost_estimate or 0.0)
+            await self._set_cached_payload(request_key, result[0].to_dict)
+            return result
+
+        # Call provider, joining an identical request already in flight
         try:
-            internal_response, request_id = await provider.generate_response(messages=internal_messages, user_id=user_id, model=model, temperature=temperature, max_output_tokens=max_output_tokens, **kwargs)  # type: ignore[arg-type]
+            (internal_response, request_id), shared = await self._coalescer.run(request_key, _call_provider)
         except Exception as e:
             self._logger.error(f"❌ LLM SERVICE CALL FAILED: {type(e).__name__}: {e}", exc_info=True)
             raise
 
+        if shared:
+            internal_response = dataclasses.replace(internal_response)
+            request_id = self._record_cache_hit(provider, internal_messages, internal_response, started=started, user_id=user_id, model=model, temperature=temperature, max_output_tokens=max_output_tokens)
+            return LLMResponse.from_llm_response(internal_response), request_id
+
         # Convert back to DTO
         response_dto = LLMResponse.from_llm_response(internal_response)
         self._ensure_request_user(request_id, user_id)
         return response_dto, request_id
 
+    async def stream_response(
+        self,
+        messages: list[LLMMessage],
+        user_id: int | None = None,
+        model: str | None = None,
+        temperature: float | None = None,
+        max_output_tokens: int | None = None,
+        response_model: type[BaseModel] | None = None,
+        **kwargs: LLMProviderKwargs,
+    ) -> AsyncIterator[LLMStreamChunk]:
+        """
+        Stream a response from the LLM as it is generated.
+
+        Yields text deltas followed by a final chunk carrying the complete response
+        and its request id. With ``response_model`` the streamed text is the JSON
+        object for that model, to be validated by the caller once complete.
+        """
+        provider = self._select_provider(model)
+
+        # Convert DTOs to internal types
+        internal_messages = [msg.to_llm_message() for msg in messages]
+
+        # Replay identical requests from the response cache as a single delta
+        started = time.perf_counter()
+        kind: CachedCallKind = "structured" if response_model is not None else "response"
+        request_key = self._request_key(provider, internal_messages, kind=kind, model=model, temperature=temperature, max_output_tokens=max_output_tokens, kwargs=kwargs, response_model=response_model)
+        cached = await self._get_cached_payload(request_key)
+        if cached is not None:
+            internal_response = response_from_dict(cached["response"] if response_model is not None else cached)
+            request_id = self._record_cache_hit(provider, internal_messages, internal_response, started=started, user_id=user_id, model=model, temperature=temperature, max_output_tokens=max_output_tokens)
+            yield LLMStreamChunk(delta=internal_response.content)
+            yield LLMStreamChunk(response=LLMResponse.from_llm_response(internal_response), request_id=request_id)
+            return
+
+        provider_kwargs: dict[str, Any] = {}
+        if model is not None:
+            provider_kwargs["model"] = model
+        if temperature is not None:
+            provider_kwargs["temperature"] = temperature
+        if max_output_tokens is not None:
+            provider_kwargs["max_output_tokens"] = max_output_tokens
+
+        stream = provider.stream_response(internal_messages, user_id=user_id, response_model=response_model, **provider_kwargs, **kwargs)
+        try:
+            async with contextlib.aclosing(stream):
+                chunk: LLMStreamChunkInternal
+                async for chunk in stream:
+                    if chunk.response is None:
+                        yield LLMStreamChunk(delta=chunk.delta)
+                        continue
+                    final_response = chunk.response
+                    await self._set_cached_payload(request_key, functools.partial(self._stream_payload, final_response, structured=response_model is not None))
+                    if chunk.request_id is not None:
+                        self._ensure_request_user(chunk.request_id, user_id)
+                    yield LLMStreamChunk(response=LLMResponse.from_llm_response(final_response), request_id=chunk.request_id)
+        except Exception as e:
+            self._logger.error(f"❌ LLM SERVICE STREAM FAILED: {type(e).__name__}: {e}", exc_info=True)
+            raise
+
     async def generate_structured_response(
-        self, messages: list[LLMMessage], response_model: type[T], user_id: int | None = None, model: str | None = None, temperature: float | None = None, max_output_tokens: int | None = None, **kwargs: LLMProviderKwargs
+        self,
+        messages: list[LLMMessage],
+        response_model: type[T],
+        user_id: int | None = None,
+        model: str | None = None,
+        temperature: float | None = None,
+        max_output_tokens: int | None = None,
+        hedge_models: Sequence[str] | None = None,
+        **kwargs: LLMProviderKwargs,
     ) -> tuple[T, uuid.UUID, dict[str, Any]]:
         """
         Generate a structured response using a Pydantic model.
@@ -448,26 +759,61 @@ class LLMService:
         # Convert DTOs to internal types
         internal_messages = [msg.to_llm_message() for msg in messages]
 
+        # Serve identical requests (same schema) from the response cache
+        started = time.perf_counter()
+        request_key = self._request_key(provider, internal_messages, kind="structured", model=model, temperature=temperature, max_output_tokens=max_output_tokens, kwargs=kwargs, response_model=response_model)
+        cached = await self._get_cached_payload(request_key)
+        if cached is not None:
+            try:
+                cached_response = response_from_dict(cached["response"])
+                cached_obj = response_model.model_validate_json(cached_response.content)
+            except (KeyError, ValueError) as e:
+                self._logger.warning(f"Cached structured response no longer validates, calling provider: {e}")
+            else:
+                request_id = self._record_cache_hit(provider, internal_messages, cached_response, started=started, user_id=user_id, model=model, temperature=temperature, max_output_tokens=max_output_tokens)
+                return cached_obj, request_id, {**cached.get("usage", {}), "cost_estimate": 0.0, "cached": True}
+
         # Call provider
         provider_kwargs: dict[str, Any] = {}
-        if model is not None:
-            provider_kwargs["model"] = model
         if temperature is not None:
             provider_kwargs["temperature"] = temperature
         if max_output_tokens is not None:
             provider_kwargs["max_output_tokens"] = max_output_tokens
 
+        async def _call_target(target: LLMProvider, target_model: str | None) -> tuple[T, uuid.UUID, dict[str, Any]]:
+            model_kwargs: dict[str, Any] = {"model": target_model} if target_model is not None else {}
+            return await target.generate_structured_object(messages=internal_messages, response_model=response_model, user_id=user_id, **model_kwargs, **provider_kwargs, **kwargs)
+
+        async def _call_provider() -> tuple[T, uuid.UUID, dict[str, Any]]:
+            result = await self._call_hedged(provider, model, hedge_models, internal_messages, _call_target, lambda r: r[2].get("cost_estimate") or 0.0)
+            await self._set_cached_payload(request_key, lambda: self._structured_payload(provider, model, result[0], result[2]))
+            return result
+
+        # Call provider, joining an identical request already in flight
         try:
-            structured_obj, request_id, usage_info = await provider.generate_structured_object(messages=internal_messages, response_model=response_model, user_id=user_id, **provider_kwargs, **kwargs)
+            (structured_obj, request_id, usage_info), shared = await self._coalescer.run(request_key, _call_provider)
         except Exception as e:
             self._logger.error(f"❌ LLM SERVICE STRUCTURED CALL FAILED: {type(e).__name__}: {e}", exc_info=True)
             raise
 
+        if shared:
+            shared_response = response_from_dict(self._structured_payload(provider, model, structured_obj, usage_info)["response"])
+            request_id = self._record_cache_hit(provider, internal_messages, shared_response, started=started, user_id=user_id, model=model, temperature=temperature, max_output_tokens=max_output_tokens)
+            return structured_obj.model_copy(deep=True), request_id, {**usage_info, "cost_estimate": 0.0, "coalesced": True}
+
         self._ensure_request_user(request_id, user_id)
         return structured_obj, request_id, usage_info
 
     async def generate_response_with_tools(
-        self, messages: list[LLMMessage], tools: list[ToolDefinition], user_id: int | None = None, model: str | None = None, temperature: float | None = None, max_output_tokens: int | None = None, **kwargs: LLMProviderKwargs
+        self,
+        messages: list[LLMMessage],
+        tools: list[ToolDefinition],
+        user_id: int | None = None,
+        model: str | None = None,
+        temperature: float | None = None,
+        max_output_tokens: int | None = None,
+        hedge_models: Sequence[str] | None = None,
+        **kwargs: LLMProviderKwargs,
     ) -> tuple[LLMResponse, list[ToolCall] | None, uuid.UUID]:
         """
         Generate response with tool calling capability.
@@ -480,21 +826,48 @@ class LLMService:
         # Convert DTOs to internal types
         internal_messages = [msg.to_llm_message() for msg in messages]
 
-        # Call provider
-        try:
-            internal_response, tool_calls, request_id = await provider.generate_response_with_tools(
+        # Serve identical requests (same tool set) from the response cache
+        started = time.perf_counter()
+        request_key = self._request_key(provider, internal_messages, kind="tools", model=model, temperature=temperature, max_output_tokens=max_output_tokens, kwargs=kwargs, tools=tools)
+        cached = await self._get_cached_payload(request_key)
+        if cached is not None:
+            cached_response = response_from_dict(cached["response"])
+            cached_tool_calls = [ToolCall(**call) for call in cached["tool_calls"]] if cached.get("tool_calls") is not None else None
+            request_id = self._record_cache_hit(provider, internal_messages, cached_response, started=started, user_id=user_id, model=model, temperature=temperature, max_output_tokens=max_output_tokens)
+            return LLMResponse.from_llm_response(cached_response), cached_tool_calls, request_id
+
+        async def _call_target(target: LLMProvider, target_model: str | None) -> tuple[LLMResponseInternal, list[ToolCall] | None, uuid.UUID]:
+            return await target.generate_response_with_tools(
                 messages=internal_messages,
                 tools=tools,
                 user_id=user_id,
-                model=model,
+                model=target_model,
                 temperature=temperature,
                 max_output_tokens=max_output_tokens,
                 **kwargs,  # type: ignore[arg-type]
             )
+
+        async def _call_provider() -> tuple[LLMResponseInternal, list[ToolCall] | None, uuid.UUID]:
+            response, calls, provider_request_id = await self._call_hedged(provider, model, hedge_models, internal_messages, _call_target, lambda r: r[0].cost_estimate or 0.0)
+            await self._set_cached_payload(
+                request_key,
+                lambda: {"response": response.to_dict(), "tool_calls": [call.to_dict() for call in calls] if calls is not None else None},
+            )
+            return response, calls, provider_request_id
+
+        # Call provider, joining an identical request already in flight
+        try:
+            (internal_response, tool_calls, request_id), shared = await self._coalescer.run(request_key, _call_provider)
         except Exception as e:
             self._logger.error(f"❌ LLM SERVICE TOOL CALL FAILED: {type(e).__name__}: {e}", exc_info=True)
             raise
 
+        if shared:
+            internal_response = dataclasses.replace(internal_response)
+            tool_calls = [dataclasses.replace(call) for call in tool_calls] if tool_calls is not None else None
+            request_id = self._record_cache_hit(provider, internal_messages, internal_response, started=started, user_id=user_id, model=model, temperature=temperature, max_output_tokens=max_output_tokens)
+            return LLMResponse.from_llm_response(internal_response), tool_calls, request_id
+
         # Convert back to DTO
         response_dto = LLMResponse.from_llm_response(internal_response)
         self._ensure_request_user(request_id, user_id)
@@ -508,9 +881,18 @@ class LLMService:
         model: str | None = None,
         audio_format: str = "mp3",
         speed: float | None = None,
+        chunked: bool | None = None,
         **kwargs: LLMProviderKwargs,
     ) -> tuple[AudioResponse, uuid.UUID]:
-        """Synthesize narrated audio from text."""
+        """
+        Synthesize narrated audio from text.
+
+        Text longer than the provider's ``tts_chunk_chars`` is split at paragraph
+        and sentence boundaries, synthesized concurrently and stitched into one
+        response (mp3, wav and pcm only). ``chunked=False`` always sends a single
+        call; ``chunked=True`` requires a stitchable format. The returned request
+        id is the first chunk's; every chunk is recorded as its own request.
+        """
 
         provider = self._select_provider(model)
 
@@ -524,16 +906,65 @@ class LLMService:
             speed=speed,
         )
 
-        internal_response, request_id = await provider.generate_audio(
-            request=request,
-            user_id=user_id,
-            **kwargs,
-        )
+        if chunked and audio_format not in STITCHABLE_FORMATS:
+            raise ValueError(f"Chunked audio synthesis supports {sorted(STITCHABLE_FORMATS)}, not {audio_format}")
+        chunks = split_transcript(text, provider.config.tts_chunk_chars) if chunked is not False and audio_format in STITCHABLE_FORMATS else []
+
+        if len(chunks) > 1:
+            internal_response, request_id = await self._generate_audio_chunked(provider, request, chunks, user_id=user_id, **kwargs)
+        else:
+            internal_response, request_id = await provider.generate_audio(
+                request=request,
+                user_id=user_id,
+                **kwargs,
+            )
 
         response_dto = AudioResponse.from_audio_response(internal_response)
         self._ensure_request_user(request_id, user_id)
         return response_dto, request_id
 
+    async def _generate_audio_chunked(
+        self,
+        provider: LLMProvider,
+        request: AudioGenerationRequest,
+        chunks: list[str],
+        user_id: int | None = None,
+        **kwargs: LLMProviderKwargs,
+    ) -> tuple[AudioResponseInternal, uuid.UUID]:
+        """Synthesize ``chunks`` with bounded concurrency and stitch them losslessly in order."""
+        semaphore = asyncio.Semaphore(provider.config.tts_chunk_concurrency)
+
+        async def _synthesize(chunk: str) -> tuple[AudioResponseInternal, uuid.UUID]:
+            async with semaphore:
+                return await provider.generate_audio(request=dataclasses.replace(request, text=chunk), user_id=user_id, **kwargs)
+
+        try:
+            # A failed chunk cancels the rest instead of paying for audio that will be discarded
+            async with asyncio.TaskGroup() as group:
+                tasks = [group.create_task(_synthesize(chunk)) for chunk in chunks]
+        except ExceptionGroup as group_error:
+            raise group_error.exceptions[0] from None
+        results = [task.result() for task in tasks]
+
+        first, request_id = results[0]
+        try:
+            audio_bytes = await get_executor(CPU_EXECUTOR).run(stitch_audio, [response.audio_bytes for response, _ in results], first.mime_type)
+        except ValueError as e:
+            raise LLMError(f"Could not stitch chunked audio: {e}") from e
+        duration_seconds = audio_duration_seconds(audio_bytes, first.mime_type)
+        if duration_seconds is None and all(response.duration_seconds is not None for response, _ in results):
+            duration_seconds = sum(response.duration_seconds or 0.0 for response, _ in results)
+        self._logger.info(f"Stitched {len(chunks)} TTS chunks into {len(audio_bytes)} bytes ({duration_seconds}s)")
+
+        return AudioResponseInternal(
+            audio_base64=base64.b64encode(audio_bytes).decode("ascii"),
+            mime_type=first.mime_type,
+            voice=first.voice,
+            model=first.model,
+            cost_estimate=sum(response.cost_estimate or 0.0 for response, _ in results),
+            duration_seconds=duration_seconds,
+        ), request_id
+
     async def generate_image(self, prompt: str, user_id: int | None = None, size: str = "1024x1024", quality: str = "standard", style: str | None = None, **kwargs: LLMProviderKwargs) -> tuple[ImageResponse, uuid.UUID]:
         """
         Generate an image from a text prompt.
@@ -578,6 +1009,10 @@ class LLMService:
 
     def get_request(self, request_id: uuid.UUID) -> LLMRequest | None:
         """Retrieve details of a previous LLM request."""
+        pending = pending_llm_request_row(request_id)
+        if pending is not None:
+            # Still queued for a write-behind insert
+            return LLMRequest.model_validate({"updated_at": pending["created_at"], **pending})
         request = self.repo.by_id(request_id)
         return LLMRequest.model_validate(request) if request else None
 
@@ -586,31 +1021,39 @@ class LLMService:
         requests = self.repo.by_user_id(user_id, limit, offset)
         return [LLMRequest.model_validate(req) for req in requests]
 
-    def estimate_cost(self, messages: list[LLMMessage], model: str | None = None) -> float:
+    def _default_model(self) -> str | None:
+        """Model used when a call does not name one."""
+        if self._default_provider_type is None:
+            return None
+        config = self._provider_configs.get(self._default_provider_type)
+        return config.model if config else None
+
+    def count_tokens(self, messages: list[LLMMessage], model: str | None = None) -> int:
+        """
+        Count prompt tokens for messages with the model's tokenizer.
+
+        Does not call any provider; tokenizers and counts for repeated
+        fragments are cached, so this is cheap enough for budgeting decisions.
+        """
+        return count_message_tokens((msg.to_llm_message() for msg in messages), model or self._default_model())
+
+    def estimate_cost(self, messages: list[LLMMessage], model: str | None = None, expected_output_tokens: int | None = None) -> float:
         """
         Estimate the cost of a request before making it.
+
+        Output size defaults to a quarter of the prompt when not given.
         """
         try:
             provider = self._select_provider(model)
         except RuntimeError:
             return 0.0
 
-        # Rough token estimation (this is approximate)
-        # In production, you might want to use tiktoken or similar
-        total_chars = 0
-        for msg in messages:
-            if isinstance(msg.content, str):
-                total_chars += len(msg.content)
-            else:
-                for part in msg.content:
-                    text = part.get("text") if isinstance(part, dict) else None
-                    if isinstance(text, str):
-                        total_chars += len(text)
-        estimated_tokens = total_chars // 4  # Rough approximation
+        prompt_tokens = self.count_tokens(messages, model or provider.config.model)
+        completion_tokens = expected_output_tokens if expected_output_tokens is not None else prompt_tokens // 4
 
         return provider.estimate_cost(
-            prompt_tokens=estimated_tokens,
-            completion_tokens=estimated_tokens // 4,  # Estimate output tokens
+            prompt_tokens=prompt_tokens,
+            completion_tokens=completion_tokens,
             model=model,
         )
 
@@ -0,0 +1,104 @@
+"""Helpers for streamed LLM completions."""
+
+from __future__ import annotations
+
+from collections.abc import AsyncIterable, AsyncIterator
+import json
+
+__all__ = ["JSONFieldStreamer", "iter_sse_data"]
+
+
+async def iter_sse_data(lines: AsyncIterable[str]) -> AsyncIterator[str]:
+    """Yield the ``data`` payload of each server-sent event in a stream of lines."""
+    data: list[str] = []
+    async for line in lines:
+        if not line:
+            if data:
+                yield "\n".join(data)
+                data = []
+            continue
+        if line.startswith(":"):
+            continue
+        field, _, value = line.partition(":")
+        if field == "data":
+            data.append(value.removeprefix(" "))
+    if data:
+        yield "\n".join(data)
+
+
+class JSONFieldStreamer:
+    """
+    Incrementally decode one top-level string field of a JSON object as it streams in.
+
+    Structured replies arrive as JSON text; feeding each chunk returns the newly
+    decoded characters of ``field`` so the learner-facing message can be shown
+    before the whole object (and its other fields) has been generated.
+    """
+
+    def __init__(self, field: str) -> None:
+        self.field = field
+        self.text = ""
+        self.complete = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = ""
+        self._high_surrogate = ""
+        self._key_chars: list[str] = []
+        self._key: str | None = None
+        self._after_colon = False
+        self._capturing = False
+
+    def feed(self, chunk: str) -> str:
+        """Consume the next piece of JSON text and return newly decoded field characters."""
+        out: list[str] = []
+        for ch in chunk:
+            if self._in_string:
+                self._consume_string_char(ch, out)
+            elif ch == '"':
+                self._in_string = True
+                self._capturing = not self.complete and self._depth == 1 and self._after_colon and self._key == self.field
+                self._key_chars = []
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+            elif self._depth == 1 and ch == ":":
+                self._after_colon = True
+            elif self._depth == 1 and ch == ",":
+                self._after_colon = False
+                self._key = None
+        delta = "".join(out)
+        self.text += delta
+        return delta
+
+    def _consume_string_char(self, ch: str, out: list[str]) -> None:
+        if self._escape:
+            self._escape += ch
+            if self._escape[1] == "u" and len(self._escape) < 6:
+                return
+            decoded = json.loads(f'"{self._escape}"')
+            self._escape = ""
+            if "\ud800" <= decoded <= "\udbff":
+                self._high_surrogate = decoded
+                return
+            if self._high_surrogate:
+                decoded = (self._high_surrogate + decoded).encode("utf-16", "surrogatepass").decode("utf-16")
+                self._high_surrogate = ""
+            self._append(decoded, out)
+        elif ch == "\\":
+            self._escape = ch
+        elif ch == '"':
+            self._in_string = False
+            if self._capturing:
+                self._capturing = False
+                self.complete = True
+            elif self._depth == 1 and not self._after_colon:
+                self._key = "".join(self._key_chars)
+        else:
+            self._append(ch, out)
+
+    def _append(self, text: str, out: list[str]) -> None:
+        if self._capturing:
+            out.append(text)
+        elif self._depth == 1 and not self._after_colon:
+            self._key_chars.append(text)
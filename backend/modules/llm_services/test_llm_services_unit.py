@@ -2,24 +2,42 @@
 
 from __future__ import annotations
 
-from collections.abc import Callable
+import asyncio
+import base64
+from collections.abc import AsyncIterator, Callable
 from dataclasses import dataclass
 import json
+import os
+import time
 from typing import Any
 from unittest.mock import AsyncMock
 import uuid
 
+import httpx
 from pydantic import BaseModel
 import pytest
 from sqlalchemy import create_engine
 from sqlalchemy.orm import Session, sessionmaker
 
+from modules.conversation_engine.models import ConversationMessageModel, ConversationModel
+from modules.llm_services.audit import AuditRecorder, pending_llm_request_row
+from modules.llm_services.batch import BATCH_COST_FACTOR, BatchExecutor, FakeBatchServer, llm_batch_mode
+from modules.llm_services.blobs import BLOB_REF_KEY
+from modules.llm_services.cache import LLMCache, ResponseStore
+from modules.llm_services.clients import ProviderClientRegistry
+from modules.llm_services.coalescing import RequestCoalescer
 from modules.llm_services.config import LLMConfig
 from modules.llm_services.exceptions import (
     LLMAuthenticationError,
+    LLMProviderError,
     LLMRateLimitError,
+    LLMTimeoutError,
     LLMValidationError,
 )
+from modules.llm_services.hedging import HedgeAttempt, HedgePolicy, RequestHedger
+from modules.llm_services.models import LLMPayloadBlobModel, LLMRequestModel
+from modules.llm_services.prompt_cache import ContextCacheHandle, ContextCacheRegistry
+from modules.llm_services.prompt_templates import PromptRegistry
 from modules.llm_services.providers.base import LLMProvider
 from modules.llm_services.providers.claude import (
     AnthropicProvider,
@@ -27,12 +45,20 @@ from modules.llm_services.providers.claude import (
     convert_to_claude_messages,
     estimate_claude_cost,
 )
+from modules.llm_services.providers.gemini import GeminiProvider
 from modules.llm_services.providers.openai import OpenAIProvider
 from modules.llm_services.providers.openrouter import OpenRouterProvider
+from modules.llm_services.providers.replay import ReplayProvider
+from modules.llm_services.rate_limit import AdaptiveConcurrencyLimiter, LocalTokenBucket, ProviderRateLimiter, RateLimitPolicy
 from modules.llm_services.repo import LLMRequestRepo
+from modules.llm_services.scheduler import BULK, INTERACTIVE, llm_priority, priority_wait_stats
+from modules.llm_services.schema_registry import SchemaRegistry
 from modules.llm_services.service import LLMMessage, LLMService
+from modules.llm_services.streaming import JSONFieldStreamer, iter_sse_data
+from modules.llm_services.tokenizer import Tokenizer, _spec_for_model, count_text_tokens
+from modules.llm_services.types import AudioGenerationRequest, LLMProviderType, LLMResponse, LLMStreamChunk, MessageRole
+from modules.llm_services.types import AudioResponse as InternalAudioResponse
 from modules.llm_services.types import LLMMessage as InternalLLMMessage
-from modules.llm_services.types import LLMProviderType, LLMResponse, MessageRole
 from modules.shared_models import Base
 from modules.user.models import UserModel
 
@@ -226,7 +252,7 @@ async def test_generate_response_assigns_user_context(db_session: Session, monke
     """The service should ensure requests persist the provided user identifier."""
 
     repo = LLMRequestRepo(db_session)
-    config = LLMConfig(provider=LLMProviderType.OPENAI, model="gpt-4o-mini", api_key="key")
+    config = LLMConfig(provider=LLMProviderType.OPENAI, model="gpt-4o-mini", api_key="key", cache_enabled=False)
 
     provider_factory = _ProviderFactory(lambda cfg, session: _RecordingProvider(cfg, session))
 
@@ -263,7 +289,7 @@ async def test_generate_response_supports_vision_messages(db_session: Session, m
     """Vision payloads should flow through to providers without losing structure."""
 
     repo = LLMRequestRepo(db_session)
-    config = LLMConfig(provider=LLMProviderType.OPENAI, model="gpt-4o", api_key="key")
+    config = LLMConfig(provider=LLMProviderType.OPENAI, model="gpt-4o", api_key="key", cache_enabled=False)
 
     provider_factory = _ProviderFactory(lambda cfg, session: _VisionRecordingProvider(cfg, session))
 
@@ -316,6 +342,7 @@ async def test_generate_response_supports_gemini_models(db_session: Session, mon
         base_url="https://generativelanguage.googleapis.com/v1beta",
         image_model="gemini-2.5-flash-image",
         audio_model="gemini-2.5-flash-preview-tts",
+        cache_enabled=False,
     )
 
     provider_factory = _ProviderFactory(lambda cfg, session: _RecordingProvider(cfg, session))
@@ -340,6 +367,252 @@ async def test_generate_response_supports_gemini_models(db_session: Session, mon
     assert stored_request.model == "gemini-2.5-pro"
 
 
+class _CountingProvider(_RecordingProvider):
+    """Recording provider that counts calls and supports structured output."""
+
+    def __init__(self, config: LLMConfig, db_session: Session) -> None:
+        super().__init__(config, db_session)
+        self.calls = 0
+
+    async def generate_response(self, messages: list[Any], user_id: int | None = None, **kwargs: Any) -> tuple[LLMResponse, uuid.UUID]:
+        self.calls += 1
+        return await super().generate_response(messages, user_id=user_id, **kwargs)
+
+    async def generate_structured_object(self, messages: list[Any], response_model: type[Any], user_id: int | None = None, **kwargs: Any) -> tuple[Any, uuid.UUID, dict[str, Any]]:
+        self.calls += 1
+        _, request_id = await super().generate_response(messages, user_id=user_id, **kwargs)
+        return response_model(title="Cached"), request_id, {"tokens_used": 42, "cost_estimate": 0.01}
+
+    async def generate_response_with_tools(self, messages: list[Any], tools: list[Any], user_id: int | None = None, **kwargs: Any) -> tuple[LLMResponse, list[Any] | None, uuid.UUID]:  # noqa: ARG002
+        self.calls += 1
+        response, request_id = await super().generate_response(messages, user_id=user_id, **kwargs)
+        return response, None, request_id
+
+
+def _caching_service(db_session: Session, monkeypatch: pytest.MonkeyPatch, cache_dir: Any) -> tuple[LLMService, _ProviderFactory]:
+    config = LLMConfig(provider=LLMProviderType.GEMINI, model="gemini-2.5-flash", api_key="key", cache_dir=str(cache_dir))
+    provider_factory = _ProviderFactory(_CountingProvider)
+    monkeypatch.setattr("modules.llm_services.service.create_llm_config_from_env", lambda **_: config)
+    monkeypatch.setattr("modules.llm_services.service.create_llm_provider", provider_factory)
+    return LLMService(LLMRequestRepo(db_session)), provider_factory
+
+
+@pytest.mark.asyncio()
+async def test_service_serves_repeated_requests_from_cache(db_session: Session, monkeypatch: pytest.MonkeyPatch, tmp_path: Any) -> None:
+    """Identical requests are served from the cache for any provider and still recorded."""
+
+    service, provider_factory = _caching_service(db_session, monkeypatch, tmp_path)
+    messages = [LLMMessage(role="user", content="cache me")]
+
+    first, first_id = await service.generate_response(messages=messages, model="gemini-2.5-pro", temperature=0.1)
+    second, second_id = await service.generate_response(messages=messages, model="gemini-2.5-pro", temperature=0.1, user_id=1)
+    await service.generate_response(messages=messages, model="gemini-2.5-pro", temperature=0.9)
+
+    provider = provider_factory.last_provider
+    assert isinstance(provider, _CountingProvider)
+    assert provider.calls == 2  # the differing temperature misses the cache
+    assert first.cached is False
+    assert second.cached is True
+    assert second.content == first.content
+    assert second.cost_estimate == 0.0
+
+    stored = LLMRequestRepo(db_session).by_id(second_id)
+    assert stored is not None
+    assert second_id != first_id
+    assert stored.cached is True
+    assert stored.user_id == 1
+    assert stored.model == "gemini-2.5-pro"
+
+
+@pytest.mark.asyncio()
+async def test_service_caches_structured_responses_per_schema(db_session: Session, monkeypatch: pytest.MonkeyPatch, tmp_path: Any) -> None:
+    """Structured hits are revalidated against the response model and keyed by its schema."""
+
+    service, provider_factory = _caching_service(db_session, monkeypatch, tmp_path)
+    messages = [LLMMessage(role="user", content="structured please")]
+
+    obj, _, usage = await service.generate_structured_response(messages, _StructuredDemoModel)
+    cached_obj, cached_id, cached_usage = await service.generate_structured_response(messages, _StructuredDemoModel)
+
+    class _OtherModel(BaseModel):
+        title: str
+        subtitle: str | None = None
+
+    await service.generate_structured_response(messages, _OtherModel)
+
+    provider = provider_factory.last_provider
+    assert isinstance(provider, _CountingProvider)
+    assert provider.calls == 2
+    assert cached_obj == obj
+    assert usage["cost_estimate"] == 0.01
+    assert cached_usage == {"tokens_used": 42, "cost_estimate": 0.0, "cached": True}
+    stored = LLMRequestRepo(db_session).by_id(cached_id)
+    assert stored is not None
+    assert stored.cached is True
+
+
+@pytest.mark.asyncio()
+async def test_service_keeps_plain_and_tool_call_cache_entries_apart(db_session: Session, monkeypatch: pytest.MonkeyPatch, tmp_path: Any) -> None:
+    """A tool call with no tools never reads the bare payload cached for the plain call."""
+
+    service, provider_factory = _caching_service(db_session, monkeypatch, tmp_path)
+    messages = [LLMMessage(role="user", content="tools or not")]
+
+    await service.generate_response(messages=messages)
+    response, tool_calls, _ = await service.generate_response_with_tools(messages=messages, tools=[])
+    cached_response, cached_tool_calls, _ = await service.generate_response_with_tools(messages=messages, tools=[])
+
+    provider = provider_factory.last_provider
+    assert isinstance(provider, _CountingProvider)
+    assert provider.calls == 2
+    assert response.cached is False
+    assert tool_calls is None
+    assert cached_response.cached is True
+    assert cached_response.content == response.content
+    assert cached_tool_calls is None
+
+
+class _StreamingProvider(_CountingProvider):
+    """Counting provider with a native token stream."""
+
+    async def stream_response(self, messages: list[Any], user_id: int | None = None, response_model: type[BaseModel] | None = None, **kwargs: Any) -> AsyncIterator[LLMStreamChunk]:  # noqa: ARG002
+        self.calls += 1
+
+        async def _events() -> AsyncIterator[LLMStreamChunk]:
+            yield LLMStreamChunk(delta="Hel")
+            yield LLMStreamChunk(delta="lo")
+            yield LLMStreamChunk(response=LLMResponse(content="Hello", provider=self.config.provider, model=str(kwargs.get("model")), tokens_used=7, output_tokens=2, cost_estimate=0.002))
+
+        async for chunk in self._stream_with_accounting(messages, _events(), user_id=user_id, model=str(kwargs.get("model")), temperature=None, max_output_tokens=None):
+            yield chunk
+
+
+@pytest.mark.asyncio()
+async def test_service_streams_deltas_and_records_final_response(db_session: Session, monkeypatch: pytest.MonkeyPatch, tmp_path: Any) -> None:
+    """Streams relay deltas, persist usage once complete and replay from the cache."""
+
+    config = LLMConfig(provider=LLMProviderType.GEMINI, model="gemini-2.5-flash", api_key="key", cache_dir=str(tmp_path), rate_limit_backend="off")
+    provider_factory = _ProviderFactory(_StreamingProvider)
+    monkeypatch.setattr("modules.llm_services.service.create_llm_config_from_env", lambda **_: config)
+    monkeypatch.setattr("modules.llm_services.service.create_llm_provider", provider_factory)
+    service = LLMService(LLMRequestRepo(db_session))
+    messages = [LLMMessage(role="user", content="stream please")]
+
+    chunks = [chunk async for chunk in service.stream_response(messages, model="gemini-2.5-pro", user_id=1)]
+    replayed = [chunk async for chunk in service.stream_response(messages, model="gemini-2.5-pro")]
+
+    assert [chunk.delta for chunk in chunks[:-1]] == ["Hel", "lo"]
+    final = chunks[-1]
+    assert final.is_final
+    assert final.response is not None
+    assert final.response.content == "Hello"
+    stored = LLMRequestRepo(db_session).by_id(final.request_id)  # type: ignore[arg-type]
+    assert stored is not None
+    assert stored.status == "completed"
+    assert stored.response_content == "Hello"
+    assert stored.tokens_used == 7
+    assert stored.cost_estimate == 0.002
+    assert stored.user_id == 1
+
+    provider = provider_factory.last_provider
+    assert isinstance(provider, _StreamingProvider)
+    assert provider.calls == 1
+    assert [chunk.delta for chunk in replayed[:-1]] == ["Hello"]
+    assert replayed[-1].response is not None
+    assert replayed[-1].response.cached is True
+
+
+@pytest.mark.asyncio()
+async def test_stream_parsers_decode_sse_events_and_partial_json_fields() -> None:
+    """SSE payloads are split on blank lines and a JSON string field is decoded as it arrives."""
+
+    async def _lines() -> AsyncIterator[str]:
+        for line in [": keep-alive", 'data: {"a":', "data: 1}", "", "event: done", "data: [DONE]"]:
+            yield line
+
+    assert [data async for data in iter_sse_data(_lines())] == ['{"a":\n1}', "[DONE]"]
+
+    streamer = JSONFieldStreamer("message")
+    payload = json.dumps({"hint": {"message": "nested"}, "message": 'Caf\u00e9 "quoted" \U0001f600', "suggested_quick_replies": ["next"]})
+    deltas = [streamer.feed(payload[i : i + 3]) for i in range(0, len(payload), 3)]
+
+    assert "".join(deltas) == 'Café "quoted" \U0001f600'
+    assert streamer.text == json.loads(payload)["message"]
+    assert streamer.complete is True
+
+
+class _SlowProvider(_CountingProvider):
+    """Counting provider that blocks until released, to keep calls in flight."""
+
+    release: asyncio.Event
+
+    async def generate_response(self, messages: list[Any], user_id: int | None = None, **kwargs: Any) -> tuple[LLMResponse, uuid.UUID]:
+        await self.release.wait()
+        return await super().generate_response(messages, user_id=user_id, **kwargs)
+
+
+@pytest.mark.asyncio()
+async def test_service_coalesces_identical_inflight_requests(db_session: Session, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Concurrent identical requests share one provider call; each caller still gets its own request row."""
+
+    config = LLMConfig(provider=LLMProviderType.GEMINI, model="gemini-2.5-flash", api_key="key", cache_enabled=False)
+    _SlowProvider.release = asyncio.Event()
+    provider_factory = _ProviderFactory(_SlowProvider)
+    monkeypatch.setattr("modules.llm_services.service.create_llm_config_from_env", lambda **_: config)
+    monkeypatch.setattr("modules.llm_services.service.create_llm_provider", provider_factory)
+
+    service = LLMService(LLMRequestRepo(db_session))
+    before = service.get_coalescing_stats()["coalesced"]
+    messages = [LLMMessage(role="user", content="same prompt")]
+    tasks = [asyncio.create_task(service.generate_response(messages=messages, model="gemini-2.5-pro")) for _ in range(3)]
+    await asyncio.sleep(0)
+    _SlowProvider.release.set()
+    results = await asyncio.gather(*tasks)
+
+    provider = provider_factory.last_provider
+    assert isinstance(provider, _SlowProvider)
+    assert provider.calls == 1
+    assert {response.content for response, _ in results} == {"ok"}
+    assert len({request_id for _, request_id in results}) == 3
+    assert sum(response.cached for response, _ in results) == 2
+    assert service.get_coalescing_stats()["coalesced"] - before == 2
+
+
+@pytest.mark.asyncio()
+async def test_coalescer_survives_cancelled_waiters() -> None:
+    """Cancelling one waiter leaves the shared call running for the others; cancelling all of them cancels it."""
+
+    coalescer = RequestCoalescer()
+    release = asyncio.Event()
+    calls = 0
+
+    async def _call() -> str:
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return "done"
+
+    first = asyncio.create_task(coalescer.run("key", _call))
+    second = asyncio.create_task(coalescer.run("key", _call))
+    await asyncio.sleep(0)
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await second == ("done", True)
+    assert first.cancelled()
+    assert calls == 1
+
+    release.clear()
+    lone = asyncio.create_task(coalescer.run("key", _call))
+    await asyncio.sleep(0)
+    lone.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await lone
+    await asyncio.sleep(0)
+    assert coalescer.stats() == {"inflight": 0, "leaders": 2, "coalesced": 1, "abandoned": 1}
+
+
 def test_convert_to_claude_messages_includes_system_prompt() -> None:
     """Claude message conversion should separate system prompt from chat history."""
 
@@ -364,6 +637,115 @@ def test_estimate_claude_cost_uses_model_pricing() -> None:
     assert cost == expected
 
 
+@pytest.mark.asyncio()
+async def test_prompt_prefix_breakpoints_map_onto_each_provider_cache(db_session: Session, monkeypatch: pytest.MonkeyPatch) -> None:
+    """A cache_breakpoint becomes a Claude cache_control block, a shared OpenAI prompt_cache_key and one reused Gemini cachedContents handle."""
+
+    material = "Shared unit source material for every lesson. " * 400
+
+    def lesson(number: int) -> list[InternalLLMMessage]:
+        return [InternalLLMMessage(role=MessageRole.USER, content=material, cache_breakpoint=True), InternalLLMMessage(role=MessageRole.USER, content=f"Lesson {number} task")]
+
+    _, claude_payload = convert_to_claude_messages(lesson(1), prompt_cache=True)
+    assert claude_payload[0]["content"][-1]["cache_control"] == {"type": "ephemeral"}
+    assert "cache_control" not in claude_payload[1]["content"][-1]
+    assert estimate_claude_cost("claude-haiku-4-5", input_tokens=0, output_tokens=0, cache_read_tokens=1_000_000) == pytest.approx(0.1)
+
+    openai_provider = OpenAIProvider(LLMConfig(provider=LLMProviderType.OPENAI, model="gpt-5-mini", api_key="key"), db_session)
+    cache_keys = {openai_provider._prepare_gpt5_request_params(lesson(number), "gpt-5-mini")["prompt_cache_key"] for number in (1, 2)}
+    assert len(cache_keys) == 1
+
+    gemini = GeminiProvider(LLMConfig(provider=LLMProviderType.GEMINI, model="gemini-2.5-flash", api_key="key"), db_session)
+    created: list[int] = []
+
+    async def _create_cached_content(model: str, prefix: list[InternalLLMMessage]) -> ContextCacheHandle:
+        created.append(len(prefix))
+        return ContextCacheHandle(name="cachedContents/unit-1", expires_at=time.time() + 3600)
+
+    monkeypatch.setattr(gemini, "_create_cached_content", _create_cached_content)
+    monkeypatch.setattr("modules.llm_services.providers.gemini.context_cache_registry", ContextCacheRegistry())
+    for number in (1, 2):
+        payload = await gemini._apply_context_cache("gemini-2.5-flash", lesson(number), gemini._build_payload(lesson(number), None, None, None, None))
+        assert payload["cachedContent"] == "cachedContents/unit-1"
+        assert payload["contents"] == [{"role": "user", "parts": [{"text": f"Lesson {number} task"}]}]
+    assert created == [1]
+
+    # Prefixes below the model's caching minimum are sent as-is
+    short = [InternalLLMMessage(role=MessageRole.USER, content="tiny", cache_breakpoint=True), InternalLLMMessage(role=MessageRole.USER, content="task")]
+    assert "cachedContent" not in await gemini._apply_context_cache("gemini-2.5-flash", short, gemini._build_payload(short, None, None, None, None))
+
+    assert gemini._extract_cache_usage({"usageMetadata": {"cachedContentTokenCount": 900}}) == (900, None)
+    assert gemini.estimate_cost(1000, 0, "gemini-2.5-flash", cached_tokens=1000) == pytest.approx(0.25 * gemini.estimate_cost(1000, 0, "gemini-2.5-flash"))
+
+
+@pytest.mark.asyncio()
+async def test_gemini_retries_uncached_when_its_context_cache_is_gone(db_session: Session, monkeypatch: pytest.MonkeyPatch) -> None:
+    """A request rejected for a missing cachedContent drops the handle and is retried once without it."""
+
+    messages = [InternalLLMMessage(role=MessageRole.USER, content="Shared unit source material. " * 400, cache_breakpoint=True), InternalLLMMessage(role=MessageRole.USER, content="Lesson task")]
+    gemini = GeminiProvider(LLMConfig(provider=LLMProviderType.GEMINI, model="gemini-2.5-flash", api_key="key"), db_session)
+    registry = ContextCacheRegistry()
+    monkeypatch.setattr("modules.llm_services.providers.gemini.context_cache_registry", registry)
+
+    async def _create_cached_content(model: str, prefix: list[InternalLLMMessage]) -> ContextCacheHandle:
+        return ContextCacheHandle(name="cachedContents/expired", expires_at=time.time() + 3600)
+
+    sent: list[dict[str, Any]] = []
+
+    async def _post(model: str, payload: dict[str, Any]) -> dict[str, Any]:
+        sent.append(payload)
+        if "cachedContent" in payload:
+            response = httpx.Response(403, text="CachedContent not found (or permission denied)", request=httpx.Request("POST", "https://gemini.test"))
+            raise LLMAuthenticationError("rejected") from httpx.HTTPStatusError("403", request=response.request, response=response)
+        return {"candidates": []}
+
+    monkeypatch.setattr(gemini, "_create_cached_content", _create_cached_content)
+    monkeypatch.setattr(gemini, "_post", _post)
+    payload, response_data = await gemini._post_with_context_cache("gemini-2.5-flash", messages, gemini._build_payload(messages, None, None, None, None))
+
+    assert response_data == {"candidates": []}
+    assert [item.get("cachedContent") for item in sent] == ["cachedContents/expired", None]
+    assert payload is sent[-1]
+    assert registry.stats()["live"] == 0
+
+
+class _WordEncoding:
+    """Stand-in BPE encoding that yields one token per whitespace-separated word."""
+
+    def encode(self, text: str, disallowed_special: Any = ()) -> list[str]:  # noqa: ARG002
+        return text.split()
+
+
+def test_tokenizer_counts_per_model_and_memoizes_fragments(db_session: Session, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Token counts use the model family's tokenizer, add message framing and drive cost estimates."""
+
+    assert _spec_for_model("gpt-4o-mini").encoding == "o200k_base"
+    assert _spec_for_model("gpt-4-turbo").encoding == "cl100k_base"
+    assert _spec_for_model("openrouter/anthropic/claude-sonnet-4").scale > 1.0
+    assert Tokenizer(_spec_for_model("claude-haiku-4-5"), _WordEncoding()).count("one two three four five six seven eight nine ten") == 12
+    assert Tokenizer(_spec_for_model("gemini-2.5-flash"), None).count("x" * 40) == 10
+
+    fragment = "A reusable prompt template fragment. " * 20
+    count_text_tokens.cache_clear()
+    first = count_text_tokens(fragment, "gpt-4o-mini")
+    assert count_text_tokens(fragment, "gpt-4o-mini") == first
+    assert count_text_tokens.cache_info().hits == 1
+
+    config = LLMConfig(provider=LLMProviderType.OPENAI, model="gpt-4o-mini", api_key="key", cache_enabled=False)
+    monkeypatch.setattr("modules.llm_services.service.create_llm_config_from_env", lambda: config)
+    monkeypatch.setattr("modules.llm_services.service.create_llm_provider", _ProviderFactory(_RecordingProvider))
+    service = LLMService(LLMRequestRepo(db_session))
+
+    messages = [LLMMessage(role="system", content=fragment), LLMMessage(role="user", content=[{"type": "text", "text": "Hi"}, {"type": "image_url", "image_url": {"url": "x"}}])]
+    prompt_tokens = service.count_tokens(messages)
+    assert prompt_tokens == first + count_text_tokens("Hi", "gpt-4o-mini") + 85 + 2 * 3 + 3
+
+    estimates: list[tuple[int, int]] = []
+    monkeypatch.setattr(_RecordingProvider, "estimate_cost", lambda _self, prompt_tokens, completion_tokens, **_kwargs: estimates.append((prompt_tokens, completion_tokens)) or 0.5, raising=False)
+    assert service.estimate_cost(messages, expected_output_tokens=50) == 0.5
+    assert estimates == [(prompt_tokens, 50)]
+
+
 class _StructuredDemoModel(BaseModel):
     """Simple schema for structured Claude responses."""
 
@@ -484,6 +866,7 @@ class TestOpenRouterProvider:
             base_url="https://openrouter.ai/api/v1",
             openrouter_api_key="test-key",
             openrouter_base_url="https://openrouter.ai/api/v1",
+            rate_limit_backend="off",
         )
 
     @pytest.mark.asyncio()
@@ -754,3 +1137,642 @@ async def test_openai_tts_audio_cost_estimation() -> None:
     assert cost_1m_standard == pytest.approx(15.00, rel=1e-6)  # Should be approximately $15.00
 
     db_session.close()
+
+
+class TestLLMCache:
+    @staticmethod
+    def _messages(text: str) -> list[InternalLLMMessage]:
+        return [InternalLLMMessage(role=MessageRole.USER, content=text)]
+
+    @pytest.mark.asyncio()
+    async def test_round_trip_marks_response_cached(self, tmp_path: Any) -> None:
+        cache = LLMCache(cache_dir=str(tmp_path / "cache"))
+        response = LLMResponse(content="hello", provider="openai", model="gpt-4o", tokens_used=12)
+
+        assert await cache.get(self._messages("hi"), temperature=0.2) is None
+        await cache.set(self._messages("hi"), response, temperature=0.2)
+
+        cached = await cache.get(self._messages("hi"), temperature=0.2)
+        assert cached is not None
+        assert cached.content == "hello"
+        assert cached.tokens_used == 12
+        assert cached.cached is True
+        assert await cache.get(self._messages("hi"), temperature=0.7) is None
+
+    @pytest.mark.asyncio()
+    async def test_expired_entries_are_not_returned(self, tmp_path: Any) -> None:
+        store = ResponseStore(tmp_path, ttl_seconds=60)
+        await store.set("stale", b"old", ttl_seconds=-1)
+        await store.set("fresh", b"new")
+
+        assert store.get("stale") is None
+        assert store.get("fresh") == b"new"
+        assert len(store) == 1
+
+    @pytest.mark.asyncio()
+    async def test_size_budget_evicts_oldest_entries(self, tmp_path: Any) -> None:
+        store = ResponseStore(tmp_path, max_size_bytes=1024, memory_max_entries=2)
+        for i in range(20):
+            await store.set(f"key-{i}", b"x" * 200)
+
+        assert store.get("key-0") is None
+        assert store.get("key-19") == b"x" * 200
+        assert store.stats()["live_bytes"] <= 1024
+        assert store.stats()["evictions"] > 0
+
+    @pytest.mark.asyncio()
+    async def test_reopening_rebuilds_index_from_data_file(self, tmp_path: Any) -> None:
+        store = ResponseStore(tmp_path)
+        await store.set("a", b"first")
+        await store.set("a", b"second")
+        await store.set("b", b"other")
+        store.close()
+
+        reopened = ResponseStore(tmp_path)
+        assert reopened.get("a") == b"second"
+        assert reopened.get("b") == b"other"
+        assert reopened.stats()["dead_bytes"] > 0
+
+        await reopened.compact()
+        assert reopened.stats()["dead_bytes"] == 0
+        assert reopened.get("a") == b"second"
+
+    @pytest.mark.asyncio()
+    async def test_deletions_and_evictions_survive_reopening(self, tmp_path: Any) -> None:
+        store = ResponseStore(tmp_path, max_size_bytes=1024)
+        await store.set("gone", b"bad payload")
+        store.delete("gone")
+        for i in range(10):
+            await store.set(f"key-{i}", b"x" * 200)
+        live_keys = [f"key-{i}" for i in range(10) if store.get(f"key-{i}") is not None]
+        store.close()
+
+        reopened = ResponseStore(tmp_path, max_size_bytes=100 * 1024)
+        assert reopened.get("gone") is None
+        assert [f"key-{i}" for i in range(10) if reopened.get(f"key-{i}") is not None] == live_keys
+
+        # A tombstone retires only the record it names, not a later write of the key
+        await reopened.set("gone", b"fresh")
+        reopened.close()
+        assert ResponseStore(tmp_path).get("gone") == b"fresh"
+
+    @pytest.mark.asyncio()
+    async def test_compaction_keeps_records_from_other_writers(self, tmp_path: Any) -> None:
+        ours = ResponseStore(tmp_path)
+        theirs = ResponseStore(tmp_path)
+        await ours.set("ours", b"1")
+        await theirs.set("theirs", b"2")
+        await theirs.set("deleted", b"3")
+        theirs.delete("deleted")
+
+        await ours.compact()
+        assert ours.get("ours") == b"1"
+        assert ours.get("theirs") == b"2"
+        assert ours.get("deleted") is None
+        assert ours.stats()["dead_bytes"] == 0
+
+        # The other writer picks up the swapped-in file on its next append
+        await theirs.set("after", b"4")
+        reopened = ResponseStore(tmp_path)
+        assert reopened.get("theirs") == b"2"
+        assert reopened.get("after") == b"4"
+        assert reopened.get("deleted") is None
+
+
+@pytest.mark.asyncio()
+async def test_client_registry_pools_http_clients_until_shutdown() -> None:
+    """Providers with the same configuration share one pooled client, closed on shutdown."""
+
+    registry = ProviderClientRegistry()
+    config = LLMConfig(provider=LLMProviderType.GEMINI, model="gemini-2.5-flash", api_key="key", http_max_keepalive_connections=5)
+
+    first = registry.http_client(config, name="gemini", timeout=30)
+    assert registry.http_client(config, name="gemini", timeout=30) is first
+    other = registry.http_client(config, name="gemini", timeout=60)
+    assert other is not first
+    assert len(registry) == 2
+
+    await registry.aclose()
+
+    assert first.is_closed
+    assert other.is_closed
+    assert len(registry) == 0
+    assert registry.http_client(config, name="gemini", timeout=30) is not first
+
+
+@pytest.mark.asyncio()
+async def test_write_behind_audit_rows_are_batched_and_readable_before_flush(db_session: Session, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Audit rows are queued off the request path, stay readable while queued and are written in one batch."""
+
+    batches: list[list[dict[str, Any]]] = []
+
+    async def _writer(rows: list[dict[str, Any]]) -> None:
+        batches.append(rows)
+
+    recorder = AuditRecorder(writer=_writer, linger=60)
+    config = LLMConfig(provider=LLMProviderType.OPENAI, model="gpt-4o-mini", api_key="key", cache_enabled=False, rate_limit_backend="off", audit_write_behind=True)
+    monkeypatch.setattr("modules.llm_services.service.create_llm_config_from_env", lambda **_: config)
+    monkeypatch.setattr("modules.llm_services.service.create_llm_provider", _ProviderFactory(_StreamingProvider))
+    monkeypatch.setattr("modules.llm_services.providers.base.get_audit_recorder", lambda _config: recorder)
+    service = LLMService(LLMRequestRepo(db_session))
+
+    first = [chunk async for chunk in service.stream_response([LLMMessage(role="user", content="one")], user_id=1)]
+    second = [chunk async for chunk in service.stream_response([LLMMessage(role="user", content="two")])]
+    first_id, second_id = first[-1].request_id, second[-1].request_id
+    assert first_id is not None
+
+    assert LLMRequestRepo(db_session).by_id(first_id) is None
+    queued = service.get_request(first_id)
+    assert queued is not None
+    assert queued.status == "completed"
+    assert queued.user_id == 1
+
+    await recorder.flush()
+
+    assert [[row["id"] for row in batch] for batch in batches] == [[first_id, second_id]]
+    assert batches[0][0]["user_id"] == 1
+    assert batches[0][0]["tokens_used"] == 7
+    assert service.get_request(first_id) is None  # written by the (fake) writer, not this session
+    assert recorder.stats()["written"] == 2
+
+
+@pytest.mark.asyncio()
+async def test_write_behind_rows_referenced_by_a_flush_are_inserted_first(db_session: Session) -> None:
+    """A session flushing a row that references a queued audit row inserts that audit row in the same transaction."""
+
+    recorder = AuditRecorder(writer=AsyncMock(), max_queue=1, linger=60)
+    request_id = uuid.uuid4()
+    row = {"id": request_id, "provider": "openai", "model": "gpt-4o-mini", "temperature": 0.2, "messages": [], "status": "completed", "api_variant": "responses", "retry_attempt": 1, "cached": False}
+    assert recorder.submit(dict(row)) is True
+    assert recorder.submit({**row, "id": uuid.uuid4()}) is False  # full queue: caller writes synchronously
+
+    conversation = ConversationModel(conversation_type="learning_coach")
+    db_session.add(conversation)
+    db_session.flush()
+    db_session.add(ConversationMessageModel(conversation_id=conversation.id, llm_request_id=request_id, role="assistant", content="hi", message_order=1))
+    db_session.commit()
+
+    stored = LLMRequestRepo(db_session).by_id(request_id)
+    assert stored is not None
+    assert stored.model == "gpt-4o-mini"
+    # The row stays queued until the background insert commits; that insert skips rows already stored
+    await recorder.flush()
+    written = recorder._writer.await_args.args[0]  # type: ignore[attr-defined]
+    assert [row["id"] for row in written] == [request_id]
+
+
+@pytest.mark.asyncio()
+async def test_write_behind_rows_stay_readable_while_written_and_are_requeued_on_failure() -> None:
+    """A row leaves the queue only after its insert commits; a failed insert puts it back for the next batch."""
+
+    attempts: list[bool] = []
+
+    async def _writer(rows: list[dict[str, Any]]) -> None:
+        attempts.append(pending_llm_request_row(rows[0]["id"]) is not None)
+        if len(attempts) == 1:
+            raise RuntimeError("database unavailable")
+
+    recorder = AuditRecorder(writer=_writer, linger=0.01)
+    request_id = uuid.uuid4()
+    assert recorder.submit({"id": request_id, "provider": "openai", "model": "gpt-4o-mini", "status": "completed"}) is True
+    for _ in range(100):
+        if recorder.written:
+            break
+        await asyncio.sleep(0.01)
+
+    assert attempts == [True, True]  # visible to get_request during both inserts
+    assert recorder.stats()["failed"] == 1 and recorder.stats()["written"] == 1
+    assert pending_llm_request_row(request_id) is None
+    await recorder.flush()
+
+
+def test_local_token_bucket_reserves_ahead_of_refill() -> None:
+    """Over-subscribed reservations queue behind each other instead of failing."""
+
+    bucket = LocalTokenBucket(capacity=2, refill_per_second=1)
+
+    assert bucket.reserve(1) == 0
+    assert bucket.reserve(1) == 0
+    assert bucket.reserve(1) == pytest.approx(1, abs=0.05)
+    assert bucket.reserve(1) == pytest.approx(2, abs=0.05)
+
+
+def test_adaptive_concurrency_backs_off_on_throttle_and_latency() -> None:
+    """The window halves on 429s, shrinks on latency spikes and grows additively otherwise."""
+
+    limiter = AdaptiveConcurrencyLimiter(initial=8, minimum=1, maximum=16)
+
+    limiter.in_flight = 1
+    limiter.release(throttled=True)
+    assert limiter.limit == 4
+
+    limiter.in_flight = 2
+    limiter.release(latency=0.1)
+    limiter.release(latency=0.1)
+    assert limiter.limit == pytest.approx(4 + 1 / 4 + 1 / 4.25)
+
+    before = limiter.limit
+    limiter.in_flight = 1
+    limiter.release(latency=1.0)
+    assert limiter.limit == pytest.approx(before * 0.9)
+
+
+@pytest.mark.asyncio()
+async def test_concurrency_window_reserves_slots_and_serves_interactive_first() -> None:
+    """Bulk calls cannot take the reserved slot, and queued interactive calls are admitted ahead of older bulk ones."""
+
+    limiter = AdaptiveConcurrencyLimiter(initial=4, minimum=1, maximum=4, priority_weights={"interactive": 4, "bulk": 1}, interactive_reserve=0.25)
+    admitted_before = {name: stats["admitted"] for name, stats in priority_wait_stats().items()}
+    order: list[str] = []
+
+    async def _call(name: str, priority: str) -> None:
+        with llm_priority(priority):
+            await limiter.acquire()
+        order.append(name)
+
+    for index in range(3):
+        await _call(f"bulk-{index}", BULK)
+    waiting = [asyncio.create_task(_call("bulk-late", BULK))]
+    await asyncio.sleep(0)
+    assert limiter.in_flight == 3  # the fourth slot is held back for interactive calls
+
+    await _call("interactive-0", INTERACTIVE)
+    waiting += [asyncio.create_task(_call(f"interactive-{index}", INTERACTIVE)) for index in (1, 2)]
+    await asyncio.sleep(0)
+    assert limiter.scheduler.queued() == {"interactive": 2, "standard": 0, "bulk": 1}
+
+    # Two releases go to the queued interactive calls; bulk waits until two slots are free again
+    for _ in range(4):
+        limiter.release()
+        await asyncio.sleep(0)
+    await asyncio.gather(*waiting)
+
+    assert order[3:] == ["interactive-0", "interactive-1", "interactive-2", "bulk-late"]
+    stats = priority_wait_stats()
+    assert stats["interactive"]["admitted"] - admitted_before["interactive"] == 3
+    assert stats["bulk"]["admitted"] - admitted_before["bulk"] == 4
+    assert stats["bulk"]["wait_seconds_max"] >= 0
+
+
+@pytest.mark.asyncio()
+async def test_rate_limiter_retries_throttled_calls_after_retry_after() -> None:
+    """A 429 sets the cooldown from Retry-After and the call is retried once it passes."""
+
+    limiter = ProviderRateLimiter("openai", "gpt-5", RateLimitPolicy(requests_per_minute=600, tokens_per_minute=60_000, max_concurrency=4), backend="local")
+    attempts = 0
+
+    async def _call() -> str:
+        nonlocal attempts
+        attempts += 1
+        if attempts == 1:
+            raise LLMRateLimitError("slow down", retry_after=0.05)
+        return "ok"
+
+    started = asyncio.get_running_loop().time()
+    result = await limiter.run(_call, estimated_tokens=100, max_retries=2)
+
+    assert result == "ok"
+    assert attempts == 2
+    assert asyncio.get_running_loop().time() - started >= 0.05
+    assert limiter.throttled == 1
+    assert limiter.concurrency.limit == 2  # halved from 2 to 1, then +1/limit on success
+    assert limiter.concurrency.in_flight == 0
+
+
+@pytest.mark.asyncio()
+async def test_rate_limiter_frees_slot_of_cancelled_call() -> None:
+    """Cancelling an in-flight call (e.g. a hedge loser) gives its slot back without shrinking the window."""
+
+    limiter = ProviderRateLimiter("openai", "gpt-5", RateLimitPolicy(requests_per_minute=600, tokens_per_minute=60_000, max_concurrency=4), backend="local")
+    started = asyncio.Event()
+
+    async def _hang() -> str:
+        started.set()
+        await asyncio.sleep(60)
+        return "never"
+
+    task = asyncio.create_task(limiter.run(_hang))
+    await started.wait()
+    assert limiter.concurrency.in_flight == 1
+    limit_before = limiter.concurrency.limit
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    assert limiter.concurrency.in_flight == 0
+    assert limiter.concurrency.limit == limit_before
+
+
+@pytest.mark.asyncio()
+async def test_hedger_races_slow_primary_and_fails_over_on_error() -> None:
+    """A slow primary is hedged after the delay and cancelled once the alternate wins; a failed primary hands over at once."""
+
+    hedger = RequestHedger()
+    policy = HedgePolicy(alternates=("bedrock:claude-sonnet-4-5",), initial_delay_seconds=0.01, min_delay_seconds=0.01)
+    primary_cancelled = asyncio.Event()
+
+    async def _slow() -> str:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            primary_cancelled.set()
+            raise
+        return "primary"
+
+    async def _fast() -> str:
+        return "alternate"
+
+    async def _fail() -> str:
+        raise LLMProviderError("overloaded")
+
+    result = await hedger.run(
+        [
+            HedgeAttempt("anthropic:claude-sonnet-4-5", _slow, abandoned_cost=lambda: 0.02),
+            HedgeAttempt("bedrock:claude-sonnet-4-5", _fast),
+        ],
+        policy,
+    )
+    assert result == ("alternate", "bedrock:claude-sonnet-4-5")
+    assert primary_cancelled.is_set()
+
+    assert await hedger.run([HedgeAttempt("anthropic:claude-sonnet-4-5", _fail), HedgeAttempt("bedrock:claude-sonnet-4-5", _fast)], policy) == ("alternate", "bedrock:claude-sonnet-4-5")
+    with pytest.raises(LLMProviderError):
+        await hedger.run([HedgeAttempt("anthropic:claude-sonnet-4-5", _fail), HedgeAttempt("bedrock:claude-sonnet-4-5", _fail)], policy)
+
+    assert hedger.stats() == {"calls": 3, "hedged": 1, "hedge_rate": 1 / 3, "hedge_wins": 2, "failovers": 2, "cancelled": 1, "wasted_cost": 0.02}
+
+
+@pytest.mark.asyncio()
+async def test_service_hedges_step_models_to_equivalent_target(db_session: Session, monkeypatch: pytest.MonkeyPatch) -> None:
+    """hedge_models routes a stalled call to the alternate model and returns its response."""
+
+    config = LLMConfig(provider=LLMProviderType.GEMINI, model="gemini-2.5-flash", api_key="key", cache_enabled=False, hedge_policies={"gemini-2.5-pro": {"initial_delay_seconds": 0.01, "min_delay_seconds": 0.01}})
+    _SlowProvider.release = asyncio.Event()
+
+    class _StallOnProProvider(_CountingProvider):
+        async def generate_response(self, messages: list[Any], user_id: int | None = None, **kwargs: Any) -> tuple[LLMResponse, uuid.UUID]:
+            if kwargs.get("model") == "gemini-2.5-pro":
+                await _SlowProvider.release.wait()
+            return await super().generate_response(messages, user_id=user_id, **kwargs)
+
+    monkeypatch.setattr("modules.llm_services.service.create_llm_config_from_env", lambda **_: config)
+    monkeypatch.setattr("modules.llm_services.service.create_llm_provider", _ProviderFactory(_StallOnProProvider))
+
+    service = LLMService(LLMRequestRepo(db_session))
+    before = service.get_hedging_stats()
+    response, _ = await service.generate_response([LLMMessage(role="user", content="hedge me")], model="gemini-2.5-pro", hedge_models=["gemini-2.5-flash"])
+
+    assert response.model == "gemini-2.5-flash"
+    after = service.get_hedging_stats()
+    assert after["hedged"] - before["hedged"] == 1
+    assert after["cancelled"] - before["cancelled"] == 1
+
+
+@pytest.mark.asyncio()
+async def test_batch_mode_submits_concurrent_calls_as_one_provider_batch(db_session: Session, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Concurrent calls in batch mode share one batch, resume with their own results and are priced at the batch rate."""
+
+    monkeypatch.setattr("modules.llm_services.providers.claude._ANTHROPIC_AVAILABLE", True)
+
+    class MockAsyncAnthropic:
+        def __init__(self, *args: Any, **kwargs: Any) -> None:
+            pass
+
+    monkeypatch.setattr("modules.llm_services.providers.claude.AsyncAnthropic", MockAsyncAnthropic)
+    provider = AnthropicProvider(LLMConfig(provider=LLMProviderType.ANTHROPIC, model="claude-haiku-4-5", api_key="ant-key", anthropic_api_key="ant-key"), db_session)
+
+    def _respond(endpoint: str, body: dict[str, Any]) -> str:
+        assert endpoint == "/v1/messages"
+        prompt = body["messages"][0]["content"][0]["text"]
+        if prompt == "fail":
+            raise RuntimeError("invalid_request_error")
+        return json.dumps({"title": prompt}) if "system" in body else f"echo {prompt}"
+
+    server = FakeBatchServer(_respond, polls_until_done=2)
+    executor = BatchExecutor({"anthropic": server}, flush_interval=0.01, poll_interval=0.01)
+
+    def _messages(text: str) -> list[InternalLLMMessage]:
+        return [InternalLLMMessage(role=MessageRole.USER, content=text)]
+
+    async with llm_batch_mode(executor):
+        (text_response, _), (structured, _, usage), failure = await asyncio.gather(
+            provider.generate_response(_messages("hello")),
+            provider.generate_structured_object(_messages("Batched"), _StructuredDemoModel),
+            provider.generate_response(_messages("fail")),
+            return_exceptions=True,
+        )
+
+    assert len(server.submitted) == 1
+    assert len(server.submitted[0][1]) == 3
+    assert text_response.content == "echo hello"
+    assert text_response.cost_estimate == pytest.approx(estimate_claude_cost("claude-haiku-4-5", text_response.input_tokens or 0, text_response.output_tokens or 0) * BATCH_COST_FACTOR)
+    assert structured.title == "Batched"
+    assert usage["cost_estimate"] > 0
+    assert isinstance(failure, LLMProviderError)
+    assert executor.stats()["requests_failed"] == 1
+
+
+@pytest.mark.asyncio()
+async def test_batch_executor_aclose_cancels_callers_of_running_batches() -> None:
+    """Closing the executor cancels callers still waiting on a submitted batch, as well as queued ones."""
+
+    server = FakeBatchServer(polls_until_done=1_000_000)
+    executor = BatchExecutor({"openai": server}, max_batch_size=2, flush_interval=60, poll_interval=0.01)
+    running = [asyncio.create_task(executor.submit("openai", server, "/v1/responses", {"input": str(number)})) for number in range(2)]
+    queued = asyncio.create_task(executor.submit("openai", server, "/v1/responses", {"input": "queued"}))
+    while not server.submitted:
+        await asyncio.sleep(0)
+
+    await executor.aclose()
+
+    results = await asyncio.wait_for(asyncio.gather(*running, queued, return_exceptions=True), timeout=1)
+    assert all(isinstance(result, asyncio.CancelledError) for result in results)
+    assert executor.stats()["running_batches"] == 0
+
+
+def test_schema_registry_compiles_each_dialect_once_and_validates() -> None:
+    """Provider schemas are rewritten once per model, shared across calls, and validate like the model itself."""
+
+    class _Child(BaseModel):
+        name: str = "x"
+
+    class _Parent(BaseModel):
+        title: str
+        children: list[_Child]
+
+    registry = SchemaRegistry()
+    assert registry.warm([_Parent, _Parent]) == 5
+
+    openai_schema = registry.compile(_Parent, "openai").schema
+    assert openai_schema["additionalProperties"] is False
+    assert openai_schema["$defs"]["_Child"]["additionalProperties"] is False
+    assert "additionalProperties" not in _Parent.model_json_schema()
+
+    gemini_schema = registry.compile(_Parent, "gemini").schema
+    assert "$defs" not in gemini_schema
+    assert gemini_schema["properties"]["children"]["items"]["properties"]["name"] == {"title": "Name", "type": "string"}
+
+    assert json.dumps(registry.compile(_Parent, "raw").schema) in (registry.compile(_Parent, "openrouter").prompt or "")
+    assert registry.compile(_Parent, "openai") is registry.compile(_Parent, "openai")
+    assert registry.stats()["misses"] == 5
+
+    parsed = registry.compile(_Parent, "claude").validate({"title": "t", "children": [{}]})
+    assert isinstance(parsed, _Parent)
+    assert parsed.children[0].name == "x"
+    with pytest.raises(ValueError):
+        registry.compile(_Parent, "claude").validate({"children": []})
+
+
+def test_prompt_registry_compiles_once_and_reloads_edited_files(tmp_path: Any) -> None:
+    """Prompt files are read once, rendered in one pass with shared JSON fragments, and reloaded on change in debug mode."""
+
+    prompt = tmp_path / "prompts" / "summary.md"
+    prompt.parent.mkdir()
+    prompt.write_text("Topic: {{ topic }}\nData: {{data}}\nAgain: {{data}}\nKeep {literal} braces\n", encoding="utf-8")
+
+    registry = PromptRegistry(reload=True)
+    assert registry.warm([tmp_path]) == 1
+    template = registry.get(prompt)
+    assert template is registry.get(prompt)
+    assert template.placeholders == {"topic", "data"}
+
+    data = {"items": [1, 2]}
+    fragments: dict[int, tuple[Any, str]] = {}
+    rendered = template.render({"topic": "Cells", "data": data}, fragments)
+    assert rendered == 'Topic: Cells\nData: {"items": [1, 2]}\nAgain: {"items": [1, 2]}\nKeep {literal} braces'
+    assert list(fragments.values()) == [(data, '{"items": [1, 2]}')]
+    with pytest.raises(ValueError, match="missing required input: 'data'"):
+        template.render({"topic": "Cells"})
+
+    prompt.write_text("Updated {{topic}}", encoding="utf-8")
+    os.utime(prompt, ns=(time.time_ns() + 10**9, time.time_ns() + 10**9))
+    assert registry.get(prompt).render({"topic": "Cells"}) == "Updated Cells"
+    assert registry.stats()["reloads"] == 1
+
+
+def test_llm_request_payloads_are_stored_once_and_rehydrated(db_session: Session) -> None:
+    """Large strings shared by several requests are stored as one blob and restored by ``by_id`` and listings."""
+
+    source = "Unit source material. " * 200
+    repo = LLMRequestRepo(db_session)
+    request_ids = []
+    for index in range(3):
+        llm_request = LLMRequestModel(
+            id=uuid.uuid4(),
+            provider="openai",
+            model="gpt-5",
+            temperature=0.7,
+            messages=[{"role": "system", "content": source}, {"role": "user", "content": f"question {index}"}],
+            request_payload={"input": [{"content": source}]},
+        )
+        repo.create(llm_request)
+        request_ids.append(llm_request.id)
+        # The flush writes references; the object the caller holds keeps its text
+        assert llm_request.messages[0]["content"] == source
+        assert llm_request not in db_session.dirty
+    db_session.commit()
+    db_session.expunge_all()
+
+    assert db_session.query(LLMPayloadBlobModel).count() == 1
+    stored = db_session.get(LLMRequestModel, request_ids[1])
+    assert stored is not None
+    assert set(stored.messages[0]["content"]) == {BLOB_REF_KEY}
+    assert stored.messages[1]["content"] == "question 1"
+
+    restored = repo.by_id(request_ids[1])
+    assert restored is not None
+    assert restored.messages[0]["content"] == source
+    assert restored.request_payload == {"input": [{"content": source}]}
+    assert restored not in db_session.dirty
+    db_session.expunge_all()
+    listed = repo.by_provider("openai")
+    assert len(listed) == 3
+    assert {request.messages[0]["content"] for request in listed} == {source}
+
+
+@pytest.mark.asyncio()
+async def test_generate_audio_synthesizes_long_text_in_parallel_chunks(db_session: Session, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Long transcripts are split, synthesized with bounded concurrency and stitched frame-exactly in order."""
+
+    # One MPEG-1 Layer III frame: 128 kbps, 44.1 kHz, 417 bytes, 1152 samples
+    header = bytes([0xFF, 0xFB, 0x90, 0x00])
+
+    class _TTSProvider(_RecordingProvider):
+        def __init__(self, config: LLMConfig, db_session: Session) -> None:
+            super().__init__(config, db_session)
+            self.texts: list[str] = []
+            self.active = 0
+            self.peak = 0
+
+        async def generate_audio(self, request: AudioGenerationRequest, user_id: int | None = None, **kwargs: Any) -> tuple[Any, uuid.UUID]:  # noqa: ARG002
+            self.active += 1
+            self.peak = max(self.peak, self.active)
+            self.texts.append(request.text)
+            await asyncio.sleep(0.01)
+            self.active -= 1
+            # Tag every frame with the paragraph number so stitching order is observable
+            marker = int(request.text.split()[1])
+            audio = b"ID3\x04\x00\x00\x00\x00\x00\x00" + (header + bytes([marker]) * 413) * 3
+            response = InternalAudioResponse(audio_base64=base64.b64encode(audio).decode(), mime_type="audio/mpeg", voice=request.voice, model=request.model, cost_estimate=0.01, duration_seconds=1)
+            return response, uuid.uuid4()
+
+    config = LLMConfig(provider=LLMProviderType.OPENAI, model="gpt-4o-mini", api_key="key", cache_enabled=False, tts_chunk_chars=120, tts_chunk_concurrency=2)
+    provider_factory = _ProviderFactory(_TTSProvider)
+    monkeypatch.setattr("modules.llm_services.service.create_llm_config_from_env", lambda: config)
+    monkeypatch.setattr("modules.llm_services.service.create_llm_provider", provider_factory)
+    service = LLMService(LLMRequestRepo(db_session))
+    provider = provider_factory.last_provider
+    assert isinstance(provider, _TTSProvider)
+
+    text = "\n\n".join(f"Paragraph {index} has a few short sentences. They fit in one chunk. Mostly." for index in range(6))
+    response, _ = await service.generate_audio(text=text, voice="alloy", model="tts-1-hd")
+
+    assert len(provider.texts) == 6
+    assert provider.peak == 2
+    audio = response.audio_bytes()
+    assert len(audio) == 6 * 3 * 417
+    assert [audio[index * 3 * 417 + 4] for index in range(6)] == list(range(6))
+    assert response.duration_seconds == pytest.approx(18 * 1152 / 44100)
+    assert response.cost_estimate == pytest.approx(0.06)
+
+    await service.generate_audio(text=text, voice="alloy", model="tts-1-hd", chunked=False)
+    assert len(provider.texts) == 7
+
+
+@pytest.mark.asyncio()
+async def test_replay_provider_serves_recorded_responses_with_simulated_failures(db_session: Session, tmp_path: Any) -> None:
+    """Recorded rows are replayed by normalized request key, structured calls fall back to a recording of the same model."""
+
+    class Summary(BaseModel):
+        title: str
+        bullets: list[str]
+
+    rows = [
+        {"messages": [{"role": "user", "content": "Explain  photosynthesis\n briefly"}], "response_content": "Plants turn light into sugar.", "execution_time_ms": 40, "status": "completed", "provider": "openai"},
+        {"messages": [{"role": "user", "content": "Summarize unit 1"}], "response_content": json.dumps({"title": "Unit 1", "bullets": ["a", "b"]}), "execution_time_ms": 60, "status": "completed", "provider": "openai"},
+        {"messages": [{"role": "user", "content": "ignored"}], "response_content": None, "status": "failed", "provider": "openai"},
+    ]
+    fixtures = tmp_path / "recorded.jsonl"
+    fixtures.write_text("\n".join(json.dumps(row) for row in rows))
+
+    config = LLMConfig(provider=LLMProviderType.REPLAY, model="gpt-5", cache_enabled=False, rate_limit_backend="off", audit_write_behind=False, replay_source=str(fixtures), replay_latency="fixed:5")
+    provider = ReplayProvider(config, db_session)
+    assert len(provider.library) == 2
+
+    message = InternalLLMMessage(role=MessageRole.USER, content="Explain photosynthesis briefly")
+    response, request_id = await provider.generate_response([message])
+    assert response.content == "Plants turn light into sugar."
+    stored = db_session.get(LLMRequestModel, request_id)
+    assert stored is not None and stored.provider == "replay" and stored.status == "completed"
+
+    summary, _, usage = await provider.generate_structured_object([InternalLLMMessage(role=MessageRole.USER, content="Summarize unit 7")], Summary)
+    assert summary == Summary(title="Unit 1", bullets=["a", "b"])
+    assert usage["tokens_used"] == 0
+
+    strict = ReplayProvider(config.model_copy(update={"replay_strict": True}), db_session)
+    with pytest.raises(LLMProviderError):
+        await strict.generate_response([InternalLLMMessage(role=MessageRole.USER, content="Something new")])
+
+    failing = ReplayProvider(config.model_copy(update={"replay_error_rate": 1.0, "replay_latency": "none"}), db_session)
+    with pytest.raises((LLMRateLimitError, LLMProviderError, LLMTimeoutError)):
+        await failing.generate_response([message])
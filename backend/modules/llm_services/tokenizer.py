@@ -0,0 +1,162 @@
+"""Per-model token counting for cost estimation and prompt budgeting.
+
+OpenAI models are counted with their tiktoken BPE encoding. Claude and Gemini
+use different, unpublished tokenizers, so they are approximated by scaling a
+BPE count with a calibration factor. Encodings are loaded lazily the first time
+a model family is counted and cached for the life of the process; if tiktoken
+is missing or an encoding cannot be loaded (e.g. no network to fetch the BPE
+ranks), counting degrades to a characters-per-token heuristic instead of
+failing.
+
+Counts for repeated fragments (prompt templates, source material) are memoized,
+so budgeting the same text again costs a dictionary lookup.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable
+from dataclasses import dataclass
+import functools
+import logging
+import math
+from typing import Any
+
+from .types import LLMMessage
+
+try:
+    import tiktoken
+
+    _TIKTOKEN_AVAILABLE = True
+except ImportError:  # pragma: no cover - optional dependency
+    tiktoken = None  # type: ignore[assignment]
+    _TIKTOKEN_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+__all__ = [
+    "Tokenizer",
+    "count_message_tokens",
+    "count_text_tokens",
+    "get_tokenizer",
+]
+
+# Framing tokens each chat message adds on top of its content, and the tokens priming the reply
+_TOKENS_PER_MESSAGE = 3
+_TOKENS_PER_NAME = 1
+_REPLY_PRIMING_TOKENS = 3
+# Flat charge for a non-text content part (image/audio) whose size cannot be read from the text
+_MEDIA_PART_TOKENS = 85
+# Memoized fragment counts kept per process
+_COUNT_CACHE_SIZE = 4096
+
+
+@dataclass(frozen=True, slots=True)
+class _TokenizerSpec:
+    """How to count tokens for one model family."""
+
+    encoding: str
+    scale: float = 1.0
+    chars_per_token: float = 4.0
+
+
+# Model-name prefixes, checked in order (most specific first)
+_MODEL_SPECS: tuple[tuple[str, _TokenizerSpec], ...] = (
+    ("gpt-3.5", _TokenizerSpec("cl100k_base")),
+    ("gpt-4-", _TokenizerSpec("cl100k_base")),
+    ("gpt-4", _TokenizerSpec("o200k_base")),
+    ("gpt-5", _TokenizerSpec("o200k_base")),
+    ("o1", _TokenizerSpec("o200k_base")),
+    ("o3", _TokenizerSpec("o200k_base")),
+    ("o4", _TokenizerSpec("o200k_base")),
+    ("text-embedding", _TokenizerSpec("cl100k_base")),
+    # Anthropic's tokenizer yields roughly 15% more tokens than cl100k on English prose
+    ("claude", _TokenizerSpec("cl100k_base", scale=1.15, chars_per_token=3.5)),
+    # Gemini's SentencePiece vocabulary lands close to o200k
+    ("gemini", _TokenizerSpec("o200k_base", scale=1.0, chars_per_token=4.0)),
+)
+_DEFAULT_SPEC = _TokenizerSpec("o200k_base")
+
+
+def _spec_for_model(model: str | None) -> _TokenizerSpec:
+    name = (model or "").lower()
+    # OpenRouter style ids ("anthropic/claude-...", "openai/gpt-4o") are matched on the model part
+    name = name.rsplit("/", 1)[-1]
+    for prefix, spec in _MODEL_SPECS:
+        if name.startswith(prefix):
+            return spec
+    return _DEFAULT_SPEC
+
+
+class Tokenizer:
+    """Counts tokens for one model family; obtain instances through ``get_tokenizer``."""
+
+    def __init__(self, spec: _TokenizerSpec, encoding: Any | None) -> None:
+        self._spec = spec
+        self._encoding = encoding
+
+    @property
+    def name(self) -> str:
+        """Encoding name, or ``approximate`` when counting by characters."""
+        return self._spec.encoding if self._encoding is not None else "approximate"
+
+    @property
+    def exact(self) -> bool:
+        """True when counts come from the model's own BPE encoding rather than an approximation."""
+        return self._encoding is not None and self._spec.scale == 1.0
+
+    def count(self, text: str) -> int:
+        """Count tokens in ``text``."""
+        if not text:
+            return 0
+        if self._encoding is None:
+            return math.ceil(len(text) / self._spec.chars_per_token)
+        tokens = len(self._encoding.encode(text, disallowed_special=()))
+        return math.ceil(tokens * self._spec.scale)
+
+
+@functools.cache
+def _load_encoding(encoding_name: str) -> Any | None:
+    """Load a tiktoken encoding once per process; None when it is unavailable."""
+    if not _TIKTOKEN_AVAILABLE:
+        return None
+    try:
+        return tiktoken.get_encoding(encoding_name)
+    except Exception as exc:
+        logger.warning(f"tiktoken encoding {encoding_name} unavailable, approximating token counts: {exc}")
+        return None
+
+
+@functools.cache
+def _tokenizer_for_spec(spec: _TokenizerSpec) -> Tokenizer:
+    return Tokenizer(spec, _load_encoding(spec.encoding))
+
+
+def get_tokenizer(model: str | None = None) -> Tokenizer:
+    """Return the cached tokenizer for ``model`` (loaded on first use)."""
+    return _tokenizer_for_spec(_spec_for_model(model))
+
+
+@functools.lru_cache(maxsize=_COUNT_CACHE_SIZE)
+def count_text_tokens(text: str, model: str | None = None) -> int:
+    """Count tokens in a text fragment for ``model``; results are memoized per (text, model)."""
+    return get_tokenizer(model).count(text)
+
+
+def _content_tokens(content: Any, model: str | None) -> int:
+    if isinstance(content, str):
+        return count_text_tokens(content, model)
+    total = 0
+    for part in content or ():
+        text = part.get("text") if isinstance(part, dict) else None
+        total += count_text_tokens(text, model) if isinstance(text, str) else _MEDIA_PART_TOKENS
+    return total
+
+
+def count_message_tokens(messages: Iterable[LLMMessage], model: str | None = None) -> int:
+    """Count prompt tokens for a chat request, including per-message framing overhead."""
+    total = _REPLY_PRIMING_TOKENS
+    for message in messages:
+        total += _TOKENS_PER_MESSAGE + _content_tokens(message.content, model)
+        if message.name:
+            total += _TOKENS_PER_NAME + count_text_tokens(message.name, model)
+    return total
@@ -0,0 +1,246 @@
+"""Helpers for chunked text-to-speech: transcript splitting and lossless audio stitching.
+
+Long podcast transcripts are split at paragraph, then sentence, then word
+boundaries into chunks of at most ``max_chars`` characters so they can be
+synthesized concurrently and stay under provider input limits. The chunk
+audio is joined without re-encoding: MP3 by concatenating MPEG frames (ID3
+tags and Xing/Info header frames of each chunk are dropped), WAV by appending
+the PCM ``data`` chunks under a single header, raw PCM by plain concatenation.
+Durations are measured from the stitched audio itself (frame sample counts or
+PCM byte rate) rather than estimated from word counts.
+"""
+
+from __future__ import annotations
+
+import re
+import struct
+
+__all__ = ["STITCHABLE_FORMATS", "audio_duration_seconds", "split_transcript", "stitch_audio"]
+
+# Requested formats whose audio can be concatenated losslessly
+STITCHABLE_FORMATS = frozenset({"mp3", "wav", "pcm"})
+
+_PARAGRAPH_BREAK = re.compile(r"\n\s*\n")
+_SENTENCE_END = re.compile(r"(?<=[.!?…])[\"'”’)\]]*\s+")
+
+# MPEG audio Layer III tables, indexed by the header's version bits
+_MPEG1 = 3
+_MP3_BITRATES_KBPS = {
+    _MPEG1: (0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320),
+    # MPEG-2 and MPEG-2.5 share a table
+    2: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+    0: (0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160),
+}
+_MP3_SAMPLE_RATES = {_MPEG1: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+_LAYER_III = 1
+
+
+# ----------------------------------------------------------------------
+# Transcript splitting
+# ----------------------------------------------------------------------
+def _hard_wrap(sentence: str, max_chars: int) -> list[str]:
+    """Split an over-long sentence at word boundaries (or mid-word as a last resort)."""
+    pieces: list[str] = []
+    current = ""
+    for word in sentence.split():
+        rest = word
+        while len(rest) > max_chars:
+            if current:
+                pieces.append(current)
+                current = ""
+            pieces.append(rest[:max_chars])
+            rest = rest[max_chars:]
+        candidate = f"{current} {rest}" if current else rest
+        if len(candidate) > max_chars:
+            pieces.append(current)
+            current = rest
+        else:
+            current = candidate
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def split_transcript(text: str, max_chars: int) -> list[str]:
+    """Split ``text`` into chunks of at most ``max_chars``, preferring paragraph then sentence boundaries."""
+    if max_chars <= 0:
+        raise ValueError("max_chars must be positive")
+    text = text.strip()
+    if len(text) <= max_chars:
+        return [text] if text else []
+
+    # (separator to put before the unit, unit) with every unit within the limit
+    units: list[tuple[str, str]] = []
+    for raw_paragraph in _PARAGRAPH_BREAK.split(text):
+        paragraph = raw_paragraph.strip()
+        if not paragraph:
+            continue
+        separator = "\n\n"
+        if len(paragraph) <= max_chars:
+            units.append((separator, paragraph))
+            continue
+        for sentence in _SENTENCE_END.split(paragraph):
+            for piece in [sentence] if len(sentence) <= max_chars else _hard_wrap(sentence, max_chars):
+                units.append((separator, piece))
+                separator = " "
+
+    chunks: list[str] = []
+    current = ""
+    for separator, unit in units:
+        candidate = f"{current}{separator}{unit}" if current else unit
+        if len(candidate) > max_chars:
+            chunks.append(current)
+            current = unit
+        else:
+            current = candidate
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+# ----------------------------------------------------------------------
+# MP3
+# ----------------------------------------------------------------------
+def _skip_id3v2(data: bytes) -> int:
+    if len(data) >= 10 and data[:3] == b"ID3":
+        size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        footer = 10 if data[5] & 0x10 else 0
+        return 10 + size + footer
+    return 0
+
+
+def _mp3_frame(data: bytes, pos: int) -> tuple[int, int, int] | None:
+    """Return ``(frame_length, samples, sample_rate)`` for a Layer III frame header at ``pos``."""
+    if pos + 4 > len(data) or data[pos] != 0xFF or (data[pos + 1] & 0xE0) != 0xE0:
+        return None
+    version = (data[pos + 1] >> 3) & 0x03
+    layer = (data[pos + 1] >> 1) & 0x03
+    bitrate_index = data[pos + 2] >> 4
+    rate_index = (data[pos + 2] >> 2) & 0x03
+    padding = (data[pos + 2] >> 1) & 0x01
+    if version == 1 or layer != _LAYER_III or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    bitrate = _MP3_BITRATES_KBPS[version][bitrate_index] * 1000
+    sample_rate = _MP3_SAMPLE_RATES[version][rate_index]
+    samples = 1152 if version == _MPEG1 else 576
+    length = samples // 8 * bitrate // sample_rate + padding
+    return length, samples, sample_rate
+
+
+def _is_info_frame(frame: bytes) -> bool:
+    """True for a Xing/Info/VBRI header frame, which carries stream metadata rather than audio."""
+    return any(tag in frame[4:64] for tag in (b"Xing", b"Info", b"VBRI"))
+
+
+def _mp3_audio_frames(data: bytes) -> tuple[list[bytes], float]:
+    """Return the audio frames of an MP3 stream and their total duration in seconds."""
+    end = len(data) - 128 if len(data) >= 128 and data[-128:-125] == b"TAG" else len(data)
+    pos = _skip_id3v2(data)
+    frames: list[bytes] = []
+    duration = 0.0
+    while pos < end:
+        header = _mp3_frame(data, pos)
+        if header is None:
+            # Resynchronise on the next frame header
+            pos = data.find(b"\xff", pos + 1, end)
+            if pos < 0:
+                break
+            continue
+        length, samples, sample_rate = header
+        frame = data[pos : min(pos + length, end)]
+        pos += length
+        if not frames and _is_info_frame(frame):
+            continue
+        frames.append(frame)
+        duration += samples / sample_rate
+    return frames, duration
+
+
+# ----------------------------------------------------------------------
+# WAV / PCM
+# ----------------------------------------------------------------------
+def _wav_parts(data: bytes) -> tuple[bytes, bytes]:
+    """Return the ``fmt `` chunk body and the PCM ``data`` payload of a RIFF/WAVE file."""
+    if len(data) < 12 or data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        raise ValueError("Audio chunk is not a RIFF/WAVE file")
+    pos = 12
+    fmt = b""
+    while pos + 8 <= len(data):
+        chunk_id = data[pos : pos + 4]
+        (size,) = struct.unpack_from("<I", data, pos + 4)
+        body = data[pos + 8 : pos + 8 + size]
+        if chunk_id == b"fmt ":
+            fmt = body
+        elif chunk_id == b"data":
+            # Streamed WAVs may leave the size as a placeholder; the payload runs to the end
+            if not fmt:
+                raise ValueError("WAV data chunk precedes its fmt chunk")
+            return fmt, body
+        pos += 8 + size + (size & 1)
+    raise ValueError("WAV file has no data chunk")
+
+
+def _wav_file(fmt: bytes, pcm: bytes) -> bytes:
+    riff_size = 4 + (8 + len(fmt)) + (8 + len(pcm)) + (len(pcm) & 1)
+    body = b"WAVE" + b"fmt " + struct.pack("<I", len(fmt)) + fmt + b"data" + struct.pack("<I", len(pcm)) + pcm
+    return b"RIFF" + struct.pack("<I", riff_size) + body + (b"\x00" if len(pcm) & 1 else b"")
+
+
+def _pcm_byte_rate(mime_type: str) -> int | None:
+    """Byte rate of raw PCM from a mime type such as ``audio/L16;rate=24000;channels=1``."""
+    rate = re.search(r"rate=(\d+)", mime_type)
+    if rate is None:
+        return None
+    channels = re.search(r"channels=(\d+)", mime_type)
+    bits = re.search(r"audio/L(\d+)", mime_type, re.IGNORECASE)
+    return int(rate.group(1)) * (int(channels.group(1)) if channels else 1) * (int(bits.group(1)) // 8 if bits else 2)
+
+
+def _container(mime_type: str) -> str:
+    lowered = mime_type.lower()
+    if "mpeg" in lowered or "mp3" in lowered:
+        return "mp3"
+    if "wav" in lowered or "wave" in lowered:
+        return "wav"
+    if "pcm" in lowered or "/l16" in lowered or "/l8" in lowered:
+        return "pcm"
+    return lowered
+
+
+# ----------------------------------------------------------------------
+# Public helpers
+# ----------------------------------------------------------------------
+def stitch_audio(chunks: list[bytes], mime_type: str) -> bytes:
+    """Join per-chunk audio of ``mime_type`` into one stream without re-encoding."""
+    if len(chunks) == 1:
+        return chunks[0]
+    container = _container(mime_type)
+    if container == "mp3":
+        return b"".join(frame for chunk in chunks for frame in _mp3_audio_frames(chunk)[0])
+    if container == "wav":
+        parts = [_wav_parts(chunk) for chunk in chunks]
+        fmt = parts[0][0]
+        if any(chunk_fmt != fmt for chunk_fmt, _ in parts):
+            raise ValueError("WAV chunks use different sample formats")
+        return _wav_file(fmt, b"".join(pcm for _, pcm in parts))
+    if container == "pcm":
+        return b"".join(chunks)
+    raise ValueError(f"Cannot stitch audio of type {mime_type}")
+
+
+def audio_duration_seconds(data: bytes, mime_type: str) -> float | None:
+    """Measure the playback duration of ``data``, or None when the format cannot be measured."""
+    container = _container(mime_type)
+    try:
+        if container == "mp3":
+            return _mp3_audio_frames(data)[1]
+        if container == "wav":
+            fmt, pcm = _wav_parts(data)
+            (byte_rate,) = struct.unpack_from("<I", fmt, 8)
+            return len(pcm) / byte_rate if byte_rate else None
+    except (ValueError, struct.error):
+        return None
+    if container == "pcm":
+        byte_rate = _pcm_byte_rate(mime_type)
+        return len(data) / byte_rate if byte_rate else None
+    return None
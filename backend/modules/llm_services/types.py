@@ -7,6 +7,7 @@ from dataclasses import dataclass
 from datetime import datetime
 from enum import Enum
 from typing import Any, Literal
+import uuid
 
 __all__ = [
     "AudioGenerationRequest",
@@ -19,6 +20,7 @@ __all__ = [
     "LLMProviderType",
     "LLMRequestMode",
     "LLMResponse",
+    "LLMStreamChunk",
     "MessageRole",
     "SearchResult",
     "ToolCall",
@@ -37,6 +39,7 @@ class LLMProviderType(str, Enum):
     BEDROCK = "bedrock"
     GEMINI = "gemini"
     OPENROUTER = "openrouter"
+    REPLAY = "replay"  # Recorded responses for offline load testing
 
 
 class LLMRequestMode(str, Enum):
@@ -71,6 +74,8 @@ class LLMMessage:
     name: str | None = None
     function_call: dict[str, Any] | None = None
     tool_calls: list[dict[str, Any]] | None = None
+    # Marks the last message of a stable prefix that providers should cache
+    cache_breakpoint: bool = False
 
     def to_dict(self) -> dict[str, Any]:
         """Convert to dictionary format for API calls"""
@@ -136,6 +141,20 @@ class LLMResponse:
         }
 
 
+@dataclass
+class LLMStreamChunk:
+    """Incremental piece of a streamed completion; the final chunk carries the full response"""
+
+    delta: str = ""
+    response: LLMResponse | None = None
+    request_id: uuid.UUID | None = None
+
+    @property
+    def is_final(self) -> bool:
+        """Whether this chunk completes the stream"""
+        return self.response is not None
+
+
 @dataclass
 class AudioGenerationRequest:
     """Request payload for audio synthesis operations."""
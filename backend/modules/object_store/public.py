@@ -9,7 +9,7 @@ import uuid
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from .repo import AudioRepo, DocumentRepo, ImageRepo
-from .s3_provider import S3Provider, create_s3_config_from_env
+from .s3_provider import S3FileNotFoundError, S3Provider, create_s3_config_from_env
 from .service import (
     AudioCreate,
     AudioRead,
@@ -117,6 +117,18 @@ class ObjectStoreProvider(Protocol):
         ...
 
 
+class RawObjectProvider(Protocol):
+    """Blocking byte access to caller-chosen keys, for jobs running on worker threads."""
+
+    def put_object_bytes(self, s3_key: str, data: bytes, *, content_type: str = "application/octet-stream", content_encoding: str | None = None) -> None:
+        """Write ``data`` under ``s3_key``."""
+        ...
+
+    def get_object_bytes(self, s3_key: str) -> bytes:
+        """Read the object at ``s3_key``; raises ``S3FileNotFoundError`` when it is missing."""
+        ...
+
+
 def object_store_provider(
     session: AsyncSession,
     *,
@@ -130,6 +142,13 @@ def object_store_provider(
     return ObjectStoreService(ImageRepo(session), AudioRepo(session), DocumentRepo(session), s3)
 
 
+def raw_object_provider(*, bucket_name: str | None = None) -> RawObjectProvider:
+    """Factory for blocking byte access to the object store bucket (no metadata rows)."""
+
+    resolved_bucket = bucket_name or os.getenv("OBJECT_STORE_BUCKET", "lantern-room")
+    return S3Provider(create_s3_config_from_env(), resolved_bucket)
+
+
 __all__ = [
     "AudioCreate",
     "AudioRead",
@@ -140,5 +159,8 @@ __all__ = [
     "ImageCreate",
     "ImageRead",
     "ObjectStoreProvider",
+    "RawObjectProvider",
+    "S3FileNotFoundError",
     "object_store_provider",
+    "raw_object_provider",
 ]
@@ -2,7 +2,6 @@
 S3 provider implementation for general file storage and retrieval.
 """
 
-import asyncio
 from dataclasses import dataclass
 from datetime import datetime
 import logging
@@ -19,6 +18,8 @@ except ImportError:  # pragma: no cover - optional dependency
     ClientError = Exception  # type: ignore
 from fastapi import UploadFile
 
+from ..infrastructure.public import OBJECT_STORE_EXECUTOR, get_executor
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
@@ -201,8 +202,7 @@ class S3Provider:
             s3_key = self._generate_file_key(user_identifier, filename, category)
 
             client = self._get_client()
-            await asyncio.get_event_loop().run_in_executor(
-                None,
+            await get_executor(OBJECT_STORE_EXECUTOR).run(
                 lambda: client.put_object(
                     Bucket=self.bucket_name,
                     Key=s3_key,
@@ -249,7 +249,7 @@ class S3Provider:
         """
         try:
             client = self._get_client()
-            url = await asyncio.get_event_loop().run_in_executor(None, lambda: client.generate_presigned_url(method, Params={"Bucket": self.bucket_name, "Key": s3_key}, ExpiresIn=expires_in))
+            url = await get_executor(OBJECT_STORE_EXECUTOR).run(lambda: client.generate_presigned_url(method, Params={"Bucket": self.bucket_name, "Key": s3_key}, ExpiresIn=expires_in))
 
             logger.info(f"Generated presigned URL for {s3_key}")
             return url
@@ -276,7 +276,7 @@ class S3Provider:
         """
         try:
             client = self._get_client()
-            await asyncio.get_event_loop().run_in_executor(None, lambda: client.delete_object(Bucket=self.bucket_name, Key=s3_key))
+            await get_executor(OBJECT_STORE_EXECUTOR).run(lambda: client.delete_object(Bucket=self.bucket_name, Key=s3_key))
 
             logger.info(f"Successfully deleted file {s3_key}")
             return True
@@ -303,7 +303,7 @@ class S3Provider:
         """
         try:
             client = self._get_client()
-            await asyncio.get_event_loop().run_in_executor(None, lambda: client.head_object(Bucket=self.bucket_name, Key=s3_key))
+            await get_executor(OBJECT_STORE_EXECUTOR).run(lambda: client.head_object(Bucket=self.bucket_name, Key=s3_key))
             return True
 
         except ClientError as e:
@@ -331,7 +331,7 @@ class S3Provider:
         """
         try:
             client = self._get_client()
-            response = await asyncio.get_event_loop().run_in_executor(None, lambda: client.head_object(Bucket=self.bucket_name, Key=s3_key))
+            response = await get_executor(OBJECT_STORE_EXECUTOR).run(lambda: client.head_object(Bucket=self.bucket_name, Key=s3_key))
 
             return {"content_type": response.get("ContentType"), "content_length": response.get("ContentLength"), "last_modified": response.get("LastModified"), "etag": response.get("ETag")}
 
@@ -343,3 +343,37 @@ class S3Provider:
         except Exception as e:
             logger.error(f"Failed to get metadata for {s3_key}: {e!s}")
             raise S3Error(f"Metadata retrieval failed: {e!s}") from e
+
+    def put_object_bytes(self, s3_key: str, data: bytes, *, content_type: str = "application/octet-stream", content_encoding: str | None = None) -> None:
+        """
+        Write ``data`` to a caller-chosen key, blocking the calling thread.
+
+        For jobs that already run on a worker thread (e.g. flow payload archival);
+        async callers use ``upload_content``.
+
+        Raises:
+            S3Error: If the upload fails
+        """
+        extra = {"ContentEncoding": content_encoding} if content_encoding else {}
+        try:
+            self._get_client().put_object(Bucket=self.bucket_name, Key=s3_key, Body=data, ContentType=content_type, **extra)
+        except ClientError as e:
+            error_code = getattr(e, "response", {}).get("Error", {}).get("Code", "Unknown")
+            raise S3Error(f"S3 upload failed: {error_code}") from e
+
+    def get_object_bytes(self, s3_key: str) -> bytes:
+        """
+        Read a whole object, blocking the calling thread.
+
+        Raises:
+            S3FileNotFoundError: If the object doesn't exist
+            S3Error: If the download fails
+        """
+        try:
+            response = self._get_client().get_object(Bucket=self.bucket_name, Key=s3_key)
+            return response["Body"].read()
+        except ClientError as e:
+            error_code = getattr(e, "response", {}).get("Error", {}).get("Code", "Unknown")
+            if error_code in ["NoSuchKey", "404"]:
+                raise S3FileNotFoundError(f"File {s3_key} not found") from e
+            raise S3Error(f"S3 download failed: {error_code}") from e
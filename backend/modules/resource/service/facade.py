@@ -13,6 +13,7 @@ import uuid
 from pypdf import PdfReader
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from modules.infrastructure.public import CPU_EXECUTOR, get_executor
 from modules.llm_services.public import LLMServicesProvider, llm_services_provider
 from modules.object_store.public import (
     DocumentCreate,
@@ -305,6 +306,10 @@ class ResourceService:
         return _ExtractionResult(text=text, metadata=metadata)
 
     async def _extract_file_text(self, extension: str, content: bytes, *, filename: str) -> tuple[str, dict[str, Any]]:
+        # Document parsing is CPU-bound; keep it off the event loop and out of the I/O pools
+        return await get_executor(CPU_EXECUTOR).run(self._extract_file_text_sync, extension, content, filename=filename)
+
+    def _extract_file_text_sync(self, extension: str, content: bytes, *, filename: str) -> tuple[str, dict[str, Any]]:
         metadata: dict[str, Any] = {
             "source": "file_upload",
             "filename": filename,
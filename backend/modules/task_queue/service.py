@@ -31,7 +31,7 @@ try:
 except ImportError:
     REDIS_AVAILABLE = False
 
-from ..infrastructure.public import InfrastructureProvider
+from ..infrastructure.public import InfrastructureProvider, get_metrics_registry
 from .models import (
     QueueStats,
     TaskModel,
@@ -49,6 +49,21 @@ __all__ = ["TaskQueueError", "TaskQueueService", "WorkerManager"]
 
 T = TypeVar("T")
 
+_metrics = get_metrics_registry()
+_QUEUE_WAIT = _metrics.histogram("task_queue_wait_seconds", "Time from submission until a worker started the task", ("queue", "task_type"))
+_TASK_DURATION = _metrics.histogram("task_queue_task_duration_seconds", "Time from task start to completion, by outcome (completed, failed)", ("queue", "task_type", "status"))
+
+
+def _elapsed_seconds(start: datetime | None, end: datetime | None) -> float | None:
+    if start is None or end is None:
+        return None
+    # SQLite hands back naive timestamps; they are stored in UTC
+    if start.tzinfo is None:
+        start = start.replace(tzinfo=UTC)
+    if end.tzinfo is None:
+        end = end.replace(tzinfo=UTC)
+    return max(0.0, (end - start).total_seconds())
+
 
 class TaskQueueError(Exception):
     """Base exception for task queue errors."""
@@ -108,6 +123,7 @@ class TaskQueueService:
 
         self.infrastructure.initialize()
         async with self.infrastructure.get_async_session_context() as session:
+            session.info["commit_scope"] = "task_queue"
             repo = TaskRepo(session)
             return await func(repo)
 
@@ -200,7 +216,17 @@ class TaskQueueService:
             self._arq_pool = await create_pool(self.redis_settings)
         return self._arq_pool
 
-    async def submit_flow_task(self, flow_name: str, flow_run_id: uuid.UUID, inputs: dict[str, Any], user_id: int | None = None, priority: int = 0, delay: float | None = None, task_type: str | None = None) -> TaskSubmissionResult:
+    async def submit_flow_task(
+        self,
+        flow_name: str,
+        flow_run_id: uuid.UUID,
+        inputs: dict[str, Any],
+        user_id: int | None = None,
+        priority: int = 0,
+        delay: float | None = None,
+        task_type: str | None = None,
+        resume_from_flow_run_id: uuid.UUID | None = None,
+    ) -> TaskSubmissionResult:
         """
         Submit a flow execution task to the ARQ queue.
 
@@ -211,6 +237,7 @@ class TaskQueueService:
             user_id: Optional user ID
             priority: Task priority (higher = more important)
             delay: Optional delay before execution in seconds
+            resume_from_flow_run_id: Optional failed flow run whose completed steps the handler should reuse
 
         Returns:
             TaskSubmissionResult with task ID and submission details
@@ -232,6 +259,8 @@ class TaskQueueService:
             # Ensure task_type is provided for the worker to resolve the handler.
             # Default to flow_name for convenience if not explicitly set by caller.
             task_payload["task_type"] = task_type or flow_name
+            if resume_from_flow_run_id is not None:
+                task_payload["resume_from_flow_run_id"] = str(resume_from_flow_run_id)
 
             # Submit task to ARQ using generic registered-task entrypoint
             job = await pool.enqueue_job(
@@ -315,6 +344,9 @@ class TaskQueueService:
 
         updated = await self._update_task(task_id, _apply)
         if updated:
+            waited = _elapsed_seconds(updated.created_at, updated.started_at)
+            if waited is not None:
+                _QUEUE_WAIT.observe(waited, updated.queue_name, updated.task_type)
             task_status = self._task_model_to_status(updated)
             await self.repo.store_task_status(task_status)
 
@@ -335,6 +367,9 @@ class TaskQueueService:
 
         updated = await self._update_task(task_id, _apply)
         if updated:
+            duration = _elapsed_seconds(updated.started_at, updated.completed_at)
+            if duration is not None:
+                _TASK_DURATION.observe(duration, updated.queue_name, updated.task_type, "failed" if error_message else "completed")
             await self.repo.complete_task(task_id, outputs, error_message)
 
     async def cancel_task(self, task_id: str) -> bool:
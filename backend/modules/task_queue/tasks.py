@@ -4,6 +4,7 @@ Task Queue Tasks - ARQ task definitions for flow execution.
 This module defines the actual ARQ tasks that will be executed by workers.
 """
 
+import asyncio
 import importlib
 import logging
 import os
@@ -14,7 +15,8 @@ import uuid
 
 from arq.connections import RedisSettings
 
-from ..infrastructure.public import infrastructure_provider
+from ..infrastructure.public import infrastructure_provider, start_metrics_server
+from ..llm_services.public import shutdown_llm_clients
 from .public import get_task_handler
 from .service import TaskQueueService, WorkerManager
 
@@ -25,6 +27,9 @@ __all__ = ["WorkerSettings", "execute_registered_task", "get_arq_worker_settings
 
 # Global worker manager instance
 _worker_manager: WorkerManager | None = None
+# Prometheus scrape endpoint (workers have no HTTP app of their own)
+_metrics_server: asyncio.Server | None = None
+_DEFAULT_METRICS_PORT = 9101
 
 
 async def execute_registered_task(_ctx: dict[str, Any], task_payload: dict[str, Any]) -> dict[str, Any]:
@@ -119,7 +124,7 @@ async def execute_registered_task(_ctx: dict[str, Any], task_payload: dict[str,
 
 async def startup(_ctx: dict[str, Any]) -> None:
     """ARQ startup function - called when worker starts."""
-    global _worker_manager  # noqa: PLW0603
+    global _worker_manager, _metrics_server  # noqa: PLW0603
 
     # Ensure verbose logging goes to stdout (captured by start.sh -> worker.log)
     root_logger = logging.getLogger()
@@ -155,20 +160,36 @@ async def startup(_ctx: dict[str, Any]) -> None:
     _worker_manager = WorkerManager(task_queue_service)
     await _worker_manager.start()
 
+    # WORKER_METRICS_PORT=0 disables the endpoint (e.g. several workers on one host without distinct ports)
+    metrics_port = int(os.getenv("WORKER_METRICS_PORT") or _DEFAULT_METRICS_PORT)
+    if metrics_port > 0 and _metrics_server is None:
+        _metrics_server = await start_metrics_server(metrics_port)
+
     logger.info("✅ ARQ Worker startup complete")
 
 
 async def shutdown(_ctx: dict[str, Any]) -> None:
     """ARQ shutdown function - called when worker stops."""
-    global _worker_manager  # noqa: PLW0603
+    global _worker_manager, _metrics_server  # noqa: PLW0603
 
     logger.info("🛑 ARQ Worker shutting down...")
 
+    if _metrics_server is not None:
+        _metrics_server.close()
+        await _metrics_server.wait_closed()
+        _metrics_server = None
+
     # Stop worker manager
     if _worker_manager:
         await _worker_manager.stop()
         _worker_manager = None
 
+    # Close pooled LLM provider clients
+    try:
+        await shutdown_llm_clients()
+    except Exception as e:
+        logger.error(f"Error closing LLM provider clients: {e}")
+
     # Shutdown infrastructure
     try:
         infra = infrastructure_provider()
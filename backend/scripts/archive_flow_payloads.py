@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Flow Payload Archival
+
+Moves the inputs/outputs of finished flow runs and step runs older than
+``FLOW_ARCHIVE_AFTER_DAYS`` (default 30) into compressed objects in the payload
+archive, leaving a pointer and summary in each row. Safe to re-run and to
+interrupt: every batch commits on its own. Meant to run daily from cron.
+
+Usage:
+    python scripts/archive_flow_payloads.py
+    python scripts/archive_flow_payloads.py --older-than-days 14 --batch-size 200
+"""
+
+import argparse
+from datetime import timedelta
+import logging
+from pathlib import Path
+import sys
+
+# Add the backend directory to the path so we can import modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules.flow_engine.public import archive_flow_payloads
+from modules.infrastructure.public import infrastructure_provider
+
+
+def main() -> None:
+    """Main function."""
+    parser = argparse.ArgumentParser(description="Archive old flow run payloads to the object store")
+    parser.add_argument("--older-than-days", type=float, help="Archive rows older than this (default: FLOW_ARCHIVE_AFTER_DAYS or 30)")
+    parser.add_argument("--batch-size", type=int, default=100, help="Rows archived per commit")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+
+    infra = infrastructure_provider()
+    infra.initialize()
+
+    older_than = timedelta(days=args.older_than_days) if args.older_than_days is not None else None
+    with infra.get_session_context() as session:
+        report = archive_flow_payloads(session, older_than=older_than, batch_size=args.batch_size)
+
+    print(f"Archived {report.flow_runs} flow runs and {report.step_runs} step runs: {report.archived_bytes:,} bytes moved, {report.stored_bytes:,} bytes stored")
+
+
+if __name__ == "__main__":
+    main()
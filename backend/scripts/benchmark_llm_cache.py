@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+LLM Cache Benchmark
+
+Compares get/set throughput of the indexed tiered ``LLMCache`` against the
+previous directory-of-JSON implementation at different cache sizes. The
+baseline is the unmodified ``LLMCache`` source read from git (``--baseline-ref``),
+so the script must run inside a checkout.
+
+Usage:
+    python scripts/benchmark_llm_cache.py
+    python scripts/benchmark_llm_cache.py --sizes 10000 100000 --ops 500
+"""
+
+import argparse
+import asyncio
+from datetime import UTC, datetime
+import json
+from pathlib import Path
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import types
+from typing import Any
+
+BACKEND_DIR = Path(__file__).parent.parent
+# Last revision with the directory-of-JSON cache, before the indexed response store replaced it
+BASELINE_REF = "0484763"
+BASELINE_CACHE_PATH = "backend/modules/llm_services/cache.py"
+
+# Add the backend directory to the path so we can import modules
+sys.path.insert(0, str(BACKEND_DIR))
+
+from modules.llm_services.cache import LLMCache
+from modules.llm_services.types import LLMMessage, LLMResponse, MessageRole
+
+
+def _load_baseline_cache(ref: str) -> Any:
+    """Load the directory-of-JSON ``LLMCache`` class exactly as it was at ``ref``."""
+    source = subprocess.run(["git", "show", f"{ref}:{BASELINE_CACHE_PATH}"], cwd=BACKEND_DIR, check=True, capture_output=True, text=True).stdout  # noqa: S603, S607
+    module = types.ModuleType("modules.llm_services._baseline_cache")
+    module.__package__ = "modules.llm_services"  # resolves its relative imports against the current package
+    exec(compile(source, f"{ref}:{BASELINE_CACHE_PATH}", "exec"), module.__dict__)  # noqa: S102
+    return module.LLMCache
+
+
+def _messages(i: int) -> list[LLMMessage]:
+    return [LLMMessage(role=MessageRole.USER, content=f"benchmark prompt #{i}")]
+
+
+def _response(i: int) -> LLMResponse:
+    return LLMResponse(content=f"benchmark response #{i} " + "x" * 512, provider="openai", model="gpt-4o", tokens_used=128)
+
+
+async def _populate(cache: Any, count: int) -> None:
+    if not isinstance(cache, LLMCache):
+        # Write the baseline's files directly in the layout its set() produces; going
+        # through set() rescans the directory per call and would take hours at 100k entries
+        cached_at = datetime.now(UTC).isoformat()
+        for i in range(count):
+            messages = _messages(i)
+            key = cache._generate_cache_key(messages)
+            cache_data = {"cache_key": key, "cached_at": cached_at, "messages": [msg.to_dict() for msg in messages], "kwargs": {}, "response": _response(i).to_dict()}
+            cache._get_cache_path(key).write_text(json.dumps(cache_data, indent=2, default=str))
+        return
+    for i in range(count):
+        await cache.set(_messages(i), _response(i))
+
+
+async def _time_ops(cache: Any, size: int, ops: int, offset: int) -> tuple[float, float]:
+    keys = random.sample(range(size), min(ops, size))
+    start = time.perf_counter()
+    for i in keys:
+        await cache.get(_messages(i))
+    get_rate = len(keys) / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for i in range(offset, offset + ops):
+        await cache.set(_messages(i), _response(i))
+    set_rate = ops / (time.perf_counter() - start)
+    return get_rate, set_rate
+
+
+async def run(sizes: list[int], ops: int, baseline_ref: str, baseline_set_ops: int) -> None:
+    baseline_cache = _load_baseline_cache(baseline_ref)
+    print(f"{'impl':<10} {'entries':>10} {'get ops/s':>14} {'set ops/s':>14} {'populate s':>12}")
+    for size in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            baseline = baseline_cache(cache_dir=str(Path(tmp) / "baseline"), max_cache_size_mb=10_000)
+            start = time.perf_counter()
+            await _populate(baseline, size)
+            populate = time.perf_counter() - start
+            get_rate, set_rate = await _time_ops(baseline, size, min(ops, baseline_set_ops), size)
+            print(f"{'baseline':<10} {size:>10} {get_rate:>14,.0f} {set_rate:>14,.1f} {populate:>12.1f}")
+
+            indexed = LLMCache(cache_dir=str(Path(tmp) / "indexed"), max_cache_size_mb=10_000)
+            start = time.perf_counter()
+            await _populate(indexed, size)
+            populate = time.perf_counter() - start
+            get_rate, set_rate = await _time_ops(indexed, size, ops, size)
+            print(f"{'indexed':<10} {size:>10} {get_rate:>14,.0f} {set_rate:>14,.1f} {populate:>12.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark LLM cache get/set throughput")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000], help="Number of pre-populated entries")
+    parser.add_argument("--ops", type=int, default=1000, help="Timed get/set operations per run")
+    parser.add_argument("--baseline-ref", default=BASELINE_REF, help="Git revision holding the directory-of-JSON LLMCache to compare against")
+    parser.add_argument("--baseline-set-ops", type=int, default=5, help="Cap on timed baseline operations (each baseline set scans the whole directory)")
+    args = parser.parse_args()
+    random.seed(0)
+    asyncio.run(run(args.sizes, args.ops, args.baseline_ref, args.baseline_set_ops))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Schema Registry Benchmark
+
+Compares the per-call cost of preparing a structured request and validating its
+response the old way (regenerate the Pydantic JSON schema and rewrite it for the
+provider on every call) against a lookup in the precompiled ``SchemaRegistry``.
+
+Usage:
+    python scripts/benchmark_schema_registry.py
+    python scripts/benchmark_schema_registry.py --calls 5000
+"""
+
+import argparse
+import json
+from pathlib import Path
+import sys
+import time
+from typing import Any
+
+from pydantic import BaseModel, Field
+
+# Add the backend directory to the path so we can import modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from modules.llm_services.schema_registry import DIALECTS, OPENROUTER_SCHEMA_PROMPT, SchemaRegistry, gemini_inline_schema, openai_strict_schema
+
+
+class Option(BaseModel):
+    label: str = Field(..., description="Option letter")
+    text: str = Field(..., description="Option text")
+    rationale_wrong: str | None = Field(default=None, description="Why this distractor is wrong")
+
+
+class Question(BaseModel):
+    stem: str = Field(..., description="Question stem")
+    options: list[Option] = Field(..., min_length=3, max_length=5)
+    answer_key: str
+    learning_objective_ids: list[str] = Field(default_factory=list)
+    difficulty: str = Field(default="medium", examples=["easy", "medium", "hard"])
+
+
+class Lesson(BaseModel):
+    title: str
+    learning_objectives: list[str]
+    questions: list[Question]
+    glossary: dict[str, str] = Field(default_factory=dict)
+
+
+def _payload() -> dict[str, Any]:
+    option = {"label": "A", "text": "An option", "rationale_wrong": "Because"}
+    question = {"stem": "What is it?", "options": [option, option, option, option], "answer_key": "A", "learning_objective_ids": ["lo_1"]}
+    return {"title": "Lesson", "learning_objectives": ["lo_1", "lo_2"], "questions": [question] * 5, "glossary": {"term": "definition"}}
+
+
+def _legacy_prepare(dialect: str) -> Any:
+    """What each provider did per structured call before the registry."""
+    schema = Lesson.model_json_schema()
+    if dialect == "openai":
+        return openai_strict_schema(schema)
+    if dialect == "gemini":
+        return gemini_inline_schema(schema)
+    if dialect == "openrouter":
+        return OPENROUTER_SCHEMA_PROMPT.format(schema=json.dumps(schema))
+    # Response cache key fingerprint
+    return json.dumps(schema, sort_keys=True, default=str)
+
+
+def _time(fn: Any, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter() - start) / calls * 1_000_000
+
+
+def run(calls: int) -> None:
+    payload = _payload()
+    registry = SchemaRegistry()
+    start = time.perf_counter()
+    registry.warm([Lesson])
+    warm_ms = (time.perf_counter() - start) * 1000
+    print(f"warm-up: {len(DIALECTS)} dialects compiled in {warm_ms:.2f} ms\n")
+
+    print(f"{'dialect':<12} {'legacy us/call':>16} {'registry us/call':>18} {'speedup':>9}")
+    for dialect in DIALECTS:
+        legacy = _time(lambda dialect=dialect: _legacy_prepare(dialect), calls)
+        cached = _time(lambda dialect=dialect: registry.compile(Lesson, dialect), calls)
+        print(f"{dialect:<12} {legacy:>16.1f} {cached:>18.2f} {legacy / cached:>8.0f}x")
+
+    compiled = registry.compile(Lesson, "gemini")
+    legacy = _time(lambda: Lesson(**payload), calls)
+    cached = _time(lambda: compiled.validate(payload), calls)
+    print(f"\n{'validation':<12} {legacy:>16.1f} {cached:>18.2f} {legacy / cached:>8.1f}x")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark precompiled structured-output schemas")
+    parser.add_argument("--calls", type=int, default=2000, help="Timed calls per dialect")
+    args = parser.parse_args()
+    run(args.calls)
+
+
+if __name__ == "__main__":
+    main()
@@ -15,9 +15,13 @@ Examples:
   # Enable verbose logging to see detailed progress
   python scripts/create_unit.py --topic "Python Basics" --target-lessons 5 --verbose
 
+  # Bulk/seed builds: submit LLM calls through provider batch APIs (half price, minutes-to-hours latency)
+  python scripts/create_unit.py --topic "Python Basics" --target-lessons 5 --batch
+
 Notes:
   - Creates complete units with all lessons generated and persisted.
   - Use --verbose (-v) to see detailed progress information during long-running operations.
+  - LLM calls run in the "bulk" priority class, behind interactive and standard traffic.
   - Requires environment configuration for infrastructure and LLM provider.
 """
 
@@ -25,11 +29,13 @@ from __future__ import annotations
 
 import argparse
 import asyncio
+import contextlib
 import logging
 from pathlib import Path
 
 from modules.content_creator.public import content_creator_provider
 from modules.infrastructure.public import infrastructure_provider
+from modules.llm_services.public import BULK, BatchExecutor, llm_batch_mode, llm_priority
 
 
 def parse_args() -> argparse.Namespace:
@@ -41,6 +47,8 @@ def parse_args() -> argparse.Namespace:
     p.add_argument("--target-lessons", type=int, default=None, help="Target number of lessons for the unit (e.g., 5, 10, 20)")
     p.add_argument("--learner-level", default="beginner", choices=["beginner", "intermediate", "advanced"], help="Target learner level")
     p.add_argument("--background", action="store_true", help="Run creation in the background (ARQ)")
+    p.add_argument("--batch", action="store_true", help="Submit LLM calls through provider batch APIs (OpenAI Batch, Anthropic Message Batches)")
+    p.add_argument("--batch-poll-interval", type=float, default=30.0, help="Seconds between batch status polls in --batch mode")
     p.add_argument("--verbose", "-v", action="store_true", help="Enable verbose logging to see detailed progress")
     return p.parse_args()
 
@@ -63,6 +71,10 @@ async def main() -> int:
 
     setup_logging(args.verbose)
 
+    if args.batch and args.background:
+        print("❌ --batch runs in the foreground; it cannot be combined with --background")
+        return 2
+
     if args.verbose:
         if args.background:
             print("⚙️  Using background mode (ARQ)")
@@ -97,14 +109,16 @@ async def main() -> int:
         if args.verbose:
             print("⚡ Running unit creation (this may take several minutes)...")
 
-        # Unified API
-        result = await creator.create_unit(
-            topic=args.topic or "",
-            source_material=source_material,
-            background=bool(args.background),
-            target_lesson_count=args.target_lessons,
-            learner_level=args.learner_level,
-        )
+        # Unified API; in batch mode steps stay suspended until their provider batch lands
+        batch_mode = llm_batch_mode(BatchExecutor(poll_interval=args.batch_poll_interval)) if args.batch else contextlib.nullcontext()
+        async with batch_mode:
+            result = await creator.create_unit(
+                topic=args.topic or "",
+                source_material=source_material,
+                background=bool(args.background),
+                target_lesson_count=args.target_lessons,
+                learner_level=args.learner_level,
+            )
 
         if args.background:
             # Background path returns MobileUnitCreationResult
@@ -141,7 +155,9 @@ async def main() -> int:
 
 if __name__ == "__main__":
     try:
-        exit_code = asyncio.run(main())
+        # Offline generation yields the LLM concurrency windows to interactive traffic (the run's task inherits the context)
+        with llm_priority(BULK):
+            exit_code = asyncio.run(main())
     except KeyboardInterrupt:
         exit_code = 130
     raise SystemExit(exit_code)
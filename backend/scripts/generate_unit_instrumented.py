@@ -25,6 +25,9 @@ Usage:
 
     # Generate only artwork
     python scripts/generate_unit_instrumented.py --config examples/superconductivity.json --only artwork --unit-id <unit_id>
+
+    # Bulk runs: submit LLM calls through provider batch APIs (half price, minutes-to-hours latency)
+    python scripts/generate_unit_instrumented.py --config examples/roman_republic.json --batch
 """
 
 from __future__ import annotations
@@ -32,6 +35,7 @@ from __future__ import annotations
 import argparse
 import asyncio
 from collections import defaultdict
+import contextlib
 from datetime import UTC, datetime
 import json
 import logging
@@ -55,6 +59,7 @@ from modules.content_creator.podcast import PodcastLesson
 from modules.content_creator.steps import UnitLearningObjective
 from modules.infrastructure.public import infrastructure_provider
 from modules.llm_services.models import LLMRequestModel
+from modules.llm_services.public import BULK, BatchExecutor, llm_batch_mode, llm_priority
 
 logger = logging.getLogger(__name__)
 
@@ -937,6 +942,19 @@ def parse_args() -> argparse.Namespace:
         help="Existing unit ID (required for --only modes)",
     )
 
+    p.add_argument(
+        "--batch",
+        action="store_true",
+        help="Submit LLM calls through provider batch APIs (OpenAI Batch, Anthropic Message Batches)",
+    )
+
+    p.add_argument(
+        "--batch-poll-interval",
+        type=float,
+        default=30.0,
+        help="Seconds between batch status polls in --batch mode",
+    )
+
     p.add_argument(
         "--verbose",
         "-v",
@@ -980,7 +998,8 @@ async def main() -> int:
     infra = infrastructure_provider()
     infra.initialize()
 
-    async with infra.get_async_session_context() as session:
+    batch_mode = llm_batch_mode(BatchExecutor(poll_interval=args.batch_poll_interval)) if args.batch else contextlib.nullcontext()
+    async with infra.get_async_session_context() as session, batch_mode:
         output_mgr = OutputManager(config.memorable_id)
         generator = InstrumentedUnitGenerator(session, config, output_mgr)
 
@@ -1004,7 +1023,9 @@ async def main() -> int:
 
 if __name__ == "__main__":
     try:
-        exit_code = asyncio.run(main())
+        # Offline generation yields the LLM concurrency windows to interactive traffic (the run's task inherits the context)
+        with llm_priority(BULK):
+            exit_code = asyncio.run(main())
     except KeyboardInterrupt:
         exit_code = 130
     raise SystemExit(exit_code)
@@ -12,10 +12,11 @@ from datetime import datetime
 import logging
 from pathlib import Path
 import sys
-from typing import Annotated
+from typing import Annotated, Any, TypeVar
 
 from fastapi import Depends, FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 import uvicorn
 
 # Add modules to path
@@ -26,15 +27,18 @@ from modules.catalog.routes import router as catalog_router
 from modules.content.routes import router as content_router
 from modules.content.routes import unit_resources_router
 from modules.content_creator.routes import router as content_creator_router
+from modules.conversation_engine.public import BaseConversation
+from modules.flow_engine.public import StructuredStep
 from modules.flow_engine.routes import router as flow_engine_router
 from modules.infrastructure.debug_routes import router as debug_router
 from modules.infrastructure.exception_handlers import (
     setup_error_middleware,
     setup_exception_handlers,
 )
-from modules.infrastructure.public import DatabaseSession, infrastructure_provider
+from modules.infrastructure.public import CONTENT_TYPE_LATEST, DatabaseSession, executor_metrics, infrastructure_provider, render_metrics, shutdown_executors
 from modules.learning_conversations.routes import router as learning_conversations_router
 from modules.learning_session.routes import router as learning_session_router
+from modules.llm_services.public import shutdown_llm_clients, warm_prompt_templates, warm_response_schemas
 from modules.resource.routes import router as resource_router
 from modules.task_queue.routes import router as task_queue_router
 from modules.user.routes import router as user_router
@@ -100,6 +104,23 @@ logger = logging.getLogger(__name__)
 # Initialize infrastructure service
 infrastructure = infrastructure_provider()
 
+T = TypeVar("T")
+
+
+def _all_subclasses(cls: type[T]) -> list[type[T]]:
+    subclasses: list[type[T]] = cls.__subclasses__()
+    return subclasses + [nested for subclass in subclasses for nested in _all_subclasses(subclass)]
+
+
+def _response_models() -> list[Any]:
+    """Collect every structured step ``Outputs`` class and conversation response model."""
+    # Outputs is declared by each concrete step rather than on StructuredStep itself
+    outputs = (getattr(step, "Outputs", None) for step in _all_subclasses(StructuredStep))
+    models: list[Any] = [model for model in outputs if model is not None]
+    for conversation in _all_subclasses(BaseConversation):
+        models.extend(conversation.response_models)
+    return models
+
 
 @asynccontextmanager
 async def lifespan(_app: FastAPI) -> AsyncGenerator[None, None]:
@@ -114,6 +135,14 @@ async def lifespan(_app: FastAPI) -> AsyncGenerator[None, None]:
         if not env_status.is_valid:
             logger.warning(f"Environment validation issues: {env_status.errors}")
 
+        # Compile provider schemas once so the first structured call doesn't pay for it
+        compiled = warm_response_schemas(_response_models())
+        logger.info(f"Precompiled {compiled} structured output schemas")
+
+        # Read and compile every prompt template before the first step renders one
+        prompts = warm_prompt_templates()
+        logger.info(f"Precompiled {prompts} prompt templates")
+
         logger.info("Learning API server started successfully")
         logger.info("Modular architecture: content_creator, learning_session, catalog, infrastructure")
 
@@ -123,7 +152,17 @@ async def lifespan(_app: FastAPI) -> AsyncGenerator[None, None]:
 
     yield
 
-    # Shutdown (if needed in the future)
+    # Shutdown
+    try:
+        await shutdown_llm_clients()
+    except Exception as e:
+        logger.error(f"Error closing LLM provider clients: {e}")
+
+    try:
+        # Let in-flight blocking calls finish before the process exits
+        shutdown_executors()
+    except Exception as e:
+        logger.error(f"Error shutting down executors: {e}")
 
 
 # Initialize FastAPI app
@@ -213,6 +252,18 @@ async def health_check() -> dict[str, str | dict[str, bool] | list[str]]:
     }
 
 
+@app.get("/health/executors")
+async def executor_health() -> dict[str, dict[str, Any]]:
+    """Queue depth, in-flight work and queue wait times of the blocking-work thread pools."""
+    return executor_metrics()
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics() -> PlainTextResponse:
+    """Step, LLM, commit and queue-wait histograms of this process in the Prometheus text format."""
+    return PlainTextResponse(render_metrics(), media_type=CONTENT_TYPE_LATEST)
+
+
 if __name__ == "__main__":
     uvicorn.run(
         "server:app",